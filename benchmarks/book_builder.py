@@ -0,0 +1,118 @@
+#
+# Copyright 2023 Google LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+Measures BookBuilderHandler update throughput and memory use on a synthetic ITCH order flow.
+
+    python -m benchmarks.book_builder --orders 1000000 --updates 1000000 --depth 5
+"""
+
+import argparse
+import random
+import time
+import tracemalloc
+
+from transcoder.message.ParsedMessage import ParsedMessage
+from transcoder.message.handler import BookBuilderHandler
+
+
+class OrderFlow:
+    """Generates ITCH order messages as decoded dictionaries, for orders priced around a mid per instrument"""
+
+    def __init__(self, instruments: int, seed: int = 1):
+        self.random = random.Random(seed)
+        self.instruments = instruments
+        self.live_orders = []
+        self.next_order_id = 1
+
+    def add_order(self) -> ParsedMessage:
+        """Returns a new order message"""
+        order_id = self.next_order_id
+        self.next_order_id += 1
+        self.live_orders.append(order_id)
+        is_buy = self.random.random() < 0.5
+        offset = self.random.randint(1, 50) * 100
+        return ParsedMessage(65, 'add_order_no_attribution', None, dictionary={
+            'stock_locate': order_id % self.instruments, 'tracking_number': 0, 'timestamp': order_id,
+            'order_reference_number': order_id, 'buy_sell_indicator': 'Buy' if is_buy else 'Sell',
+            'shares': self.random.randint(1, 10) * 100, 'stock': None,
+            'price': 1_000_000 - offset if is_buy else 1_000_000 + offset})
+
+    def update(self) -> ParsedMessage:
+        """Returns an add, execution, cancel, delete or replace message, keeping the live order count steady"""
+        choice = self.random.random()
+        if choice < 0.3 or not self.live_orders:
+            return self.add_order()
+        index = self.random.randrange(len(self.live_orders))
+        order_id = self.live_orders[index]
+        fields = {'stock_locate': order_id % self.instruments, 'tracking_number': 0, 'timestamp': order_id}
+        if choice < 0.45:
+            return ParsedMessage(69, 'order_executed', None, dictionary=dict(
+                fields, order_reference_number=order_id, executed_shares=100, match_number=1))
+        if choice < 0.6:
+            return ParsedMessage(88, 'order_cancelled', None, dictionary=dict(
+                fields, order_reference_number=order_id, cancelled_shares=100))
+        self.live_orders[index] = self.live_orders[-1]
+        self.live_orders.pop()
+        if choice < 0.85:
+            return ParsedMessage(68, 'order_deleted', None, dictionary=dict(fields, order_reference_number=order_id))
+        new_order_id = self.next_order_id
+        self.next_order_id += 1
+        self.live_orders.append(new_order_id)
+        return ParsedMessage(85, 'order_replaced', None, dictionary=dict(
+            fields, original_order_reference_number=order_id, new_order_reference_number=new_order_id,
+            shares=self.random.randint(1, 10) * 100, price=1_000_000 + self.random.randint(-50, 50) * 100))
+
+
+def main():
+    """Runs the benchmark"""
+    arg_parser = argparse.ArgumentParser(description='BookBuilderHandler benchmark')
+    arg_parser.add_argument('--orders', type=int, default=1_000_000, help='Number of live orders to build')
+    arg_parser.add_argument('--updates', type=int, default=1_000_000, help='Number of updates to time')
+    arg_parser.add_argument('--instruments', type=int, default=1000, help='Number of instruments')
+    arg_parser.add_argument('--depth', type=int, default=1, help='Snapshot depth')
+    arg_parser.add_argument('--interval', type=int, default=1, help='Updates between snapshots')
+    args = arg_parser.parse_args()
+
+    handler = BookBuilderHandler({'depth': args.depth, 'interval': args.interval})
+    flow = OrderFlow(args.instruments)
+
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    for _ in range(args.orders):
+        handler.handle(flow.add_order())
+    book_memory = tracemalloc.get_traced_memory()[0] - baseline - len(flow.live_orders) * 8
+    tracemalloc.stop()
+    print(f'Live orders: {len(handler.orders)}')
+    print(f'Memory per million live orders: {book_memory / len(handler.orders) * 1_000_000 / 2 ** 20:.1f} MiB')
+
+    updates = [flow.update() for _ in range(args.updates)]
+    snapshot_count = 0
+    start = time.perf_counter()
+    for message in updates:
+        handler.handle(message)
+        if message.manufactured_messages is not None:
+            snapshot_count += len(message.manufactured_messages)
+    elapsed = time.perf_counter() - start
+    print(f'Updates: {args.updates}, snapshots emitted: {snapshot_count}')
+    print(f'Update rate: {args.updates / elapsed:,.0f} per second')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,256 @@
+#
+# Copyright 2023 Google LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+Deterministic synthetic corpora for the transcoder benchmarks, in each of the file formats the bundled ITCH, CME and
+FIX schemas are read from. The same seed and message count always give the same bytes.
+
+    python -m benchmarks.corpus itch_length_delimited itch.bin --messages 100000
+"""
+
+import argparse
+import os
+import random
+import struct
+from dataclasses import dataclass
+from typing import Callable
+
+import dpkt
+
+RESOURCES_PATH = os.path.join(os.path.dirname(__file__), 'resources')
+TEST_RESOURCES_PATH = os.path.join(os.path.dirname(__file__), '..', 'transcoder', 'tests', 'resources')
+ITCH_SCHEMA_PATH = os.path.normpath(os.path.join(TEST_RESOURCES_PATH, 'itch_test_schema.xml'))
+FIX_SPEC_PATH = os.path.normpath(os.path.join(TEST_RESOURCES_PATH, 'fix_test_spec.xml'))
+CME_SCHEMA_PATH = os.path.join(RESOURCES_PATH, 'cme_benchmark_schema.xml')
+
+CME_SCHEMA_ID = 1
+CME_SCHEMA_VERSION = 9
+CME_MESSAGES_PER_PACKET = 4
+
+
+class ItchMessages:  # pylint: disable=too-few-public-methods
+    """Generates ITCH order flow: time messages, adds, executions, cancels, deletes, replaces and trades"""
+
+    def __init__(self, seed: int = 1, instruments: int = 100):
+        self.random = random.Random(seed)
+        self.instruments = instruments
+        self.next_order_id = 1
+        self.live_orders = []
+        self.timestamp = 0
+
+    def header(self, message_type: bytes, stock_locate: int) -> bytes:
+        """Returns the type, stock locate, tracking number and timestamp common to the order messages"""
+        self.timestamp += self.random.randint(1, 1000)
+        return message_type + struct.pack('>HH', stock_locate, 0) + self.timestamp.to_bytes(6, 'big')
+
+    def next_message(self) -> bytes:
+        """Returns the next message of the flow"""
+        choice = self.random.random()
+        if choice < 0.01:
+            return b'T' + struct.pack('>I', self.timestamp // 1_000_000_000)
+        if choice < 0.4 or len(self.live_orders) < 10:
+            return self.add_order()
+        return self.update_order(choice)
+
+    def add_order(self) -> bytes:
+        """Returns an add order message for a new live order"""
+        order_id = self.next_order_id
+        self.next_order_id += 1
+        self.live_orders.append(order_id)
+        return self.header(b'A', order_id % self.instruments) + struct.pack(
+            '>QcI8sI', order_id, self.random.choice([b'B', b'S']), self.random.randint(1, 10) * 100,
+            b'SYM%05d' % (order_id % self.instruments), self.random.randint(9_000, 11_000) * 100)
+
+    def update_order(self, choice: float) -> bytes:
+        """Returns an execution, cancel, trade, delete or replace of a random live order, as the choice says"""
+        index = self.random.randrange(len(self.live_orders))
+        order_id = self.live_orders[index]
+        stock_locate = order_id % self.instruments
+        if choice < 0.5:
+            return self.header(b'E', stock_locate) + struct.pack('>QIQ', order_id, 100, self.next_order_id)
+        if choice < 0.6:
+            return self.header(b'X', stock_locate) + struct.pack('>QI', order_id, 100)
+        if choice < 0.65:
+            return self.header(b'P', stock_locate) + struct.pack(
+                '>QcI8sIQ', 0, b'B', 100, b'SYM%05d' % stock_locate, self.random.randint(9_000, 11_000) * 100,
+                self.next_order_id)
+        self.live_orders[index] = self.live_orders[-1]
+        self.live_orders.pop()
+        if choice < 0.85:
+            return self.header(b'D', stock_locate) + struct.pack('>Q', order_id)
+        new_order_id = self.next_order_id
+        self.next_order_id += 1
+        self.live_orders.append(new_order_id)
+        return self.header(b'U', stock_locate) + struct.pack(
+            '>QQII', order_id, new_order_id, self.random.randint(1, 10) * 100, self.random.randint(9_000, 11_000) * 100)
+
+
+class CmeMessages:  # pylint: disable=too-few-public-methods
+    """Generates CME MDP 3.0 style book updates and trade summaries, as SBE messages with a message header"""
+
+    def __init__(self, seed: int = 1, instruments: int = 20):
+        self.random = random.Random(seed)
+        self.instruments = instruments
+        self.transact_time = 1_700_000_000_000_000_000
+        self.rpt_seq = 0
+
+    def next_message(self) -> bytes:
+        """Returns the next SBE message, with one to four entries"""
+        self.transact_time += self.random.randint(1_000, 1_000_000)
+        entry_count = self.random.randint(1, 4)
+        entries = []
+        is_trade = self.random.random() < 0.2
+        for _ in range(entry_count):
+            self.rpt_seq += 1
+            mantissa = self.random.randint(4_000, 5_000) * 250_000_000
+            security_id = self.random.randrange(self.instruments)
+            if is_trade:
+                entries.append(struct.pack('<qbiiIiB', mantissa, -9, self.random.randint(1, 50), security_id,
+                                           self.rpt_seq, self.random.randint(1, 5), self.random.randint(1, 2)))
+            else:
+                entries.append(struct.pack('<qbiiIiBBc', mantissa, -9, self.random.randint(1, 500), security_id,
+                                           self.rpt_seq, self.random.randint(1, 20), self.random.randint(1, 10),
+                                           self.random.randint(0, 2), self.random.choice([b'0', b'1'])))
+        template_id, entry_length = (48, 26) if is_trade else (46, 28)
+        return struct.pack('<HHHHQB', 9, template_id, CME_SCHEMA_ID, CME_SCHEMA_VERSION, self.transact_time, 0x81) \
+            + struct.pack('<HB', entry_length, entry_count) + b''.join(entries)
+
+
+class FixMessages:  # pylint: disable=too-few-public-methods
+    """Generates FIX 4.4 execution reports, market data incremental refreshes and heartbeats"""
+
+    def __init__(self, seed: int = 1):
+        self.random = random.Random(seed)
+        self.sequence_number = 0
+
+    def next_message(self) -> bytes:
+        """Returns the next message, with its BodyLength and CheckSum set"""
+        self.sequence_number += 1
+        choice = self.random.random()
+        if choice < 0.05:
+            msg_type, body = '0', ''
+        elif choice < 0.6:
+            price = self.random.randint(9_000, 11_000) / 100
+            body = f'37=O{self.sequence_number}|17=E{self.sequence_number}|150=F|39=2|' \
+                   f'55=SYM{self.random.randrange(100):03d}|54={self.random.randint(1, 2)}|38=100|44={price}|' \
+                   f'32=100|31={price}|151=0|14=100|60=20230101-12:00:00.000|'
+            msg_type = '8'
+        else:
+            entries = ''.join(f'279={self.random.randint(0, 2)}|269={self.random.randint(0, 1)}|'
+                              f'55=SYM{self.random.randrange(100):03d}|'
+                              f'270={self.random.randint(9_000, 11_000) / 100}|271={self.random.randint(1, 50)}|'
+                              for _ in range(self.random.randint(1, 3)))
+            msg_type, body = 'X', f'268={entries.count("279=")}|{entries}'
+        body = f'35={msg_type}|49=SENDER|56=TARGET|34={self.sequence_number}|52=20230101-12:00:00.000|{body}'
+        body = body.replace('|', '\x01').encode('ascii')
+        message = b'8=FIX.4.4\x019=%d\x01' % len(body) + body
+        return message + b'10=%03d\x01' % (sum(message) % 256)
+
+
+def write_length_delimited(path: str, messages, count: int):
+    """Writes messages with a 2 byte big endian length prefix"""
+    with open(path, 'wb') as corpus_file:
+        for _ in range(count):
+            message = messages.next_message()
+            corpus_file.write(struct.pack('>H', len(message)) + message)
+
+
+def write_pcap(path: str, messages, count: int):
+    """Writes one message per UDP datagram, in an Ethernet capture"""
+    with open(path, 'wb') as corpus_file:
+        writer = dpkt.pcap.Writer(corpus_file)
+        for i in range(count):
+            udp = dpkt.udp.UDP(sport=26400, dport=26400, data=messages.next_message())
+            udp.ulen = len(udp)
+            ip = dpkt.ip.IP(src=b'\x0a\x00\x00\x01', dst=b'\xe9\x36\x0c\x01', p=dpkt.ip.IP_PROTO_UDP, data=udp)
+            ip.len = len(ip)
+            ethernet = dpkt.ethernet.Ethernet(data=ip, type=dpkt.ethernet.ETH_TYPE_IP)
+            writer.writepkt(bytes(ethernet), ts=1_700_000_000 + i / 1_000_000)
+
+
+def write_cme_binary_packet(path: str, messages, count: int):
+    """Writes packets of CME_MESSAGES_PER_PACKET messages in the CME binary packet format: a 2 byte little endian
+    packet length, the 12 byte sequence number and sending time header, then each message with its 2 byte size"""
+    with open(path, 'wb') as corpus_file:
+        sequence_number = 0
+        for start in range(0, count, CME_MESSAGES_PER_PACKET):
+            sequence_number += 1
+            body = b''
+            for _ in range(min(CME_MESSAGES_PER_PACKET, count - start)):
+                message = messages.next_message()
+                body += struct.pack('<H', len(message) + 2) + message
+            header = struct.pack('<IQ', sequence_number, 1_700_000_000_000_000_000 + sequence_number)
+            corpus_file.write(struct.pack('<H', len(header) + len(body)) + header + body)
+
+
+def write_line_delimited(path: str, messages, count: int):
+    """Writes one message per line"""
+    with open(path, 'wb') as corpus_file:
+        for _ in range(count):
+            corpus_file.write(messages.next_message() + b'\n')
+
+
+def write_stream(path: str, messages, count: int):
+    """Writes messages back to back, without delimiters"""
+    with open(path, 'wb') as corpus_file:
+        for _ in range(count):
+            corpus_file.write(messages.next_message())
+
+
+@dataclass(frozen=True)
+class Corpus:
+    """A message generator and file format, with the transcoder options that read them"""
+    messages_class: type
+    writer: Callable
+    factory: str
+    schema_file_path: str
+    source_file_format_type: str
+    source_file_endian: str = 'big'
+
+
+CORPORA = {
+    'itch_length_delimited': Corpus(ItchMessages, write_length_delimited, 'itch', ITCH_SCHEMA_PATH,
+                                    'length_delimited'),
+    'itch_pcap': Corpus(ItchMessages, write_pcap, 'itch', ITCH_SCHEMA_PATH, 'pcap'),
+    'cme_binary_packet': Corpus(CmeMessages, write_cme_binary_packet, 'cme', CME_SCHEMA_PATH, 'cme_binary_packet',
+                                'little'),
+    'fix_line_delimited': Corpus(FixMessages, write_line_delimited, 'fix', FIX_SPEC_PATH, 'line_delimited'),
+    'fix_stream': Corpus(FixMessages, write_stream, 'fix', FIX_SPEC_PATH, 'fix_stream'),
+}
+
+
+def write_corpus(name: str, path: str, count: int, seed: int = 1):
+    """Writes count messages of the named corpus to path"""
+    corpus = CORPORA[name]
+    corpus.writer(path, corpus.messages_class(seed), count)
+
+
+def main():
+    """Writes a corpus"""
+    arg_parser = argparse.ArgumentParser(description='Synthetic benchmark corpus writer')
+    arg_parser.add_argument('corpus', choices=sorted(CORPORA), help='Corpus to write')
+    arg_parser.add_argument('path', help='Path of the corpus file')
+    arg_parser.add_argument('--messages', type=int, default=100_000, help='Number of messages')
+    arg_parser.add_argument('--seed', type=int, default=1, help='Random seed')
+    args = arg_parser.parse_args()
+    write_corpus(args.corpus, args.path, args.messages, args.seed)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+#
+# Copyright 2023 Google LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+Measures CLI startup time, from interpreter start to the source, parser and output classes being loaded, for the
+common file to file paths, and checks it against a budget. Each path is timed in a fresh interpreter.
+
+    python -m benchmarks.startup --runs 10 --budget_ms 150
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+# factory, source_file_format_type, output_type
+STARTUP_PATHS = [
+    ('itch', 'length_delimited', 'fastavro'),
+    ('itch', 'length_delimited', 'avro'),
+    ('itch', 'length_delimited', 'jsonl'),
+    ('itch', 'pcap', 'jsonl'),
+    ('cme', 'cme_binary_packet', 'fastavro'),
+    ('fix', 'line_delimited', 'jsonl'),
+    ('fix', 'fix_stream', 'length_delimited'),
+]
+
+# Dependencies that none of the paths above should import
+HEAVY_MODULES = ['google.cloud.bigquery', 'google.cloud.pubsub_v1', 'numpy', 'yaml']
+
+STARTUP_SCRIPT = '''
+import json, sys, time
+start = time.perf_counter()
+import transcoder.main
+from transcoder.message.MessageUtil import message_parsers
+from transcoder.output.OutputUtil import get_output_manager_class
+from transcoder.source.SourceUtil import get_source_class
+factory, source_type, output_type = sys.argv[1:4]
+message_parsers.load(factory)
+get_source_class(source_type)
+get_output_manager_class(output_type)
+elapsed = time.perf_counter() - start
+print(json.dumps({'elapsed': elapsed, 'modules': [x for x in sys.argv[4:] if x in sys.modules]}))
+'''
+
+
+def time_startup(factory: str, source_type: str, output_type: str) -> dict:
+    """Returns the startup time of a path in a fresh interpreter, and the heavy modules it imported"""
+    result = subprocess.run([sys.executable, '-c', STARTUP_SCRIPT, factory, source_type, output_type] + HEAVY_MODULES,
+                            capture_output=True, check=True, text=True)
+    return json.loads(result.stdout)
+
+
+def main():
+    """Runs the benchmark, exiting with an error if any path exceeds the budget"""
+    arg_parser = argparse.ArgumentParser(description='CLI startup benchmark')
+    arg_parser.add_argument('--runs', type=int, default=10, help='Number of runs per path, the median is reported')
+    arg_parser.add_argument('--budget_ms', type=float, default=150, help='Startup time budget per path')
+    args = arg_parser.parse_args()
+
+    over_budget = False
+    for path in STARTUP_PATHS:
+        results = [time_startup(*path) for _ in range(args.runs)]
+        median_ms = statistics.median(x['elapsed'] for x in results) * 1000
+        modules = sorted(set(y for x in results for y in x['modules']))
+        status = 'ok' if median_ms <= args.budget_ms and not modules else 'OVER BUDGET'
+        over_budget = over_budget or status != 'ok'
+        print(f'{"/".join(path):45} {median_ms:8.1f} ms  {status}{"  imports " + ", ".join(modules) if modules else ""}')
+    sys.exit(1 if over_budget else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,201 @@
+#
+# Copyright 2023 Google LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+Measures end to end transcoding of the synthetic corpora, for every source, parser and output combination that runs
+offline: messages and bytes per second, peak RSS and startup time. Each combination runs in a fresh interpreter.
+Results are written to a JSON baseline, and can be compared with the baseline of another commit.
+
+    python -m benchmarks.transcode --messages 100000 --output baseline.json
+    python -m benchmarks.transcode --output current.json --compare baseline.json --threshold 5
+
+With --message_handlers, combinations that parse messages are run with the handlers both batched and message by
+message, so the two handler paths of the transcoder can be compared.
+
+    python -m benchmarks.transcode --corpus itch_length_delimited --output_type diag \
+        --message_handlers SequencerHandler,TimestampPullForwardHandler
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.corpus import CORPORA, write_corpus
+
+# Output types that run without cloud credentials. length_delimited writes the framed source messages unparsed
+OFFLINE_OUTPUT_TYPES = ['diag', 'jsonl', 'avro', 'fastavro', 'length_delimited']
+FRAME_ONLY_OUTPUT_TYPES = ['length_delimited']
+# Source format and output combinations that cannot run: the line delimited source yields text, which the length
+# delimited output does not write
+UNSUPPORTED_COMBINATIONS = [('line_delimited', 'length_delimited')]
+
+# Suffixes of the results of each handler path, when message handlers are given
+HANDLER_PATHS = {True: 'batched', False: 'per_message'}
+
+# Higher is better for these results, lower for the others
+THROUGHPUT_RESULTS = ['messages_per_second', 'bytes_per_second']
+COMPARED_RESULTS = THROUGHPUT_RESULTS + ['peak_rss_bytes', 'startup_seconds']
+
+CASE_SCRIPT = '''
+import json, os, resource, sys, time
+case = json.loads(sys.argv[1])
+from transcoder import Transcoder, TranscoderConfig
+transcoder = Transcoder.from_config(TranscoderConfig(**case['config']))
+if case['batch_handlers'] is not None:
+    transcoder.batch_handlers = case['batch_handlers']
+ready = time.time()
+stdout, sys.stdout = sys.stdout, open(os.devnull, 'w', encoding='utf-8')
+start = time.perf_counter()
+transcoder.transcode()
+transcoder.output_manager.wait_for_completion()
+elapsed = time.perf_counter() - start
+sys.stdout.close()
+sys.stdout = stdout
+peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({'ready': ready, 'elapsed': elapsed, 'messages': transcoder.source.record_count,
+                  'errors': sum(getattr(transcoder.message_parser, 'error_summary_count', {}).values()),
+                  'peak_rss_bytes': peak_rss if sys.platform == 'darwin' else peak_rss * 1024}))
+'''
+
+
+def run_case(corpus_name: str, corpus_path: str, output_type: str, work_dir: str, *,  # pylint: disable=too-many-arguments
+             message_handlers: str = None, batch_handlers: bool = None) -> dict:
+    """Transcodes a corpus to an output in a fresh interpreter, returning its timings and peak RSS. Handlers are
+    run batched or message by message as batch_handlers says, or as the transcoder selects if it is None"""
+    corpus = CORPORA[corpus_name]
+    output_path = tempfile.mkdtemp(dir=work_dir)
+    config = {'factory': corpus.factory, 'schema_file_path': corpus.schema_file_path,
+              'source_file_path': corpus_path, 'source_file_format_type': corpus.source_file_format_type,
+              'source_file_endian': corpus.source_file_endian, 'output_type': output_type,
+              'output_path': output_path, 'error_output_path': output_path, 'quiet': True,
+              'frame_only': output_type in FRAME_ONLY_OUTPUT_TYPES, 'message_handlers': message_handlers}
+    launched = time.time()
+    result = subprocess.run([sys.executable, '-c', CASE_SCRIPT,
+                             json.dumps({'config': config, 'batch_handlers': batch_handlers})],
+                            capture_output=True, check=False, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f'{corpus_name}/{output_type} failed:\n{result.stderr}')
+    measured = json.loads(result.stdout.splitlines()[-1])
+    measured['startup_seconds'] = measured.pop('ready') - launched
+    return measured
+
+
+def run_benchmarks(args) -> dict:
+    """Writes the corpora and runs each combination, returning the medians of the runs by combination"""
+    results = {}
+    with tempfile.TemporaryDirectory() as work_dir:
+        for corpus_name in args.corpus or sorted(CORPORA):
+            corpus_path = os.path.join(work_dir, corpus_name)
+            write_corpus(corpus_name, corpus_path, args.messages, args.seed)
+            corpus_size = os.path.getsize(corpus_path)
+            for output_type in args.output_type or OFFLINE_OUTPUT_TYPES:
+                if (CORPORA[corpus_name].source_file_format_type, output_type) in UNSUPPORTED_COMBINATIONS:
+                    continue
+                # Frame only outputs do not parse messages, so handlers are not run
+                handler_paths = [True, False] if args.message_handlers is not None \
+                    and output_type not in FRAME_ONLY_OUTPUT_TYPES else [None]
+                for batch_handlers in handler_paths:
+                    runs = [run_case(corpus_name, corpus_path, output_type, work_dir,
+                                     message_handlers=args.message_handlers, batch_handlers=batch_handlers)
+                            for _ in range(args.runs)]
+                    elapsed = statistics.median(x['elapsed'] for x in runs)
+                    case = {'messages': runs[0]['messages'], 'bytes': corpus_size, 'errors': runs[0]['errors'],
+                            'elapsed_seconds': round(elapsed, 6),
+                            'messages_per_second': round(runs[0]['messages'] / elapsed, 1),
+                            'bytes_per_second': round(corpus_size / elapsed, 1),
+                            'peak_rss_bytes': max(x['peak_rss_bytes'] for x in runs),
+                            'startup_seconds': round(statistics.median(x['startup_seconds'] for x in runs), 6)}
+                    name = f'{corpus_name}/{output_type}' if batch_handlers is None \
+                        else f'{corpus_name}/{output_type}/{HANDLER_PATHS[batch_handlers]}'
+                    results[name] = case
+                    print(f'{name:40} {case["messages_per_second"]:>12,.0f} msg/s '
+                          f'{case["bytes_per_second"] / 2 ** 20:>8.2f} MiB/s '
+                          f'{case["peak_rss_bytes"] / 2 ** 20:>8.1f} MiB {case["startup_seconds"] * 1000:>8.1f} ms '
+                          f'startup{"  " + str(case["errors"]) + " errors" if case["errors"] else ""}')
+    return results
+
+
+def git_commit() -> str:
+    """Returns the commit of the working tree, or None outside a git checkout"""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, check=True,
+                              text=True, cwd=os.path.dirname(__file__)).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> bool:
+    """Prints the change of each result from the baseline, returning whether any got worse by more than threshold
+    percent"""
+    regressed = False
+    print(f'\nCompared with {baseline.get("commit")}:')
+    for name, case in results.items():
+        previous = baseline['results'].get(name)
+        if previous is None:
+            continue
+        changes = []
+        for key in COMPARED_RESULTS:
+            change = (case[key] - previous[key]) / previous[key] * 100 if previous[key] else 0.0
+            worse = -change if key in THROUGHPUT_RESULTS else change
+            regressed = regressed or worse > threshold
+            changes.append(f'{key} {change:+6.1f}%{" !" if worse > threshold else "  "}')
+        print(f'{name:40} {"  ".join(changes)}')
+    return regressed
+
+
+def main():
+    """Runs the benchmark, exiting with an error if a comparison shows a regression"""
+    arg_parser = argparse.ArgumentParser(description='End to end transcoding benchmark')
+    arg_parser.add_argument('--messages', type=int, default=100_000, help='Number of messages per corpus')
+    arg_parser.add_argument('--runs', type=int, default=3, help='Number of runs per combination, the median is '
+                                                                 'reported')
+    arg_parser.add_argument('--seed', type=int, default=1, help='Random seed of the corpora')
+    arg_parser.add_argument('--corpus', action='append', choices=sorted(CORPORA),
+                            help='Corpus to run, may be repeated. Defaults to all')
+    arg_parser.add_argument('--output_type', action='append', choices=OFFLINE_OUTPUT_TYPES,
+                            help='Output to run, may be repeated. Defaults to all')
+    arg_parser.add_argument('--message_handlers', help='Comma delimited list of message handlers to run, both '
+                                                       'batched and message by message')
+    arg_parser.add_argument('--output', help='Path of the JSON baseline to write')
+    arg_parser.add_argument('--compare', help='Path of a JSON baseline to compare with')
+    arg_parser.add_argument('--threshold', type=float, default=5.0,
+                            help='Percentage by which a result may get worse than the compared baseline')
+    args = arg_parser.parse_args()
+
+    results = run_benchmarks(args)
+    baseline = {'commit': git_commit(), 'python': platform.python_version(), 'platform': platform.platform(),
+                'messages': args.messages, 'runs': args.runs, 'seed': args.seed,
+                'message_handlers': args.message_handlers, 'results': results}
+    if args.output is not None:
+        with open(args.output, 'w', encoding='utf-8') as output_file:
+            json.dump(baseline, output_file, indent=2)
+
+    if args.compare is not None:
+        with open(args.compare, encoding='utf-8') as compare_file:
+            sys.exit(1 if compare(results, json.load(compare_file), args.threshold) else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -3,6 +3,7 @@ for repetition in a repeating group (rather than relying on the order of the tag
 import logging
 import re
 from collections import deque
+from operator import itemgetter
 
 import six
 
@@ -18,13 +19,100 @@ common.
 """
 
 DELIMITER = '='
-FIX_REGEX_STRING = r'([^{s}{d}]*)[{d}](.*?){s}(?!\w+{s})'
-FIX_REGEX = re.compile(FIX_REGEX_STRING.format(d=DELIMITER, s=SEPARATOR), re.DOTALL)
 MICROSECONDS = 0
 MILLISECONDS = 1
 
 HEADER_TAGS_SET = {str(tag) for tag in HEADER_TAGS}
 ENCODED_TAG_SET = {str(tag) for tag in ENCODED_DATA_TAGS}
+HEADER_TAGS_BYTES = {tag.encode('ascii') for tag in HEADER_TAGS_SET}
+ENCODED_TAG_BYTES = {tag.encode('ascii') for tag in ENCODED_TAG_SET}
+
+
+class TagCache(dict):
+    """Memoizes the conversion of raw tags to ``int`` (or ``str`` for non-numeric tags) for one encoding"""
+
+    MAX_SIZE = 65536
+
+    def __init__(self, encoding):
+        super().__init__()
+        self.encoding = encoding
+
+    def __missing__(self, tag):
+        try:
+            value = int(tag)
+        except ValueError:
+            value = int_or_str(tag, self.encoding)
+        if len(self) < self.MAX_SIZE:
+            self[tag] = value
+        return value
+
+
+class Tokenizer:
+    """
+    Single pass tokenizer splitting a buffer into ``(tag, delimiter, value)`` fields for one delimiter/separator
+    combination, as returned by ``partition``.
+
+    Values are terminated by the separator. As a separator followed by a run of word characters and another
+    separator cannot start a new ``tag=value`` pair, such runs are kept as part of the preceding value. Tokens
+    without a delimiter are otherwise dropped, as is any trailing pair that is not terminated by a separator.
+    """
+
+    def __init__(self, input_in_unicode, delimiter, separator):
+        if input_in_unicode:
+            self.delimiter = delimiter
+            self.separator = separator
+            self.is_word = re.compile(r'\w+').fullmatch
+        else:
+            self.delimiter = delimiter.encode('ascii')
+            self.separator = separator.encode('ascii')
+            self.is_word = re.compile(rb'\w+').fullmatch
+        self.tag_caches = {}
+
+    def tokenize(self, buff):
+        """Returns the list of ``(tag, delimiter, value)`` fields in the buffer, in the type of the buffer"""
+        delimiter = self.delimiter
+        tokens = buff.split(self.separator)
+        tokens.pop()  # the remainder after the final separator is never a complete pair
+        fields = [token.partition(delimiter) for token in tokens]
+        if all(map(itemgetter(1), fields)):
+            # every token is a tag=value pair
+            return fields
+        return self._merge_fields(fields)
+
+    def _merge_fields(self, fields):
+        """Drops tokens without a delimiter, or appends them to the previous value if they are a word"""
+        separator, is_word = self.separator, self.is_word
+        merged = []
+        is_value_open = False
+        for field in fields:
+            if field[1]:
+                merged.append(field)
+                is_value_open = True
+            elif is_value_open and is_word(field[0]):
+                tag, delimiter, value = merged[-1]
+                merged[-1] = (tag, delimiter, value + separator + field[0])
+            else:
+                is_value_open = False
+        return merged
+
+    def get_tag_cache(self, encoding):
+        """Returns the tag conversion cache for the encoding"""
+        tag_cache = self.tag_caches.get(encoding)
+        if tag_cache is None:
+            tag_cache = self.tag_caches[encoding] = TagCache(encoding)
+        return tag_cache
+
+
+_TOKENIZERS = {}
+
+
+def get_tokenizer(input_in_unicode, delimiter=DELIMITER, separator=SEPARATOR):
+    """Returns the cached tokenizer for the input type, delimiter and separator"""
+    key = (input_in_unicode, delimiter, separator)
+    tokenizer = _TOKENIZERS.get(key)
+    if tokenizer is None:
+        tokenizer = _TOKENIZERS[key] = Tokenizer(input_in_unicode, delimiter, separator)
+    return tokenizer
 
 
 # pylint: disable=too-many-branches
@@ -78,43 +166,19 @@ class Codec:
         :param buff: Buffer to parse
         :type buff:  ``bytestr`` or ``unicode``
         :param delimiter: A character that separate key and values inside the FIX message. Generally '='. Note the type:
-          because of the way the buffer is tokenised, this needs to be unicode (or ``str`` in python 2.7*).
+          because of the way the buffer is tokenised, this needs to be unicode.
         :type delimiter: ``unicode``
         :param separator: A character that separate key+value pairs inside the FIX message. Generally '\1'. See type
           observations above.
         :type separator: ``unicode``
         """
-
-        def pushback_generator(iterator):
-            """
-            Generator which allows to push back a previously picked item
-            for example:
-            gen = pushback_generator(range(10))
-            print next(gen)
-            print next(gen)
-            v = next(gen)
-            print v
-            gen.send(v)
-            print next(gen)
-            :param iterator:
-            :return:
-            """
-            for value in iterator:
-                back = yield value
-                if back is not None:
-                    yield back
-                    yield back
-
         assert not (delimiter.isalnum() or separator.isalnum())
 
         encoding, encoding_347 = self.encoding, None
-        input_in_unicode = False
         msg_type = None
 
-        if isinstance(buff, six.text_type):
+        if isinstance(buff, str):
             input_in_unicode = True
-            custom_r = re.compile(six.ensure_text(FIX_REGEX_STRING.format(
-                d=re.escape(delimiter), s=re.escape(separator)), encoding='ascii'), re.DOTALL)
             if self.encoding is not None:
                 encoding = None  # No need to decode
                 logging.warning(
@@ -123,71 +187,64 @@ class Codec:
                 logging.warning('Processing a unicode message and ignore the argument "decode_all_as_347=%s"',
                                 self.decode_all_as_347)
         elif isinstance(buff, bytes):
-            custom_r = re.compile(six.ensure_binary(FIX_REGEX_STRING.format(
-                d=re.escape(delimiter), s=re.escape(separator)), encoding='ascii'), re.DOTALL)
+            input_in_unicode = False
         else:
             raise ValueError(f'Unsupported type of input: {type(buff)}')
 
-        tagvals = custom_r.findall(buff)
+        tokenizer = get_tokenizer(input_in_unicode, delimiter, separator)
+        fields = tokenizer.tokenize(buff)
 
         if not self._no_groups and self.spec is not None:
-            for i in range(4):
-                if tagvals[i][0] in (b'35', '35'):
-                    msg_type = self.spec.msg_types.get(tagvals[i][1])
-
-        if not input_in_unicode:
-            for tag, val in tagvals:
-                if int_or_str(tag) == 347:
-                    encoding_347 = six.ensure_str(val)
-                    break
-                if six.ensure_str(tag) not in HEADER_TAGS_SET:  # already enter the message body
-                    break
-
-        if self.decode_all_as_347 and encoding_347:
-            tagvals = ((int_or_str(tval[0], encoding_347), six.ensure_text(tval[1], encoding_347)) for tval in tagvals)
-        elif encoding:
-            tagvals = ((int_or_str(tval[0], encoding),
-                        six.ensure_text(tval[1], (
-                            encoding_347 if encoding_347 and tval[0].decode() in ENCODED_TAG_SET else encoding))
-                        ) for tval in tagvals)
-        elif not input_in_unicode and six.PY3:
-            tagvals = ((int_or_str(tval[0], 'ascii'),
-                        six.ensure_text(tval[1], (
-                            encoding_347 if encoding_347 and tval[0].decode() in ENCODED_TAG_SET else 'UTF-8'))
-                        ) for tval in tagvals)
-        elif input_in_unicode and six.PY2:
-            tagvals = ((int_or_str(six.ensure_binary(tval[0]), 'ascii'),
-                        six.ensure_binary(tval[1], (
-                            encoding_347 if encoding_347 and tval[0].encode() in ENCODED_TAG_SET else 'UTF-8'))
-                        ) for tval in tagvals)
+            for i in range(min(4, len(fields))):
+                if fields[i][0] in (b'35', '35'):
+                    msg_type = self.spec.msg_types.get(fields[i][2])
+
+        if input_in_unicode:
+            tags = tokenizer.get_tag_cache(None)
+            tagvals = [(tags[tag], value) for tag, _, value in fields]
         else:
-            tagvals = ((int_or_str(tval[0]), tval[1]) for tval in tagvals)
+            for tag, _, val in fields:
+                if tag == b'347' or tag not in HEADER_TAGS_BYTES:
+                    if tokenizer.get_tag_cache(None)[tag] == 347:
+                        encoding_347 = val.decode('UTF-8')
+                    break  # found the encoding or already entered the message body
+
+            if self.decode_all_as_347 and encoding_347:
+                tag_encoding, value_encoding, encoded_value_encoding = encoding_347, encoding_347, encoding_347
+            elif encoding:
+                tag_encoding, value_encoding, encoded_value_encoding = encoding, encoding, encoding_347 or encoding
+            else:
+                tag_encoding, value_encoding, encoded_value_encoding = 'ascii', 'UTF-8', encoding_347 or 'UTF-8'
+
+            tags = tokenizer.get_tag_cache(tag_encoding)
+            if encoded_value_encoding == value_encoding:
+                tagvals = [(tags[tag], value.decode(value_encoding)) for tag, _, value in fields]
+            else:
+                tagvals = [(tags[tag],
+                            value.decode(encoded_value_encoding if tag in ENCODED_TAG_BYTES else value_encoding))
+                           for tag, _, value in fields]
 
         if self._no_groups or self.spec is None or msg_type is None:
             # no groups can be found without a spec, so no point looking up the msg type.
             return self._frg_class(tagvals)
         msg = self._frg_class()
         groups = msg_type.groups
-        tagvals = pushback_generator(tagvals)
-        for tag, value in tagvals:
+        index, count = 0, len(tagvals)
+        while index < count:
+            tag, value = tagvals[index]
+            index += 1
             if tag not in groups:
                 msg[tag] = value
+            elif value == '0':
+                msg[tag] = RepeatingGroup.create_repeating_group(tag)
             else:
-                if value in (b'0', '0'):
-                    msg[tag] = RepeatingGroup.create_repeating_group(tag)
-                else:
-                    contents, last_tagval = self._process_group(tag, tagvals,
-                                                                msg_type=msg_type,
-                                                                group=groups[tag])
-                    msg[tag] = contents
-                    if last_tagval:
-                        tagvals.send(last_tagval)
+                msg[tag], index = self._process_group(tag, tagvals, index, msg_type=msg_type, group=groups[tag])
         return msg
 
-    def _process_group(self, identifying_tag, enumerator, msg_type, group):
+    def _process_group(self, identifying_tag, tagvals, index, msg_type, group):
         """
-        Recursively process a group
-        Returns ``(count_tag, [{}, {}])``
+        Recursively process a group, starting from the tag/value pair at ``index``
+        Returns ``([{}, {}], next_index)`` where ``next_index`` is the first pair not belonging to the group
         """
         rep_group = RepeatingGroup()
         rep_group.number_tag = identifying_tag
@@ -198,7 +255,10 @@ class Codec:
         # MS: Changed to all child tags
         valid_tags = group.all_child_tags
 
-        for tag, value in enumerator:
+        count = len(tagvals)
+        while index < count:
+            tag, value = tagvals[index]
+            index += 1
             if first_tag is None:
                 # handle first tag: we expect all the members of the group to start with this tag
                 first_tag = tag
@@ -214,30 +274,31 @@ class Codec:
                 member[tag] = value
             elif tag in inner_groups:
                 # tag is starting a new sub group, we recurse
-                contents, last_tagval = self._process_group(tag, enumerator, msg_type, group.groups[tag])
-                member[tag] = contents
-                if last_tagval:
+                member[tag], index = self._process_group(tag, tagvals, index, msg_type, inner_groups[tag])
+                if index < count:
                     # we are not at the end of the message.
-                    tag, val = last_tagval
+                    tag, value = tagvals[index]
                     if tag == first_tag:
                         # the embedded group finished this member
                         rep_group.append(member)
                         member = self._frg_class()
-                        member[tag] = val
+                        member[tag] = value
+                        index += 1
                     elif tag in group.tags:
                         # didn't finish this member
-                        member[tag] = val
+                        member[tag] = value
+                        index += 1
                     else:
                         # didn't finish the message but finished the current group
                         rep_group.append(member)
-                        return rep_group, (tag, val)
+                        return rep_group, index
             else:
                 # we're out of the group.
                 rep_group.append(member)
-                return rep_group, (tag, value)
+                return rep_group, index - 1
         # we are reaching the end of the message, so complete, no further tags to pass on
         rep_group.append(member)
-        return rep_group, None
+        return rep_group, index
 
     def _unmap(self, msg):
         """
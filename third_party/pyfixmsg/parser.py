@@ -26,6 +26,8 @@ from third_party.pyfixmsg.codecs.stringfix import Codec
 from third_party.pyfixmsg.exception.FixSchemaNotDefinedError import FixSchemaNotDefinedError
 from third_party.pyfixmsg.fixmessage import FixFragment, FixMessage
 from third_party.pyfixmsg.reference import FixSpec, FixTag, Component, Group
+from third_party.pyfixmsg.spec_cache import FixSpecCache
+from transcoder.PluginRegistry import PluginCapabilities
 from transcoder.message.DatacastField import DatacastField
 from transcoder.message.DatacastGroup import DatacastGroup
 from transcoder.message.DatacastParser import DatacastParser
@@ -36,6 +38,8 @@ from transcoder.message.ParsedMessage import ParsedMessage
 class FixParser(DatacastParser):
     """Fix message parser"""
 
+    capabilities = PluginCapabilities()
+
     @staticmethod
     def supported_factory_types():
         return ['fix']
@@ -43,28 +47,64 @@ class FixParser(DatacastParser):
     def __init__(self, schema_file_path: str,  # pylint: disable=too-many-arguments
                  message_type_inclusions: str = None, message_type_exclusions: str = None,
                  fix_header_tags: str = None, fix_separator: int = 1,
-                 stats_only: bool = False):
+                 stats_only: bool = False, schema_cache_dir: str = None):
         super().__init__(message_type_inclusions=message_type_inclusions,
                          message_type_exclusions=message_type_exclusions, stats_only=stats_only)
         self.schema_file_path = schema_file_path
         self.fix_header_tags = fix_header_tags
         self.fix_separator = fix_separator
-        self.spec = FixSpec(schema_file_path)
+
+        self.spec_cache = FixSpecCache(schema_file_path, schema_cache_dir, fix_header_tags) \
+            if schema_cache_dir is not None else None
+        cache_entry = self.spec_cache.load() if self.spec_cache is not None else None
+        if cache_entry is not None:
+            self.spec, self.cached_schemas = cache_entry
+        else:
+            self.spec, self.cached_schemas = FixSpec(schema_file_path), None
 
         # The codec will use the given spec to find repeating groups
         # The codec will produce FixFragment objects inside repeating groups
         self.codec = Codec(spec=self.spec, fragment_class=FixFragment)
 
-        self.header_tags = []
+        self.header_tags = set()
+
+        # Tag number to (output name, value converter, is header tag), resolved once for the spec
+        self.tag_table = {tag.tag: (tag.name, tag.get_value_converter(), tag.tag in self.header_tags)
+                          for tag in self.spec.tags.tags}
+        # Per message type tables, restricted to the top level tags the message schema emits
+        self.message_tag_tables = {}
+
+        # Separator and MsgType prefix by input type, for finding the MsgType without tokenizing the message
+        separator = chr(self.fix_separator)
+        # Tag number to the name of its value conversion, for decode profiling, resolved on first use
+        self.tag_type_names = None
+        self.msg_type_peek_tokens = {str: (separator, '35='), bytes: (separator.encode('UTF-8'), b'35=')}
 
     def _process_schema(self):
+        schemas: [DatacastSchema] = self.cached_schemas
+        if schemas is None:
+            schemas = self._build_schemas()
+            if self.spec_cache is not None:
+                self.spec_cache.save(self.spec, schemas)
+
+        for schema in schemas:
+            self.message_tag_tables[schema.message_id] = self.build_message_tag_table(schema.fields)
+        if self.cached_schemas is None:
+            return schemas
+        # Handlers append manufactured fields to the schemas returned, so the cached schemas are handed out as copies
+        # and stay as loaded for the next call
+        return [DatacastSchema(x.message_id, x.name, list(x.fields)) for x in self.cached_schemas]
+
+    def _build_schemas(self) -> [DatacastSchema]:
         _header_tags = []
         if self.fix_header_tags is not None:
             for tag in self.fix_header_tags.split(','):
                 _header_tags.append(self.spec.tags.by_tag(int(tag)))
 
         schemas: [DatacastSchema] = []
-        for _, value in self.spec.msg_types.items():
+        for key, value in self.spec.msg_types.items():
+            if isinstance(key, bytes):  # message types are also keyed by their encoded msgtype
+                continue
             message_id = value.msgtype
             message_name = value.name
             field_composition = value.composition
@@ -73,15 +113,27 @@ class FixParser(DatacastParser):
             schemas.append(DatacastSchema(message_id, message_name, fields))
         return schemas
 
+    def build_message_tag_table(self, fields: [DatacastField]) -> dict:
+        """Returns the subset of the tag table for the top level tags and groups of a message schema"""
+        table = {}
+        for field in fields:
+            if isinstance(field, DatacastGroup):
+                tag = self.spec.tags.by_name(field.name).tag
+            else:
+                tag = field.tag
+            table[tag] = self.tag_table[tag]
+        return table
+
     def traverse_schema(self, message_name, composition):
         """Traverses message composition and builds the schema to a Datacast representation"""
         fields: [DatacastField] = []
+        field_keys = set()
         for element, _ in composition:
             if isinstance(element, FixTag) and element.tag:
-                self.unique_append(message_name, fields, [element])
+                self.unique_append(message_name, fields, [element], field_keys)
             elif isinstance(element, Component):
                 elements = self.traverse_schema(message_name, element.composition)
-                self.unique_append(message_name, fields, elements)
+                self.unique_append(message_name, fields, elements, field_keys)
             elif isinstance(element, Group):
                 _group = DatacastGroup(element.name)
                 _group_fields = self.traverse_schema(message_name, element.composition)
@@ -92,25 +144,64 @@ class FixParser(DatacastParser):
         return fields
 
     @staticmethod
-    def unique_append(message_name, fields, elements):
-        """Uniquely adds message fields, if a field was already included it will be ignored"""
+    def unique_append(message_name, fields, elements, field_keys: set = None):
+        """Uniquely adds message fields, if a field was already included it will be ignored. The set of keys of
+        the fields already added can be supplied and is kept up to date across calls"""
+        if field_keys is None:
+            field_keys = {FixParser._field_key(field) for field in fields if isinstance(field, FixTag)}
         for element in elements:
-            is_duplicate = False
-            for field in fields:
-                if not isinstance(field, DatacastGroup) and field.is_equal(element):
-                    is_duplicate = True
-                    break
-            if is_duplicate is False:
+            if not isinstance(element, FixTag):
+                fields.append(element)
+                continue
+            key = FixParser._field_key(element)
+            if key not in field_keys:
+                field_keys.add(key)
                 fields.append(element)
             else:
                 logging.warning('Duplicate field found for message type %s: %s', message_name, element)
 
-    def _process_message(self, raw_msg) -> ParsedMessage:
+    @staticmethod
+    def _field_key(field: FixTag):
+        return field.__class__, field.name, field.tag, field.type
+
+    def peek_msg_type(self, raw_msg, max_fields: int = 4):
+        """Returns the MsgType (tag 35) if found within the leading fields of the raw message, otherwise None"""
+        peek_tokens = self.msg_type_peek_tokens.get(type(raw_msg), None)
+        if peek_tokens is None:
+            return None
+        separator, msg_type_prefix = peek_tokens
+        # Skip leading whitespace, such as the newline left by line delimited sources, without copying the message
+        start = 0
+        while raw_msg[start:start + 1].isspace():
+            start += 1
+        for _ in range(max_fields):
+            end = raw_msg.find(separator, start)
+            if end == -1:
+                return None
+            if raw_msg.startswith(msg_type_prefix, start):
+                msg_type = raw_msg[start + 3:end]
+                return msg_type.decode('UTF-8') if isinstance(msg_type, bytes) else msg_type
+            start = end + 1
+        return None
+
+    def load_fix_message(self, raw_msg) -> FixMessage:
+        """Tokenizes the raw message into a FixMessage"""
         fix_msg = FixMessage()
         fix_msg.codec = self.codec
-        separator = chr(self.fix_separator)
-        msg = fix_msg.load_fix(raw_msg, separator=separator)
-        msg_type_id = msg[35]
+        return fix_msg.load_fix(raw_msg, separator=chr(self.fix_separator))
+
+    def _process_message(self, raw_msg) -> ParsedMessage:
+        # Messages are tokenized from bytes, so the parser does not declare zero-copy support and the transcoder copies
+        # the memoryview frames of the fix_stream source. Frames passed directly are copied here
+        if isinstance(raw_msg, memoryview):
+            raw_msg = raw_msg.tobytes()
+        # Identify the message type from the raw bytes, so excluded and stats only messages are never tokenized
+        msg = raw_msg
+        msg_type_id = self.peek_msg_type(raw_msg)
+        if msg_type_id is None:
+            msg = self.load_fix_message(raw_msg)
+            msg_type_id = msg[35]
+
         message_type = self.spec.msg_types.get(msg_type_id, None)
 
         if message_type is None:
@@ -122,35 +213,80 @@ class FixParser(DatacastParser):
     def _parse_message(self, message: ParsedMessage) -> ParsedMessage:
         try:
             fix_msg = message.raw_message
-            message.dictionary = self.process_field(fix_msg, fix_msg.items())
+            if not isinstance(fix_msg, FixMessage):
+                fix_msg = message.raw_message = self.load_fix_message(fix_msg)
+            tag_table = self.message_tag_tables.get(message.type, None)
+            message.dictionary = self.process_field(fix_msg, fix_msg.items(), tag_table=tag_table)
         except Exception as ex:  # pylint: disable=broad-except
             message.exception = ex
         return message
 
-    def process_field(self, msg, items):
-        """Processes the Fix message fields and puts the values into a readable dictionary"""
+    def process_field(self, msg, items, tag_table: dict = None):
+        """Processes the Fix message fields and puts the values into a readable dictionary. If a message tag table
+        is supplied, top level tags it does not contain are skipped"""
         if not isinstance(items, list):  # pylint: disable=no-else-return
+            spec_tag_table = self.tag_table
+            if tag_table is None:
+                tag_table = spec_tag_table
             dictionary = {}
             for key, value in items:
-                if key in self.header_tags:
+                entry = tag_table.get(key, None)
+                if entry is None:
+                    if key not in spec_tag_table:
+                        raise KeyError(key)
+                    continue
+                name, converter, is_header = entry
+                if is_header is True:
                     continue
-                tag = msg.codec.spec.tags.by_tag(key)
                 if isinstance(value, RepeatingGroup):
-                    dictionary[tag.name] = self.process_field(msg, value)
+                    dictionary[name] = self.process_field(msg, value)
                 else:
-                    dictionary[tag.name] = tag.cast_value_to_type(value, tag.type, False)
+                    dictionary[name] = converter(value)
             return dictionary
         else:
+            tag_table = self.tag_table
             array = []
             # Repeating Groups array
             for item in items:
                 record = {}
                 for key, value in item.items():
-                    tag = msg.codec.spec.tags.by_tag(key)
+                    name, converter, _ = tag_table[key]
                     if isinstance(value, RepeatingGroup):
-                        array.append(self.process_field(msg, value))
+                        record[name] = self.process_field(msg, value)
                     else:
-                        record[tag.name] = tag.cast_value_to_type(value, tag.type, False)
+                        record[name] = converter(value)
                 array.append(record)
 
             return array
+
+    def profile_decode(self, message: ParsedMessage, raw_message, profiler):
+        """Tokenizes the raw message and converts each field value through the decode profiler, attributing
+        conversions to the FIX type of the tag"""
+        if self.tag_type_names is None:
+            self.tag_type_names = {tag.tag: self.tag_type_name(tag) for tag in self.spec.tags.tags}
+        fix_msg = raw_message
+        if not isinstance(fix_msg, FixMessage):
+            if isinstance(fix_msg, memoryview):
+                fix_msg = fix_msg.tobytes()
+            fix_msg = profiler.measure(message.name, 'tokenize', self.load_fix_message, fix_msg)
+        self.profile_items(message.name, fix_msg.items(), self.message_tag_tables.get(message.type, None), profiler)
+
+    @staticmethod
+    def tag_type_name(tag: FixTag) -> str:
+        """Names the value conversion of a tag for decode profiling"""
+        if tag._is_enum:  # pylint: disable=protected-access
+            return f'{tag.type}(enum)'
+        return str(tag.type)
+
+    def profile_items(self, message_name, items, tag_table, profiler):
+        """Converts the values of message or repeating group entry items through the decode profiler"""
+        tag_table = tag_table if tag_table is not None else self.tag_table
+        for key, value in items:
+            entry = tag_table.get(key, None)
+            if entry is None or entry[2] is True:
+                continue
+            if isinstance(value, RepeatingGroup):
+                for item in value:
+                    self.profile_items(message_name, item.items(), None, profiler)
+            else:
+                profiler.measure(message_name, self.tag_type_names[key], entry[1], value)
@@ -14,8 +14,6 @@ Note::
 
 # pylint: skip-file
 
-from google.cloud import bigquery
-
 from transcoder.message.DatacastField import DatacastField
 
 try:
@@ -166,6 +164,19 @@ class FixTag(DatacastField):
             result = str(value)
         return result
 
+    def get_value_converter(self):
+        """Returns a function equivalent to cast_value_to_type for this tag's type, resolved once"""
+        if self._is_enum is True:
+            return dict(self._values).__getitem__
+        _type = self.type.lower() if self.type is not None else None
+        if _type in INTEGER_TYPES:
+            return int
+        if _type in FLOAT_TYPES:
+            return float
+        if _type in BOOLEAN_TYPES:
+            return bool
+        return str
+
     def get_bigquery_field_type(self):
         _type = self.type.lower()
         bq_type = 'STRING'
@@ -180,6 +191,7 @@ class FixTag(DatacastField):
         return bq_type
 
     def create_bigquery_field(self, part: DatacastField = None):
+        from google.cloud import bigquery
         return bigquery.SchemaField(self.name, self.get_bigquery_field_type(), mode="NULLABLE")
 
     def is_equal(self, other):
@@ -0,0 +1,86 @@
+#
+# Copyright 2023 Google LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+# pylint: disable=invalid-name
+
+import hashlib
+import logging
+import os
+import pickle
+import sys
+import tempfile
+
+CACHE_FORMAT_VERSION = 1
+
+
+class FixSpecCache:
+    """
+    Persists a parsed FixSpec together with the DatacastSchema list derived from it, so the QuickFIX XML does not
+    have to be parsed and traversed on every run. Entries are keyed by a hash of the XML contents, the FIX header
+    tags and the cache format. The cache directory must be trusted, as entries are loaded with pickle.
+    """
+
+    def __init__(self, schema_file_path: str, cache_dir: str, fix_header_tags: str = None):
+        self.schema_file_path = schema_file_path
+        self.cache_dir = cache_dir
+        self.key = self._compute_key(schema_file_path, fix_header_tags)
+        base_name = os.path.splitext(os.path.basename(schema_file_path))[0]
+        self.cache_file_path = os.path.join(cache_dir, f'{base_name}.{self.key[:16]}.pickle')
+
+    @staticmethod
+    def _compute_key(schema_file_path: str, fix_header_tags: str) -> str:
+        digest = hashlib.sha256()
+        with open(schema_file_path, 'rb') as schema_file:
+            for chunk in iter(lambda: schema_file.read(1 << 20), b''):
+                digest.update(chunk)
+        digest.update(f'|{fix_header_tags}|{CACHE_FORMAT_VERSION}|{sys.version_info[0]}.{sys.version_info[1]}'
+                      .encode('UTF-8'))
+        return digest.hexdigest()
+
+    def load(self):
+        """Returns a tuple of (FixSpec, schemas) if a valid entry exists, otherwise None"""
+        if not os.path.exists(self.cache_file_path):
+            return None
+        try:
+            with open(self.cache_file_path, 'rb') as cache_file:
+                entry = pickle.load(cache_file)
+            if entry.get('key') != self.key:
+                return None
+            logging.debug('Loaded FIX spec cache: %s', self.cache_file_path)
+            return entry['spec'], entry['schemas']
+        except Exception as ex:  # pylint: disable=broad-except
+            logging.warning('Ignoring unreadable FIX spec cache %s: %s', self.cache_file_path, ex)
+            return None
+
+    def save(self, spec, schemas):
+        """Atomically writes the spec and schemas to the cache directory"""
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            file_descriptor, temp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            try:
+                with os.fdopen(file_descriptor, 'wb') as cache_file:
+                    pickle.dump({'key': self.key, 'spec': spec, 'schemas': schemas}, cache_file,
+                                protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(temp_path, self.cache_file_path)
+            except BaseException:
+                os.unlink(temp_path)
+                raise
+            logging.debug('Saved FIX spec cache: %s', self.cache_file_path)
+        except Exception as ex:  # pylint: disable=broad-except
+            logging.warning('Unable to write FIX spec cache %s: %s', self.cache_file_path, ex)
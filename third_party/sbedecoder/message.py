@@ -27,21 +27,18 @@
 import logging
 from struct import unpack_from
 
-import numpy as np
-from google.cloud import bigquery
-
 from third_party.sbedecoder.typemap import TypeMap
 from transcoder.message.DatacastField import DatacastField
 
 null_value = {
-    'int8': np.iinfo(np.int8).max,
-    'uint8': np.iinfo(np.uint8).max,
-    'int16': np.iinfo(np.int16).max,
-    'uint16': np.iinfo(np.uint16).max,
-    'int32': np.iinfo(np.int32).max,
-    'uint32': np.iinfo(np.uint32).max,
-    'int64': np.iinfo(np.int64).max,
-    'uint64': np.iinfo(np.uint64).max
+    'int8': (1 << 7) - 1,
+    'uint8': (1 << 8) - 1,
+    'int16': (1 << 15) - 1,
+    'uint16': (1 << 16) - 1,
+    'int32': (1 << 31) - 1,
+    'uint32': (1 << 32) - 1,
+    'int64': (1 << 63) - 1,
+    'uint64': (1 << 64) - 1
 }
 
 # https://json-schema.org/understanding-json-schema/reference/type.html
@@ -238,6 +235,7 @@ class SBEMessageField(DatacastField):
         return bq_type
 
     def create_bigquery_field(self, part: DatacastField = None):
+        from google.cloud import bigquery
         field = self
         if part is not None:
             field = part
@@ -641,3 +639,7 @@ class SBEMessageFactory:  # pylint: disable=too-few-public-methods
     # This should return a tuple of (message, message_size)
     def build(self, msg_buffer, offset):
         raise NotImplementedError()
+
+    # Factories with precompiled message layouts return the decoded dictionary, otherwise None
+    def decode(self, message):  # pylint: disable=unused-argument
+        return None
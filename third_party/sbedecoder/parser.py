@@ -23,7 +23,10 @@
 #
 
 
-from third_party.sbedecoder.message import TypeMessageField
+from operator import attrgetter
+
+from third_party.sbedecoder.message import SBEMessage, TypeMessageField
+from third_party.sbedecoder.typemap import TypeMap
 from transcoder.message import DatacastField
 from transcoder.message.DatacastGroup import DatacastGroup
 from transcoder.message.DatacastParser import DatacastParser
@@ -31,6 +34,26 @@ from transcoder.message.DatacastSchema import DatacastSchema
 from transcoder.message.ParsedMessage import ParsedMessage
 
 
+get_value = attrgetter('value')
+
+
+def field_type_name(field) -> str:
+    """Names the decode path of a field for decode profiling, distinguishing the TypeMessageField paths for
+    strings, constants and variable length integers by primitive type"""
+    if not isinstance(field, TypeMessageField):
+        return type(field).__name__
+    if field.constant is not None:
+        kind = 'constant'
+    elif field.is_string_type:
+        kind = 'string'
+    elif field.primitive_type in TypeMap.primitive_type_map and 'int' in field.primitive_type and \
+            TypeMap.primitive_type_map[field.primitive_type][1] != field.field_length:
+        kind = 'variable_length_int'
+    else:
+        kind = field.primitive_type
+    return f'TypeMessageField({kind})'
+
+
 class SBEParser(DatacastParser):
     """SBE message parser"""
 
@@ -86,10 +109,21 @@ class SBEParser(DatacastParser):
         for sbe_msg in self.parse(raw_msg, 0):
             return ParsedMessage(sbe_msg.message_id, sbe_msg.name, raw_message=sbe_msg)
 
+    def read_field(self, raw_msg, field_name: str):
+        # Fields decode their value from the message buffer only when read
+        sbe_msg, _ = self.factory.build(raw_msg, 0)
+        for field in sbe_msg.fields:
+            if field.name == field_name:
+                return field.value
+        return None
+
     def _parse_message(self, message: ParsedMessage) -> ParsedMessage:
         sbe_msg = message.raw_message
         try:
-            message.dictionary = self.process_field(sbe_msg.fields, sbe_msg.groups)
+            dictionary = self.factory.decode(sbe_msg)
+            if dictionary is None:
+                dictionary = self.process_field(sbe_msg.fields, sbe_msg.groups)
+            message.dictionary = dictionary
         except Exception as ex:  # pylint: disable=broad-except
             message.exception = ex
         return message
@@ -120,3 +154,23 @@ class SBEParser(DatacastParser):
                 output_result[group_name].append(self.process_field(repeating_group.fields, repeating_group.groups))
 
         return output_result
+
+    def profile_decode(self, message: ParsedMessage, raw_message, profiler):  # pylint: disable=unused-argument
+        """Decodes a parsed message field by field through the decode profiler. Messages of precompiled layouts
+        are decoded as a whole"""
+        sbe_msg = message.raw_message
+        if not isinstance(sbe_msg, SBEMessage):
+            profiler.measure(message.name, 'compiled_layout', self.factory.decode, sbe_msg)
+            return
+        self.profile_fields(message.name, sbe_msg.fields, sbe_msg.groups, profiler)
+
+    def profile_fields(self, message_name, fields, groups, profiler):
+        """Decodes each field, then wraps and decodes each repeating group entry, through the decode profiler"""
+        for field in fields:
+            if field.id is not None:
+                profiler.measure(message_name, field_type_name(field), get_value, field)
+
+        for group in groups:
+            for index in range(group.num_groups):
+                repeating_group = profiler.measure(message_name, 'SBERepeatingGroup', group.__getitem__, index)
+                self.profile_fields(message_name, repeating_group.fields, repeating_group.groups, profiler)
@@ -0,0 +1,157 @@
+#
+# Copyright 2023 Google LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+# pylint: disable=invalid-name
+
+import json
+import logging
+import os
+from datetime import datetime
+from time import monotonic
+
+from transcoder.message.handler.MessageHandler import MessageHandler
+
+# Incremented when the checkpoint file layout changes, checkpoints of other versions are not resumed from
+CHECKPOINT_VERSION = 1
+# Number of source messages between checks of whether a checkpoint is due, rather than reading the clock per message
+CHECKPOINT_CHECK_INTERVAL = 1024
+
+
+class Checkpointer:
+    """Periodically records how far a transcoding session has got, so an interrupted session can resume from the
+    last checkpoint without writing any message twice. A checkpoint is only recorded once every message yielded by
+    the source so far has been transcoded and the output manager has flushed them, and holds the source position
+    following the last of those messages, the message counts, the state of the handlers and the state the output
+    manager needs to discard anything written after the checkpoint. Checkpoints replace the previous one atomically"""
+
+    def __init__(self, path: str, interval: float = 30.0, check_interval: int = CHECKPOINT_CHECK_INTERVAL):
+        self.path = path
+        self.interval = interval
+        self.check_interval = check_interval
+        self.source_record_count = 0
+        self.next_checkpoint_time = None
+        self.stop_requested = False
+        self.stopped = False
+        self.checkpoint_count = 0
+
+    def load(self):
+        """Returns the checkpoint recorded at path, or None if there is none"""
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path, encoding='utf-8') as checkpoint_file:
+            checkpoint = json.load(checkpoint_file)
+        if checkpoint.get('version') != CHECKPOINT_VERSION:
+            raise CheckpointMismatchError(f'Checkpoint {self.path} has version {checkpoint.get("version")}, '
+                                          f'expected {CHECKPOINT_VERSION}')
+        return checkpoint
+
+    @staticmethod
+    def source_identity(transcoder) -> dict:
+        """Returns the fields identifying the source and output a checkpoint was recorded for"""
+        source_path = getattr(transcoder.source, 'path', None)
+        is_file = isinstance(source_path, str)
+        shard = [transcoder.shard_index, transcoder.shard_count] if transcoder.shard_count is not None else None
+        return {'source_file_path': os.path.abspath(source_path) if is_file else None,
+                'source_size': os.path.getsize(source_path) if is_file else None,
+                'shard': shard,
+                'output_type': transcoder.output_manager.output_type_identifier()}
+
+    def validate(self, transcoder, checkpoint: dict):
+        """Raises CheckpointMismatchError if the checkpoint was recorded for another source or output"""
+        for name, value in self.source_identity(transcoder).items():
+            if checkpoint.get(name) != value:
+                raise CheckpointMismatchError(f'Checkpoint {self.path} was recorded with {name} '
+                                              f'{checkpoint.get(name)}, not {value}')
+
+    def restore(self, transcoder, checkpoint: dict):
+        """Restores the counts and handler states of a checkpoint, once schemas are processed. The output state is
+        restored before schemas are added to the output manager, as that is when output files are reopened"""
+        states = checkpoint['handlers']
+        handler_names = [type(x).__name__ for x in transcoder.all_handlers]
+        if [x['name'] for x in states] != handler_names:
+            raise CheckpointMismatchError(f'Checkpoint {self.path} was recorded with handlers '
+                                          f'{[x["name"] for x in states]}, not {handler_names}')
+        for handler, state in zip(transcoder.all_handlers, states):
+            if state['state'] is not None:
+                handler.restore_state(state['state'])
+            elif type(handler).flush is not MessageHandler.flush:
+                logging.warning('%s does not checkpoint its state, messages it held at the checkpoint are not '
+                                'emitted', type(handler).__name__)
+
+        parser = transcoder.message_parser
+        parser.record_count = checkpoint['processed_count']
+        parser.summary_count.update(checkpoint['record_type_count'])
+        parser.error_summary_count.update(checkpoint['error_record_type_count'])
+        transcoder.transcoded_count = checkpoint['transcoded_count']
+        transcoder.manufactured_count = checkpoint['manufactured_count']
+        self.source_record_count = checkpoint['source_record_count']
+
+    def iterate(self, transcoder, raw_messages):
+        """Yields the source messages, recording a checkpoint once interval seconds have passed. Once a message is
+        yielded, the messages before it have been transcoded, so whether a checkpoint is due is checked before the
+        following message is read, every check_interval messages. Stops early, setting stopped, once stop_requested is
+        set"""
+        check_interval = self.check_interval
+        countdown = check_interval
+        self.next_checkpoint_time = monotonic() + self.interval
+        for raw in raw_messages:
+            self.source_record_count += 1
+            yield raw
+            countdown -= 1
+            if countdown == 0:
+                countdown = check_interval
+                if self.stop_requested is True:
+                    self.stopped = True
+                    return
+                if monotonic() >= self.next_checkpoint_time:
+                    self.write(transcoder)
+
+    def write(self, transcoder, complete: bool = False):
+        """Flushes the output manager and records a checkpoint of the messages transcoded so far. A complete
+        checkpoint is recorded once the session has run to its end, resuming from it transcodes nothing"""
+        output_manager = transcoder.output_manager
+        parser = transcoder.message_parser
+        output_manager.flush()
+        checkpoint = dict(self.source_identity(transcoder), **{
+            'version': CHECKPOINT_VERSION,
+            'time': datetime.now().isoformat(),
+            'complete': complete,
+            'position': transcoder.source.position,
+            'source_record_count': self.source_record_count,
+            'processed_count': parser.record_count,
+            'record_type_count': dict(parser.summary_count),
+            'error_record_type_count': dict(parser.error_summary_count),
+            'transcoded_count': transcoder.transcoded_count,
+            'manufactured_count': transcoder.manufactured_count,
+            'handlers': [{'name': type(x).__name__, 'state': x.checkpoint_state()} for x in transcoder.all_handlers],
+            'output': output_manager.checkpoint_state()})
+
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as checkpoint_file:
+            json.dump(checkpoint, checkpoint_file)
+            checkpoint_file.flush()
+            os.fsync(checkpoint_file.fileno())
+        os.replace(temp_path, self.path)
+        self.checkpoint_count += 1
+        self.next_checkpoint_time = monotonic() + self.interval
+        logging.debug('Checkpoint written at source message %s', self.source_record_count)
+
+
+class CheckpointMismatchError(Exception):
+    """Exception thrown when resuming from a checkpoint recorded for a different transcoding session"""
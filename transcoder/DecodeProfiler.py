@@ -0,0 +1,225 @@
+#
+# Copyright 2023 Google LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+# pylint: disable=invalid-name
+
+import json
+import logging
+import os
+import tracemalloc
+from time import perf_counter_ns
+
+# One in this many messages per parser is decoded again field by field, to attribute its decode cost
+DECODE_PROFILE_SAMPLE_INTERVAL = 64
+# Calls timed to estimate the overhead of timing a single field, which is subtracted from field timings
+CALIBRATION_CALLS = 2000
+# Templates logged when the report is written
+LOGGED_TEMPLATE_COUNT = 10
+
+
+class DecodeCost:  # pylint: disable=too-few-public-methods
+    """Decode time of every call, with the bytes allocated by the sampled calls"""
+
+    __slots__ = ['calls', 'total_ns', 'allocation_calls', 'allocated_bytes', 'retained_bytes']
+
+    def __init__(self):
+        self.calls = 0
+        self.total_ns = 0
+        self.allocation_calls = 0
+        self.allocated_bytes = 0
+        self.retained_bytes = 0
+
+    def to_dict(self) -> dict:
+        """Returns the counts, cumulative time and mean allocations"""
+        result = {'calls': self.calls, 'total_ns': self.total_ns,
+                  'mean_ns': round(self.total_ns / self.calls) if self.calls > 0 else 0}
+        if self.allocation_calls > 0:
+            result.update({'mean_allocated_bytes': round(self.allocated_bytes / self.allocation_calls),
+                           'mean_retained_bytes': round(self.retained_bytes / self.allocation_calls)})
+        return result
+
+
+def _noop(argument):
+    return argument
+
+
+class DecodeProfiler:
+    """Attributes decode time and allocations to each message template, and within each template to the field
+    types decoded. Every message decoded by the parser is timed per template, and one in every sample_interval is
+    decoded again through the parser's profile_decode, which passes each field to measure: once to time the field
+    and, when tracing allocations, once more under tracemalloc to count the bytes it allocates"""
+
+    def __init__(self, report_path: str = None, sample_interval: int = DECODE_PROFILE_SAMPLE_INTERVAL,
+                 trace_allocations: bool = True):
+        self.report_path = report_path
+        self.sample_interval = sample_interval
+        self.trace_allocations = trace_allocations
+        self.templates = {}
+        self.field_types = {}
+        self.sampled_messages = {}
+        self.instrumented = []
+        self.measuring_allocations = False
+        self.timer_overhead_ns = self.calibrate()
+
+    @staticmethod
+    def calibrate() -> int:
+        """Returns the median time of timing a call that does nothing"""
+        durations = []
+        for _ in range(CALIBRATION_CALLS):
+            start = perf_counter_ns()
+            _noop(None)
+            durations.append(perf_counter_ns() - start)
+        return sorted(durations)[CALIBRATION_CALLS // 2]
+
+    def template(self, name) -> DecodeCost:
+        """Returns the cost of a template"""
+        cost = self.templates.get(name, None)
+        if cost is None:
+            cost = self.templates[name] = DecodeCost()
+        return cost
+
+    def field_type(self, template_name, field_type: str) -> DecodeCost:
+        """Returns the cost of a field type within a template"""
+        field_types = self.field_types.get(template_name, None)
+        if field_types is None:
+            field_types = self.field_types[template_name] = {}
+        cost = field_types.get(field_type, None)
+        if cost is None:
+            cost = field_types[field_type] = DecodeCost()
+        return cost
+
+    def instrument(self, parser):
+        """Times each message decoded by the parser, sampling messages for profile_decode"""
+        if not hasattr(parser, 'profile_decode'):
+            logging.warning('%s does not support decode profiling, only template decode times are recorded',
+                            type(parser).__name__)
+        method = parser._parse_message  # pylint: disable=protected-access
+        template = self.template
+        countdown = [self.sample_interval]
+
+        def profiled(message):
+            raw_message = message.raw_message
+            start = perf_counter_ns()
+            result = method(message)
+            elapsed = perf_counter_ns() - start
+            cost = template(message.name)
+            cost.calls += 1
+            cost.total_ns += elapsed
+
+            countdown[0] -= 1
+            if countdown[0] == 0:
+                countdown[0] = self.sample_interval
+                if hasattr(parser, 'profile_decode'):
+                    self.sample(parser, message, raw_message)
+            return result
+
+        # The parse method may already be shadowed on the instance by the stage profiler, and is restored to it
+        self.instrumented.append((parser, vars(parser).get('_parse_message', None)))
+        parser._parse_message = profiled  # pylint: disable=protected-access
+
+    def uninstrument(self):
+        """Restores the parse methods of the instrumented parsers"""
+        for parser, shadowed_method in self.instrumented:
+            if shadowed_method is not None:
+                parser._parse_message = shadowed_method  # pylint: disable=protected-access
+            else:
+                delattr(parser, '_parse_message')
+        self.instrumented = []
+
+    def sample(self, parser, message, raw_message):
+        """Decodes a message field by field, timing each field, then again counting the bytes each field
+        allocates"""
+        self.sampled_messages[message.name] = self.sampled_messages.get(message.name, 0) + 1
+        self.measuring_allocations = False
+        parser.profile_decode(message, raw_message, self)
+        if self.trace_allocations is True and tracemalloc.is_tracing() is False:
+            self.measuring_allocations = True
+            tracemalloc.start()
+            try:
+                parser.profile_decode(message, raw_message, self)
+            finally:
+                tracemalloc.stop()
+                self.measuring_allocations = False
+
+    def measure(self, template_name, field_type: str, function, argument):
+        """Calls function with the argument, attributing its cost to the field type of the template. Returns the
+        result of the call"""
+        cost = self.field_type(template_name, field_type)
+        if self.measuring_allocations is True:
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+            result = function(argument)
+            current, peak = tracemalloc.get_traced_memory()
+            cost.allocation_calls += 1
+            cost.allocated_bytes += peak - baseline
+            cost.retained_bytes += current - baseline
+            return result
+
+        start = perf_counter_ns()
+        result = function(argument)
+        elapsed = perf_counter_ns() - start
+        cost.calls += 1
+        cost.total_ns += max(elapsed - self.timer_overhead_ns, 0)
+        return result
+
+    def stop(self):
+        """Writes the report and logs the most expensive templates"""
+        report = self.report()
+        for entry in report['templates'][:LOGGED_TEMPLATE_COUNT]:
+            top_field_type = entry['field_types'][0]['field_type'] if entry['field_types'] else None
+            logging.info('Decode cost %.1f%% %s: %d calls, mean %d ns, most expensive field type %s',
+                         entry['share'] * 100, entry['template'], entry['calls'], entry['mean_ns'], top_field_type)
+        if self.report_path is not None:
+            with open(self.report_path, 'w', encoding='utf-8') as report_file:
+                json.dump(report, report_file, indent=2)
+            logging.info('Decode profile report written to %s', os.path.abspath(self.report_path))
+
+    def report(self) -> dict:
+        """Returns the profile as a JSON serializable dict. Templates are ranked by their total decode time, and
+        their field types by the decode time estimated for all messages of the template from the sampled
+        messages. Field types are also ranked across all templates"""
+        all_templates_ns = sum(x.total_ns for x in self.templates.values())
+        all_field_types = {}
+        templates = []
+        for name, cost in self.templates.items():
+            sampled_messages = self.sampled_messages.get(name, 0)
+            scale = cost.calls / sampled_messages if sampled_messages > 0 else 0
+            field_types = []
+            for field_type, field_cost in self.field_types.get(name, {}).items():
+                estimated_ns = round(field_cost.total_ns * scale)
+                field_types.append(dict(field_cost.to_dict(), field_type=field_type, estimated_total_ns=estimated_ns,
+                                        share=round(estimated_ns / cost.total_ns, 6) if cost.total_ns > 0 else 0))
+                totals = all_field_types.setdefault(field_type, {'field_type': field_type, 'sampled_calls': 0,
+                                                                 'estimated_total_ns': 0})
+                totals['sampled_calls'] += field_cost.calls
+                totals['estimated_total_ns'] += estimated_ns
+            field_types.sort(key=lambda x: x['estimated_total_ns'], reverse=True)
+            if self.trace_allocations is True and sampled_messages > 0:
+                cost.allocation_calls = sampled_messages
+                cost.allocated_bytes = sum(x.allocated_bytes for x in self.field_types.get(name, {}).values())
+                cost.retained_bytes = sum(x.retained_bytes for x in self.field_types.get(name, {}).values())
+            templates.append(dict(cost.to_dict(), template=str(name), sampled_messages=sampled_messages,
+                                  share=round(cost.total_ns / all_templates_ns, 6) if all_templates_ns > 0 else 0,
+                                  field_types=field_types))
+        templates.sort(key=lambda x: x['total_ns'], reverse=True)
+        for totals in all_field_types.values():
+            totals['share'] = round(totals['estimated_total_ns'] / all_templates_ns, 6) if all_templates_ns > 0 else 0
+        return {'sample_interval': self.sample_interval, 'timer_overhead_ns': self.timer_overhead_ns,
+                'total_ns': all_templates_ns, 'templates': templates,
+                'field_types': sorted(all_field_types.values(), key=lambda x: x['estimated_total_ns'], reverse=True)}
@@ -0,0 +1,95 @@
+#
+# Copyright 2023 Google LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+# pylint: disable=invalid-name
+
+import threading
+
+# Number of times per flush interval handlers are asked for the messages they have due
+FLUSH_CHECKS_PER_INTERVAL = 10
+
+
+class FlushTimerLock:
+    """Lock the transcoder holds while it transcodes a message or batch or flushes its handlers, shared with the timer
+    thread. Raises on the transcoder thread an error the timer thread stopped on"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.exception = None
+
+    def __enter__(self):
+        self.lock.acquire()  # pylint: disable=consider-using-with
+        if self.exception is not None:
+            self.lock.release()
+            raise self.exception
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.lock.release()
+
+
+class HandlerFlushTimer:
+    """Outputs the messages handlers have due on the wall clock, such as a ConflationHandler with clock=wall, while
+    the source is quiet, rather than only once the next message arrives. A daemon thread calls timed_flush on the
+    handlers that have a flush_interval, FLUSH_CHECKS_PER_INTERVAL times per shortest interval. The transcoder holds
+    the timer lock while it transcodes a message or flushes its handlers, so handler state and the output manager are
+    only used by one thread at a time, and not while the transcoder waits on the source. An error the transcoder does
+    not continue on stops the timer, and is raised on the transcoder thread with its next message"""
+
+    def __init__(self, handlers: list):
+        self.handlers = handlers
+        self.check_interval = min(x.flush_interval for x in handlers) / FLUSH_CHECKS_PER_INTERVAL
+        self.lock = FlushTimerLock()
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.flush_count = 0
+
+    def start(self, transcoder):
+        """Starts the timer thread, which flushes the handlers of the transcoder"""
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self.run, args=(transcoder,), name='handler-flush-timer', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        """Stops the timer thread"""
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def run(self, transcoder):
+        """Writes the messages each handler has due, every check interval until stopped"""
+        while not self.stop_event.wait(self.check_interval):
+            with self.lock.lock:
+                try:
+                    self.flush(transcoder)
+                except Exception as ex:  # pylint: disable=broad-exception-caught
+                    self.lock.exception = ex
+                    return
+
+    def flush(self, transcoder):
+        """Writes the messages each handler has due, reporting errors as the transcoder does for other messages"""
+        for handler in self.handlers:
+            try:
+                messages = handler.timed_flush()
+                if len(messages) > 0:
+                    transcoder.write_manufactured_messages(messages)
+                    self.flush_count += 1
+            except Exception as ex:  # pylint: disable=broad-exception-caught
+                transcoder.handle_exception(None, None, ex)
@@ -0,0 +1,61 @@
+#
+# Copyright 2023 Google LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+# pylint: disable=invalid-name
+
+import importlib
+import sys
+from types import ModuleType
+
+
+def lazy_exports(package_name: str, exports: [str]):
+    """Returns the module level __getattr__ and __dir__ (PEP 562) of a package that imports each of its exports from
+    the submodule of the same name on first access, so that importing the package does not import every
+    implementation and its dependencies. The package lists its exports for static analysis in an
+    "if TYPE_CHECKING:" block of the same imports.
+
+    Importing the submodule of an export directly binds the submodule on the package in its place, so code within the
+    transcoder imports exports through their package, and packages import the base classes and helpers their
+    submodules share eagerly"""
+    exports = frozenset(exports)
+
+    def __getattr__(name):
+        if name not in exports:
+            raise AttributeError(f"module '{package_name}' has no attribute '{name}'")
+        value = getattr(importlib.import_module(f'{package_name}.{name}'), name)
+        # Bound in place of the submodule the import system binds on the package, as an eager import would
+        setattr(sys.modules[package_name], name, value)
+        return value
+
+    def __dir__():
+        return sorted(set(vars(sys.modules[package_name])) | exports)
+
+    return __getattr__, __dir__
+
+
+def load_object(object_path: str):
+    """Imports and returns the object at a 'module:attribute' path"""
+    module_name, _, attribute = object_path.partition(':')
+    module = importlib.import_module(module_name)
+    value = getattr(module, attribute)
+    # The lazy export of a package whose submodule was imported directly, see lazy_exports
+    if isinstance(value, ModuleType) and value.__name__ == f'{module_name}.{attribute}':
+        value = getattr(value, attribute)
+        setattr(module, attribute, value)
+    return value
@@ -0,0 +1,213 @@
+#
+# Copyright 2023 Google LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+# pylint: disable=invalid-name
+
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from collections import Counter
+from concurrent import futures
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import replace
+
+from transcoder.Transcoder import SHARED_DESTINATION_OUTPUTS, Transcoder
+from transcoder.TranscoderConfig import TranscoderConfig
+from transcoder.message import NoParser
+from transcoder.message.MessageUtil import get_message_parser
+from transcoder.output import get_output_manager
+from transcoder.output.OutputUtil import get_output_manager_class
+from transcoder.source.SourceUtil import expand_source_paths, multi_file_source_name
+
+# Seconds between samples of the bytes each worker has read of its file
+PROGRESS_SAMPLE_INTERVAL = 1.0
+
+# Inherited by forked workers: the parser whose schema was compiled before the workers started, and the bytes read of
+# each file, by the position of the file in the schedule
+_worker_parser = None
+_worker_progress = None
+
+
+def _transcode_file(config: TranscoderConfig, slot: int) -> dict:
+    """Transcodes one file in a worker process, returning the summary of its session"""
+    parser = _worker_parser
+    if parser is not None:
+        parser.reset_counts()
+    start_time = time.monotonic()
+    transcoder = Transcoder.from_config(config, message_parser=parser)
+    stop_sampling = threading.Event()
+    if _worker_progress is not None:
+        def sample_progress():
+            while not stop_sampling.wait(PROGRESS_SAMPLE_INTERVAL):
+                _worker_progress[slot] = transcoder.source.bytes_read or 0
+
+        threading.Thread(target=sample_progress, name='progress-sampler', daemon=True).start()
+    try:
+        transcoder.transcode()
+        transcoder.output_manager.wait_for_completion()
+    finally:
+        stop_sampling.set()
+    return dict(transcoder.summary(), seconds=time.monotonic() - start_time,
+                schema_names=sorted(transcoder.output_manager.existing_schemas))
+
+
+class MultiFileTranscoder:
+    """Transcodes many source files concurrently in a pool of worker processes, largest file first so the longest
+    sessions start earliest. The schema is compiled once, before the workers are forked, so that every worker
+    shares it. Each file is transcoded by its own Transcoder, with outputs prefixed by the file name, and file
+    outputs can be merged into a single set prefixed by the name of the directory once every file is transcoded"""
+
+    def __init__(self, config: TranscoderConfig, source_paths: [str], *, workers: int = None,
+                 merge_outputs: bool = False, merged_prefix: str = None, progress_interval: float = 10.0):
+        # Files with the same name in different directories would write to the same outputs
+        prefixes = [os.path.basename(os.path.splitext(x)[0]) for x in source_paths]
+        duplicates = sorted(x for x, count in Counter(prefixes).items() if count > 1)
+        if len(duplicates) > 0:
+            raise MultiFileTranscodeError(f'Source files share the output prefixes {duplicates}')
+        if merge_outputs is True and config.output_type not in SHARED_DESTINATION_OUTPUTS \
+                and get_output_manager_class(config.output_type).supports_merging() is False:
+            raise MultiFileTranscodeError(f'Outputs of type {config.output_type} can not be merged')
+
+        self.config = config
+        # Largest file first, so a large file started last does not leave the other workers idle
+        self.source_paths = sorted(source_paths, key=os.path.getsize, reverse=True)
+        self.prefixes = dict(zip(source_paths, prefixes))
+        self.workers = workers if workers is not None else os.cpu_count()
+        self.merge_outputs = merge_outputs
+        self.merged_prefix = merged_prefix if merged_prefix is not None else 'merged'
+        self.progress_interval = progress_interval
+        self.results = {}
+        self.failures = {}
+
+    @classmethod
+    def from_source(cls, config: TranscoderConfig, workers: int = None, merge_outputs: bool = False,
+                    progress_interval: float = 10.0):
+        """Creates a MultiFileTranscoder for the files of the directory or glob pattern of config.source_file_path,
+        with merged outputs prefixed by the name of the directory"""
+        source_path = config.source_file_path
+        source_paths = expand_source_paths(source_path)
+        if len(source_paths) == 0:
+            raise MultiFileTranscodeError(f'No source files match {source_path}')
+        return cls(config, source_paths, workers=workers, merge_outputs=merge_outputs,
+                   merged_prefix=multi_file_source_name(source_path), progress_interval=progress_interval)
+
+    def create_parser(self):
+        """Returns the parser the workers share, with its schema compiled"""
+        config = self.config
+        if config.frame_only is True:
+            return NoParser()
+        parser = get_message_parser(config.factory, config.schema_file_path, config.stats_only,
+                                    config.message_type_inclusions, config.message_type_exclusions,
+                                    config.fix_header_tags, config.fix_separator, config.schema_cache_dir)
+        parser.process_schema()
+        return parser
+
+    def file_config(self, source_path: str) -> TranscoderConfig:
+        """Returns the config of the session of a single file. When outputs are merged, handlers add the file to
+        records, as handlers such as SequencerHandler number the messages of each file from 1"""
+        shared_destination = self.merge_outputs is True and self.config.output_type in SHARED_DESTINATION_OUTPUTS
+        return replace(self.config, source_file_path=source_path,
+                       output_prefix=self.merged_prefix if shared_destination else self.prefixes[source_path],
+                       merged_file_prefix=self.prefixes[source_path] if self.merge_outputs is True else None)
+
+    def transcode(self) -> dict:
+        """Transcodes every file, returning the summary of each by path. Files that fail do not stop the others,
+        and raise MultiFileTranscodeError once the rest are transcoded"""
+        global _worker_parser, _worker_progress  # pylint: disable=global-statement
+        start_time = time.monotonic()
+        # Forked workers inherit the compiled schema, other start methods compile it in each worker, or load it
+        # from the schema cache
+        fork = 'fork' in multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context('fork' if fork else None)
+        _worker_parser = self.create_parser() if fork else None
+        _worker_progress = context.Array('q', len(self.source_paths), lock=False) if fork else None
+        logging.info('Transcoding %s files with %s workers', len(self.source_paths), self.workers)
+        try:
+            with ProcessPoolExecutor(max_workers=self.workers, mp_context=context) as executor:
+                pending = {executor.submit(_transcode_file, self.file_config(path), slot): path
+                           for slot, path in enumerate(self.source_paths)}
+                while len(pending) > 0:
+                    done, _ = futures.wait(pending, timeout=self.progress_interval,
+                                           return_when=futures.FIRST_COMPLETED)
+                    for future in done:
+                        self.complete_file(pending.pop(future), future)
+                    if len(done) == 0:
+                        self.log_progress()
+        finally:
+            _worker_parser, _worker_progress = None, None
+
+        if self.merge_outputs is True and self.config.output_type not in SHARED_DESTINATION_OUTPUTS:
+            self.merge_files()
+        self.log_summary(time.monotonic() - start_time)
+        if len(self.failures) > 0:
+            raise MultiFileTranscodeError(f'Failed to transcode {sorted(self.failures)}')
+        return self.results
+
+    def complete_file(self, path: str, future: futures.Future):
+        """Records the summary of a file, or the exception it failed with"""
+        exception = future.exception()
+        if exception is not None:
+            logging.error('Failed to transcode %s: %s', path, exception)
+            self.failures[path] = exception
+            return
+        result = self.results[path] = future.result()
+        logging.info('Transcoded %s (%s of %s files): %s source messages in %s seconds', path,
+                     len(self.results) + len(self.failures), len(self.source_paths), result['source_record_count'],
+                     round(result['seconds'], 3))
+
+    def log_progress(self):
+        """Logs the percentage read of each file being transcoded"""
+        if _worker_progress is None:
+            return
+        in_progress = []
+        for slot, path in enumerate(self.source_paths):
+            size = os.path.getsize(path)
+            if path not in self.results and path not in self.failures and _worker_progress[slot] > 0 and size > 0:
+                in_progress.append(f'{os.path.basename(path)} {round(_worker_progress[slot] / size * 100, 1)}%')
+        logging.info('Transcoded %s of %s files, in progress: %s', len(self.results) + len(self.failures),
+                     len(self.source_paths), ', '.join(in_progress))
+
+    def merge_files(self):
+        """Merges the output files of every file in name order into files prefixed with merged_prefix"""
+        output_manager = get_output_manager(self.config.output_type, self.merged_prefix, self.config.output_path,
+                                            lazy_create_resources=True)
+        paths = [x for x in sorted(self.source_paths) if x in self.results]
+        schema_names = sorted(set().union(*(self.results[x]['schema_names'] for x in paths)))
+        output_manager.merge_outputs([self.prefixes[x] for x in paths], schema_names)
+        output_manager.wait_for_completion()
+        logging.info('Merged the outputs of %s files into %s', len(paths), self.merged_prefix)
+
+    def log_summary(self, total_seconds: float):
+        """Logs the counts of every file transcoded"""
+        record_type_count = Counter()
+        for result in self.results.values():
+            record_type_count.update(result.get('record_type_count', {}))
+        source_record_count = sum(x['source_record_count'] for x in self.results.values())
+        logging.info('Files transcoded: %s, failed: %s', len(self.results), len(self.failures))
+        logging.info('Source message count: %s', source_record_count)
+        logging.info('Transcoded message count: %s', sum(x['transcoded_count'] for x in self.results.values()))
+        logging.info('Summary of message counts: %s', dict(record_type_count))
+        logging.info('Message rate: %s per second', round(source_record_count / total_seconds, 6))
+        logging.info('Total runtime in seconds: %s', round(total_seconds, 6))
+
+
+class MultiFileTranscodeError(Exception):
+    """Exception thrown for source files that cannot be transcoded together, or once any of them failed"""
@@ -0,0 +1,137 @@
+#
+# Copyright 2023 Google LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+# pylint: disable=invalid-name
+
+import functools
+import logging
+
+from transcoder.LazyImportUtil import load_object
+
+
+class PluginCapabilities:
+    """Describes how the transcoding pipeline can drive a source, parser, handler or output implementation
+
+    supports_batching: processes a list of messages per call, such as MessageHandler.handle_batch. Handlers are only
+        passed batches if they also return their checkpoint_state, to be restored when a handler fails on a batch
+    supports_zero_copy: yields, or accepts, memoryview buffers over source data rather than bytes copies
+    """
+
+    __slots__ = ('supports_batching', 'supports_zero_copy')
+
+    def __init__(self, supports_batching: bool = False, supports_zero_copy: bool = False):
+        self.supports_batching = supports_batching
+        self.supports_zero_copy = supports_zero_copy
+
+    def __eq__(self, other):
+        return isinstance(other, PluginCapabilities) and all(
+            getattr(self, x) == getattr(other, x) for x in self.__slots__)
+
+    def __hash__(self):
+        return hash(tuple(getattr(self, x) for x in self.__slots__))
+
+    def __repr__(self):
+        return 'PluginCapabilities(' + ', '.join(f'{x}={getattr(self, x)}' for x in self.__slots__) + ')'
+
+
+@functools.lru_cache(maxsize=None)
+def get_all_entry_points() -> dict:
+    """Returns the (name, 'module:attribute') pairs installed distributions register, by group. Distribution
+    metadata is scanned once per process"""
+    from importlib import metadata  # pylint: disable=import-outside-toplevel
+    all_entry_points = {}
+    for distribution in metadata.distributions():
+        for entry_point in distribution.entry_points:
+            all_entry_points.setdefault(entry_point.group, []).append((entry_point.name, entry_point.value))
+    return all_entry_points
+
+
+def get_entry_points(group: str) -> [tuple]:
+    """Returns the (name, 'module:attribute') pairs installed distributions register for the group"""
+    return get_all_entry_points().get(group, [])
+
+
+class PluginRegistry:
+    """Maps identifiers to implementation classes, built in or registered by installed distributions under an entry
+    point group, for example in a plugin's setup.cfg:
+
+    [options.entry_points]
+    market_data_transcoder.parsers =
+        fast_itch = fast_itch.parser:FastItchParser
+
+    Classes are imported only when loaded. Built in and registered identifiers resolve without scanning installed
+    distributions, so entry points are only discovered for other identifiers or when all identifiers are listed, and
+    an entry point named after a built in implementation is ignored. Built in implementations can be replaced at
+    runtime with register.
+    """
+
+    def __init__(self, group: str, builtin_plugins: dict):
+        self.group = group
+        self.builtin_plugins = dict(builtin_plugins)
+        self.registered_plugins = {}
+        self._plugins = None
+
+    @property
+    def plugins(self) -> dict:
+        """Returns identifiers mapped to 'module:attribute' paths, discovering entry points on first use"""
+        if self._plugins is None:
+            plugins = dict(self.builtin_plugins)
+            for name, object_path in get_entry_points(self.group):
+                if name in self.builtin_plugins:
+                    logging.debug('Entry point %s for built in %s in %s is ignored', object_path, name, self.group)
+                    continue
+                plugins[name] = object_path
+            plugins.update(self.registered_plugins)
+            self._plugins = plugins
+        return self._plugins
+
+    def object_path(self, name: str) -> str:
+        """Returns the 'module:attribute' path of the identifier, or None if it has no implementation"""
+        if name in self.registered_plugins:
+            return self.registered_plugins[name]
+        if name in self.builtin_plugins:
+            return self.builtin_plugins[name]
+        return self.plugins.get(name)
+
+    def names(self) -> [str]:
+        """Returns the identifiers of all available implementations"""
+        return list(self.plugins)
+
+    def builtin_names(self) -> [str]:
+        """Returns the identifiers of the built in implementations, without discovering entry points"""
+        return list(self.builtin_plugins)
+
+    def __contains__(self, name: str) -> bool:
+        return self.object_path(name) is not None
+
+    def register(self, name: str, object_path: str):
+        """Registers an implementation at runtime, taking precedence over built in and entry point implementations"""
+        self.registered_plugins[name] = object_path
+        self._plugins = None
+
+    def load(self, name: str):
+        """Imports and returns the implementation registered for the identifier"""
+        object_path = self.object_path(name)
+        if object_path is None:
+            raise KeyError(name)
+        return load_object(object_path)
+
+    def capabilities(self, name: str) -> PluginCapabilities:
+        """Returns the capabilities the implementation registered for the identifier declares"""
+        return getattr(self.load(name), 'capabilities', PluginCapabilities())
@@ -0,0 +1,176 @@
+#
+# Copyright 2023 Google LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+# pylint: disable=invalid-name
+
+import cProfile
+import json
+import logging
+import os
+from time import perf_counter_ns
+
+# One in this many calls per stage and message type has its duration kept for percentiles
+PROFILE_SAMPLE_INTERVAL = 16
+# Maximum durations kept per stage and message type, later samples replace the oldest
+PROFILE_MAX_SAMPLES = 4096
+
+
+class StageStats:
+    """Call count and cumulative time of a stage for one message type, with sampled per call durations"""
+
+    __slots__ = ['calls', 'total_ns', 'samples', 'sample_count']
+
+    def __init__(self):
+        self.calls = 0
+        self.total_ns = 0
+        self.samples = []
+        self.sample_count = 0
+
+    def add(self, elapsed_ns: int):
+        """Adds the duration of one call"""
+        self.calls += 1
+        self.total_ns += elapsed_ns
+        if self.calls % PROFILE_SAMPLE_INTERVAL == 1:
+            if len(self.samples) < PROFILE_MAX_SAMPLES:
+                self.samples.append(elapsed_ns)
+            else:
+                self.samples[self.sample_count % PROFILE_MAX_SAMPLES] = elapsed_ns
+            self.sample_count += 1
+
+    def to_dict(self) -> dict:
+        """Returns the counts, cumulative time and sampled percentiles"""
+        samples = sorted(self.samples)
+        result = {'calls': self.calls, 'total_ns': self.total_ns,
+                  'mean_ns': round(self.total_ns / self.calls) if self.calls > 0 else 0,
+                  'sampled_calls': len(samples)}
+        if len(samples) > 0:
+            result.update({'p50_ns': samples[len(samples) // 2], 'p99_ns': samples[len(samples) * 99 // 100],
+                           'max_ns': samples[-1]})
+        return result
+
+
+class StageProfiler:
+    """Measures the time spent framing, parsing, handling and writing messages, broken down by message type, with
+    '*' standing for all messages where the type is not known yet. Components are instrumented by shadowing their methods with timing wrappers on the instances, which are removed
+    again by uninstrument"""
+
+    def __init__(self, report_path: str = None, pstats_path: str = None):
+        self.report_path = report_path
+        self.pstats_path = pstats_path
+        self.stages = {}
+        self.instrumented = []
+        self.profile = None
+        self.start_ns = None
+        self.end_ns = None
+
+    def stage(self, name: str) -> dict:
+        """Returns the message type to StageStats dict of a stage"""
+        stage = self.stages.get(name, None)
+        if stage is None:
+            stage = self.stages[name] = {}
+        return stage
+
+    @staticmethod
+    def record(stage: dict, message_type, elapsed_ns: int):
+        """Adds the duration of a call for a message type to a stage"""
+        stats = stage.get(message_type, None)
+        if stats is None:
+            stats = stage[message_type] = StageStats()
+        stats.add(elapsed_ns)
+
+    def instrument(self, transcoder):
+        """Times the parser, handler and output calls of a transcoder"""
+        parser = transcoder.message_parser
+        if transcoder.frame_only is False:
+            self._wrap(parser, '_process_message', self.stage('process_message'), lambda args, result: result.name if result is not None else '*')
+            self._wrap(parser, '_parse_message', self.stage('parse_message'), lambda args, result: args[0].name)
+        for handler in transcoder.all_handlers:
+            self._wrap(handler, 'handle', self.stage(f'handler:{type(handler).__name__}'),
+                       lambda args, result: args[0].name)
+        self._wrap(transcoder.output_manager, 'write_record', self.stage('write_record'),
+                   lambda args, result: args[0] if args[0] is not None else '*')
+
+    def _wrap(self, component, method_name: str, stage: dict, get_message_type):
+        method = getattr(component, method_name)
+        record = self.record
+
+        def timed(*args):
+            start = perf_counter_ns()
+            result = method(*args)
+            elapsed = perf_counter_ns() - start
+            record(stage, get_message_type(args, result), elapsed)
+            return result
+
+        setattr(component, method_name, timed)
+        self.instrumented.append((component, method_name))
+
+    def uninstrument(self):
+        """Restores the methods of the instrumented components"""
+        for component, method_name in self.instrumented:
+            delattr(component, method_name)
+        self.instrumented = []
+
+    def time_iterator(self, iterator):
+        """Yields from a source message iterator, timing each message it frames"""
+        stage = self.stage('framing')
+        record = self.record
+        iterator = iter(iterator)
+        while True:
+            start = perf_counter_ns()
+            try:
+                raw = next(iterator)
+            except StopIteration:
+                return
+            record(stage, '*', perf_counter_ns() - start)
+            yield raw
+
+    def start(self):
+        """Starts timing the run, and cProfile when a pstats path is set"""
+        self.start_ns = perf_counter_ns()
+        if self.pstats_path is not None:
+            self.profile = cProfile.Profile()
+            self.profile.enable()
+
+    def stop(self):
+        """Stops timing the run, writing the report and pstats dump"""
+        self.end_ns = perf_counter_ns()
+        if self.profile is not None:
+            self.profile.disable()
+            self.profile.dump_stats(self.pstats_path)
+            logging.info('Profile pstats written to %s', self.pstats_path)
+        if self.report_path is not None:
+            with open(self.report_path, 'w', encoding='utf-8') as report_file:
+                json.dump(self.report(), report_file, indent=2)
+            logging.info('Profile report written to %s', os.path.abspath(self.report_path))
+
+    def report(self) -> dict:
+        """Returns the profile as a JSON serializable dict. Each stage has its totals, its share of the time spent in
+        all stages and its stats by message type"""
+        run_ns = (self.end_ns or perf_counter_ns()) - self.start_ns if self.start_ns is not None else 0
+        stage_totals = {name: sum(x.total_ns for x in stage.values()) for name, stage in self.stages.items()}
+        all_stages_ns = sum(stage_totals.values())
+        stages = {}
+        for name, stage in self.stages.items():
+            stages[name] = {
+                'calls': sum(x.calls for x in stage.values()),
+                'total_ns': stage_totals[name],
+                'share': round(stage_totals[name] / all_stages_ns, 6) if all_stages_ns > 0 else 0,
+                'by_message_type': {str(k): v.to_dict() for k, v in stage.items()}
+            }
+        return {'run_ns': run_ns, 'sample_interval': PROFILE_SAMPLE_INTERVAL, 'stages': stages}
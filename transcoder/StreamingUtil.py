@@ -0,0 +1,129 @@
+#
+# Copyright 2023 Google LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+# pylint: disable=invalid-name
+
+import contextlib
+import dataclasses
+import io
+import itertools
+
+from transcoder.Transcoder import HANDLER_BATCH_SIZE, Transcoder
+from transcoder.TranscoderConfig import TranscoderConfig
+from transcoder.message import DatacastParser
+from transcoder.output.memory import MemoryOutputManager
+from transcoder.source import get_message_source
+from transcoder.source.Source import Source
+
+
+def iter_length_delimited(buffer, prefix_length: int = 2, endian: str = 'big'):
+    """Yields memoryviews over the length delimited messages of an in memory buffer, without copying them. A
+    truncated last message is not yielded"""
+    view = memoryview(buffer)
+    if view.itemsize != 1:
+        view = view.cast('B')
+    offset, end = 0, len(view)
+    while offset + prefix_length <= end:
+        message_end = offset + prefix_length + int.from_bytes(view[offset:offset + prefix_length], endian)
+        if message_end > end:
+            break
+        yield view[offset + prefix_length:message_end]
+        offset = message_end
+
+
+@contextlib.contextmanager
+def open_source_messages(source, config: TranscoderConfig, parser: DatacastParser):
+    """Opens the raw messages of a Source, an in memory buffer framed as config.source_file_format_type, or an
+    iterable of messages, copying memoryviews to bytes for parsers that do not accept them. A Source is closed once
+    the messages are done with, also when a generator consuming them is closed early"""
+    copy_buffers = parser.capabilities.supports_zero_copy is False
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        source_format = config.source_file_format_type or 'length_delimited'
+        if source_format == 'length_delimited' and config.skip_bytes == 0 and config.message_skip_bytes == 0:
+            messages = iter_length_delimited(source, config.prefix_length, config.source_file_endian)
+            yield map(bytes, messages) if copy_buffers else messages
+            return
+        source = get_message_source(io.BytesIO(source), config.source_file_encoding, source_format,
+                                    config.source_file_endian, config.skip_bytes, config.skip_lines,
+                                    config.message_skip_bytes, config.prefix_length, config.base64,
+                                    config.base64_urlsafe, config.fix_separator)
+    if not isinstance(source, Source):
+        yield iter(source)
+        return
+
+    source.open()
+    try:
+        messages = source.get_message_iterator()
+        yield map(bytes, messages) if copy_buffers and source.capabilities.supports_zero_copy else messages
+    finally:
+        source.close()
+
+
+def transcode_iter(source, parser, handlers=None, batch_size: int = None, config: TranscoderConfig = None,
+                   **options):
+    """Transcodes messages in process, yielding (message type name, record) tuples in source order, with the
+    messages handlers manufacture following the message they were manufactured on. With batch_size, lists of up to
+    batch_size tuples are yielded instead.
+
+    source: bytes, bytearray or memoryview of messages framed as source_file_format_type (length_delimited by default,
+    framed without copying), an iterable of individual raw messages, or a Source
+    parser: a DatacastParser, or a factory name such as itch, along with schema_file_path
+    handlers: a list of MessageHandler instances, or a --message_handlers style string
+    config, options: a TranscoderConfig, and/or its fields as keyword arguments
+    """
+    config = dataclasses.replace(config if config is not None else TranscoderConfig(), **options)
+    transcoder_config = dataclasses.replace(
+        config, factory=parser if isinstance(parser, str) else None, source_file_path=None,
+        source_file_format_type=None, message_handlers=handlers if isinstance(handlers, str) else None, quiet=True)
+    output = MemoryOutputManager()
+    transcoder = Transcoder.from_config(transcoder_config, output_manager=output,
+                                        message_parser=parser if isinstance(parser, DatacastParser) else None)
+    if handlers is not None and not isinstance(handlers, str):
+        for handler in handlers:
+            transcoder.add_handler(handler)
+        transcoder.build_handler_chains()
+        transcoder.select_pipeline()
+
+    transcoder.process_schemas()
+    records = output.records
+    with open_source_messages(source, config, transcoder.message_parser) as raw_messages:
+        if transcoder.batch_handlers is True:
+            for raw_batch in iter(lambda: list(itertools.islice(raw_messages, HANDLER_BATCH_SIZE)), []):
+                transcoder.transcode_batch(raw_batch)
+                yield from _take_records(records, batch_size)
+        else:
+            for raw in raw_messages:
+                transcoder.transcode_message(raw)
+                if len(records) > 0:
+                    yield from _take_records(records, batch_size)
+                if transcoder.transcoded_count == transcoder.sampling_count:
+                    break
+
+    transcoder.flush_handlers()
+    yield from _take_records(records, batch_size, final=True)
+
+
+def _take_records(records: list, batch_size: int, final: bool = False):
+    if batch_size is None:
+        yield from records
+        records.clear()
+        return
+    while len(records) >= batch_size or (final is True and len(records) > 0):
+        yield records[:batch_size]
+        del records[:batch_size]
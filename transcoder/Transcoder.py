@@ -19,25 +19,39 @@
 
 # pylint: disable=broad-except
 
-import importlib
+import contextlib
+import functools
+import itertools
 import logging
 import os
 import signal
 import sys
+import threading
+from dataclasses import fields
 from datetime import datetime
 
+from transcoder.TranscoderConfig import TranscoderConfig
 from transcoder.message import DatacastParser, NoParser
 from transcoder.message.ErrorWriter import ErrorWriter, TranscodeStep
 from transcoder.message.MessageUtil import get_message_parser, parse_handler_config
-from transcoder.output import get_output_manager
-from transcoder.source import get_message_source
+from transcoder.message.MessageUtil import message_handlers as message_handler_registry
+from transcoder.message.exception import MessageHandlerNotDefinedError
+from transcoder.output import OutputManager, get_output_manager
+from transcoder.source import expand_source_paths, get_message_source
+from transcoder.source.Source import SourceNotSeekableError
+from transcoder.source.SourceUtil import multi_file_source_name
+
+# Number of source messages parsed ahead of executing handlers that support batching
+HANDLER_BATCH_SIZE = 1024
+# Outputs whose topics and tables are shared by the shards of a source, rather than named per shard
+SHARED_DESTINATION_OUTPUTS = ('pubsub', 'bigquery')
 
 
 # pylint: disable=invalid-name
 class Transcoder:  # pylint: disable=too-many-instance-attributes
     """ Main entry point for transcodihg sessions, bounded by a schema, source and parser """
 
-    def __init__(self,  # pylint: disable=too-many-arguments),too-many-locals
+    def __init__(self,  # pylint: disable=too-many-arguments),too-many-locals,too-many-branches,too-many-statements
                  factory: str, schema_file_path: str, source_file_path: str, source_file_encoding: str,
                  source_file_format_type: str, source_file_endian: str, prefix_length: int, skip_lines: int,
                  skip_bytes: int, message_skip_bytes: int, quiet: bool, output_type: str, output_encoding: str,
@@ -45,14 +59,23 @@ class Transcoder:  # pylint: disable=too-many-instance-attributes
                  message_handlers: str, lazy_create_resources: bool, frame_only: bool, stats_only: bool,
                  create_schemas_only: bool, continue_on_error: bool, create_schema_enforcing_topics: bool,
                  sampling_count: int, message_type_inclusions: str, message_type_exclusions: str, fix_header_tags: str,
-                 fix_separator: int, base64: bool, base64_urlsafe: bool):
-
-        signal.signal(signal.SIGINT, self.trap)
+                 fix_separator: int, base64: bool, base64_urlsafe: bool, schema_cache_dir: str = None,
+                 profile_path: str = None, profile_pstats_path: str = None, metrics_port: int = None,
+                 metrics_file_path: str = None, metrics_interval: float = 10.0, synthetic_options: str = None,
+                 profile_decode_path: str = None, checkpoint_path: str = None, checkpoint_interval: float = 30.0,
+                 resume: bool = False, start_message: int = None, start_timestamp: int = None,
+                 shard_index: int = None, shard_count: int = None, output_prefix: str = None,
+                 merge_sources: bool = False, merge_timestamp_field: str = None, merged_file_prefix: str = None,
+                 message_parser: DatacastParser = None, output_manager: OutputManager = None):
 
         self.message_handler_spec = message_handlers
         self.message_handlers = {}
         self.all_message_type_handlers = []
         self.all_handlers = []
+        self.handler_chains = {}
+        self.default_handler_chain = ()
+        self.all_handlers_in_chain_order = ()
+        self.handler_message_types = {}
         self.handlers_enabled = False
         self.continue_on_error = continue_on_error
         self.error_output_path = error_output_path
@@ -66,86 +89,373 @@ class Transcoder:  # pylint: disable=too-many-instance-attributes
         self.stats_only = stats_only
         self.sampling_count = sampling_count
         self.transcoded_count = 0
-
-        self.output_prefix = os.path.basename(
-            os.path.splitext(source_file_path)[0]) if source_file_path else 'stdin'
-
-        self.error_writer = ErrorWriter(prefix=self.output_prefix,
+        self.manufactured_count = 0
+        # Profiling, metrics and checkpointing are imported only when enabled, to keep CLI startup fast
+        self.profiler = None
+        if profile_path is not None or profile_pstats_path is not None:
+            from transcoder.StageProfiler import StageProfiler  # pylint: disable=import-outside-toplevel
+            self.profiler = StageProfiler(profile_path, profile_pstats_path)
+        self.decode_profiler = None
+        if profile_decode_path is not None:
+            from transcoder.DecodeProfiler import DecodeProfiler  # pylint: disable=import-outside-toplevel
+            self.decode_profiler = DecodeProfiler(profile_decode_path)
+        self.metrics = None
+        if metrics_port is not None or metrics_file_path is not None:
+            from transcoder.TranscoderMetrics import TranscoderMetrics  # pylint: disable=import-outside-toplevel
+            self.metrics = TranscoderMetrics(metrics_port, metrics_file_path, metrics_interval)
+        self.checkpointer = None
+        if checkpoint_path is not None:
+            from transcoder.Checkpointer import Checkpointer  # pylint: disable=import-outside-toplevel
+            self.checkpointer = Checkpointer(checkpoint_path, checkpoint_interval)
+        self.resume = resume
+        self.start_message = start_message
+        self.start_timestamp = start_timestamp
+        self.shard_index = shard_index
+        self.shard_count = shard_count
+        self.merged_file_prefix = merged_file_prefix
+
+        if output_prefix is not None:
+            self.output_prefix = output_prefix
+        elif merge_sources is True:
+            self.output_prefix = multi_file_source_name(source_file_path) or 'merged'
+        elif source_file_path:
+            self.output_prefix = os.path.basename(os.path.splitext(source_file_path)[0])
+        else:
+            self.output_prefix = 'synthetic' if source_file_format_type == 'synthetic' else 'stdin'
+        # Files written by a shard are named for it, to be merged downstream
+        shard_prefix = self.output_prefix
+        if shard_count is not None:
+            from transcoder.source.file.FileShard import shard_suffix  # pylint: disable=import-outside-toplevel
+            shard_prefix += shard_suffix(shard_index, shard_count)
+
+        self.error_writer = ErrorWriter(prefix=shard_prefix,
                                         output_path=self.error_output_path)
 
-        self.output_manager = get_output_manager(output_type, self.output_prefix, output_path,
-                                                 output_encoding, self.prefix_length, destination_project_id,
-                                                 destination_dataset_id, lazy_create_resources,
-                                                 create_schema_enforcing_topics)
+        destination_prefix = self.output_prefix if output_type in SHARED_DESTINATION_OUTPUTS else shard_prefix
+        self.output_manager = output_manager if output_manager is not None else get_output_manager(
+            output_type, destination_prefix, output_path, output_encoding, self.prefix_length, destination_project_id,
+            destination_dataset_id, lazy_create_resources, create_schema_enforcing_topics)
 
         # TODO: think about this abstraction some more
+        self.source = None
         if self.output_manager.supports_data_writing() is False:
             self.create_schemas_only = True
+        elif source_file_format_type is not None:  # embedded use passes messages to the transcoder instead
+            create_source = functools.partial(get_message_source, source_file_encoding=source_file_encoding,
+                                              source_file_format_type=source_file_format_type,
+                                              endian=source_file_endian, skip_bytes=skip_bytes,
+                                              skip_lines=skip_lines, message_skip_bytes=message_skip_bytes,
+                                              prefix_length=prefix_length, base64=base64,
+                                              base64_urlsafe=base64_urlsafe, fix_separator=fix_separator,
+                                              factory=factory, schema_file_path=schema_file_path,
+                                              synthetic_options=synthetic_options)
+            if merge_sources is True:  # the files of a directory or glob pattern, merged in timestamp order
+                # pylint: disable=import-outside-toplevel
+                from transcoder.source.MergedMessageSource import MergedMessageSource, MergedSourceError
+                source_paths = expand_source_paths(source_file_path)
+                if len(source_paths) == 0:
+                    raise MergedSourceError(f'No source files match {source_file_path}')
+                self.source = MergedMessageSource(list(map(create_source, source_paths)))
+            else:
+                self.source = create_source(source_file_path)
+            if shard_count is not None:
+                self.source.set_shard(shard_index, shard_count)
+
+        if message_parser is not None:
+            self.message_parser: DatacastParser = message_parser
         else:
-            self.source = get_message_source(source_file_path, source_file_encoding,
-                                             source_file_format_type, source_file_endian,
-                                             skip_bytes, skip_lines, message_skip_bytes,
-                                             prefix_length, base64, base64_urlsafe)
-
-        self.message_parser: DatacastParser = NoParser() if self.frame_only else get_message_parser(
-            factory,
-            schema_file_path,
-            stats_only,
-            message_type_inclusions,
-            message_type_exclusions,
-            fix_header_tags,
-            fix_separator
-        )
+            self.message_parser: DatacastParser = NoParser() if self.frame_only else get_message_parser(
+                factory,
+                schema_file_path,
+                stats_only,
+                message_type_inclusions,
+                message_type_exclusions,
+                fix_header_tags,
+                fix_separator,
+                schema_cache_dir
+            )
+        # Merged sources are ordered by a timestamp field read by the parser once it is created
+        if merge_sources is True and merge_timestamp_field is not None and self.source is not None:
+            self.source.timestamp_reader = functools.partial(self.message_parser.read_field,
+                                                             field_name=merge_timestamp_field)
 
         self.setup_handlers()
+        # Held while a message or batch is transcoded and while handlers are flushed, a lock shared with other threads
+        # using the handlers and output manager if there are any, and no lock otherwise
+        self.lock = contextlib.nullcontext()
+        # Handlers with messages due on the wall clock are flushed on a timer, so they output while the source is quiet
+        self.flush_timer = None
+        timed_handlers = [x for x in self.all_handlers if x.flush_interval is not None]
+        if len(timed_handlers) > 0 and self.frame_only is False:
+            from transcoder.HandlerFlushTimer import HandlerFlushTimer  # pylint: disable=import-outside-toplevel
+            self.flush_timer = HandlerFlushTimer(timed_handlers)
+            self.lock = self.flush_timer.lock
+        self.select_pipeline()
+
+    @classmethod
+    def from_config(cls, config: TranscoderConfig, message_parser: DatacastParser = None,
+                    output_manager: OutputManager = None):
+        """Creates a Transcoder from a TranscoderConfig, optionally with an already created parser or output"""
+        return cls(**{x.name: getattr(config, x.name) for x in fields(config)}, message_parser=message_parser,
+                   output_manager=output_manager)
+
+    def select_pipeline(self):
+        """Chooses the fastest processing path the source, parser, handlers and output are all capable of"""
+        source = self.source
+        consumer = self.output_manager if self.frame_only else self.message_parser
+        # Zero-copy source buffers are copied to bytes only for consumers that cannot accept memoryviews
+        self.copy_source_buffers = source is not None and source.capabilities.supports_zero_copy is True \
+            and consumer.capabilities.supports_zero_copy is False
+        # Handlers are passed batches of messages when all of them process batches natively, and record their state
+        # to be restored if a handler fails on a batch, which is then handled again message by message. As the
+        # message count is then only known per batch, sampling runs message by message, as does profiling to time
+        # each handler call and checkpointing, which records the source position following a transcoded message
+        self.batch_handlers = self.handlers_enabled is True and self.frame_only is False \
+            and not self.sampling_count and self.profiler is None and self.checkpointer is None \
+            and all(x.capabilities.supports_batching and x.checkpoint_state() is not None for x in self.all_handlers)
+        logging.debug('Copying source buffers: %s, batching handlers: %s', self.copy_source_buffers,
+                      self.batch_handlers)
 
     def transcode(self):
         """Entry point for transcoding session"""
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGINT, self.trap)
         self.start_time = datetime.now()
+        checkpoint = self.load_checkpoint() if self.resume is True and self.checkpointer is not None else None
+        if checkpoint is not None and checkpoint['complete'] is True:
+            logging.info('Checkpoint %s is complete, nothing left to transcode', self.checkpointer.path)
+            return
         if self.frame_only is False:
             self.process_schemas()
+        if checkpoint is not None:
+            self.checkpointer.restore(self, checkpoint)
+
+        if self.profiler is not None:
+            self.profiler.instrument(self)
+            self.profiler.start()
+        if self.decode_profiler is not None and self.frame_only is False:
+            self.decode_profiler.instrument(self.message_parser)
+        if self.metrics is not None:
+            self.metrics.start(self)
+        if self.flush_timer is not None:
+            self.flush_timer.start(self)
+        try:
+            self.transcode_source(checkpoint['position'] if checkpoint is not None else None)
+        finally:
+            if self.flush_timer is not None:
+                self.flush_timer.stop()
+            if self.metrics is not None:
+                self.metrics.stop()
+            if self.decode_profiler is not None and self.frame_only is False:
+                self.decode_profiler.uninstrument()
+                self.decode_profiler.stop()
+            if self.profiler is not None:
+                self.profiler.stop()
+                self.profiler.uninstrument()
 
+        self.print_summary()
+        if self.checkpointer is not None and self.checkpointer.stopped is True:
+            self.output_manager.wait_for_completion()
+            sys.exit(1)
+
+    def load_checkpoint(self):
+        """Returns the checkpoint to resume from, restoring the output state from it ahead of schemas being added to
+        the output manager. None if no checkpoint has been recorded yet"""
+        checkpoint = self.checkpointer.load()
+        if checkpoint is None:
+            logging.info('No checkpoint at %s, transcoding from the start of the source', self.checkpointer.path)
+            return None
+        self.checkpointer.validate(self, checkpoint)
+        logging.info('Resuming from checkpoint %s at source message %s', self.checkpointer.path,
+                     checkpoint['source_record_count'])
+        self.output_manager.restore_state(checkpoint['output'])
+        return checkpoint
+
+    def transcode_source(self, resume_position: dict = None):
+        """Transcodes each message of the source, then the messages handlers have yet to emit. Resumes from the
+        source position of a checkpoint if given, otherwise starts from the start message or time if given"""
+        checkpointer = self.checkpointer
         with self.source:
-            for raw_msg in self.source.get_message_iterator():
-                if self.frame_only:  # don't parse message
-                    self.message_parser.process_message(raw_msg)
-                    self.output_manager.write_record(None, raw_msg)
-                else:  # parse message
-                    if self.stats_only is False:  # output message
+            start_position = resume_position if resume_position is not None else self.get_start_position()
+            if start_position is not None:
+                self.source.seek(start_position)
+            raw_messages = self.source.get_message_iterator()
+            if start_position is not None:
+                # Messages of the frame the position is within that precede the message to start from
+                for _ in itertools.islice(raw_messages, start_position.get('skip_messages', 0)):
+                    pass
+                self.source.record_count = checkpointer.source_record_count if resume_position is not None else 0
+            if self.profiler is not None:
+                raw_messages = self.profiler.time_iterator(raw_messages)
+            if self.copy_source_buffers is True:
+                raw_messages = map(bytes, raw_messages)
+            if checkpointer is not None:
+                raw_messages = checkpointer.iterate(self, raw_messages)
+
+            if self.batch_handlers is True:
+                for batch in iter(lambda: list(itertools.islice(raw_messages, HANDLER_BATCH_SIZE)), []):
+                    self.transcode_batch(batch)
+            else:
+                for raw_msg in raw_messages:
+                    if self.frame_only:  # don't parse message
+                        self.message_parser.process_message(raw_msg)
+                        self.output_manager.write_record(None, raw_msg)
+                    else:  # parse message, the parser only counts message types when stats_only is set
                         self.transcode_message(raw_msg)
 
-                if self.transcoded_count == self.sampling_count:
-                    break
-
-        self.print_summary()
+                    if self.transcoded_count == self.sampling_count:
+                        break
+
+            # Handlers are flushed once the session runs to its end, and not when stopped at a checkpoint
+            stopped = checkpointer is not None and checkpointer.stopped is True
+            if self.frame_only is False and stopped is False:
+                self.flush_handlers()
+            if checkpointer is not None:
+                checkpointer.write(self, complete=stopped is False)
+
+    def get_start_position(self):
+        """Returns the source position to start from, looked up in the sidecar message index of the source file when
+        a start message or time is given"""
+        needs_seek = self.checkpointer is not None or self.start_message is not None \
+            or self.start_timestamp is not None
+        if needs_seek is True and self.source.seekable is False:
+            raise SourceNotSeekableError('Checkpointing and starting from a message or time require a source that '
+                                         'can seek, such as a source file')
+        if self.start_message is not None:
+            return self.source.position_of_message(self.start_message)
+        if self.start_timestamp is not None:
+            return self.source.position_at_time(self.start_timestamp)
+        return None
 
     def transcode_message(self, raw):
-        """ Transcoding steps executed on each source message """
-        self.error_writer.set_step(TranscodeStep.PARSE_MESSAGE)
-        msg = None
+        """ Transcoding steps executed on each source message. Returns the parsed message """
+        with self.lock:
+            self.error_writer.set_step(TranscodeStep.PARSE_MESSAGE)
+            msg = None
+            try:
+                msg = self.message_parser.process_message(raw)
+
+                # Messages that failed to decode are reported once, and not passed to handlers
+                if msg.exception is not None:
+                    self.handle_exception(raw, msg, msg.exception)
+                elif msg.ignored is False:  # passed inclusions / exclusions
+                    self.execute_handlers(msg)
+                    if msg.ignored is False:  # passed filters
+                        self.error_writer.set_step(TranscodeStep.WRITE_OUTPUT_RECORD)
+                        self.output_manager.write_record(msg.name, msg.dictionary)
+                        self.transcoded_count += 1
+                    if msg.manufactured_messages is not None:
+                        self.write_manufactured_messages(msg.manufactured_messages)
+
+            except Exception as ex:
+                self.handle_exception(raw, msg, ex)
+            return msg
+
+    def transcode_batch(self, raw_messages):
+        """ Transcoding steps executed on a batch of source messages, when all handlers support batching. Returns
+        the (raw, message) pairs passed to the handlers """
+        with self.lock:
+            handled_messages = []
+            parsed_messages = []
+            for raw in raw_messages:
+                self.error_writer.set_step(TranscodeStep.PARSE_MESSAGE)
+                msg = None
+                try:
+                    msg = self.message_parser.process_message(raw)
+                    exception = msg.exception
+                except Exception as ex:
+                    exception = ex
+                if exception is None:
+                    if msg.ignored is False and msg.dictionary is not None:  # passed inclusions / exclusions
+                        parsed_messages.append((raw, msg))
+                    continue
+
+                # Messages that failed to decode are left out of the batch passed to handlers. They are reported once
+                # the messages parsed ahead of them are written, so those are kept if the error is raised
+                self._write_batch(parsed_messages)
+                handled_messages += parsed_messages
+                parsed_messages = []
+                self.error_writer.set_step(TranscodeStep.PARSE_MESSAGE)
+                self.handle_exception(raw, msg, exception)
+
+            self._write_batch(parsed_messages)
+            return handled_messages + parsed_messages
+
+    def _write_batch(self, parsed_messages):
+        """ Executes the handlers over the (raw, message) pairs of a batch and writes the messages. If a handler fails
+        on the batch, handlers are restored to their state ahead of the batch and the batch is handled again message
+        by message, so that only the messages a handler fails on are reported """
+        if len(parsed_messages) == 0:
+            return
+        handler_states = [x.checkpoint_state() for x in self.all_handlers]
         try:
-            msg = self.message_parser.process_message(raw)
-
-            if msg.exception is not None:
-                self.handle_exception(raw, msg, msg.exception)
-
-            if msg.ignored is False:  # passed inclusions / exclusions
-                self.execute_handlers(msg)
+            self.execute_handlers_batch([msg for _, msg in parsed_messages])
+            handled = True
+        except Exception:
+            handled = False
+            for handler, state in zip(self.all_handlers, handler_states):
+                handler.restore_state(state)
+            # Filters and manufactured messages of the failed batch are dropped, to be added again
+            for _, msg in parsed_messages:
+                msg.ignored = False
+                msg.manufactured_messages = None
+
+        for raw, msg in parsed_messages:
+            try:
+                if handled is False:
+                    self.execute_handlers(msg)
                 if msg.ignored is False:  # passed filters
                     self.error_writer.set_step(TranscodeStep.WRITE_OUTPUT_RECORD)
                     self.output_manager.write_record(msg.name, msg.dictionary)
                     self.transcoded_count += 1
-
-        except Exception as ex:
-            self.handle_exception(raw, msg, ex)
+                if msg.manufactured_messages is not None:
+                    self.write_manufactured_messages(msg.manufactured_messages)
+            except Exception as ex:
+                self.handle_exception(raw, msg, ex)
+
+    def write_manufactured_messages(self, messages):
+        """ Writes messages created by handlers, which are not passed through the handlers themselves """
+        self.error_writer.set_step(TranscodeStep.WRITE_OUTPUT_RECORD)
+        for message in messages:
+            self.output_manager.write_record(message.name, message.dictionary)
+            self.manufactured_count += 1
+
+    def flush_handlers(self):
+        """ Writes the messages handlers have yet to emit once the source is exhausted """
+        with self.lock:
+            for handler in self.all_handlers:
+                messages = handler.flush()
+                try:
+                    self.write_manufactured_messages(messages)
+                except Exception as ex:
+                    self.handle_exception(None, None, ex)
 
     def execute_handlers(self, message):
         """ Executes in sequence the message handlers specified for this transcoding instance """
         if self.handlers_enabled is True:  # execute handlers
-            self.error_writer.set_step(TranscodeStep.EXECUTE_HANDLERS)
-            for handler in self.all_message_type_handlers + self.message_handlers.get(message.type, []):
+            handler = None
+            try:
+                for handler in self.handler_chains.get(message.type, self.default_handler_chain):
+                    handler.handle(message)
+            except Exception:
+                self.error_writer.set_step(TranscodeStep.EXECUTE_HANDLER, type(handler).__name__)
+                raise
+
+    def execute_handlers_batch(self, messages):
+        """ Executes the message handlers over a batch of messages, in source order. Each handler is passed the
+        messages of the types it supports in a single handle_batch call """
+        if self.handlers_enabled is True:
+            handler = None
+            try:
+                for handler in self.all_handlers_in_chain_order:
+                    if handler.supports_all_message_types is True:
+                        handler.handle_batch(messages)
+                    else:
+                        supported_types = self.handler_message_types[handler]
+                        handler.handle_batch([x for x in messages if x.type in supported_types])
+            except Exception:
                 self.error_writer.set_step(TranscodeStep.EXECUTE_HANDLER, type(handler).__name__)
-                handler.handle(message)
+                raise
 
     def setup_handlers(self):
         """Initialize MessageHandler instances to employ at runtime"""
@@ -164,23 +474,49 @@ class Transcoder:  # pylint: disable=too-many-instance-attributes
                 cls_name = handler_spec.split(':')[0]
                 config_dict = parse_handler_config(handler_spec)
 
-            module = importlib.import_module('transcoder.message.handler')
-            class_ = getattr(module, cls_name)
-            instance = class_(config_dict)
-            self.all_handlers.append(instance)
+            if cls_name not in message_handler_registry:
+                raise MessageHandlerNotDefinedError(f'Message handler {cls_name} is not defined')
+            class_ = message_handler_registry.load(cls_name)
+            self.add_handler(class_(config_dict))
 
-            if instance.supports_all_message_types is True:
-                self.all_message_type_handlers.append(instance)
-                continue
+        if self.shard_count is not None:
+            for handler in self.all_handlers:
+                handler.set_shard(self.shard_index, self.shard_count)
+        if self.merged_file_prefix is not None:
+            for handler in self.all_handlers:
+                handler.set_merged_file(self.merged_file_prefix)
+        self.build_handler_chains()
+
+    def add_handler(self, instance):
+        """Appends a MessageHandler instance to the handlers to employ at runtime. build_handler_chains must be called
+        once all handlers are added"""
+        self.handlers_enabled = True
+        self.all_handlers.append(instance)
+
+        if instance.supports_all_message_types is True:
+            self.all_message_type_handlers.append(instance)
+            return
+
+        supported_msg_types = instance.supported_message_types
+        for supported_type in supported_msg_types:
+            if supported_type in self.message_handlers:
+                handler_list = self.message_handlers[supported_type]
+                if instance not in handler_list:
+                    self.message_handlers[supported_type].append(instance)
+            else:
+                self.message_handlers[supported_type] = [instance]
+
+    def build_handler_chains(self):
+        """Resolves the handlers to execute for each message type once, ahead of processing messages"""
+        self.default_handler_chain = tuple(self.all_message_type_handlers)
+        self.handler_chains = {message_type: self.default_handler_chain + tuple(handlers)
+                               for message_type, handlers in self.message_handlers.items()}
 
-            supported_msg_types = instance.supported_message_types
-            for supported_type in supported_msg_types:
-                if supported_type in self.message_handlers:
-                    handler_list = self.message_handlers[supported_type]
-                    if instance not in handler_list:
-                        self.message_handlers[supported_type].append(instance)
-                else:
-                    self.message_handlers[supported_type] = [instance]
+        # Handlers for all message types always precede type specific handlers within a chain
+        type_specific_handlers = [x for x in self.all_handlers if x.supports_all_message_types is False]
+        self.all_handlers_in_chain_order = self.default_handler_chain + tuple(type_specific_handlers)
+        self.handler_message_types = {handler: set(handler.supported_message_types)
+                                      for handler in type_specific_handlers}
 
     def print_summary(self):
         """Print summary of the messages that were processed"""
@@ -213,6 +549,8 @@ class Transcoder:  # pylint: disable=too-many-instance-attributes
                     logging.info('Source message count: %s', self.source.record_count)
                     logging.info('Processed message count: %s', self.message_parser.record_count)
                     logging.info('Transcoded message count: %s', self.transcoded_count)
+                    if self.manufactured_count > 0:
+                        logging.info('Manufactured message count: %s', self.manufactured_count)
                     logging.info('Processed schema count: %s', self.message_parser.total_schema_count)
                     logging.info('Summary of message counts: %s', self.message_parser.record_type_count)
                     logging.info('Summary of error message counts: %s', self.message_parser.error_record_type_count)
@@ -224,9 +562,24 @@ class Transcoder:  # pylint: disable=too-many-instance-attributes
             logging.info('Total runtime in seconds: %s', round(total_seconds, 6))
             logging.info('Total runtime in minutes: %s', round(total_seconds / 60, 6))
 
+    def summary(self) -> dict:
+        """Returns the counts print_summary reports, for callers running transcoding sessions programmatically"""
+        summary = {
+            'source_record_count': self.source.record_count if self.source is not None else 0,
+            'processed_count': self.message_parser.record_count,
+            'transcoded_count': self.transcoded_count,
+            'manufactured_count': self.manufactured_count
+        }
+        if self.frame_only is False:
+            summary.update({'schema_count': self.message_parser.total_schema_count,
+                            'record_type_count': dict(self.message_parser.record_type_count),
+                            'error_record_type_count': dict(self.message_parser.error_record_type_count)})
+        return summary
+
     def process_schemas(self):
         """Process the schema specified at runtime"""
         spec_schemas = self.message_parser.process_schema()
+        emit_source_schemas = all(handler.emits_source_messages for handler in self.all_handlers)
         for schema in spec_schemas:
             if self.output_manager.supports_zero_field_schemas() is False and len(schema.fields) == 0:
                 logging.info('Schema "%s" contains no field definitions, skipping schema creation', schema.name)
@@ -237,7 +590,12 @@ class Transcoder:  # pylint: disable=too-many-instance-attributes
                         or schema.message_id in handler.supported_message_types:
                     handler.append_manufactured_fields(schema)
 
-            self.output_manager.enqueue_schema(schema)
+            if emit_source_schemas is True:
+                self.output_manager.enqueue_schema(schema)
+
+        for handler in self.all_handlers:
+            for schema in handler.manufactured_schemas():
+                self.output_manager.enqueue_schema(schema)
 
         # Only need to wait if lazy create is off, and you want to force creation before data is read
         if self.lazy_create_resources is False:
@@ -256,7 +614,12 @@ class Transcoder:  # pylint: disable=too-many-instance-attributes
             raise exception
 
     def trap(self, _signum, _frame):
-        """Trap SIGINT to suppress noisy stack traces and show interim summary"""
+        """Trap SIGINT to suppress noisy stack traces and show interim summary. When checkpointing, the first SIGINT
+        stops transcoding at the next checkpoint boundary and records a checkpoint to resume from instead"""
+        if self.checkpointer is not None and self.checkpointer.stop_requested is False:
+            logging.info('Stopping once a checkpoint is recorded, interrupt again to exit immediately')
+            self.checkpointer.stop_requested = True
+            return
         print()
         self.print_summary()
         sys.exit(1)
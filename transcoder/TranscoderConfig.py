@@ -0,0 +1,79 @@
+#
+# Copyright 2023 Google LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+# pylint: disable=invalid-name
+# pylint: disable=too-many-instance-attributes
+
+from dataclasses import dataclass
+
+
+@dataclass
+class TranscoderConfig:
+    """Options of a transcoding session, named and defaulted as the txcode CLI arguments, for creating a Transcoder
+    with Transcoder.from_config rather than its positional arguments"""
+    factory: str = None
+    schema_file_path: str = None
+    source_file_path: str = None
+    source_file_encoding: str = 'utf-8'
+    source_file_format_type: str = None
+    source_file_endian: str = 'big'
+    prefix_length: int = 2
+    skip_lines: int = 0
+    skip_bytes: int = 0
+    message_skip_bytes: int = 0
+    quiet: bool = False
+    output_type: str = 'diag'
+    output_encoding: str = 'binary'
+    output_path: str = None
+    error_output_path: str = None
+    destination_project_id: str = None
+    destination_dataset_id: str = None
+    message_handlers: str = None
+    lazy_create_resources: bool = False
+    frame_only: bool = False
+    stats_only: bool = False
+    create_schemas_only: bool = False
+    continue_on_error: bool = False
+    create_schema_enforcing_topics: bool = True
+    sampling_count: int = None
+    message_type_inclusions: str = None
+    message_type_exclusions: str = None
+    fix_header_tags: str = None
+    fix_separator: int = 1
+    base64: bool = False
+    base64_urlsafe: bool = False
+    schema_cache_dir: str = None
+    profile_path: str = None
+    profile_pstats_path: str = None
+    metrics_port: int = None
+    metrics_file_path: str = None
+    metrics_interval: float = 10.0
+    synthetic_options: str = None
+    profile_decode_path: str = None
+    checkpoint_path: str = None
+    checkpoint_interval: float = 30.0
+    resume: bool = False
+    start_message: int = None
+    start_timestamp: int = None
+    shard_index: int = None
+    shard_count: int = None
+    output_prefix: str = None
+    merge_sources: bool = False
+    merge_timestamp_field: str = None
+    merged_file_prefix: str = None
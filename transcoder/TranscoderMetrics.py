@@ -0,0 +1,302 @@
+#
+# Copyright 2023 Google LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+# pylint: disable=invalid-name
+
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from time import perf_counter_ns
+
+
+# Upper bounds of the latency histogram buckets in nanoseconds, in 1-2-5 steps from 1 microsecond to 10 seconds
+LATENCY_BUCKETS_NS = tuple(m * 10 ** e for e in range(3, 10) for m in (1, 2, 5)) + (10 ** 10,)
+# One in this many parser and output calls is timed for the latency histograms
+METRICS_SAMPLE_INTERVAL = 32
+
+
+class LatencyHistogram:
+    """Counts of sampled latencies in fixed buckets"""
+
+    __slots__ = ['counts', 'count', 'sum_ns']
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS_NS) + 1)
+        self.count = 0
+        self.sum_ns = 0
+
+    def observe(self, elapsed_ns: int):
+        """Adds a latency"""
+        self.counts[bisect_left(LATENCY_BUCKETS_NS, elapsed_ns)] += 1
+        self.count += 1
+        self.sum_ns += elapsed_ns
+
+    def cumulative_counts(self) -> [int]:
+        """Returns the count of latencies less than or equal to each bucket bound, then the total count"""
+        return list(itertools.accumulate(self.counts))
+
+    def percentile_ns(self, percentile: float):
+        """Returns the upper bound of the bucket holding the given percentile, or None without samples"""
+        counts = self.cumulative_counts()
+        if counts[-1] == 0:
+            return None
+        index = bisect_left(counts, counts[-1] * percentile / 100)
+        return LATENCY_BUCKETS_NS[index] if index < len(LATENCY_BUCKETS_NS) else None
+
+
+class TranscoderMetrics:  # pylint: disable=too-many-instance-attributes
+    """Live metrics of a transcoding run, served in the Prometheus text format and written periodically to a JSON
+    stats file. Message and error counts are read from the parser and transcoder when metrics are collected. While
+    running, the parser and output manager of the transcoder are wrapped in stand-ins that count the bytes of each
+    parsed message by type, and time one in METRICS_SAMPLE_INTERVAL of their calls"""
+
+    def __init__(self, port: int = None, stats_file_path: str = None, interval: float = 10.0,
+                 host: str = '127.0.0.1'):
+        self.port = port
+        self.host = host
+        self.stats_file_path = stats_file_path
+        self.interval = interval
+        self.transcoder = None
+        self.bytes_by_type = defaultdict(int)
+        self.decode_latency = LatencyHistogram()
+        self.output_latency = LatencyHistogram()
+        self.parser = None
+        self.output_manager = None
+        self.start_time = None
+        self.previous_snapshot = None
+        self.http_server = None
+        self.stopped = threading.Event()
+        self.writer_thread = None
+
+    def start(self, transcoder):
+        """Wraps the parser and output manager of a transcoder in metered stand-ins, and starts serving its metrics
+        and writing the stats file"""
+        self.transcoder = transcoder
+        self.parser, self.output_manager = transcoder.message_parser, transcoder.output_manager
+        transcoder.message_parser = MeteredComponent(self.parser, 'process_message', self.decode_latency,
+                                                     self.bytes_by_type)
+        transcoder.output_manager = MeteredComponent(self.output_manager, 'write_record', self.output_latency)
+        self.start_time = time.time()
+        if self.port is not None:
+            self.http_server = ThreadingHTTPServer((self.host, self.port), MetricsRequestHandler)
+            self.http_server.metrics = self
+            threading.Thread(target=self.http_server.serve_forever, name='metrics-server', daemon=True).start()
+            logging.info('Serving metrics on http://%s:%s/metrics', self.host, self.http_server.server_port)
+        if self.stats_file_path is not None:
+            self.writer_thread = threading.Thread(target=self._write_periodically, name='metrics-writer',
+                                                  daemon=True)
+            self.writer_thread.start()
+
+    def stop(self):
+        """Stops serving metrics, writing the final stats file, and restores the parser and output manager of the
+        transcoder"""
+        self.stopped.set()
+        if self.writer_thread is not None:
+            self.writer_thread.join()
+        if self.http_server is not None:
+            self.http_server.shutdown()
+            self.http_server.server_close()
+        if self.transcoder is not None:
+            self.transcoder.message_parser, self.transcoder.output_manager = self.parser, self.output_manager
+
+    def _write_periodically(self):
+        while not self.stopped.wait(self.interval):
+            self.write_stats_file()
+        self.write_stats_file()
+
+    def write_stats_file(self):
+        """Replaces the stats file with a current snapshot"""
+        temp_path = f'{self.stats_file_path}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as stats_file:
+            json.dump(self.snapshot(), stats_file, indent=2)
+        os.replace(temp_path, self.stats_file_path)
+
+    def snapshot(self, advance: bool = True) -> dict:
+        """Returns the current metrics as a JSON serializable dict, with message and byte rates by type since the
+        previous snapshot advanced to"""
+        transcoder = self.transcoder
+        parser = self.parser
+        now = time.time()
+        messages_by_type = parser.summary_count.copy() if isinstance(parser.summary_count, dict) \
+            else {'*': parser.summary_count}
+        bytes_by_type = dict(self.bytes_by_type)
+
+        previous = self.previous_snapshot
+        elapsed = now - (previous['time'] if previous is not None else self.start_time)
+        previous_messages = previous['messages_by_type'] if previous is not None else {}
+        previous_bytes = previous['bytes_by_type'] if previous is not None else {}
+
+        snapshot = {
+            'time': now,
+            'uptime_seconds': round(now - self.start_time, 6),
+            **self._source_progress(),
+            'transcoded_count': transcoder.transcoded_count,
+            'manufactured_count': transcoder.manufactured_count,
+            'messages_by_type': messages_by_type,
+            'bytes_by_type': bytes_by_type,
+            'errors_by_type': getattr(parser, 'error_summary_count', {}).copy(),
+            'messages_per_second_by_type': {k: round((v - previous_messages.get(k, 0)) / elapsed, 3)
+                                            for k, v in messages_by_type.items()} if elapsed > 0 else {},
+            'bytes_per_second_by_type': {k: round((v - previous_bytes.get(k, 0)) / elapsed, 3)
+                                         for k, v in bytes_by_type.items()} if elapsed > 0 else {},
+            'decode_latency_ns': self._latency_summary(self.decode_latency),
+            'output_latency_ns': self._latency_summary(self.output_latency),
+            'output_in_flight': self.output_manager.in_flight_count()
+        }
+        if advance is True:
+            self.previous_snapshot = snapshot
+        return snapshot
+
+    def _source_progress(self) -> dict:
+        source = self.transcoder.source
+        bytes_read = source.bytes_read if source is not None else None
+        source_size = source.source_size if source is not None else None
+        source_record_count = source.record_count if source is not None else 0
+        # Progress is exact when the message count of the source is known from its index
+        message_count = source.message_count if source is not None else None
+        if message_count:
+            read_progress = round(min(source_record_count / message_count, 1.0), 6)
+        else:
+            read_progress = round(min(bytes_read / source_size, 1.0), 6) if bytes_read and source_size else None
+        return {'source_record_count': source_record_count, 'source_message_count': message_count,
+                'bytes_read': bytes_read, 'source_size': source_size, 'read_progress': read_progress}
+
+    @staticmethod
+    def _latency_summary(histogram: LatencyHistogram) -> dict:
+        return {'sampled': histogram.count,
+                'mean': round(histogram.sum_ns / histogram.count) if histogram.count > 0 else None,
+                'p50': histogram.percentile_ns(50), 'p99': histogram.percentile_ns(99),
+                'p999': histogram.percentile_ns(99.9)}
+
+    def prometheus_text(self) -> str:
+        """Returns the current metrics in the Prometheus text exposition format"""
+        transcoder = self.transcoder
+        parser = self.parser
+        source = transcoder.source
+        summary_count = parser.summary_count.copy() if isinstance(parser.summary_count, dict) \
+            else {'*': parser.summary_count}
+        lines = []
+
+        def add(name: str, metric_type: str, help_text: str, samples):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} {metric_type}')
+            for labels, value in samples:
+                label_text = ','.join(f'{k}="{_escape_label(v)}"' for k, v in labels.items())
+                lines.append(f'{name}{{{label_text}}} {value}' if label_text else f'{name} {value}')
+
+        add('transcoder_source_records_total', 'counter', 'Messages framed from the source',
+            [({}, source.record_count if source is not None else 0)])
+        add('transcoder_messages_total', 'counter', 'Messages parsed by message type',
+            [({'message_type': k}, v) for k, v in summary_count.items()])
+        add('transcoder_message_bytes_total', 'counter', 'Bytes of the messages parsed by message type',
+            [({'message_type': k}, v) for k, v in dict(self.bytes_by_type).items()])
+        add('transcoder_errors_total', 'counter', 'Messages that failed to transcode by message type',
+            [({'message_type': k}, v) for k, v in getattr(parser, 'error_summary_count', {}).copy().items()])
+        add('transcoder_transcoded_messages_total', 'counter', 'Messages written to the output',
+            [({}, transcoder.transcoded_count)])
+        add('transcoder_manufactured_messages_total', 'counter', 'Messages created by handlers and written',
+            [({}, transcoder.manufactured_count)])
+        for name, help_text, histogram in [
+                ('transcoder_decode_latency_seconds', 'Sampled time to parse a message', self.decode_latency),
+                ('transcoder_output_latency_seconds', 'Sampled time to write a record', self.output_latency)]:
+            counts = histogram.cumulative_counts()
+            add(name, 'histogram', help_text, [])
+            lines.extend(f'{name}_bucket{{le="{bound / 1e9:g}"}} {count}'
+                         for bound, count in zip(LATENCY_BUCKETS_NS, counts))
+            lines.append(f'{name}_bucket{{le="+Inf"}} {counts[-1]}')
+            lines.append(f'{name}_sum {histogram.sum_ns / 1e9}')
+            lines.append(f'{name}_count {histogram.count}')
+        add('transcoder_output_in_flight', 'gauge', 'Records written but not yet acknowledged by the destination',
+            [({}, self.output_manager.in_flight_count())])
+        bytes_read = source.bytes_read if source is not None else None
+        if bytes_read is not None:
+            add('transcoder_source_read_bytes', 'gauge', 'Bytes read from the source', [({}, bytes_read)])
+        source_size = source.source_size if source is not None else None
+        if source_size is not None:
+            add('transcoder_source_size_bytes', 'gauge', 'Size of the source', [({}, source_size)])
+        message_count = source.message_count if source is not None else None
+        if message_count is not None:
+            add('transcoder_source_messages', 'gauge', 'Messages in the source, from its index', [({}, message_count)])
+        return '\n'.join(lines) + '\n'
+
+
+class MeteredComponent:  # pylint: disable=too-few-public-methods
+    """Stands in for a parser or output manager, timing one in METRICS_SAMPLE_INTERVAL calls of one of its methods
+    and forwarding everything else. With bytes_by_type, the length of the raw message passed to each call is added
+    to the count of the type of the parsed message it returns"""
+
+    def __init__(self, component, method_name: str, histogram: LatencyHistogram, bytes_by_type: dict = None):
+        self.component = component
+        method = getattr(component, method_name)
+        countdown = 0
+
+        def metered(*args):
+            nonlocal countdown
+            if countdown:
+                countdown -= 1
+                result = method(*args)
+            else:
+                countdown = METRICS_SAMPLE_INTERVAL - 1
+                start = perf_counter_ns()
+                result = method(*args)
+                histogram.observe(perf_counter_ns() - start)
+            if bytes_by_type is not None and result is not None:
+                bytes_by_type[result.name] += len(args[0])
+            return result
+
+        setattr(self, method_name, metered)
+
+    def __getattr__(self, name):
+        return getattr(self.component, name)
+
+
+def _escape_label(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class MetricsRequestHandler(BaseHTTPRequestHandler):
+    """Serves the Prometheus text at /metrics and the JSON snapshot at /stats"""
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """Returns the metrics"""
+        metrics: TranscoderMetrics = self.server.metrics
+        path = self.path.split('?')[0]
+        if path == '/metrics':
+            body, content_type = metrics.prometheus_text(), 'text/plain; version=0.0.4'
+        elif path == '/stats':
+            body, content_type = json.dumps(metrics.snapshot(advance=False)), 'application/json'
+        else:
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+        data = body.encode('utf-8')
+        self.send_response(HTTPStatus.OK)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        logging.debug('%s - %s', self.address_string(), format % args)
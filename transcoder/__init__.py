@@ -20,4 +20,7 @@
 # pylint: disable=invalid-name
 
 from .Transcoder import Transcoder
+from .TranscoderConfig import TranscoderConfig
+from .MultiFileTranscoder import MultiFileTranscoder
+from .StreamingUtil import transcode_iter
 from .version import __version__
@@ -29,28 +29,105 @@ CLI entry point for the market data transcoding API
 import argparse
 import logging
 import os
+from datetime import datetime, timezone
 
-from transcoder.message.factory import all_supported_factory_types
-from transcoder.output import all_output_identifiers
-from transcoder.source import all_source_identifiers
-from transcoder import Transcoder, __version__
+from transcoder.message.MessageUtil import message_parsers
+from transcoder.output.OutputUtil import output_managers
+from transcoder.source import expand_source_paths, get_message_source, is_multi_file_source
+from transcoder.source.SourceUtil import sources
+from transcoder.source.file.MessageIndex import MessageIndex, build_index
+from transcoder import MultiFileTranscoder, Transcoder, TranscoderConfig, __version__
 
 script_dir = os.path.dirname(__file__)
 
 
+def parse_timestamp(value: str) -> int:
+    """Returns nanoseconds since the epoch of an integer nanosecond timestamp or an ISO 8601 date and time, taken
+    as UTC if it has no offset"""
+    if value.isdigit():
+        return int(value)
+    moment = datetime.fromisoformat(value)
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    whole_seconds = int(moment.replace(microsecond=0).timestamp())
+    return whole_seconds * 1_000_000_000 + moment.microsecond * 1000
+
+
+def builtin_choices(registry) -> str:
+    """Returns the built in identifiers of a plugin registry as an argument metavar"""
+    return '{' + ','.join(registry.builtin_names()) + '}'
+
+
+def check_args(arg_parser: argparse.ArgumentParser, args) -> bool:
+    """Exits with a usage error for plugin identifiers that are not installed and options that can not be used
+    together, returning whether the source is a directory or glob pattern of files"""
+    # Identifiers are checked once parsed, so installed plugins are only discovered for those that are not built in
+    for option, value, registry in [('--factory', args.factory, message_parsers),
+                                    ('--source_file_format_type', args.source_file_format_type, sources),
+                                    ('--output_type', args.output_type, output_managers)]:
+        if value is not None and value not in registry:
+            arg_parser.error(f"argument {option}: invalid choice: '{value}' "
+                             f"(choose from {', '.join(registry.names())})")
+    if args.resume is True and args.checkpoint is None:
+        arg_parser.error('--resume requires --checkpoint')
+    if args.build_index is True and args.source_file is None:
+        arg_parser.error('--build_index requires --source_file')
+    if (args.shard_index is None) != (args.shard_count is None):
+        arg_parser.error('--shard_index and --shard_count must be given together')
+    if args.shard_count is not None:
+        if args.shard_count < 1 or not 0 <= args.shard_index < args.shard_count:
+            arg_parser.error('--shard_index must be at least 0 and less than --shard_count')
+        if args.source_file is None:
+            arg_parser.error('--shard_count requires --source_file')
+        if args.start_message is not None or args.start_time is not None:
+            arg_parser.error('--start_message and --start_time can not be used with --shard_count')
+    multi_file = is_multi_file_source(os.path.expanduser(args.source_file) if args.source_file else None)
+    check_multi_file_args(arg_parser, args, multi_file)
+    return multi_file
+
+
+def check_multi_file_args(arg_parser: argparse.ArgumentParser, args, multi_file: bool):
+    """Exits with a usage error for options that can not be used with, or require, a directory or glob pattern
+    source"""
+    if args.merge_timestamp_field is not None and args.merge_sources is False:
+        arg_parser.error('--merge_timestamp_field requires --merge_sources')
+    if args.merge_timestamp_field is not None and args.frame_only is True:
+        arg_parser.error('--merge_timestamp_field can not be used with --frame_only')
+    if args.merge_sources is True:
+        if multi_file is False:
+            arg_parser.error('--merge_sources requires a directory or glob pattern --source_file')
+        merged_options = {'--checkpoint': args.checkpoint, '--start_message': args.start_message,
+                          '--start_time': args.start_time, '--shard_count': args.shard_count,
+                          '--workers': args.workers, '--merge_outputs': args.merge_outputs or None}
+        for option in [x for x, value in merged_options.items() if value is not None]:
+            arg_parser.error(f'{option} can not be used with --merge_sources')
+    elif multi_file is True:
+        single_file_options = {'--checkpoint': args.checkpoint, '--start_message': args.start_message,
+                               '--start_time': args.start_time, '--shard_count': args.shard_count,
+                               '--metrics_port': args.metrics_port, '--metrics_file': args.metrics_file,
+                               '--profile': args.profile, '--profile_pstats': args.profile_pstats,
+                               '--profile_decode': args.profile_decode}
+        for option in [x for x, value in single_file_options.items() if value is not None]:
+            arg_parser.error(f'{option} can not be used with a directory or glob pattern --source_file')
+    elif args.workers is not None or args.merge_outputs is True:
+        arg_parser.error('--workers and --merge_outputs require a directory or glob pattern --source_file')
+
+
 def main():
     """main entry point for Datacast Transcoder"""
     arg_parser = argparse.ArgumentParser(description='Datacast Transcoder process input arguments', allow_abbrev=False)
 
     source_options_group = arg_parser.add_argument_group('Input source arguments')
-    source_options_group.add_argument('--factory', choices=all_supported_factory_types(),
-                                      help='Message factory for decoding')
+    source_options_group.add_argument('--factory', metavar=builtin_choices(message_parsers),
+                                      help='Message factory for decoding, or a factory installed as a plugin')
     source_options_group.add_argument('--schema_file', type=str, help='Path to the schema file')
-    source_options_group.add_argument('--source_file', type=str, help='Path to the source file')
+    source_options_group.add_argument('--source_file', type=str,
+                                      help='Path to the source file, or a directory or glob pattern of source files '
+                                           'to transcode in parallel')
     source_options_group.add_argument('--source_file_encoding', type=str, default='utf-8', help='The source file '
                                                                                                 'character encoding')
-    source_options_group.add_argument('--source_file_format_type', required=True, choices=all_source_identifiers(),
-                                      help='The source file format')
+    source_options_group.add_argument('--source_file_format_type', required=True, metavar=builtin_choices(sources),
+                                      help='The source file format, or a source installed as a plugin')
 
     base64_group = source_options_group.add_mutually_exclusive_group()
     base64_group.add_argument('--base64', action='store_true',
@@ -63,6 +140,9 @@ def main():
     source_options_group.add_argument('--fix_header_tags', type=str, help='Comma delimited list of fix header tags')
     source_options_group.add_argument('--fix_separator', type=int, default=1, help='The unicode int representing the '
                                                                                    'fix message separator')
+    source_options_group.add_argument('--schema_cache_dir', type=str,
+                                      help='Directory for caching the parsed FIX specification and derived schemas '
+                                           'between runs')
     source_options_group.add_argument('--message_handlers', type=str, help='Comma delimited list of message '
                                                                            'handlers in priority order')
     source_options_group.add_argument('--message_skip_bytes', type=int, default=0,
@@ -88,14 +168,18 @@ def main():
                                            'file-level headers')
     source_options_group.add_argument('--skip_lines', type=int, default=0,
                                       help='Number of lines to skip before processing the file')
+    source_options_group.add_argument('--synthetic_options', type=str,
+                                      help='Generator options of the synthetic source, in the format '
+                                           'count=<n>:rate=<per second>:mix=<message type>=<weight>|...:'
+                                           'group_size=<min>-<max>:variants=<n>:seed=<n>')
     source_options_group.add_argument('--source_file_endian', choices=['big', 'little'], default='big',
                                       help='Source file endianness')
 
     output_options_group = arg_parser.add_argument_group('Output arguments')
     output_options_group.add_argument('--output_path', help='Output file path. Defaults to avroOut')
-    output_options_group.add_argument('--output_type', choices=all_output_identifiers(),
+    output_options_group.add_argument('--output_type', metavar=builtin_choices(output_managers),
                                       default='diag',
-                                      help='Output format type')
+                                      help='Output format type, or an output installed as a plugin')
     output_options_group.add_argument('--error_output_path',
                                       help='Error output file path if --continue_on_error flag enabled. Defaults to '
                                            'errorOut')
@@ -138,11 +222,83 @@ def main():
     arg_parser.add_argument('--log', choices=['notset', 'debug', 'info', 'warning', 'error', 'critical'],
                             default='info',
                             help='The default logging level')
+    profile_options_group = arg_parser.add_argument_group('Profiling arguments')
+    profile_options_group.add_argument('--profile', type=str,
+                                       help='Path of a JSON report of the time spent framing, parsing, handling and '
+                                            'writing messages, by message type')
+    profile_options_group.add_argument('--profile_pstats', type=str,
+                                       help='Path of a cProfile pstats dump of the message processing loop')
+    profile_options_group.add_argument('--profile_decode', type=str,
+                                       help='Path of a JSON report of decode time and allocations by message '
+                                            'template and field type, ranked by decode time')
+
+    metrics_options_group = arg_parser.add_argument_group('Metrics arguments')
+    metrics_options_group.add_argument('--metrics_port', type=int,
+                                       help='Local port to serve Prometheus metrics on, at /metrics')
+    metrics_options_group.add_argument('--metrics_file', type=str,
+                                       help='Path of a JSON stats file rewritten every --metrics_interval seconds')
+    metrics_options_group.add_argument('--metrics_interval', type=float, default=10.0,
+                                       help='Seconds between writes of the metrics file')
+
+    checkpoint_options_group = arg_parser.add_argument_group('Checkpoint arguments')
+    checkpoint_options_group.add_argument('--checkpoint', type=str,
+                                          help='Path of a checkpoint file recording the source position, message '
+                                               'counts and handler state every --checkpoint_interval seconds, once '
+                                               'outputs are flushed. Requires a source file that can seek')
+    checkpoint_options_group.add_argument('--checkpoint_interval', type=float, default=30.0,
+                                          help='Seconds between checkpoints')
+    checkpoint_options_group.add_argument('--resume', action='store_true',
+                                          help='Resume from the --checkpoint file if it exists, discarding output '
+                                               'written after it')
+
+    index_options_group = arg_parser.add_argument_group('Index arguments')
+    index_options_group.add_argument('--build_index', action='store_true',
+                                     help='Build a sidecar index of the messages of the source file at '
+                                          '<source_file>.idx and exit')
+    index_options_group.add_argument('--index_interval', type=int, default=1024,
+                                     help='Messages between index entries')
+    start_group = index_options_group.add_mutually_exclusive_group()
+    start_group.add_argument('--start_message', type=int,
+                             help='Zero based ordinal of the message to start transcoding from, found with the '
+                                  'source file index')
+    start_group.add_argument('--start_time', type=parse_timestamp,
+                             help='Start transcoding from the last indexed packet captured at or before this time, '
+                                  'in nanoseconds since the epoch or ISO 8601, found with the source file index')
+
+    shard_options_group = arg_parser.add_argument_group('Shard arguments')
+    shard_options_group.add_argument('--shard_index', type=int,
+                                     help='Zero based index of the byte range of the source file to transcode, '
+                                          'such as the completion index of a Kubernetes indexed job')
+    shard_options_group.add_argument('--shard_count', type=int,
+                                     help='Number of byte ranges to split a length_delimited, cme_binary_packet or '
+                                          'pcap source file into, aligned to frames with the source file index or by '
+                                          'resynchronising on the framing of the file. Output files are named for '
+                                          'the shard')
+
+    multi_file_options_group = arg_parser.add_argument_group('Multi-file arguments')
+    multi_file_options_group.add_argument('--workers', type=int,
+                                          help='Number of worker processes transcoding the files of a directory or '
+                                               'glob pattern --source_file, largest file first. Defaults to the CPU '
+                                               'count')
+    multi_file_options_group.add_argument('--merge_outputs', action='store_true',
+                                          help='Merge the outputs of each file, prefixed by the file name, into one '
+                                               'set prefixed by the directory name. Files are merged once all are '
+                                               'transcoded, and Pub/Sub topics and BigQuery tables are shared')
+    multi_file_options_group.add_argument('--merge_sources', action='store_true',
+                                          help='Transcode the files of a directory or glob pattern --source_file as '
+                                               'one stream, merged in timestamp order, such as the A and B feeds or '
+                                               'the channels of a capture. Ordered by pcap capture timestamps unless '
+                                               '--merge_timestamp_field is given')
+    multi_file_options_group.add_argument('--merge_timestamp_field', type=str,
+                                          help='Name of the decoded message field to order --merge_sources by, such '
+                                               'as timestamp for ITCH or TransactTime for CME')
+
     arg_parser.add_argument('-q', '--quiet', action='store_true', help='Suppress message output to console')
 
     arg_parser.add_argument('-v', '--version', action='version', version=f'Datacast Transcoder {__version__}')
 
     args = arg_parser.parse_args()
+    multi_file = check_args(arg_parser, args)
 
     logging.basicConfig(level=args.log.upper())
     logging.debug(args)
@@ -178,17 +334,57 @@ def main():
     fix_separator = args.fix_separator
     base64 = args.base64
     base64_urlsafe = args.base64_urlsafe
+    schema_cache_dir = os.path.expanduser(args.schema_cache_dir) if args.schema_cache_dir is not None else None
+    profile_path = os.path.expanduser(args.profile) if args.profile is not None else None
+    profile_pstats_path = os.path.expanduser(args.profile_pstats) if args.profile_pstats is not None else None
+    metrics_port = args.metrics_port
+    metrics_file_path = os.path.expanduser(args.metrics_file) if args.metrics_file is not None else None
+    metrics_interval = args.metrics_interval
+    synthetic_options = args.synthetic_options
+    profile_decode_path = os.path.expanduser(args.profile_decode) if args.profile_decode is not None else None
+    checkpoint_path = os.path.expanduser(args.checkpoint) if args.checkpoint is not None else None
+    checkpoint_interval = args.checkpoint_interval
+    resume = args.resume
+    start_message = args.start_message
+    start_timestamp = args.start_time
+    shard_index = args.shard_index
+    shard_count = args.shard_count
+    merge_sources = args.merge_sources
+    merge_timestamp_field = args.merge_timestamp_field
+
+    if args.build_index is True:
+        # Imports every message factory, so only once indexing
+        # pylint: disable=import-outside-toplevel
+        from transcoder.message.factory.MessageFactory import get_template_id_reader
+        for path in expand_source_paths(source_file_path) if multi_file is True else [source_file_path]:
+            source = get_message_source(path, source_file_encoding, source_file_format_type,
+                                        source_file_endian, skip_bytes, skip_lines, message_skip_bytes, prefix_length)
+            index = build_index(source, args.index_interval, get_template_id_reader(factory))
+            index.write(MessageIndex.path_for(path))
+            logging.info('Indexed %s messages with %s entries to %s', index.message_count, len(index),
+                         MessageIndex.path_for(path))
+        return
+
+    config = TranscoderConfig(factory, schema_file_path, source_file_path, source_file_encoding,
+                              source_file_format_type, source_file_endian, prefix_length, skip_lines,
+                              skip_bytes, message_skip_bytes, quiet, output_type, output_encoding,
+                              output_path, error_output_path, destination_project_id, destination_dataset_id,
+                              message_handlers, lazy_create_resources, frame_only, stats_only,
+                              create_schemas_only, continue_on_error, create_schema_enforcing_topics,
+                              sampling_count, message_type_inclusions, message_type_exclusions,
+                              fix_header_tags, fix_separator, base64, base64_urlsafe, schema_cache_dir,
+                              profile_path, profile_pstats_path, metrics_port, metrics_file_path, metrics_interval,
+                              synthetic_options, profile_decode_path, checkpoint_path, checkpoint_interval, resume,
+                              start_message, start_timestamp, shard_index, shard_count,
+                              merge_sources=merge_sources, merge_timestamp_field=merge_timestamp_field)
 
-    txcode = Transcoder(factory, schema_file_path, source_file_path, source_file_encoding,
-                        source_file_format_type, source_file_endian, prefix_length, skip_lines,
-                        skip_bytes, message_skip_bytes, quiet, output_type, output_encoding,
-                        output_path, error_output_path, destination_project_id, destination_dataset_id,
-                        message_handlers, lazy_create_resources, frame_only, stats_only,
-                        create_schemas_only, continue_on_error, create_schema_enforcing_topics,
-                        sampling_count, message_type_inclusions, message_type_exclusions,
-                        fix_header_tags, fix_separator, base64, base64_urlsafe)
+    if multi_file is True and merge_sources is False:
+        MultiFileTranscoder.from_source(config, args.workers, args.merge_outputs).transcode()
+        return
 
+    txcode = Transcoder.from_config(config)
     txcode.transcode()
+    txcode.output_manager.wait_for_completion()
 
 
 if __name__ == "__main__":
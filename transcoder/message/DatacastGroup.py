@@ -19,8 +19,6 @@
 
 from typing import Any
 
-from google.cloud import bigquery
-
 from transcoder.message.DatacastField import DatacastField
 
 
@@ -72,6 +70,7 @@ class DatacastGroup(DatacastField):
         }
 
     def create_bigquery_field(self, part: DatacastField = None):
+        from google.cloud import bigquery  # pylint: disable=import-outside-toplevel
         field = self
         if part is not None:
             field = part
@@ -17,12 +17,15 @@
 # limitations under the License.
 #
 
+from transcoder.PluginRegistry import PluginCapabilities
 from transcoder.message import DatacastSchema, ParsedMessage
 from transcoder.message.exception import ParserFunctionNotDefinedError
 
 class DatacastParser:
     """Class encapsulating message parsing and processing functionality """
 
+    capabilities = PluginCapabilities()
+
     @staticmethod
     def supported_factory_types():
         """Static method for retrieving list of provider-specific factory classes"""
@@ -42,6 +45,13 @@ class DatacastParser:
         self.total_schema_count = 0
         self.error_summary_count = {}
 
+    def reset_counts(self):
+        """Resets the message and error counts, for reusing the parser and its processed schema in another run"""
+        self.record_count = 0
+        self.summary_count = {}
+        self.total_schema_count = 0
+        self.error_summary_count = {}
+
     @property
     def record_type_count(self):
         """Method returning count of record types in a given source"""
@@ -100,6 +110,15 @@ class DatacastParser:
                 return False
         return True
 
+    def read_field(self, raw_msg, field_name: str):
+        """Returns the value of a top level field of a raw message, or None if its message type has no such field,
+        without counting or filtering the message. Override to read the field without decoding the whole message"""
+        message = self._process_message(raw_msg)
+        if message is None:
+            return None
+        message = self._parse_message(message)
+        return message.dictionary.get(field_name, None) if message.dictionary is not None else None
+
     def _process_message(self, raw_msg) -> ParsedMessage:
         raise ParserFunctionNotDefinedError
 
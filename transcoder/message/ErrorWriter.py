@@ -73,9 +73,7 @@ class ErrorWriter:
     def write_error(self, raw_record, message: ParsedMessage, exception: Exception):
         """Write data about error to file"""
         if self.file is None:
-            exists = os.path.exists(self.output_path)
-            if not exists:
-                os.makedirs(self.output_path)
+            os.makedirs(self.output_path, exist_ok=True)
 
             # Only create error file if errors exist
             self.file = open(self.__get_file_name(self.prefix, 'out'),  # pylint: disable=consider-using-with
@@ -96,7 +94,7 @@ class ErrorWriter:
     def __encode_source_message(record):
         if record is None:
             return ''
-        if isinstance(record, bytes):
+        if isinstance(record, (bytes, memoryview)):
             return base64.b64encode(record).decode('utf-8')
         if isinstance(record, str):
             return base64.b64encode(record.encode('utf-8')).decode('utf-8')
@@ -17,33 +17,56 @@
 # limitations under the License.
 #
 
-from third_party.pyfixmsg.parser import FixParser
-from third_party.sbedecoder import SBEParser
+from transcoder.LazyImportUtil import load_object
+from transcoder.PluginRegistry import PluginRegistry
 from transcoder.message import DatacastParser
 from transcoder.message.exception import MessageParserNotDefinedError
-from transcoder.message.factory.MessageFactory import get_message_factory
+from transcoder.message.handler import HANDLER_NAMES
+
+SBE_FACTORY_TYPES = ['cme', 'itch', 'memx']
+FIX_FACTORY_TYPES = ['fix']
+SBE_PARSER = 'third_party.sbedecoder:SBEParser'
+FIX_PARSER = 'third_party.pyfixmsg.parser:FixParser'
+
+# Factory name to the parser class, imported only once the factory is selected
+message_parsers = PluginRegistry('market_data_transcoder.parsers', dict(
+    [(x, SBE_PARSER) for x in SBE_FACTORY_TYPES] + [(x, FIX_PARSER) for x in FIX_FACTORY_TYPES]))
+
+# Handler class name to the handler class, as given to --message_handlers
+message_handlers = PluginRegistry('market_data_transcoder.handlers',
+                                  {x: f'transcoder.message.handler:{x}' for x in HANDLER_NAMES})
 
 
 def get_message_parser(factory: str, schema_file_path: str,  # pylint: disable=too-many-arguments
                        stats_only: bool = False,
                        message_type_inclusions: str = None, message_type_exclusions: str = None,
-                       fix_header_tags: str = None, fix_separator: int = 1) -> DatacastParser:
+                       fix_header_tags: str = None, fix_separator: int = 1,
+                       schema_cache_dir: str = None) -> DatacastParser:
     """Returns a DatacastParser instance based on the supplied factory name"""
+    if factory not in message_parsers:
+        raise MessageParserNotDefinedError
+    parser_path = message_parsers.object_path(factory)
+    parser_class = message_parsers.load(factory)
+
     message_parser: DatacastParser = None
-    if factory in SBEParser.supported_factory_types():
+    if parser_path == SBE_PARSER:
+        get_message_factory = load_object('transcoder.message.factory.MessageFactory:get_message_factory')
         message_factory = get_message_factory(factory, schema_file_path)
-        message_parser = SBEParser(message_factory,
-                                   message_type_inclusions=message_type_inclusions,
-                                   message_type_exclusions=message_type_exclusions,
-                                   stats_only=stats_only)
-    elif factory in FixParser.supported_factory_types():
-        message_parser = FixParser(schema_file_path=schema_file_path,
-                                   message_type_inclusions=message_type_inclusions,
-                                   message_type_exclusions=message_type_exclusions,
-                                   fix_header_tags=fix_header_tags, fix_separator=fix_separator,
-                                   stats_only=stats_only)
-    else:
-        raise MessageParserNotDefinedError
+        message_parser = parser_class(message_factory,
+                                      message_type_inclusions=message_type_inclusions,
+                                      message_type_exclusions=message_type_exclusions,
+                                      stats_only=stats_only)
+    elif parser_path == FIX_PARSER:
+        message_parser = parser_class(schema_file_path=schema_file_path,
+                                      message_type_inclusions=message_type_inclusions,
+                                      message_type_exclusions=message_type_exclusions,
+                                      fix_header_tags=fix_header_tags, fix_separator=fix_separator,
+                                      stats_only=stats_only, schema_cache_dir=schema_cache_dir)
+    else:  # plugin parsers are constructed with the options common to all parsers
+        message_parser = parser_class(schema_file_path=schema_file_path,
+                                      message_type_inclusions=message_type_inclusions,
+                                      message_type_exclusions=message_type_exclusions,
+                                      stats_only=stats_only)
 
     return message_parser
 
@@ -53,21 +76,22 @@ def parse_handler_config(handler_config_string: str) -> dict:
     Extracts the configuration parameters attached to the CLI handler option,
     in the format:
 
-    FirstHandler:<param>=<value>,SecondHandler:<param>=<value>
+    FirstHandler:<param>=<value>,SecondHandler:<param>=<value>:<param>=<value>
 
     For example:
 
     --message_handlers SequencerHandler,FilterHandler:field=value
 
     would run a SequencerHandler without a config, then pass a single-element dict of field: value to FilterHandler via the config object.
+    Multiple parameters are separated by colons, e.g. BookBuilderHandler:depth=5:interval=10.
 
     This routine manufactures the configuration for the Handler from the CLI string
 
     """
     if handler_config_string.find(':') != -1:
         config = {}
-        params = handler_config_string.split(':')[1]
-        keyval = params.split('=')
-        config[keyval[0]] = keyval[1]
+        for params in handler_config_string.split(':')[1:]:
+            keyval = params.split('=', 1)
+            config[keyval[0]] = keyval[1]
         return config
     return None
@@ -17,10 +17,13 @@
 # limitations under the License.
 #
 
+from transcoder.PluginRegistry import PluginCapabilities
 from .DatacastParser import DatacastParser
 
 class NoParser(DatacastParser):
     """ NOOP parser that simply maintains a record count. Intended to be used with the frame-only option. """
+
+    capabilities = PluginCapabilities(supports_zero_copy=True)
     # pylint: disable=super-init-not-called
 
     def __init__(self):
@@ -31,6 +31,13 @@ class ParsedMessage:
         self.dictionary = dictionary
         self.exception = exception
         self.ignored: bool = False
+        self.manufactured_messages: list = None
+
+    def append_manufactured_message(self, message):
+        """Attaches a message created by a handler while processing this message, to be output after it"""
+        if self.manufactured_messages is None:
+            self.manufactured_messages = []
+        self.manufactured_messages.append(message)
 
     def is_empty(self):
         """Is this parsed message empty?"""
@@ -19,3 +19,4 @@
 
 from .MessageParserNotDefinedError import MessageParserNotDefinedError
 from .ParserFunctionNotDefinedError import ParserFunctionNotDefinedError
+from .MessageHandlerNotDefinedError import MessageHandlerNotDefinedError
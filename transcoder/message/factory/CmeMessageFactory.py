@@ -26,8 +26,13 @@ from transcoder.message.factory.exception import TemplateSchemaNotDefinedError
 class CmeMessageFactory(SBEMessageFactory):  # pylint: disable=too-few-public-methods,duplicate-code
     """CME-specific logic to unpack message from buffer & decode according to message template"""
 
+    @staticmethod
+    def read_template_id(msg_buffer) -> int:
+        """Returns the template id of a raw message from its SBE message header"""
+        return unpack_from('<H', msg_buffer, 2)[0]
+
     def build(self, msg_buffer, offset):
-        template_id = unpack_from('<H', msg_buffer, 2)[0]
+        template_id = self.read_template_id(msg_buffer)
 
         message_type = self.schema.get_message_type(template_id)
 
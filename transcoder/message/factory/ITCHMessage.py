@@ -0,0 +1,69 @@
+#
+# Copyright 2023 Google LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+# pylint: disable=invalid-name
+
+from transcoder.message.factory.ITCHMessageLayout import ITCHMessageLayout
+
+
+class ITCHMessage:
+    """Lightweight handle to an ITCH message buffer with a precompiled layout. The SBE message fields are only
+    wrapped if they are accessed directly"""
+
+    __slots__ = ('message_type', 'layout', 'msg_buffer', 'msg_offset', '_message')
+
+    def __init__(self, message_type, layout: ITCHMessageLayout, msg_buffer, msg_offset):
+        self.message_type = message_type
+        self.layout = layout
+        self.msg_buffer = msg_buffer
+        self.msg_offset = msg_offset
+        self._message = None
+
+    @property
+    def name(self):
+        """Name of the message type"""
+        return self.message_type.__name__
+
+    @property
+    def message_id(self):
+        """Template id of the message type"""
+        return self.message_type.message_id
+
+    def decode(self) -> dict:
+        """Decodes all message fields into a dictionary using the precompiled layout"""
+        return self.layout.decode(self.msg_buffer, self.msg_offset)
+
+    def _wrapped_message(self):
+        if self._message is None:
+            self._message = self.message_type()
+            self._message.wrap(self.msg_buffer, self.msg_offset)
+        return self._message
+
+    @property
+    def fields(self):
+        """Fields of the wrapped SBE message"""
+        return self._wrapped_message().fields
+
+    @property
+    def groups(self):
+        """Repeating groups of the wrapped SBE message"""
+        return self._wrapped_message().groups
+
+    def __str__(self):
+        return self.name
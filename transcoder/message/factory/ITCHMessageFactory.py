@@ -19,24 +19,46 @@
 
 # pylint: disable=invalid-name
 
-import struct
-
 from third_party.sbedecoder import SBEMessageFactory
+from transcoder.message.factory.ITCHMessage import ITCHMessage
+from transcoder.message.factory.ITCHMessageLayout import ITCHMessageLayout
 from transcoder.message.factory.exception import TemplateSchemaNotDefinedError
 
 
 class ITCHMessageFactory(SBEMessageFactory):  # pylint: disable=too-few-public-methods
     """ITCH-specific logic to unpack message from buffer & decode according to message template"""
 
+    def __init__(self, schema):
+        super().__init__(schema)
+        # ITCH message types are a single byte, so dispatch is a direct index on the first byte of the message
+        self.dispatch_table = [None] * 256
+        for template_id, message_type in schema.message_map.items():
+            if 0 <= template_id < 256:
+                layout = ITCHMessageLayout.compile(message_type, schema.byte_order)
+                self.dispatch_table[template_id] = (message_type, layout)
+
+    @staticmethod
+    def read_template_id(msg_buffer) -> int:
+        """Returns the template id of a raw message, its message type byte"""
+        return msg_buffer[0]
+
     def build(self, msg_buffer, offset):
-        message_type_str = struct.unpack_from('>c', msg_buffer, offset)[0]
-        template_id = ord(message_type_str)
-        message_type = self.schema.get_message_type(template_id)
+        template_id = msg_buffer[offset]
+        entry = self.dispatch_table[template_id]
 
-        if message_type is None:
+        if entry is None:
             raise TemplateSchemaNotDefinedError(f'Schema not found for template_id: {template_id} supporting '
-                                                f'message_type: {message_type_str.decode()}')
+                                                f'message_type: {chr(template_id)}')
+
+        message_type, layout = entry
+        if layout is not None:
+            return ITCHMessage(message_type, layout, msg_buffer, offset), len(msg_buffer)
 
         message = message_type()
         message.wrap(msg_buffer, offset)
         return message, len(msg_buffer)
+
+    def decode(self, message):
+        if isinstance(message, ITCHMessage):
+            return message.decode()
+        return None
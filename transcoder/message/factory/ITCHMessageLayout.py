@@ -0,0 +1,250 @@
+#
+# Copyright 2023 Google LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+# pylint: disable=invalid-name
+
+import struct
+
+from third_party.sbedecoder.message import TypeMessageField, EnumMessageField, SetMessageField, \
+    CompositeMessageField, get_bool_value, null_value
+from third_party.sbedecoder.typemap import TypeMap
+
+ENDIAN_PREFIXES = '<>!=@'
+
+
+def _string_value(raw):
+    if not raw.rstrip(b'\x00'):  # all bytes are zero
+        return None
+    return raw.split(b'\x00', 1)[0].decode('UTF-8').strip()
+
+
+def _string_value_not_null(raw):
+    return raw.split(b'\x00', 1)[0].decode('UTF-8').strip()
+
+
+def _char_value(raw):
+    if raw == b'\x00':
+        return None
+    return raw.decode('UTF-8')
+
+
+def _char_value_not_null(raw):
+    return raw.decode('UTF-8')
+
+
+class LayoutNotSupportedError(Exception):
+    """Raised when a message type cannot be represented as a fixed layout"""
+
+
+class ITCHMessageLayout:  # pylint: disable=too-few-public-methods
+    """Precomputed fixed layout of an ITCH message type. All fields of a message are unpacked with a single
+    struct call, and the resulting values are converted by a decoder function generated once per message type.
+    Produces the same dictionary as traversing the wrapped SBE message fields."""
+
+    @staticmethod
+    def compile(message_type, byte_order: str):
+        """Returns a layout for the message type, or None if the message type is not a fixed layout"""
+        try:
+            return ITCHMessageLayout(message_type, byte_order)
+        except LayoutNotSupportedError:
+            return None
+
+    def __init__(self, message_type, byte_order: str):
+        if len(message_type.groups) > 0:
+            raise LayoutNotSupportedError(f'{message_type.__name__} contains repeating groups')
+
+        # The header fields carry the endian prefix the schema was parsed with
+        endian = message_type.fields[0].unpack_fmt[0] if len(message_type.fields) > 0 else ''
+        if endian not in ('<', '>'):
+            raise LayoutNotSupportedError(f'{message_type.__name__} does not define an endian')
+
+        self.name = message_type.__name__
+        self.endian = endian
+        self.byte_order = byte_order
+        self.struct_fmt = endian
+        self.struct_offset = None
+        self.struct_end = 0
+        self.value_count = 0
+        self.namespace = {'get_bool_value': get_bool_value, 'string_value': _string_value,
+                          'string_value_not_null': _string_value_not_null, 'char_value': _char_value,
+                          'char_value_not_null': _char_value_not_null}
+
+        entries = []
+        for field in message_type.fields:
+            if field.id is None:  # header fields are not part of the output
+                continue
+            if field.since_version > 0:
+                raise LayoutNotSupportedError(f'{self.name}.{field.name} is versioned')
+            entries.append((field.name, self._compile_field(field)))
+
+        source = ['def decode(buffer, offset, unpack_from=unpack_from):',
+                  f'    values = unpack_from(buffer, offset + {self.struct_offset or 0})' if self.value_count
+                  else '    values = ()',
+                  '    return {']
+        for name, expression in entries:
+            source.append(f'        {name!r}: {expression},')
+        source.append('    }')
+
+        self.struct = struct.Struct(self.struct_fmt)
+        self.namespace['unpack_from'] = self.struct.unpack_from
+        exec('\n'.join(source), self.namespace)  # pylint: disable=exec-used
+        self.decode = self.namespace['decode']
+
+    def _add_constant(self, value):
+        name = f'c{len(self.namespace)}'
+        self.namespace[name] = value
+        return name
+
+    def _add_values(self, field_offset: int, fmt: str) -> int:
+        """Appends the struct format for a field at its offset, returning the index of its first unpacked value"""
+        if fmt[0] in ENDIAN_PREFIXES:
+            fmt = fmt[1:]
+        if self.struct_offset is None:
+            self.struct_offset = field_offset
+            self.struct_end = field_offset
+        if field_offset < self.struct_end:
+            raise LayoutNotSupportedError(f'{self.name} contains overlapping fields')
+
+        padding = field_offset - self.struct_end
+        if padding > 0:
+            self.struct_fmt += f'{padding}x'
+
+        size = struct.calcsize(self.endian + fmt)
+        value_index = self.value_count
+        self.value_count += len(struct.unpack(self.endian + fmt, bytes(size)))
+        self.struct_fmt += fmt
+        self.struct_end = field_offset + size
+        return value_index
+
+    def _compile_field(self, field) -> str:
+        if isinstance(field, TypeMessageField):
+            return self._compile_type_field(field, field.field_offset)
+        if isinstance(field, EnumMessageField):
+            return self._compile_enum_field(field)
+        if isinstance(field, SetMessageField):
+            return self._compile_set_field(field)
+        if isinstance(field, CompositeMessageField):
+            parts = [f'{part.name!r}: {self._compile_type_field(part, part.field_offset)}' for part in field.parts]
+            return '{' + ', '.join(parts) + '}'
+        raise LayoutNotSupportedError(f'{self.name}.{field.name} has unsupported type {type(field).__name__}')
+
+    def _compile_type_field(self, field, field_offset: int) -> str:
+        if field.constant is not None:
+            return self._compile_constant_field(field)
+
+        if field.is_string_type is True:
+            index = self._add_values(field_offset, f'{field.field_length}s')
+            function = 'string_value_not_null' if field.null_value else 'string_value'
+            return f'{function}(values[{index}])'
+
+        if field.primitive_type == 'char':
+            index = self._add_values(field_offset, field.unpack_fmt)
+            function = 'char_value_not_null' if field.null_value else 'char_value'
+            return f'{function}(values[{index}])'
+
+        primitive_type_size = TypeMap.primitive_type_map.get(field.primitive_type, (None, None))[1]
+        is_variable_length_int = field.is_int_type() and primitive_type_size != field.field_length
+        if is_variable_length_int is True:
+            index, value = self._compile_variable_length_int(field, field_offset)
+        else:
+            index = self._add_values(field_offset, field.unpack_fmt)
+            value = f'values[{index}]'
+
+        null_values = set()
+        if field.primitive_type in null_value:
+            null_values.add(int(null_value[field.primitive_type]))
+        if field.null_value:
+            null_values.add(field.null_value)
+        if is_variable_length_int is True:
+            null_values = {x for x in null_values if x < 1 << (8 * field.field_length)}
+
+        if field.is_bool_type:
+            value = f'get_bool_value({value})'
+        if len(null_values) == 0:
+            return value
+
+        return f'(None if values[{index}] in {self._add_constant(frozenset(null_values))} else {value})' \
+            if is_variable_length_int is False else \
+            f'(None if {value} in {self._add_constant(frozenset(null_values))} else {value})'
+
+    def _compile_constant_field(self, field) -> str:
+        try:
+            value = field.value
+        except Exception as ex:  # pylint: disable=broad-except
+            raise LayoutNotSupportedError(f'{self.name}.{field.name} constant cannot be decoded') from ex
+        if field.is_string_type is True and value is not None:
+            value = value.strip()
+        return self._add_constant(value)
+
+    def _compile_variable_length_int(self, field, field_offset: int) -> (int, str):
+        """Returns the index of the first unpacked value of an integer whose length is not a primitive type size,
+        and the expression recombining it"""
+        if self.byte_order is None:
+            raise LayoutNotSupportedError(f'{self.name}.{field.name} requires a schema byte order')
+        if field.field_length == 6:
+            # 48-bit integers are unpacked as a 16 and 32-bit pair and recombined
+            index = self._add_values(field_offset, 'HI' if self.byte_order == 'big' else 'IH')
+            if self.byte_order == 'big':
+                return index, f'((values[{index}] << 32) | values[{index + 1}])'
+            return index, f'(values[{index}] | (values[{index + 1}] << 32))'
+        index = self._add_values(field_offset, f'{field.field_length}s')
+        self.namespace['int_from_bytes'] = int.from_bytes
+        return index, f'int_from_bytes(values[{index}], {self.byte_order!r})'
+
+    def _compile_enum_field(self, field) -> str:
+        index = self._add_values(field.field_offset, field.unpack_fmt)
+        cache = {}
+        null_raw = int(null_value[field.primitive_type]) if field.primitive_type in null_value else None
+
+        def enum_value(raw):
+            try:
+                return cache[raw]
+            except KeyError:
+                pass
+            _raw_value = raw.decode('UTF-8') if isinstance(raw, bytes) else raw
+            if null_raw is not None and _raw_value == null_raw:
+                value = None
+            else:
+                value = field.text_to_enum_description.get(str(_raw_value), None)
+                if field.enum_fallback_to_name is True and value is None or value == '':
+                    value = field.text_to_enumerant.get(str(_raw_value), None)
+                if field.is_bool_type:
+                    value = get_bool_value(value)
+            cache[raw] = value
+            return value
+
+        return f'{self._add_constant(enum_value)}(values[{index}])'
+
+    def _compile_set_field(self, field) -> str:
+        index = self._add_values(field.field_offset, field.unpack_fmt)
+        cache = {}
+
+        def set_value(raw):
+            try:
+                return cache[raw]
+            except KeyError:
+                pass
+            value = None
+            if raw != 0:
+                names = [field.text_to_name[i] for i in range(field.field_length * 8) if 1 & (raw >> i)]
+                value = ', '.join(names)
+            cache[raw] = value
+            return value
+
+        return f'{self._add_constant(set_value)}(values[{index}])'
@@ -21,6 +21,12 @@ from third_party.sbedecoder import SBESchema, SBEMessageFactory
 from transcoder.message.factory import ITCHMessageFactory, CmeMessageFactory, MemxMessageFactory
 from transcoder.message.factory.exception.FactoryNotFoundError import FactoryNotFoundError
 
+TEMPLATE_ID_READERS = {
+    'itch': ITCHMessageFactory.read_template_id,
+    'cme': CmeMessageFactory.read_template_id,
+    'memx': MemxMessageFactory.read_template_id
+}
+
 
 def get_message_factory(name: str, schema_file_path: str) -> SBEMessageFactory:
     """Gets a user-specified factory with the parsed schema"""
@@ -38,3 +44,9 @@ def get_message_factory(name: str, schema_file_path: str) -> SBEMessageFactory:
         raise FactoryNotFoundError(f'Factory with name "{name}" is not valid')
 
     return factory
+
+
+def get_template_id_reader(name: str):
+    """Returns a function reading the template id of a raw message of a factory without parsing the schema, or None
+    for factories without binary templates"""
+    return TEMPLATE_ID_READERS.get(name, None)
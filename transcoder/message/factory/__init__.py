@@ -19,14 +19,25 @@
 
 # pylint: disable=invalid-name
 
-from third_party.pyfixmsg.parser import FixParser
-from third_party.sbedecoder import SBEParser
-from .ITCHMessageFactory import ITCHMessageFactory
-from .CmeMessageFactory import CmeMessageFactory
-from .MDPMessageFactory import MDPMessageFactory
-from .MemxMessageFactory import MemxMessageFactory
+from typing import TYPE_CHECKING
+
+from transcoder.LazyImportUtil import lazy_exports
+from transcoder.message.MessageUtil import message_parsers
+
+if TYPE_CHECKING:
+    from .ITCHMessageFactory import ITCHMessageFactory
+    from .CmeMessageFactory import CmeMessageFactory
+    from .MDPMessageFactory import MDPMessageFactory
+    from .MemxMessageFactory import MemxMessageFactory
+
+__getattr__, __dir__ = lazy_exports(__name__, [
+    'ITCHMessageFactory',
+    'CmeMessageFactory',
+    'MDPMessageFactory',
+    'MemxMessageFactory'
+])
 
 
 def all_supported_factory_types():
     """Returns the names of all available factories"""
-    return SBEParser.supported_factory_types() + FixParser.supported_factory_types()
+    return message_parsers.names()
@@ -0,0 +1,204 @@
+#
+# Copyright 2023 Google LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+from transcoder.message.DatacastField import DatacastField
+from transcoder.message.DatacastSchema import DatacastSchema
+from transcoder.message.ParsedMessage import ParsedMessage
+from transcoder.message.handler.HandlerUtil import cme_price
+from transcoder.message.handler.MessageHandler import MessageHandler
+from transcoder.message.handler.MessageHandlerDoubleField import MessageHandlerDoubleField
+from transcoder.message.handler.MessageHandlerLongField import MessageHandlerLongField
+from transcoder.message.handler.MessageHandlerStringField import MessageHandlerStringField
+
+# Accumulator array slots
+OPEN, HIGH, LOW, CLOSE, VOLUME, NOTIONAL, TRADE_COUNT, MIDPOINT, MIDPOINT_SUM, QUOTE_COUNT = range(10)
+EMPTY_ACCUMULATOR = (None, None, None, None, 0, 0.0, 0, None, 0.0, 0)
+
+
+class BarAggregationHandler(MessageHandler):  # pylint: disable=too-many-instance-attributes
+    """Aggregates trades and quotes per key into time bucketed bars of OHLCV, VWAP and midpoint, emitted as a
+    manufactured message type once the stream moves past each window. Timestamps are expected to be numeric and
+    non-decreasing, messages timestamped before the current window are added to it. Supported configuration
+    parameters:
+
+    window: length of a bar in timestamp units, defaults to 60000000000 (one minute of nanoseconds)
+    timestamp_field: message field holding the timestamp, defaults to timestamp
+    key_field: field identifying the instrument, defaults to stock_locate
+    message_names: '|' delimited names of the messages to aggregate, defaults to trade|cross_trade
+    group: name of a repeating group whose entries hold the key, price and size, e.g. no_md_entries
+    price_field, size_field: trade price and size fields, default to price and shares
+    bid_field, ask_field: quote fields used for the midpoint, if any
+    snapshot_name: name of the book snapshots manufactured by a BookBuilderHandler listed ahead of this handler,
+        defaults to book_snapshot. Midpoints are taken from the top of book of each snapshot, keyed by its
+        instrument_id, and only once both sides of the book are quoted
+    raw_output: whether source messages and the book snapshots are output alongside the bars, defaults to true
+    message_name: name of the bar message type, defaults to bar
+    """
+
+    def __init__(self, config=None):
+        super().__init__(config)
+        config = config if config is not None else {}
+        self.window = int(config.get('window', 60_000_000_000))
+        self.timestamp_field = config.get('timestamp_field', 'timestamp')
+        self.key_field = config.get('key_field', 'stock_locate')
+        self.message_names = set(config.get('message_names', 'trade|cross_trade').split('|'))
+        self.group = config.get('group', None)
+        self.price_field = config.get('price_field', 'price')
+        self.size_field = config.get('size_field', 'shares')
+        self.bid_field = config.get('bid_field', None)
+        self.ask_field = config.get('ask_field', None)
+        self.snapshot_name = config.get('snapshot_name', 'book_snapshot')
+        self.raw_output = str(config.get('raw_output', 'true')).lower() == 'true'
+        self.message_name = config.get('message_name', 'bar')
+
+        self.key_schema_field: DatacastField = None
+        self.bar_start = None
+        self.accumulators = {}
+        self.active_keys = []
+
+    @property
+    def emits_source_messages(self):
+        return self.raw_output
+
+    def append_manufactured_fields(self, schema: DatacastSchema):
+        # Bars are keyed by the same field type the source messages use
+        if self.key_schema_field is None and schema.name in self.message_names:
+            fields = schema.fields
+            if self.group is not None:
+                fields = next((x.fields for x in fields if x.name == self.group and hasattr(x, 'fields')), [])
+            self.key_schema_field = next((x for x in fields if x.name == self.key_field), None)
+
+    def manufactured_schemas(self) -> [DatacastSchema]:
+        key_schema_field = self.key_schema_field if self.key_schema_field is not None \
+            else MessageHandlerStringField(self.key_field)
+        fields = [key_schema_field, MessageHandlerLongField('bar_start'), MessageHandlerLongField('bar_end')]
+        fields.extend(MessageHandlerDoubleField(x) for x in ['open', 'high', 'low', 'close'])
+        fields.extend([MessageHandlerLongField('volume'), MessageHandlerDoubleField('vwap'),
+                       MessageHandlerLongField('trade_count'), MessageHandlerDoubleField('midpoint'),
+                       MessageHandlerDoubleField('midpoint_mean'), MessageHandlerLongField('quote_count')])
+        return [DatacastSchema(self.message_name, self.message_name, fields)]
+
+    def handle(self, message: ParsedMessage):
+        if self.raw_output is False:
+            message.ignored = True
+        snapshots = self.book_snapshots(message)
+        aggregated = message.name in self.message_names
+        if aggregated is False and not snapshots:
+            return
+
+        fields = message.dictionary
+        timestamp = fields[self.timestamp_field] if aggregated is True else snapshots[0].dictionary['timestamp']
+        if self.bar_start is None or timestamp >= self.bar_start + self.window:
+            for bar_message in self.close_bars():
+                message.append_manufactured_message(bar_message)
+            self.bar_start = timestamp - timestamp % self.window
+
+        if aggregated is True:
+            if self.group is None:
+                self.accumulate(fields)
+            else:
+                for entry in fields.get(self.group, None) or ():
+                    self.accumulate(entry)
+        for snapshot in snapshots:
+            fields = snapshot.dictionary
+            self.add_quote(fields.get('instrument_id', None), fields.get('bid_price_1', None),
+                           fields.get('ask_price_1', None))
+
+    def flush(self) -> [ParsedMessage]:
+        return self.close_bars()
+
+    def book_snapshots(self, message: ParsedMessage) -> [ParsedMessage]:
+        """Returns the book snapshots manufactured for the message by handlers ahead of this one. Without raw
+        output the snapshots are consumed, and removed from the manufactured messages"""
+        manufactured_messages = message.manufactured_messages
+        if not manufactured_messages:
+            return []
+        snapshots = [x for x in manufactured_messages if x.name == self.snapshot_name]
+        if snapshots and self.raw_output is False:
+            message.manufactured_messages = [x for x in manufactured_messages if x.name != self.snapshot_name]
+        return snapshots
+
+    def accumulate(self, fields: dict):
+        """Adds the trade and quote values of a message or group entry to the accumulator of its key"""
+        key = fields.get(self.key_field, None)
+        self.add_trade(key, cme_price(fields.get(self.price_field, None)), fields.get(self.size_field, None))
+        if self.bid_field is not None and self.ask_field is not None:
+            self.add_quote(key, cme_price(fields.get(self.bid_field, None)),
+                           cme_price(fields.get(self.ask_field, None)))
+
+    def accumulator(self, key) -> list:
+        """Returns the accumulator of the key, marking the key as active in the current window"""
+        accumulator = self.accumulators.get(key, None)
+        if accumulator is None:
+            accumulator = self.accumulators[key] = list(EMPTY_ACCUMULATOR)
+        if accumulator[TRADE_COUNT] == 0 and accumulator[QUOTE_COUNT] == 0:
+            self.active_keys.append(key)
+        return accumulator
+
+    def add_trade(self, key, price, size):
+        """Adds a trade to the open, high, low, close, volume and VWAP of the key"""
+        if price is None or size is None:
+            return
+        accumulator = self.accumulator(key)
+        if accumulator[TRADE_COUNT] == 0:
+            accumulator[OPEN] = accumulator[HIGH] = accumulator[LOW] = price
+        elif price > accumulator[HIGH]:
+            accumulator[HIGH] = price
+        elif price < accumulator[LOW]:
+            accumulator[LOW] = price
+        accumulator[CLOSE] = price
+        accumulator[VOLUME] += size
+        accumulator[NOTIONAL] += price * size
+        accumulator[TRADE_COUNT] += 1
+
+    def add_quote(self, key, bid, ask):
+        """Adds the midpoint of a two-sided quote to the key, quotes missing either side are skipped"""
+        if bid is None or ask is None:
+            return
+        accumulator = self.accumulator(key)
+        midpoint = (bid + ask) / 2
+        accumulator[MIDPOINT] = midpoint
+        accumulator[MIDPOINT_SUM] += midpoint
+        accumulator[QUOTE_COUNT] += 1
+
+    def close_bars(self) -> [ParsedMessage]:
+        """Returns the bars of the current window for keys that saw trades or quotes, and resets their accumulators"""
+        bars = []
+        bar_end = self.bar_start + self.window if self.bar_start is not None else None
+        for key in self.active_keys:
+            accumulator = self.accumulators[key]
+            volume, trade_count, quote_count = accumulator[VOLUME], accumulator[TRADE_COUNT], accumulator[QUOTE_COUNT]
+            bars.append(ParsedMessage(self.message_name, self.message_name, None, dictionary={
+                self.key_field: key if self.key_schema_field is not None else str(key),
+                'bar_start': self.bar_start,
+                'bar_end': bar_end,
+                'open': accumulator[OPEN],
+                'high': accumulator[HIGH],
+                'low': accumulator[LOW],
+                'close': accumulator[CLOSE],
+                'volume': volume,
+                'vwap': accumulator[NOTIONAL] / volume if volume else None,
+                'trade_count': trade_count,
+                'midpoint': accumulator[MIDPOINT],
+                'midpoint_mean': accumulator[MIDPOINT_SUM] / quote_count if quote_count else None,
+                'quote_count': quote_count
+            }))
+            accumulator[:] = EMPTY_ACCUMULATOR
+        self.active_keys.clear()
+        return bars
@@ -0,0 +1,281 @@
+#
+# Copyright 2023 Google LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+from transcoder.message.DatacastSchema import DatacastSchema
+from transcoder.message.ParsedMessage import ParsedMessage
+from transcoder.message.handler.HandlerUtil import cme_price
+from transcoder.message.handler.MessageHandler import MessageHandler
+from transcoder.message.handler.MessageHandlerDoubleField import MessageHandlerDoubleField
+from transcoder.message.handler.MessageHandlerIntField import MessageHandlerIntField
+from transcoder.message.handler.MessageHandlerLongField import MessageHandlerLongField
+from transcoder.message.handler.MessageHandlerStringField import MessageHandlerStringField
+from transcoder.message.handler.book import Book, OrderBook, PriceLevelBook
+
+CME_BOOK_MESSAGE_PREFIX = 'MDIncrementalRefreshBook'
+CME_ORDER_BOOK_MESSAGE_PREFIX = 'MDIncrementalRefreshOrderBook'
+
+
+class BookBuilderHandler(MessageHandler):
+    """Maintains per instrument books from ITCH order messages, CME MDP 3.0 market by price (MDIncrementalRefreshBook)
+    and market by order (MDIncrementalRefreshOrderBook) messages, and emits book snapshots as a manufactured message
+    type. Supported configuration parameters:
+
+    depth: number of levels per side in each snapshot, defaults to 1 (top of book)
+    interval: number of updates to an instrument's book between snapshots, defaults to 1 (every update)
+    changes_only: only emit a snapshot if its levels differ from the previous one, defaults to true
+    max_depth: depth of CME market by price books, defaults to 10
+    message_name: name of the snapshot message type, defaults to book_snapshot
+    """
+
+    def __init__(self, config=None):
+        super().__init__(config)
+        config = config if config is not None else {}
+        self.depth = int(config.get('depth', 1))
+        self.interval = int(config.get('interval', 1))
+        self.changes_only = str(config.get('changes_only', 'true')).lower() == 'true'
+        self.max_depth = int(config.get('max_depth', 10))
+        self.message_name = config.get('message_name', 'book_snapshot')
+
+        self.order_books = {}
+        self.price_level_books = {}
+        self.orders = {}
+        self.enum_keys = {}
+
+        self.level_field_names = tuple(
+            tuple((f'{side}_price_{level}', f'{side}_size_{level}', f'{side}_orders_{level}')
+                  for level in range(1, self.depth + 1))
+            for side in ('bid', 'ask'))
+
+        self.processors = {
+            'add_order_no_attribution': self.process_itch_add_order,
+            'add_order_attribution': self.process_itch_add_order,
+            'order_executed': self.process_itch_order_executed,
+            'order_executed_price': self.process_itch_order_executed,
+            'order_cancelled': self.process_itch_order_cancelled,
+            'order_deleted': self.process_itch_order_deleted,
+            'order_replaced': self.process_itch_order_replaced
+        }
+
+    def manufactured_schemas(self) -> [DatacastSchema]:
+        fields = [MessageHandlerLongField('instrument_id'), MessageHandlerStringField('symbol'),
+                  MessageHandlerLongField('timestamp'), MessageHandlerLongField('update_count')]
+        for side_field_names in self.level_field_names:
+            for price_name, size_name, orders_name in side_field_names:
+                fields.extend([MessageHandlerDoubleField(price_name), MessageHandlerLongField(size_name),
+                               MessageHandlerIntField(orders_name)])
+        return [DatacastSchema(self.message_name, self.message_name, fields)]
+
+    def handle(self, message: ParsedMessage):
+        name = message.name
+        if name in self.processors:
+            processor = self.processors[name]
+        else:
+            processor = self.processors[name] = self._resolve_processor(name)
+        if processor is not None:
+            processor(message)
+
+    def _resolve_processor(self, message_name: str):
+        # CME template names carry the template id, e.g. MDIncrementalRefreshBook46
+        if message_name.startswith(CME_ORDER_BOOK_MESSAGE_PREFIX):
+            return self.process_cme_order_book
+        if message_name.startswith(CME_BOOK_MESSAGE_PREFIX):
+            return self.process_cme_book
+        return None
+
+    def flush(self) -> [ParsedMessage]:
+        messages = []
+        for book in list(self.order_books.values()) + list(self.price_level_books.values()):
+            if book.update_count % self.interval != 0:
+                snapshot = self.create_snapshot(book, book.last_timestamp)
+                if snapshot is not None:
+                    messages.append(snapshot)
+        return messages
+
+    def book_updated(self, message: ParsedMessage, book: Book, timestamp, visible: bool = True):
+        """Counts an update to the book, attaching a snapshot to the message at each interval. Updates that are not
+        visible, as they only touch levels beyond the snapshot depth, do not require a new snapshot"""
+        book.update_count += 1
+        book.last_timestamp = timestamp
+        if visible is True:
+            book.snapshot_stale = True
+        if book.update_count % self.interval == 0:
+            snapshot = self.create_snapshot(book, timestamp)
+            if snapshot is not None:
+                message.append_manufactured_message(snapshot)
+
+    def create_snapshot(self, book: Book, timestamp):
+        """Returns a snapshot message of the book, or None if unchanged since the last snapshot and changes_only is
+        set"""
+        if self.changes_only is True and book.snapshot_stale is False:
+            return None
+        book.snapshot_stale = False
+        levels = book.snapshot(self.depth)
+        if self.changes_only is True and levels == book.last_snapshot:
+            return None
+        book.last_snapshot = levels
+
+        dictionary = {'instrument_id': book.instrument_id, 'symbol': book.symbol, 'timestamp': timestamp,
+                      'update_count': book.update_count}
+        for side_levels, side_field_names in zip(levels, self.level_field_names):
+            for level, field_names in zip(side_levels, side_field_names):
+                dictionary.update(zip(field_names, level))
+        return ParsedMessage(self.message_name, self.message_name, None, dictionary=dictionary)
+
+    def enum_key(self, value) -> str:
+        """Normalizes an enum description or name, e.g. 'DeleteThru' or 'delete_thru' to 'deletethru'"""
+        key = self.enum_keys.get(value, None)
+        if key is None:
+            key = self.enum_keys[value] = str(value).replace('_', '').replace(' ', '').lower()
+        return key
+
+    @staticmethod
+    def is_bid(side) -> bool:
+        """Returns whether an ITCH buy/sell indicator or CME entry type is the bid side"""
+        return side is not None and side[:1] in ('B', 'b')
+
+    def order_book(self, instrument_id, symbol: str = None) -> OrderBook:
+        """Returns the order aggregated book of an instrument, creating it if needed"""
+        book = self.order_books.get(instrument_id, None)
+        if book is None:
+            book = self.order_books[instrument_id] = OrderBook(instrument_id, symbol)
+        elif symbol is not None and book.symbol is None:
+            book.symbol = symbol
+        return book
+
+    def add_order(self, order_id, book: OrderBook, is_bid: bool, price, size: int) -> int:
+        """Adds an order to the order map and its book. Returns the rank of the order's price level"""
+        self.orders[order_id] = (book, is_bid, price, size)
+        return book.add(is_bid, price, size)
+
+    def reduce_order(self, order_id, size: int = None):
+        """Reduces the size of an order, or removes it if size is None or covers the remaining size. Returns a tuple
+        of the order's book and the rank of its price level, or None if the order is unknown, such as orders entered
+        before the start of the source"""
+        order = self.orders.get(order_id, None)
+        if order is None:
+            return None
+        book, is_bid, price, remaining = order
+        if size is None or size >= remaining:
+            del self.orders[order_id]
+            return book, book.reduce(is_bid, price, remaining, True)
+        self.orders[order_id] = (book, is_bid, price, remaining - size)
+        return book, book.reduce(is_bid, price, size, False)
+
+    def process_itch_add_order(self, message: ParsedMessage):
+        """Adds an ITCH order to the book of its stock locate"""
+        fields = message.dictionary
+        book = self.order_book(fields['stock_locate'], fields.get('stock', None))
+        rank = self.add_order(fields['order_reference_number'], book, self.is_bid(fields['buy_sell_indicator']),
+                              fields['price'], fields['shares'])
+        self.book_updated(message, book, fields['timestamp'], rank < self.depth)
+
+    def process_itch_order_executed(self, message: ParsedMessage):
+        """Reduces an ITCH order by its executed shares"""
+        fields = message.dictionary
+        reduced = self.reduce_order(fields['order_reference_number'], fields['executed_shares'])
+        if reduced is not None:
+            self.book_updated(message, reduced[0], fields['timestamp'], reduced[1] < self.depth)
+
+    def process_itch_order_cancelled(self, message: ParsedMessage):
+        """Reduces an ITCH order by its cancelled shares"""
+        fields = message.dictionary
+        reduced = self.reduce_order(fields['order_reference_number'], fields['cancelled_shares'])
+        if reduced is not None:
+            self.book_updated(message, reduced[0], fields['timestamp'], reduced[1] < self.depth)
+
+    def process_itch_order_deleted(self, message: ParsedMessage):
+        """Removes an ITCH order"""
+        fields = message.dictionary
+        reduced = self.reduce_order(fields['order_reference_number'])
+        if reduced is not None:
+            self.book_updated(message, reduced[0], fields['timestamp'], reduced[1] < self.depth)
+
+    def process_itch_order_replaced(self, message: ParsedMessage):
+        """Replaces an ITCH order with a new order on the same side"""
+        fields = message.dictionary
+        order = self.orders.get(fields['original_order_reference_number'], None)
+        if order is None:
+            return
+        book, is_bid = order[0], order[1]
+        _, rank = self.reduce_order(fields['original_order_reference_number'])
+        new_rank = self.add_order(fields['new_order_reference_number'], book, is_bid, fields['price'],
+                                  fields['shares'])
+        self.book_updated(message, book, fields['timestamp'], min(rank, new_rank) < self.depth)
+
+    def process_cme_book(self, message: ParsedMessage):
+        """Applies the market by price entries of a CME MDIncrementalRefreshBook message to level addressed books"""
+        fields = message.dictionary
+        updated_books = {}
+        for entry in fields.get('no_md_entries', None) or ():
+            entry_type = self.enum_key(entry.get('md_entry_type', None))
+            instrument_id = entry.get('security_id', None)
+            book = self.price_level_books.get(instrument_id, None)
+            if book is None:
+                book = self.price_level_books[instrument_id] = PriceLevelBook(instrument_id, self.max_depth)
+
+            if entry_type == 'bookreset':
+                book.clear()
+            elif entry_type in ('bid', 'offer'):
+                is_bid = entry_type == 'bid'
+                action = self.enum_key(entry.get('md_update_action', None))
+                level = entry.get('md_price_level', None)
+                if action == 'new':
+                    book.new(is_bid, level, cme_price(entry.get('md_entry_px', None)),
+                             entry.get('md_entry_size', None), entry.get('number_of_orders', None))
+                elif action in ('change', 'overlay'):
+                    book.change(is_bid, level, cme_price(entry.get('md_entry_px', None)),
+                                entry.get('md_entry_size', None), entry.get('number_of_orders', None))
+                elif action == 'delete':
+                    book.delete(is_bid, level)
+                elif action == 'deletefrom':
+                    book.delete_from(is_bid, level)
+                elif action == 'deletethru':
+                    book.delete_thru(is_bid)
+                else:
+                    continue
+            else:  # implied and statistics entries do not affect the outright book
+                continue
+            updated_books[instrument_id] = book
+
+        for book in updated_books.values():
+            self.book_updated(message, book, fields.get('transact_time', None))
+
+    def process_cme_order_book(self, message: ParsedMessage):
+        """Applies the market by order entries of a CME MDIncrementalRefreshOrderBook message to order books"""
+        fields = message.dictionary
+        updated_books = {}
+        for entry in fields.get('no_md_entries', None) or ():
+            order_id = entry.get('order_id', None)
+            action = self.enum_key(entry.get('md_update_action', None))
+            if action in ('change', 'delete'):
+                reduced = self.reduce_order(order_id)
+                if reduced is not None:
+                    book, rank = reduced
+                    updated_books[book] = updated_books.get(book, False) or rank < self.depth
+            if action in ('new', 'change'):
+                entry_type = self.enum_key(entry.get('md_entry_type', None))
+                if entry_type not in ('bid', 'offer'):
+                    continue
+                book = self.order_book(entry.get('security_id', None))
+                rank = self.add_order(order_id, book, entry_type == 'bid',
+                                      cme_price(entry.get('md_entry_px', None)), entry.get('md_display_qty', None))
+                updated_books[book] = updated_books.get(book, False) or rank < self.depth
+
+        for book, visible in updated_books.items():
+            self.book_updated(message, book, fields.get('transact_time', None), visible)
@@ -0,0 +1,97 @@
+#
+# Copyright 2023 Google LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import time
+
+from transcoder.message.ParsedMessage import ParsedMessage
+from transcoder.message.handler.MessageHandler import MessageHandler
+
+
+class ConflationHandler(MessageHandler):
+    """Conflates messages to the latest message per message type and key, e.g. per security_id, and outputs the
+    conflated set once per interval. Messages without the key field, or not among message_names, are output as is.
+    Handlers after this one see conflated messages as ignored. Supported configuration parameters:
+
+    key_field: field to conflate on, defaults to stock_locate
+    clock: 'message' to measure intervals on a numeric message timestamp, or 'wall' for the system clock, as
+        suited to live sources. On the wall clock the transcoder also flushes on a timer, so the conflated messages
+        of an interval are output while the source is quiet. Defaults to message
+    interval: interval between flushes, in timestamp units for the message clock, defaulting to 1000000000 (one
+        second of nanoseconds), or in seconds for the wall clock, defaulting to 1
+    timestamp_field: message field holding the timestamp for the message clock, defaults to timestamp
+    message_names: '|' delimited names of the messages to conflate, defaults to all messages with the key field
+    """
+
+    def __init__(self, config=None):
+        super().__init__(config)
+        config = config if config is not None else {}
+        self.key_field = config.get('key_field', 'stock_locate')
+        self.wall_clock = config.get('clock', 'message') == 'wall'
+        self.interval = float(config.get('interval', 1)) if self.wall_clock \
+            else int(config.get('interval', 1_000_000_000))
+        self.timestamp_field = config.get('timestamp_field', 'timestamp')
+        message_names = config.get('message_names', None)
+        self.message_names = set(message_names.split('|')) if message_names is not None else None
+
+        self.latest = {}
+        self.next_flush = None
+        self.conflated_count = 0
+
+    def handle(self, message: ParsedMessage):
+        if self.wall_clock is True:
+            now = time.monotonic()
+        else:
+            now = message.dictionary.get(self.timestamp_field, None)
+
+        if now is not None:
+            for conflated in self.flush_due(now):
+                message.append_manufactured_message(conflated)
+
+        if self.message_names is not None and message.name not in self.message_names:
+            return
+        key = message.dictionary.get(self.key_field, None)
+        if key is None:
+            return
+        message.ignored = True
+        latest_key = (message.name, key)
+        if latest_key in self.latest:
+            self.conflated_count += 1
+        self.latest[latest_key] = message
+
+    def flush_due(self, now) -> [ParsedMessage]:
+        """Returns the conflated messages if the interval has ended by now, starting the next interval"""
+        if self.next_flush is None:
+            self.next_flush = now - now % self.interval + self.interval
+            return []
+        if now < self.next_flush:
+            return []
+        self.next_flush = now - now % self.interval + self.interval
+        return self.flush()
+
+    @property
+    def flush_interval(self):
+        return self.interval if self.wall_clock is True else None
+
+    def timed_flush(self) -> [ParsedMessage]:
+        return self.flush_due(time.monotonic())
+
+    def flush(self) -> [ParsedMessage]:
+        messages = list(self.latest.values())
+        self.latest.clear()
+        return messages
@@ -0,0 +1,29 @@
+#
+# Copyright 2023 Google LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+
+def cme_price(price):
+    """Returns the value of a CME price, which is decoded as a mantissa and exponent composite. Other prices are
+    returned unchanged"""
+    if isinstance(price, dict):
+        mantissa, exponent = price.get('mantissa', None), price.get('exponent', None)
+        if mantissa is None or exponent is None:
+            return mantissa
+        return mantissa / 10 ** -exponent if exponent < 0 else mantissa * 10 ** exponent
+    return price
@@ -17,12 +17,15 @@
 # limitations under the License.
 #
 
-from transcoder.message import ParsedMessage
+from transcoder.PluginRegistry import PluginCapabilities
+from transcoder.message import DatacastSchema, ParsedMessage
 
 
 class MessageHandler:
     """Base class for handlers of specific message types"""
 
+    capabilities = PluginCapabilities()
+
     def __init__(self, config=None):
         self.config = config
         self.all_value: str = '__ALL__'
@@ -37,10 +40,59 @@ class MessageHandler:
         """Returns handler's supported message types"""
         return []
 
+    @property
+    def emits_source_messages(self):
+        """Returns whether source messages are output, handlers that only output manufactured messages return False
+        so schemas are not created for the source message types"""
+        return True
+
     def append_manufactured_fields(self, schema):  # pylint: disable=unused-argument
         """Extend for handler-specific logic for appending manufactured field to message"""
         return None
 
+    def manufactured_schemas(self) -> [DatacastSchema]:
+        """Extend for handlers that create messages of their own types, returns the schemas of those types"""
+        return []
+
+    def flush(self) -> [ParsedMessage]:
+        """Called once the source is exhausted, returns manufactured messages the handler has yet to emit"""
+        return []
+
+    @property
+    def flush_interval(self):
+        """Returns the seconds between the wall clock times a handler has messages due, for handlers that output
+        messages on a timer whether or not source messages arrive. None if the handler has no timed messages"""
+        return None
+
+    def timed_flush(self) -> [ParsedMessage]:
+        """Called from a timer every fraction of flush_interval, returns the manufactured messages due by now"""
+        return []
+
+    def checkpoint_state(self):
+        """Extend for handlers that keep state across messages, returns JSON serializable state recorded in a
+        checkpoint. None if the handler has no state or it can not be restored"""
+        return None
+
+    def restore_state(self, state):  # pylint: disable=unused-argument
+        """Extend to restore the state returned by checkpoint_state when resuming from a checkpoint"""
+        return None
+
+    def set_shard(self, shard_index: int, shard_count: int):  # pylint: disable=unused-argument
+        """Called before schemas are processed when the source is one of shard_count byte ranges of a file. Extend for
+        handlers that add the shard to their output for downstream merges"""
+        return None
+
+    def set_merged_file(self, file_prefix: str):  # pylint: disable=unused-argument
+        """Called before schemas are processed when the outputs of the source file are merged with those of other
+        files, with the prefix its own outputs would have. Extend for handlers that add the file to their output"""
+        return None
+
     def handle(self, message: ParsedMessage):
         """Extend for handler-specific logic for message processing"""
         raise Exception  # pylint: disable=broad-exception-raised
+
+    def handle_batch(self, messages: [ParsedMessage]):
+        """Processes a list of messages in source order. Override for handlers that can process a batch more
+        efficiently than one message at a time"""
+        for message in messages:
+            self.handle(message)
@@ -18,8 +18,6 @@
 #
 
 
-from google.cloud import bigquery
-
 from transcoder.message.DatacastField import DatacastField
 
 
@@ -33,6 +31,7 @@ class MessageHandlerFloatField(DatacastField):
         return {'name': self.name, 'type': ['null', 'float']}
 
     def create_bigquery_field(self, part=None):
+        from google.cloud import bigquery  # pylint: disable=import-outside-toplevel
         return bigquery.SchemaField(self.name, 'FLOAT64', mode="NULLABLE")
 
     def create_json_field(self, part=None):  # pylint: disable=unused-argument
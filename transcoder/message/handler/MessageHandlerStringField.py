@@ -17,8 +17,6 @@
 # limitations under the License.
 #
 
-from google.cloud import bigquery
-
 from transcoder.message.DatacastField import DatacastField
 
 
@@ -32,6 +30,7 @@ class MessageHandlerStringField(DatacastField):
         return {'name': self.name, 'type': ['null', 'string']}
 
     def create_bigquery_field(self, part=None):
+        from google.cloud import bigquery  # pylint: disable=import-outside-toplevel
         return bigquery.SchemaField(self.name, 'STRING', mode="NULLABLE")
 
     def create_json_field(self, part=None):  # pylint: disable=unused-argument
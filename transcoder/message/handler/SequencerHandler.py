@@ -17,15 +17,19 @@
 # limitations under the License.
 #
 
+from transcoder.PluginRegistry import PluginCapabilities
 from transcoder.message import ParsedMessage, DatacastSchema
 from transcoder.message.handler.MessageHandler import MessageHandler
 from transcoder.message.handler.MessageHandlerIntField import MessageHandlerIntField
+from transcoder.message.handler.MessageHandlerStringField import MessageHandlerStringField
 
 
 class SequencerHandler(MessageHandler):
     """ Message handler to append a sequencer number to all messages transcoded from an arbitrary source.
     Particularly useful when transcoding messages encapsulated in POSIX files where the original sequence numbers were found within the pocket header and not the message itself """
 
+    capabilities = PluginCapabilities(supports_batching=True)
+
     def __init__(self, config=None):
         super().__init__(config=config)
         if config is not None:
@@ -35,12 +39,56 @@ class SequencerHandler(MessageHandler):
                 self.sequence_number_field_name = 'sequence_number'
         else:
             self.sequence_number_field_name = 'sequence_number'
+        self.shard_field_name = config.get('shard_field_name', 'shard_index') if config is not None else 'shard_index'
+        self.file_field_name = config.get('file_field_name', 'source_file') if config is not None else 'source_file'
         self.sequence_number = 0
+        # Sequence numbers restart from 1 in each shard of a source, which is added to messages so that shard and
+        # sequence number order messages across shards
+        self.shard_index = None
+        # Likewise when the outputs of several files are merged, the file is added as the prefix of its own outputs
+        self.merged_file = None
+
+    def set_shard(self, shard_index: int, shard_count: int):
+        self.shard_index = shard_index
+
+    def set_merged_file(self, file_prefix: str):
+        self.merged_file = file_prefix
 
     def append_manufactured_fields(self, schema: DatacastSchema):
         schema.fields.append(MessageHandlerIntField(self.sequence_number_field_name))
+        if self.shard_index is not None:
+            schema.fields.append(MessageHandlerIntField(self.shard_field_name))
+        if self.merged_file is not None:
+            schema.fields.append(MessageHandlerStringField(self.file_field_name))
+
+    def checkpoint_state(self):
+        return {'sequence_number': self.sequence_number}
+
+    def restore_state(self, state):
+        self.sequence_number = state['sequence_number']
 
     def handle(self, message: ParsedMessage):
         if message.ignored is False:
             self.sequence_number += 1
             message.dictionary[self.sequence_number_field_name] = self.sequence_number
+            if self.shard_index is not None:
+                message.dictionary[self.shard_field_name] = self.shard_index
+            if self.merged_file is not None:
+                message.dictionary[self.file_field_name] = self.merged_file
+
+    def handle_batch(self, messages: [ParsedMessage]):
+        field_name = self.sequence_number_field_name
+        shard_field_name, shard_index = self.shard_field_name, self.shard_index
+        file_field_name, merged_file = self.file_field_name, self.merged_file
+        sequence_number = self.sequence_number
+        try:
+            for message in messages:
+                if message.ignored is False:
+                    message.dictionary[field_name] = sequence_number + 1
+                    sequence_number += 1
+                    if shard_index is not None:
+                        message.dictionary[shard_field_name] = shard_index
+                    if merged_file is not None:
+                        message.dictionary[file_field_name] = merged_file
+        finally:
+            self.sequence_number = sequence_number
@@ -0,0 +1,150 @@
+#
+# Copyright 2023 Google LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+from transcoder.message.DatacastSchema import DatacastSchema
+from transcoder.message.ParsedMessage import ParsedMessage
+from transcoder.message.handler.MessageHandler import MessageHandler
+from transcoder.message.handler.MessageHandlerStringField import MessageHandlerStringField
+
+# Identifiers below this bound, such as every ITCH stock_locate, are looked up by index
+SYMBOL_ARRAY_SIZE = 1 << 16
+
+DIRECTORY_MESSAGE_FIELDS = {'stock_directory': ('stock_locate', 'stock')}
+DEFINITION_MESSAGE_PREFIX = 'MDInstrumentDefinition'
+DEFINITION_MESSAGE_FIELDS = ('security_id', 'symbol')
+
+SECDEF_SECURITY_ID_TAG = '48='
+SECDEF_SYMBOL_TAG = '55='
+
+
+class SymbolEnrichmentHandler(MessageHandler):
+    """Appends the symbol of the instrument a message refers to, as learned from ITCH stock_directory and CME
+    MDInstrumentDefinition messages seen earlier in the stream, or pre-seeded from a CME secdef file. Messages are
+    enriched at the top level and within repeating group entries carrying the key field. Supported configuration
+    parameters:
+
+    key_field: field identifying the instrument, defaults to stock_locate. Use security_id for CME
+    symbol_field: name of the appended field, defaults to symbol
+    secdef_file: path to a FIX tag/value security definition file, such as CME secdef.dat
+    """
+
+    def __init__(self, config=None):
+        super().__init__(config)
+        config = config if config is not None else {}
+        self.key_field = config.get('key_field', 'stock_locate')
+        self.symbol_field = config.get('symbol_field', 'symbol')
+
+        self.symbols = [None] * SYMBOL_ARRAY_SIZE
+        self.overflow_symbols = {}
+        # Message name to a tuple of whether to enrich the top level, and the names of the groups to enrich
+        self.enrichment_plans = {}
+        self.directory_fields = {}
+
+        secdef_file = config.get('secdef_file', None)
+        if secdef_file is not None:
+            self.load_secdef(secdef_file)
+
+    def append_manufactured_fields(self, schema: DatacastSchema):
+        top_level = self._append_symbol_field(schema.fields)
+        groups = tuple(x.name for x in schema.fields
+                       if hasattr(x, 'fields') and self._append_symbol_field(x.fields) is True)
+        self.enrichment_plans[schema.name] = (top_level, groups)
+
+    def _append_symbol_field(self, fields) -> bool:
+        names = {x.name for x in fields}
+        if self.key_field not in names or self.symbol_field in names:
+            return False
+        fields.append(MessageHandlerStringField(self.symbol_field))
+        return True
+
+    def set_symbol(self, key, symbol: str):
+        """Records the symbol of an instrument identifier"""
+        if key.__class__ is int and 0 <= key < SYMBOL_ARRAY_SIZE:
+            self.symbols[key] = symbol
+        else:
+            self.overflow_symbols[key] = symbol
+
+    def get_symbol(self, key) -> str:
+        """Returns the symbol of an instrument identifier, or None if not known"""
+        if key.__class__ is int and 0 <= key < SYMBOL_ARRAY_SIZE:
+            return self.symbols[key]
+        return self.overflow_symbols.get(key, None)
+
+    def checkpoint_state(self):
+        symbols = [[key, symbol] for key, symbol in enumerate(self.symbols) if symbol is not None]
+        return {'symbols': symbols + [[key, symbol] for key, symbol in self.overflow_symbols.items()]}
+
+    def restore_state(self, state):
+        for key, symbol in state['symbols']:
+            self.set_symbol(key, symbol)
+
+    def load_secdef(self, file_path: str, separator: str = '\x01'):
+        """Seeds symbols from the SecurityID (48) and Symbol (55) tags of a FIX security definition file"""
+        with open(file_path, encoding='utf-8', errors='replace') as secdef_file:
+            for line in secdef_file:
+                security_id, symbol = None, None
+                for field in line.rstrip('\r\n').split(separator):
+                    if field.startswith(SECDEF_SECURITY_ID_TAG):
+                        security_id = int(field[3:])
+                    elif field.startswith(SECDEF_SYMBOL_TAG):
+                        symbol = field[3:]
+                if security_id is not None and symbol is not None:
+                    self.set_symbol(security_id, symbol)
+
+    def _get_directory_fields(self, message_name: str):
+        if message_name in DIRECTORY_MESSAGE_FIELDS:
+            return DIRECTORY_MESSAGE_FIELDS[message_name]
+        if message_name.startswith(DEFINITION_MESSAGE_PREFIX):
+            return DEFINITION_MESSAGE_FIELDS
+        return None
+
+    def _get_enrichment_plan(self, message: ParsedMessage):
+        # Used for messages whose schema was not processed, the plan is derived from the message itself
+        dictionary = message.dictionary
+        top_level = self.key_field in dictionary and self.symbol_field not in dictionary
+        groups = tuple(name for name, value in dictionary.items()
+                       if isinstance(value, list) and len(value) > 0 and isinstance(value[0], dict)
+                       and self.key_field in value[0])
+        return top_level, groups
+
+    def handle(self, message: ParsedMessage):
+        name = message.name
+        dictionary = message.dictionary
+
+        if name in self.directory_fields:
+            directory_fields = self.directory_fields[name]
+        else:
+            directory_fields = self.directory_fields[name] = self._get_directory_fields(name)
+        if directory_fields is not None:
+            key_field, symbol_field = directory_fields
+            key, symbol = dictionary.get(key_field, None), dictionary.get(symbol_field, None)
+            if key is not None and symbol is not None:
+                self.set_symbol(key, symbol)
+
+        plan = self.enrichment_plans.get(name, None)
+        if plan is None:
+            plan = self.enrichment_plans[name] = self._get_enrichment_plan(message)
+        top_level, groups = plan
+
+        key_field, symbol_field = self.key_field, self.symbol_field
+        if top_level is True:
+            dictionary[symbol_field] = self.get_symbol(dictionary.get(key_field, None))
+        for group in groups:
+            for entry in dictionary.get(group, None) or ():
+                entry[symbol_field] = self.get_symbol(entry.get(key_field, None))
@@ -17,6 +17,7 @@
 # limitations under the License.
 #
 
+from transcoder.PluginRegistry import PluginCapabilities
 from transcoder.message import ParsedMessage, DatacastSchema
 from transcoder.message.handler.MessageHandler import MessageHandler
 from transcoder.message.handler.MessageHandlerIntField import MessageHandlerIntField
@@ -27,6 +28,8 @@ class TimestampPullForwardHandler(MessageHandler):
     """Custom message handler that stores the 'second' value from the last message of type 'time_message',
     and carries it forward into other message types not of type 'time_message'"""
 
+    capabilities = PluginCapabilities(supports_batching=True)
+
     def __init__(self, config=None):
         super().__init__(config)
         self.last_timestamp_message = None
@@ -39,9 +42,34 @@ class TimestampPullForwardHandler(MessageHandler):
         if schema.name != self.time_message_type_name:
             schema.fields.append(MessageHandlerIntField(self.new_timestamp_field_name))
 
+    def checkpoint_state(self):
+        # The last time message is not recorded, only the value carried forward into other message types
+        return {'last_epoch_seconds': self.last_epoch_seconds}
+
+    def restore_state(self, state):
+        self.last_epoch_seconds = state['last_epoch_seconds']
+
     def handle(self, message: ParsedMessage):
         if message.name == self.time_message_type_name:
             self.last_timestamp_message = message.dictionary
             self.last_epoch_seconds = int(message.dictionary[self.time_value_field_name])
         else:
             message.dictionary[self.new_timestamp_field_name] = self.last_epoch_seconds
+
+    def handle_batch(self, messages: [ParsedMessage]):
+        time_message_type_name = self.time_message_type_name
+        time_value_field_name = self.time_value_field_name
+        new_timestamp_field_name = self.new_timestamp_field_name
+        last_timestamp_message = self.last_timestamp_message
+        last_epoch_seconds = self.last_epoch_seconds
+        try:
+            for message in messages:
+                dictionary = message.dictionary
+                if message.name == time_message_type_name:
+                    last_timestamp_message = dictionary
+                    last_epoch_seconds = int(dictionary[time_value_field_name])
+                else:
+                    dictionary[new_timestamp_field_name] = last_epoch_seconds
+        finally:
+            self.last_timestamp_message = last_timestamp_message
+            self.last_epoch_seconds = last_epoch_seconds
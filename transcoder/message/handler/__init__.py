@@ -19,7 +19,29 @@
 
 # pylint: disable=invalid-name
 
-from .SequencerHandler import SequencerHandler
-from .CmeBinaryPacketHandler import CmeBinaryPacketHandler
-from .TimestampPullForwardHandler import TimestampPullForwardHandler
-from .FilterHandler import FilterHandler
+from typing import TYPE_CHECKING
+
+from transcoder.LazyImportUtil import lazy_exports
+
+HANDLER_NAMES = [
+    'SequencerHandler',
+    'CmeBinaryPacketHandler',
+    'TimestampPullForwardHandler',
+    'FilterHandler',
+    'BookBuilderHandler',
+    'BarAggregationHandler',
+    'ConflationHandler',
+    'SymbolEnrichmentHandler'
+]
+
+if TYPE_CHECKING:
+    from .SequencerHandler import SequencerHandler
+    from .CmeBinaryPacketHandler import CmeBinaryPacketHandler
+    from .TimestampPullForwardHandler import TimestampPullForwardHandler
+    from .FilterHandler import FilterHandler
+    from .BookBuilderHandler import BookBuilderHandler
+    from .BarAggregationHandler import BarAggregationHandler
+    from .ConflationHandler import ConflationHandler
+    from .SymbolEnrichmentHandler import SymbolEnrichmentHandler
+
+__getattr__, __dir__ = lazy_exports(__name__, HANDLER_NAMES)
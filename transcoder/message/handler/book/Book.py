@@ -0,0 +1,41 @@
+#
+# Copyright 2023 Google LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+
+class Book:
+    """Base class for the book of a single instrument. Snapshots are a tuple of the bid and ask levels, best price
+    first, each level being a tuple of (price, size, order count)"""
+
+    __slots__ = ('instrument_id', 'symbol', 'update_count', 'last_timestamp', 'last_snapshot', 'snapshot_stale')
+
+    def __init__(self, instrument_id, symbol: str = None):
+        self.instrument_id = instrument_id
+        self.symbol = symbol
+        self.update_count = 0
+        self.last_timestamp = None
+        self.last_snapshot = None
+        self.snapshot_stale = False
+
+    def snapshot(self, depth: int) -> tuple:
+        """Returns the best depth levels of each side"""
+        raise NotImplementedError
+
+    def clear(self):
+        """Removes all levels from both sides"""
+        raise NotImplementedError
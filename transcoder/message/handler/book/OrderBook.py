@@ -0,0 +1,77 @@
+#
+# Copyright 2023 Google LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+from bisect import bisect_left
+
+from transcoder.message.handler.book.Book import Book
+
+
+class OrderBook(Book):
+    """Price aggregated book maintained from individual orders. Each side keeps a sorted list of prices, best price
+    first, and a map of price to a [size, order count] level. Bid prices are stored negated so both lists ascend"""
+
+    __slots__ = ('bid_prices', 'ask_prices', 'bid_levels', 'ask_levels')
+
+    def __init__(self, instrument_id, symbol: str = None):
+        super().__init__(instrument_id, symbol)
+        self.bid_prices = []
+        self.ask_prices = []
+        self.bid_levels = {}
+        self.ask_levels = {}
+
+    def add(self, is_bid: bool, price, size: int) -> int:
+        """Adds an order to the level at price. Returns the rank of the level, 0 being the best price"""
+        levels, prices, key = (self.bid_levels, self.bid_prices, -price) if is_bid \
+            else (self.ask_levels, self.ask_prices, price)
+        rank = bisect_left(prices, key)
+        level = levels.get(price, None)
+        if level is None:
+            levels[price] = [size, 1]
+            prices.insert(rank, key)
+        else:
+            level[0] += size
+            level[1] += 1
+        return rank
+
+    def reduce(self, is_bid: bool, price, size: int, remove_order: bool) -> int:
+        """Reduces the size of the level at price, removing the level once it holds no orders. Returns the rank the
+        level had, 0 being the best price"""
+        levels, prices, key = (self.bid_levels, self.bid_prices, -price) if is_bid \
+            else (self.ask_levels, self.ask_prices, price)
+        rank = bisect_left(prices, key)
+        level = levels[price]
+        level[0] -= size
+        if remove_order is True:
+            level[1] -= 1
+            if level[1] == 0:
+                del levels[price]
+                del prices[rank]
+        return rank
+
+    def snapshot(self, depth: int) -> tuple:
+        bid_levels, ask_levels = self.bid_levels, self.ask_levels
+        bids = tuple((-key, *bid_levels[-key]) for key in self.bid_prices[:depth])
+        asks = tuple((price, *ask_levels[price]) for price in self.ask_prices[:depth])
+        return bids, asks
+
+    def clear(self):
+        self.bid_prices.clear()
+        self.ask_prices.clear()
+        self.bid_levels.clear()
+        self.ask_levels.clear()
@@ -0,0 +1,68 @@
+#
+# Copyright 2023 Google LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+from transcoder.message.handler.book.Book import Book
+
+
+class PriceLevelBook(Book):
+    """Market by price book addressed by level number, as published by CME MDP 3.0. Each side is an array of
+    (price, size, order count) levels, best price first, bounded by the published book depth"""
+
+    __slots__ = ('bids', 'asks', 'max_depth')
+
+    def __init__(self, instrument_id, max_depth: int = 10, symbol: str = None):
+        super().__init__(instrument_id, symbol)
+        self.bids = []
+        self.asks = []
+        self.max_depth = max_depth
+
+    def new(self, is_bid: bool, level: int, price, size: int, order_count: int):
+        """Inserts a level, shifting the levels below it down and dropping those beyond the book depth"""
+        side = self.bids if is_bid else self.asks
+        side.insert(level - 1, (price, size, order_count))
+        del side[self.max_depth:]
+
+    def change(self, is_bid: bool, level: int, price, size: int, order_count: int):
+        """Replaces a level"""
+        side = self.bids if is_bid else self.asks
+        if level <= len(side):
+            side[level - 1] = (price, size, order_count)
+        else:
+            side.append((price, size, order_count))
+
+    def delete(self, is_bid: bool, level: int):
+        """Removes a level, shifting the levels below it up"""
+        side = self.bids if is_bid else self.asks
+        if level <= len(side):
+            del side[level - 1]
+
+    def delete_from(self, is_bid: bool, level: int):
+        """Removes the best levels up to and including level"""
+        del (self.bids if is_bid else self.asks)[:level]
+
+    def delete_thru(self, is_bid: bool):
+        """Removes every level of a side"""
+        (self.bids if is_bid else self.asks).clear()
+
+    def snapshot(self, depth: int) -> tuple:
+        return tuple(self.bids[:depth]), tuple(self.asks[:depth])
+
+    def clear(self):
+        self.bids.clear()
+        self.asks.clear()
@@ -22,6 +22,7 @@ import os
 from concurrent import futures
 from concurrent.futures import ThreadPoolExecutor
 
+from transcoder.PluginRegistry import PluginCapabilities
 from transcoder.message import DatacastField, DatacastSchema
 from transcoder.output.exception import OutputFunctionNotDefinedError, OutputManagerSchemaError
 
@@ -29,6 +30,8 @@ from transcoder.output.exception import OutputFunctionNotDefinedError, OutputMan
 class OutputManager:
     """Abstract output manager class"""
 
+    capabilities = PluginCapabilities()
+
     @staticmethod
     def output_type_identifier():
         """Returns identifier of output type"""
@@ -44,6 +47,12 @@ class OutputManager:
         """Returns flag indicating if the output manager support schemas with zero fields"""
         return False
 
+    @staticmethod
+    def supports_merging():
+        """Returns flag indicating if files written by output managers of the same type with other prefixes can be
+        merged with merge_outputs"""
+        return False
+
     def __init__(self, schema_max_workers=5, lazy_create_resources: bool = False):
         self.schema_thread_pool_executor: ThreadPoolExecutor = concurrent.futures.ThreadPoolExecutor(
             max_workers=schema_max_workers)
@@ -51,6 +60,7 @@ class OutputManager:
         self.existing_schemas = {}
         self.schema_definitions = {}
         self.schema_futures = []
+        self.resume_state = None
 
     def _create_field(self, field: DatacastField):
         raise OutputFunctionNotDefinedError
@@ -86,6 +96,49 @@ class OutputManager:
     def _write_record(self, record_type_name, record):
         raise OutputFunctionNotDefinedError
 
+    def in_flight_count(self) -> int:
+        """Returns the number of records written but not yet acknowledged by the destination"""
+        return 0
+
+    def flush(self):
+        """Extend or override to make every record written so far durable at the destination. Called before a
+        checkpoint is recorded"""
+        return None
+
+    def checkpoint_state(self):
+        """Returns JSON serializable state recorded in a checkpoint after flush, passed back to restore_state
+        on resume. Output managers that append to files return their sizes so a resume can discard records
+        written after the checkpoint"""
+        return None
+
+    def restore_state(self, state):
+        """Called before schemas are added when resuming from a checkpoint"""
+        self.resume_state = state
+
+    def resumed_file_size(self, schema_name: str):
+        """Returns the size of a schema's output file recorded in the checkpoint being resumed from, 0 if the file
+        was created after the checkpoint, or None when not resuming"""
+        if self.resume_state is None:
+            return None
+        return self.resume_state.pop(schema_name, 0)
+
+    @staticmethod
+    def file_sizes(files: dict) -> dict:
+        """Returns the size on disk of each flushed file, keyed the same as files"""
+        return {name: os.fstat(file.fileno()).st_size for name, file in files.items()}
+
+    def merge_outputs(self, prefixes: [str], schema_names: [str]):
+        """Override to merge the files of each schema written with each of the prefixes, in order, into the files of
+        this output manager's prefix, removing the merged files"""
+        raise OutputFunctionNotDefinedError
+
+    @staticmethod
+    def merge_schema_files(part_paths: [str], merged_path: str):
+        """Keeps the first schema file of the parts of a merged file as its schema file, removing the others"""
+        os.replace(part_paths[0], merged_path)
+        for path in part_paths[1:]:
+            os.remove(path)
+
     def wait_for_schema_creation(self):
         """Wait for enqueued schema resources. Nothing to wait for if lazy_create_resources is enabled."""
         self.schema_thread_pool_executor.shutdown(wait=True)
@@ -110,7 +163,5 @@ class OutputManager:
             _output_path = os.path.join(main_script_dir, relative_path)
         else:
             _output_path = output_path
-        exists = os.path.exists(_output_path)
-        if not exists:
-            os.makedirs(_output_path)
+        os.makedirs(_output_path, exist_ok=True)
         return _output_path
@@ -17,29 +17,33 @@
 # limitations under the License.
 #
 
+from transcoder.PluginRegistry import PluginRegistry
 from transcoder.output import OutputManager
-from transcoder.output.avro import AvroOutputManager
-from transcoder.output.avro.FastAvroOutputManager import FastAvroOutputManager
-from transcoder.output.diag import DiagnosticOutputManager
-from transcoder.output.length_delimited import LengthDelimitedOutputManager
-from transcoder.output.google_cloud import PubSubOutputManager, BigQueryOutputManager
-from transcoder.output.google_cloud.terraform import BigQueryTerraformOutputManager, PubSubTerraformOutputManager
-from transcoder.output.json import JsonOutputManager
+
+# Output identifier to the output manager class, imported only once the output is selected
+output_managers = PluginRegistry('market_data_transcoder.outputs', {
+    'diag': 'transcoder.output.diag:DiagnosticOutputManager',
+    'avro': 'transcoder.output.avro:AvroOutputManager',
+    'fastavro': 'transcoder.output.avro:FastAvroOutputManager',
+    'bigquery': 'transcoder.output.google_cloud:BigQueryOutputManager',
+    'pubsub': 'transcoder.output.google_cloud:PubSubOutputManager',
+    'bigquery_terraform': 'transcoder.output.google_cloud.terraform:BigQueryTerraformOutputManager',
+    'pubsub_terraform': 'transcoder.output.google_cloud.terraform:PubSubTerraformOutputManager',
+    'jsonl': 'transcoder.output.json:JsonOutputManager',
+    'length_delimited': 'transcoder.output.length_delimited:LengthDelimitedOutputManager'
+})
 
 
 def all_output_identifiers():
     """List of all available source identifiers"""
-    return [
-        DiagnosticOutputManager.output_type_identifier(),
-        AvroOutputManager.output_type_identifier(),
-        FastAvroOutputManager.output_type_identifier(),
-        BigQueryOutputManager.output_type_identifier(),
-        PubSubOutputManager.output_type_identifier(),
-        BigQueryTerraformOutputManager.output_type_identifier(),
-        PubSubTerraformOutputManager.output_type_identifier(),
-        JsonOutputManager.output_type_identifier(),
-        LengthDelimitedOutputManager.output_type_identifier()
-    ]
+    return output_managers.names()
+
+
+def get_output_manager_class(output_name: str):
+    """Imports and returns the OutputManager class registered for the supplied name"""
+    if output_name not in output_managers:
+        raise UnsupportedOutputTypeError(f'Output {output_name} is not supported')
+    return output_managers.load(output_name)
 
 
 def get_output_manager(output_name: str,  # pylint: disable=too-many-arguments
@@ -52,33 +56,30 @@ def get_output_manager(output_name: str,  # pylint: disable=too-many-arguments
                        lazy_create_resources: bool = False,
                        create_schema_enforcing_topics: bool = True):
     """Returns OutputManager instance based on the supplied name"""
+    output_class = get_output_manager_class(output_name)
     output: OutputManager = None
-    if output_name == AvroOutputManager.output_type_identifier():
-        output = AvroOutputManager(output_prefix, output_file_path, lazy_create_resources=lazy_create_resources)
-    elif output_name == FastAvroOutputManager.output_type_identifier():
-        output = FastAvroOutputManager(output_prefix, output_file_path, lazy_create_resources=lazy_create_resources)
-    elif output_name == PubSubOutputManager.output_type_identifier():
-        output = PubSubOutputManager(destination_project_id, output_encoding=output_encoding,
-                                     output_prefix=output_prefix, lazy_create_resources=lazy_create_resources,
-                                     create_schema_enforcing_topics=create_schema_enforcing_topics)
-    elif output_name == BigQueryOutputManager.output_type_identifier():
-        output = BigQueryOutputManager(destination_project_id, destination_dataset_id, output_prefix,
-                                       lazy_create_resources=lazy_create_resources)
-    elif output_name == BigQueryTerraformOutputManager.output_type_identifier():
-        output = BigQueryTerraformOutputManager(destination_project_id, destination_dataset_id, output_file_path)
-    elif output_name == PubSubTerraformOutputManager.output_type_identifier():
-        output = PubSubTerraformOutputManager(destination_project_id, output_encoding=output_encoding,
-                                              create_schema_enforcing_topics=create_schema_enforcing_topics,
-                                              output_path=output_file_path)
-    elif output_name == DiagnosticOutputManager.output_type_identifier():
-        output = DiagnosticOutputManager()
-    elif output_name == JsonOutputManager.output_type_identifier():
-        output = JsonOutputManager(output_prefix, output_file_path, lazy_create_resources=lazy_create_resources)
-    elif output_name == LengthDelimitedOutputManager.output_type_identifier():
+    if output_name in ['avro', 'fastavro', 'jsonl']:
+        output = output_class(output_prefix, output_file_path, lazy_create_resources=lazy_create_resources)
+    elif output_name == 'pubsub':
+        output = output_class(destination_project_id, output_encoding=output_encoding,
+                              output_prefix=output_prefix, lazy_create_resources=lazy_create_resources,
+                              create_schema_enforcing_topics=create_schema_enforcing_topics)
+    elif output_name == 'bigquery':
+        output = output_class(destination_project_id, destination_dataset_id, output_prefix,
+                              lazy_create_resources=lazy_create_resources)
+    elif output_name == 'bigquery_terraform':
+        output = output_class(destination_project_id, destination_dataset_id, output_file_path)
+    elif output_name == 'pubsub_terraform':
+        output = output_class(destination_project_id, output_encoding=output_encoding,
+                              create_schema_enforcing_topics=create_schema_enforcing_topics,
+                              output_path=output_file_path)
+    elif output_name == 'diag':
+        output = output_class()
+    elif output_name == 'length_delimited':
         # TODO: pass through output endian specification from CLI args
-        output = LengthDelimitedOutputManager(prefix_length=prefix_length)
-    else:
-        raise UnsupportedOutputTypeError(f'Output {output_name} is not supported')
+        output = output_class(prefix_length=prefix_length)
+    else:  # plugin outputs are constructed as the file outputs
+        output = output_class(output_prefix, output_file_path, lazy_create_resources=lazy_create_resources)
     return output
 
 
@@ -36,13 +36,23 @@ class AvroOutputManager(BaseAvroOutputManager):
 
     def _add_schema(self, schema: DatacastSchema):
         super()._add_schema(schema)
-        output_file = open(self._get_file_name(schema.name, 'avro'), 'wb')  # pylint: disable=consider-using-with
-        writer = DataFileWriter(output_file, DatumWriter(), self.schemas[schema.name])
+        file_name = self._get_file_name(schema.name, 'avro')
+        resumed_size = self.resumed_file_size(schema.name)
+        if resumed_size:
+            output_file = open(file_name, 'a+b')  # pylint: disable=consider-using-with
+            output_file.truncate(resumed_size)
+            writer = DataFileWriter(output_file, DatumWriter())
+        else:
+            output_file = open(file_name, 'wb')  # pylint: disable=consider-using-with
+            writer = DataFileWriter(output_file, DatumWriter(), self.schemas[schema.name])
         self.writers[schema.name] = writer
 
     def _write_record(self, record_type_name, record):
         self.writers[record_type_name].append(record)
 
+    def _get_output_file(self, writer):
+        return writer.writer
+
     def _parse_schema(self, schema_dict):
         jsoned = json.dumps(schema_dict)
         return avro.schema.parse(jsoned)
@@ -17,7 +17,10 @@
 # limitations under the License.
 #
 
+import contextlib
+import itertools
 import json
+import os
 
 from transcoder.message import DatacastField, DatacastSchema
 from transcoder.output import OutputManager
@@ -32,6 +35,10 @@ class BaseAvroOutputManager(OutputManager):
         """Returns flag indicating if the output manager support schemas with zero fields"""
         return True
 
+    @staticmethod
+    def supports_merging():
+        return True
+
     def __init__(self, prefix: str, output_path: str, lazy_create_resources: bool = False):
         super().__init__(lazy_create_resources=lazy_create_resources)
         self.prefix = prefix
@@ -63,8 +70,38 @@ class BaseAvroOutputManager(OutputManager):
         with open(self._get_file_name(name, 'avsc'), mode='wt', encoding='utf-8') as file:
             file.write(schema_json)
 
-    def _get_file_name(self, name, extension):
-        return self.output_path + '/' + self.prefix + '-' + name + '.' + extension
+    def _get_file_name(self, name, extension, prefix: str = None):
+        return self.output_path + '/' + (prefix or self.prefix) + '-' + name + '.' + extension
+
+    def merge_outputs(self, prefixes: [str], schema_names: [str]):
+        # The records of the data files of each part are written to a single data file. Files of schemas that
+        # had no records written may hold no data file header
+        import fastavro  # pylint: disable=import-outside-toplevel
+        for name in schema_names:
+            parts = [x for x in prefixes if os.path.exists(self._get_file_name(name, 'avro', x))]
+            if len(parts) == 0:
+                continue
+            with open(self._get_file_name(name, 'avsc', parts[0]), encoding='utf-8') as schema_file:
+                schema = fastavro.parse_schema(json.load(schema_file))
+            part_paths = [self._get_file_name(name, 'avro', x) for x in parts]
+            with contextlib.ExitStack() as stack, open(self._get_file_name(name, 'avro'), 'wb') as merged_file:
+                readers = [fastavro.reader(stack.enter_context(open(x, 'rb'))) for x in part_paths
+                           if os.path.getsize(x) > 0]
+                fastavro.writer(merged_file, schema, itertools.chain.from_iterable(readers))
+            for path in part_paths:
+                os.remove(path)
+            self.merge_schema_files([self._get_file_name(name, 'avsc', x) for x in parts],
+                                    self._get_file_name(name, 'avsc'))
+
+    def flush(self):
+        for _, writer in self.writers.items():
+            writer.flush()
+
+    def checkpoint_state(self):
+        return self.file_sizes({name: self._get_output_file(writer) for name, writer in self.writers.items()})
+
+    def _get_output_file(self, writer):
+        return writer
 
     def wait_for_completion(self):
         super().wait_for_completion()
@@ -35,6 +35,9 @@ class FastAvroOutputManager(BaseAvroOutputManager):
     def _add_schema(self, schema: DatacastSchema):
         super()._add_schema(schema)
         output_file = open(self._get_file_name(schema.name, 'avro'), 'a+b')  # pylint: disable=consider-using-with
+        resumed_size = self.resumed_file_size(schema.name)
+        if resumed_size is not None:
+            output_file.truncate(resumed_size)
         self.writers[schema.name] = output_file
 
     def _write_record(self, record_type_name, record):
@@ -19,5 +19,15 @@
 
 # pylint: disable=invalid-name
 
-from .AvroOutputManager import AvroOutputManager
-from .FastAvroOutputManager import FastAvroOutputManager
+from typing import TYPE_CHECKING
+
+from transcoder.LazyImportUtil import lazy_exports
+
+if TYPE_CHECKING:
+    from .AvroOutputManager import AvroOutputManager
+    from .FastAvroOutputManager import FastAvroOutputManager
+
+__getattr__, __dir__ = lazy_exports(__name__, [
+    'AvroOutputManager',
+    'FastAvroOutputManager'
+])
@@ -19,4 +19,13 @@
 
 # pylint: disable=invalid-name
 
-from .DiagnosticOutputManager import DiagnosticOutputManager
+from typing import TYPE_CHECKING
+
+from transcoder.LazyImportUtil import lazy_exports
+
+if TYPE_CHECKING:
+    from .DiagnosticOutputManager import DiagnosticOutputManager
+
+__getattr__, __dir__ = lazy_exports(__name__, [
+    'DiagnosticOutputManager'
+])
@@ -27,6 +27,18 @@ from transcoder.output import OutputManager
 from transcoder.output.exception import BigQueryTableSchemaOutOfSyncError
 from transcoder.output.google_cloud.Constants import GOOGLE_PACKAGED_SOLUTION_KEY, GOOGLE_PACKAGED_SOLUTION_LABEL_DICT, \
     GOOGLE_PACKAGED_SOLUTION_VALUE
+from transcoder.output.google_cloud.ResourceCache import resource_cache
+
+
+class BigQueryDatasetResources:  # pylint: disable=too-few-public-methods
+    """BigQuery client of a project, with a dataset created or labelled and its tables listed once, shared by the
+    output managers of a process"""
+
+    def __init__(self, client, tables: list):
+        self.client = client
+        self.tables = tables
+        # Table name to the schema it was last verified or created with
+        self.verified_schemas = {}
 
 
 class BigQueryOutputManager(OutputManager):
@@ -42,7 +54,16 @@ class BigQueryOutputManager(OutputManager):
         self.dataset_id = dataset_id
         self.dataset_ref = bigquery.DatasetReference(project_id, dataset_id)
         self.output_prefix = output_prefix
-        self.client = bigquery.Client(project=project_id)
+        self.resource_key = ('bigquery', project_id, dataset_id)
+        self.resources = resource_cache.get(self.resource_key, self._load_dataset_resources)
+        self.client = self.resources.client
+
+        self.tables = self.resources.tables
+        for table_id in list(map(lambda x: x.table_id, self.tables)):
+            self.existing_schemas.update({table_id: True})
+
+    def _load_dataset_resources(self):
+        self.client = bigquery.Client(project=self.project_id)
 
         if self._does_dataset_exist(self.dataset_ref) is False:
             self._create_dataset(self.dataset_ref)
@@ -53,9 +74,7 @@ class BigQueryOutputManager(OutputManager):
                 dataset.labels.update(GOOGLE_PACKAGED_SOLUTION_LABEL_DICT)
                 self.client.update_dataset(dataset, ["labels"])
 
-        self.tables = list(self.client.list_tables(dataset_id))
-        for table_id in list(map(lambda x: x.table_id, self.tables)):
-            self.existing_schemas.update({table_id: True})
+        return BigQueryDatasetResources(self.client, list(self.client.list_tables(self.dataset_id)))
 
     def _create_field(self, field: DatacastField):
         return field.create_bigquery_field()
@@ -89,6 +108,8 @@ class BigQueryOutputManager(OutputManager):
 
     def _add_schema(self, schema: DatacastSchema):
         bq_schema = self._get_field_list(schema.fields)
+        if self.resources.verified_schemas.get(schema.name, None) == bq_schema:
+            return
         table_ref = bigquery.TableReference(self.dataset_ref, schema.name)
 
         if self._does_table_exist(schema.name) is True:
@@ -115,13 +136,21 @@ class BigQueryOutputManager(OutputManager):
                 # b/153072942
                 # https://cloud.google.com/bigquery/docs/error-messages
                 logging.warning('Table conflict, already exists %s: %s', schema.name, error)
+                resource_cache.invalidate(self.resource_key)
             except Exception as error:
                 logging.error('Error creating table %s: %s', schema.name, error)
                 raise
 
+        self.resources.verified_schemas[schema.name] = bq_schema
+
     def _write_record(self, record_type_name, record):
         table_ref = bigquery.TableReference(self.dataset_ref, record_type_name)
-        errors = self.client.insert_rows_json(table_ref, [record])
+        try:
+            errors = self.client.insert_rows_json(table_ref, [record])
+        except NotFound:
+            # Deleted outside this process since the table was verified, so later jobs verify it again
+            resource_cache.invalidate(self.resource_key)
+            raise
         if errors:
             logging.error('Encountered errors while inserting rows: %s', errors)
 
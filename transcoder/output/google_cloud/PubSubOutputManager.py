@@ -21,6 +21,7 @@ import io
 import json
 import logging
 import os
+import threading
 from concurrent import futures
 from typing import Callable
 
@@ -40,9 +41,24 @@ from transcoder.output import OutputManager
 from transcoder.output.exception import OutputNotAvailableError, PubSubTopicSchemaOutOfSyncError
 from transcoder.output.google_cloud.Constants import GOOGLE_PACKAGED_SOLUTION_LABEL_DICT, GOOGLE_PACKAGED_SOLUTION_KEY, \
     GOOGLE_PACKAGED_SOLUTION_VALUE
+from transcoder.output.google_cloud.ResourceCache import resource_cache
 
 
-class PubSubOutputManager(OutputManager):
+class PubSubProjectResources:  # pylint: disable=too-few-public-methods
+    """Pub/Sub clients of a project, with its topics and schemas as listed once, shared by the output managers of a
+    process"""
+
+    def __init__(self, publisher, topics: list, schema_client, schemas: list):
+        self.publisher = publisher
+        self.topics = topics
+        self.schema_client = schema_client
+        self.schemas = schemas
+        self.schema_definitions = {}
+        # Topic path to the schema and settings it was last verified or created with
+        self.verified_topics = {}
+
+
+class PubSubOutputManager(OutputManager):  # pylint: disable=too-many-instance-attributes
     """Manages creation of Pub/Sub topic and schema objects"""
 
     @staticmethod
@@ -59,14 +75,16 @@ class PubSubOutputManager(OutputManager):
         self.create_schema_enforcing_topics = create_schema_enforcing_topics
         self.project_path = f"projects/{project_id}"
 
-        self.publisher = pubsub_v1.PublisherClient()
-        self.topics = list(self.publisher.list_topics(request={"project": self.project_path}))
+        self.resource_key = ('pubsub', project_id)
+        self.resources = resource_cache.get(self.resource_key, self._load_project_resources)
+        self.publisher = self.resources.publisher
+        self.topics = self.resources.topics
         for topic in self.topics:
             topic_id = os.path.basename(topic.name)
             self.existing_schemas.update({topic_id: True})
 
-        self.schema_client = SchemaServiceClient()
-        self.schemas = list(self.schema_client.list_schemas(request={"parent": self.project_path}))
+        self.schema_client = self.resources.schema_client
+        self.schemas = self.resources.schemas
 
         self.avro_schemas = {}
 
@@ -77,6 +95,15 @@ class PubSubOutputManager(OutputManager):
 
         self.publish_futures = []
         self.publish_futures_data = {}
+        self.completed_lock = threading.Lock()
+        self.completed_count = 0
+
+    def _load_project_resources(self):
+        publisher = pubsub_v1.PublisherClient()
+        schema_client = SchemaServiceClient()
+        return PubSubProjectResources(publisher, list(publisher.list_topics(request={"project": self.project_path})),
+                                      schema_client,
+                                      list(schema_client.list_schemas(request={"parent": self.project_path})))
 
     def _does_topic_schema_exist(self, schema_id):
         return self._get_schema(schema_id) is not None
@@ -91,7 +118,15 @@ class PubSubOutputManager(OutputManager):
         return None
 
     def _get_schema_avro(self, schema_path):
-        result = self.schema_client.get_schema(request={"name": schema_path})
+        result = self.resources.schema_definitions.get(schema_path, None)
+        if result is None:
+            try:
+                result = self.schema_client.get_schema(request={"name": schema_path})
+            except NotFound:
+                # Deleted outside this process since the schemas were listed
+                resource_cache.invalidate(self.resource_key)
+                raise
+            self.resources.schema_definitions[schema_path] = result
         return result
 
     def _get_topic(self, topic_path):
@@ -103,7 +138,7 @@ class PubSubOutputManager(OutputManager):
     def _create_field(self, field: DatacastField):
         return field.create_avro_field()
 
-    def _add_schema(self, schema: DatacastSchema):  # pylint: disable=too-many-locals
+    def _add_schema(self, schema: DatacastSchema):  # pylint: disable=too-many-locals,too-many-statements
         schema_id = schema.name
         topic_id = schema.name
 
@@ -114,8 +149,12 @@ class PubSubOutputManager(OutputManager):
         avsc_schema = {'type': 'record', 'namespace': 'sbeMessage', 'name': schema.name, 'fields': _fields}
         self.avro_schemas[schema.name] = avsc_schema
 
+        jsoned_avsc_schema = json.dumps(avsc_schema)
+        verified_settings = (jsoned_avsc_schema, self.is_binary_encoded, self.create_schema_enforcing_topics)
+        if self.resources.verified_topics.get(topic_path, None) == verified_settings:
+            return
+
         if self.create_schema_enforcing_topics is True:
-            jsoned_avsc_schema = json.dumps(avsc_schema)
             create_schema = False
 
             if self._does_topic_schema_exist(schema_path) is True:
@@ -134,7 +173,9 @@ class PubSubOutputManager(OutputManager):
                     )
                     logging.debug('Created a schema using an Avro schema:\n%s', result)
                 except AlreadyExists:
+                    # Created outside this process since the schemas were listed
                     logging.debug('Schema %s already exists.', schema_id)
+                    resource_cache.invalidate(self.resource_key)
 
         _existing_topic = self._get_topic(topic_path)
         if _existing_topic is not None:
@@ -167,10 +208,13 @@ class PubSubOutputManager(OutputManager):
                 logging.debug('Created a topic:\n%s', response)
             except AlreadyExists:
                 logging.debug('Topic %s already exists.', topic_id)
+                resource_cache.invalidate(self.resource_key)
             except InvalidArgument as ex:
                 logging.error(ex)
                 raise
 
+        self.resources.verified_topics[topic_path] = verified_settings
+
     def _check_existing_label(self, _existing_topic):
         if GOOGLE_PACKAGED_SOLUTION_KEY not in _existing_topic.labels \
                 or _existing_topic.labels.get(GOOGLE_PACKAGED_SOLUTION_KEY, None) != GOOGLE_PACKAGED_SOLUTION_VALUE:
@@ -187,11 +231,12 @@ class PubSubOutputManager(OutputManager):
             except Exception as err:  # pylint: disable=broad-except
                 logging.warning("Failed to update topic labels: %s", err)
 
-    @staticmethod
-    def get_callback(publish_future: Future, data: str) -> Callable[[pubsub_v1.publisher.futures.Future], None]:  # pylint: disable=unused-argument
+    def get_callback(self, publish_future: Future, data: str) -> Callable[[pubsub_v1.publisher.futures.Future], None]:  # pylint: disable=unused-argument
         """PubSub future callback function used to log publishing errors"""
 
         def callback(_publish_future: pubsub_v1.publisher.futures.Future) -> None:
+            with self.completed_lock:
+                self.completed_count += 1
             try:
                 logging.debug(_publish_future.result())
             except InvalidArgument as error:
@@ -246,6 +291,14 @@ class PubSubOutputManager(OutputManager):
             publish_future.add_done_callback(self.get_callback(publish_future, data))
             self.publish_futures.append(publish_future)
 
+    def in_flight_count(self) -> int:
+        return len(self.publish_futures) - self.completed_count
+
+    def flush(self):
+        """Waits for messages published so far to be acknowledged. Messages published after the last checkpoint
+        are published again on resume, so subscribers may see duplicates"""
+        futures.wait(self.publish_futures, return_when=futures.ALL_COMPLETED)
+
     def wait_for_completion(self):
         super().wait_for_completion()
         futures.wait(self.publish_futures, return_when=futures.ALL_COMPLETED)
@@ -0,0 +1,59 @@
+#
+# Copyright 2023 Google LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import threading
+import time
+
+# Seconds a resource listing is reused for before it is listed again, so that jobs see resources created or deleted
+# outside the process
+RESOURCE_LISTING_TTL = 300.0
+
+
+class ResourceCache:
+    """Process wide cache of Google Cloud clients and resource listings, shared by the output managers of every
+    transcoding job run by a long running process. Entries are created again once older than ttl seconds, or once
+    invalidated by an output manager that found a listing out of date"""
+
+    def __init__(self, ttl: float = RESOURCE_LISTING_TTL):
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        # Key to the (entry, monotonic time it was created)
+        self.entries = {}
+
+    def get(self, key, create):
+        """Returns the entry for key, created by calling create on first use and once the entry has expired"""
+        with self.lock:
+            now = time.monotonic()
+            cached = self.entries.get(key, None)
+            if cached is None or now - cached[1] >= self.ttl:
+                cached = self.entries[key] = (create(), now)
+            return cached[0]
+
+    def invalidate(self, key):
+        """Discards the entry for key, so that the next job lists its resources again"""
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        """Discards all entries, so that clients are recreated and resources listed again"""
+        with self.lock:
+            self.entries.clear()
+
+
+resource_cache = ResourceCache()
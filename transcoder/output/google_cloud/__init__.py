@@ -19,5 +19,16 @@
 
 # pylint: disable=invalid-name
 
-from .BigQueryOutputManager import BigQueryOutputManager
-from .PubSubOutputManager import PubSubOutputManager
+from typing import TYPE_CHECKING
+
+from transcoder.LazyImportUtil import lazy_exports
+from .ResourceCache import ResourceCache
+
+if TYPE_CHECKING:
+    from .BigQueryOutputManager import BigQueryOutputManager
+    from .PubSubOutputManager import PubSubOutputManager
+
+__getattr__, __dir__ = lazy_exports(__name__, [
+    'BigQueryOutputManager',
+    'PubSubOutputManager'
+])
@@ -19,5 +19,15 @@
 
 # pylint: disable=invalid-name
 
-from .BigQueryTerraformOutputManager import BigQueryTerraformOutputManager
-from .PubSubTerraformOutputManager import PubSubTerraformOutputManager
+from typing import TYPE_CHECKING
+
+from transcoder.LazyImportUtil import lazy_exports
+
+if TYPE_CHECKING:
+    from .BigQueryTerraformOutputManager import BigQueryTerraformOutputManager
+    from .PubSubTerraformOutputManager import PubSubTerraformOutputManager
+
+__getattr__, __dir__ = lazy_exports(__name__, [
+    'BigQueryTerraformOutputManager',
+    'PubSubTerraformOutputManager'
+])
@@ -18,6 +18,8 @@
 #
 import datetime
 import json
+import os
+import shutil
 
 from transcoder.message import DatacastSchema, DatacastField
 from transcoder.output import OutputManager
@@ -37,6 +39,10 @@ class JsonOutputManager(OutputManager):
     def output_type_identifier():
         return 'jsonl'
 
+    @staticmethod
+    def supports_merging():
+        return True
+
     def _create_field(self, field: DatacastField):
         return field.create_json_field(field)
 
@@ -48,9 +54,12 @@ class JsonOutputManager(OutputManager):
             self.writers[schema.name].close()
             del self.writers[schema.name]
 
+        resumed_size = self.resumed_file_size(schema.name)
         output_file = open(  # pylint: disable=consider-using-with
-            self._get_file_name(schema.name, 'jsonl'), 'w',
+            self._get_file_name(schema.name, 'jsonl'), 'w' if resumed_size is None else 'a',
             encoding='utf-8')
+        if resumed_size is not None:
+            output_file.truncate(resumed_size)
 
         schema_json = {
             '$schema': 'https://json-schema.org/draft/2019-09/schema',
@@ -80,12 +89,33 @@ class JsonOutputManager(OutputManager):
         with open(self.get_schema_file_name(name, 'json'), mode='wt', encoding='utf-8') as file:
             file.write(schema_json)
 
-    def get_schema_file_name(self, name, extension):
+    def get_schema_file_name(self, name, extension, prefix: str = None):
         """Returns a file name for the schema file"""
-        return self.output_path + '/' + self.prefix + '-' + name + '.schema.' + extension
+        return self.output_path + '/' + (prefix or self.prefix) + '-' + name + '.schema.' + extension
+
+    def _get_file_name(self, name, extension, prefix: str = None):
+        return self.output_path + '/' + (prefix or self.prefix) + '-' + name + '.' + extension
+
+    def merge_outputs(self, prefixes: [str], schema_names: [str]):
+        # JSON lines files are merged by concatenation
+        for name in schema_names:
+            parts = [x for x in prefixes if os.path.exists(self._get_file_name(name, 'jsonl', x))]
+            if len(parts) == 0:
+                continue
+            with open(self._get_file_name(name, 'jsonl'), 'wb') as merged_file:
+                for prefix in parts:
+                    with open(self._get_file_name(name, 'jsonl', prefix), 'rb') as part_file:
+                        shutil.copyfileobj(part_file, merged_file)
+                    os.remove(self._get_file_name(name, 'jsonl', prefix))
+            self.merge_schema_files([self.get_schema_file_name(name, 'json', x) for x in parts],
+                                    self.get_schema_file_name(name, 'json'))
+
+    def flush(self):
+        for _, writer in self.writers.items():
+            writer.flush()
 
-    def _get_file_name(self, name, extension):
-        return self.output_path + '/' + self.prefix + '-' + name + '.' + extension
+    def checkpoint_state(self):
+        return self.file_sizes(self.writers)
 
     def wait_for_completion(self):
         super().wait_for_completion()
@@ -21,12 +21,15 @@
 
 import struct
 import sys
+from transcoder.PluginRegistry import PluginCapabilities
 from transcoder.output import OutputManager
 
 
 class LengthDelimitedOutputManager(OutputManager):
     """ Output manager for length-prefixed binary files sent to standard output """
 
+    capabilities = PluginCapabilities(supports_zero_copy=True)
+
     def __init__(self, prefix_length: int=2, endian: int='>'):
         super().__init__()
         self.prefix_length = prefix_length
@@ -51,3 +54,6 @@ class LengthDelimitedOutputManager(OutputManager):
     def write_record(self, record_type_name, record):
         byte_len = struct.pack(self.pack_spec(), len(record))
         sys.stdout.buffer.write(byte_len + record)
+
+    def flush(self):
+        sys.stdout.buffer.flush()
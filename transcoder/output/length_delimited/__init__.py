@@ -19,4 +19,13 @@
 
 # pylint: disable=invalid-name
 
-from .LengthDelimitedOutputManager import LengthDelimitedOutputManager
+from typing import TYPE_CHECKING
+
+from transcoder.LazyImportUtil import lazy_exports
+
+if TYPE_CHECKING:
+    from .LengthDelimitedOutputManager import LengthDelimitedOutputManager
+
+__getattr__, __dir__ = lazy_exports(__name__, [
+    'LengthDelimitedOutputManager'
+])
@@ -0,0 +1,55 @@
+#
+# Copyright 2023 Google LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+from transcoder.PluginRegistry import PluginCapabilities
+from transcoder.message import DatacastSchema
+from transcoder.output import OutputManager
+
+
+class MemoryOutputManager(OutputManager):
+    """Collects records in memory as (message type name, record) tuples, for callers embedding the transcoder to take
+    with take_records. Not available as a CLI output type"""
+
+    capabilities = PluginCapabilities(supports_zero_copy=True)
+
+    @staticmethod
+    def output_type_identifier():
+        return 'memory'
+
+    @staticmethod
+    def supports_zero_field_schemas():
+        return True
+
+    def __init__(self):
+        super().__init__(lazy_create_resources=True)
+        self.records = []
+
+    def enqueue_schema(self, schema: DatacastSchema):
+        self.schema_definitions[schema.name] = schema
+
+    def write_record(self, record_type_name, record):
+        self.records.append((record_type_name, record))
+
+    def take_records(self) -> [tuple]:
+        """Returns the records written since the last call"""
+        records, self.records = self.records, []
+        return records
+
+    def wait_for_schema_creation(self):
+        pass
@@ -0,0 +1,85 @@
+#
+# Copyright 2023 Google LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import contextlib
+import os
+import threading
+
+from transcoder.TranscoderConfig import TranscoderConfig
+from transcoder.message import DatacastParser
+from transcoder.message.MessageUtil import get_message_parser
+
+
+class ParserPool:
+    """Keeps parsers, and the schemas they have compiled, warm between transcoding jobs. A parser is used by one job
+    at a time, so concurrent jobs with the same schema each check out their own"""
+
+    def __init__(self, max_idle_per_schema: int = 4):
+        self.max_idle_per_schema = max_idle_per_schema
+        self.lock = threading.Lock()
+        self.idle_parsers = {}
+        self.created_count = 0
+        self.reused_count = 0
+
+    @staticmethod
+    def parser_key(config: TranscoderConfig) -> tuple:
+        """Returns the parser options of a config, with the schema file modification time so that edited schemas are
+        compiled again"""
+        schema_path = config.schema_file_path
+        schema_mtime = os.path.getmtime(schema_path) if schema_path is not None and os.path.exists(schema_path) \
+            else None
+        return (config.factory, schema_path, schema_mtime, config.stats_only, config.message_type_inclusions,
+                config.message_type_exclusions, config.fix_header_tags, config.fix_separator, config.schema_cache_dir)
+
+    @contextlib.contextmanager
+    def checkout(self, config: TranscoderConfig):
+        """Yields a (parser, reused) tuple for the config, returning the parser to the pool afterwards. Each job
+        calls process_schema, which returns schemas the job's handlers can append fields to without changing those
+        of the next job"""
+        key = self.parser_key(config)
+        with self.lock:
+            idle = self.idle_parsers.get(key, None)
+            parser: DatacastParser = idle.pop() if idle else None
+            if parser is None:
+                self.created_count += 1
+                # Parsers of a previous version of the schema file are not checked out again
+                for stale_key in [x for x in self.idle_parsers if x[:2] == key[:2] and x != key]:
+                    del self.idle_parsers[stale_key]
+            else:
+                self.reused_count += 1
+
+        reused = parser is not None
+        if reused is True:
+            parser.reset_counts()
+        else:
+            parser = get_message_parser(config.factory, config.schema_file_path, config.stats_only,
+                                        config.message_type_inclusions, config.message_type_exclusions,
+                                        config.fix_header_tags, config.fix_separator, config.schema_cache_dir)
+        try:
+            yield parser, reused
+        finally:
+            with self.lock:
+                idle = self.idle_parsers.setdefault(key, [])
+                if len(idle) < self.max_idle_per_schema:
+                    idle.append(parser)
+
+    def idle_count(self) -> int:
+        """Returns the number of parsers waiting to be checked out"""
+        with self.lock:
+            return sum(len(x) for x in self.idle_parsers.values())
@@ -0,0 +1,79 @@
+#
+# Copyright 2023 Google LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import threading
+import time
+from enum import Enum
+
+from transcoder.TranscoderConfig import TranscoderConfig
+
+
+class TranscodeJobState(Enum):
+    """Enum of the states of a transcoding job run by the server"""
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+
+    def __str__(self):
+        return self.value
+
+
+class TranscodeJob:  # pylint: disable=too-many-instance-attributes
+    """A transcoding job submitted to the server, with its state and per job stats"""
+
+    def __init__(self, job_id: str, config: TranscoderConfig):
+        self.job_id = job_id
+        self.config = config
+        self.state = TranscodeJobState.QUEUED
+        self.submit_time = time.time()
+        self.start_time = None
+        self.end_time = None
+        self.warm_parser = False
+        self.summary = None
+        self.error = None
+        self.done = threading.Event()
+
+    def start(self):
+        """Marks the job as running"""
+        self.start_time = time.time()
+        self.state = TranscodeJobState.RUNNING
+
+    def finish(self, summary: dict = None, error: Exception = None):
+        """Marks the job as succeeded with the transcoder summary, or failed with the error raised"""
+        self.end_time = time.time()
+        self.summary = summary
+        if error is not None:
+            self.error = f'{type(error).__name__}: {error}'
+        self.state = TranscodeJobState.FAILED if error is not None else TranscodeJobState.SUCCEEDED
+        self.done.set()
+
+    def to_dict(self) -> dict:
+        """Returns the job state and stats as a JSON serializable dict"""
+        end_time = self.end_time if self.end_time is not None else time.time()
+        return {
+            'job_id': self.job_id,
+            'state': str(self.state),
+            'source_file_path': self.config.source_file_path,
+            'queued_seconds': round((self.start_time or end_time) - self.submit_time, 6),
+            'runtime_seconds': round(end_time - self.start_time, 6) if self.start_time is not None else None,
+            'warm_parser': self.warm_parser,
+            'summary': self.summary,
+            'error': self.error
+        }
@@ -0,0 +1,215 @@
+#
+# Copyright 2023 Google LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import dataclasses
+import itertools
+import json
+import logging
+import os
+import socketserver
+import stat
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from transcoder.Transcoder import Transcoder
+from transcoder.TranscoderConfig import TranscoderConfig
+from transcoder.server.ParserPool import ParserPool
+from transcoder.server.TranscodeJob import TranscodeJob, TranscodeJobState
+from transcoder.version import __version__
+
+# Job options expanded like the CLI expands its path arguments
+PATH_OPTIONS = ['schema_file_path', 'source_file_path', 'output_path', 'error_output_path', 'schema_cache_dir']
+
+
+class TranscoderServer:
+    """Runs transcoding jobs submitted over HTTP, on a TCP port or a UNIX socket, concurrently in one long running
+    process that keeps parsers and output clients warm between jobs"""
+
+    def __init__(self, max_workers: int = 4, max_idle_parsers: int = 4, max_finished_jobs: int = 1000,
+                 defaults: TranscoderConfig = None):
+        self.defaults = defaults if defaults is not None else TranscoderConfig()
+        self.parser_pool = ParserPool(max_idle_parsers)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='transcode-job')
+        self.max_finished_jobs = max_finished_jobs
+        self.lock = threading.Lock()
+        self.jobs = {}
+        self.job_ids = itertools.count(1)
+
+    def create_config(self, options: dict) -> TranscoderConfig:
+        """Returns the config of a job from its options, the names of TranscoderConfig fields, over the defaults"""
+        unknown_options = set(options) - {x.name for x in dataclasses.fields(TranscoderConfig)}
+        if len(unknown_options) > 0:
+            raise ValueError(f'Unknown transcoder options: {", ".join(sorted(unknown_options))}')
+        options = {k: os.path.expanduser(v) if k in PATH_OPTIONS and isinstance(v, str) else v
+                   for k, v in options.items()}
+        options['quiet'] = True  # messages are never printed to the server console
+        return dataclasses.replace(self.defaults, **options)
+
+    def submit(self, options: dict) -> TranscodeJob:
+        """Queues a transcoding job with the given options"""
+        config = self.create_config(options)
+        with self.lock:
+            job = TranscodeJob(str(next(self.job_ids)), config)
+            self.jobs[job.job_id] = job
+            finished = [x for x in self.jobs.values() if x.done.is_set()]
+            for finished_job in finished[:max(0, len(finished) - self.max_finished_jobs)]:
+                del self.jobs[finished_job.job_id]
+        self.executor.submit(self.run_job, job)
+        return job
+
+    def get_job(self, job_id: str) -> TranscodeJob:
+        """Returns the job with the given id, or None once it has been forgotten"""
+        with self.lock:
+            return self.jobs.get(job_id, None)
+
+    def list_jobs(self) -> [TranscodeJob]:
+        """Returns the queued, running and most recently finished jobs"""
+        with self.lock:
+            return list(self.jobs.values())
+
+    def run_job(self, job: TranscodeJob):
+        """Runs a job on a pooled parser, recording its summary or the error it failed with"""
+        job.start()
+        try:
+            if job.config.frame_only is True:
+                summary = self.transcode(Transcoder.from_config(job.config))
+            else:
+                with self.parser_pool.checkout(job.config) as (parser, reused):
+                    job.warm_parser = reused
+                    summary = self.transcode(Transcoder.from_config(job.config, message_parser=parser))
+        except Exception as ex:  # pylint: disable=broad-except
+            logging.exception('Transcoding job %s failed', job.job_id)
+            job.finish(error=ex)
+            return
+        job.finish(summary)
+
+    @staticmethod
+    def transcode(transcoder: Transcoder) -> dict:
+        """Transcodes the source of a job, waiting for its output to be completely written"""
+        transcoder.transcode()
+        transcoder.output_manager.wait_for_completion()
+        return transcoder.summary()
+
+    def stats(self) -> dict:
+        """Returns the job counts by state and the parser pool counts"""
+        jobs = self.list_jobs()
+        return {
+            'version': __version__,
+            'jobs': {str(state): sum(1 for x in jobs if x.state == state) for state in TranscodeJobState},
+            'parsers_created': self.parser_pool.created_count,
+            'parsers_reused': self.parser_pool.reused_count,
+            'parsers_idle': self.parser_pool.idle_count()
+        }
+
+    def create_http_server(self, host: str = '127.0.0.1', port: int = 8080, socket_path: str = None):
+        """Returns an HTTP server for the jobs API, listening on the UNIX socket path if given, or else on host and
+        port"""
+        if socket_path is not None:
+            if os.path.exists(socket_path) and stat.S_ISSOCK(os.stat(socket_path).st_mode):
+                os.unlink(socket_path)  # left behind by a previous server
+            return ThreadingUnixHTTPServer(socket_path, self)
+        return TranscoderHTTPServer((host, port), self)
+
+    def shutdown(self):
+        """Waits for the queued and running jobs to finish"""
+        self.executor.shutdown(wait=True)
+
+
+class TranscoderHTTPServer(ThreadingHTTPServer):
+    """HTTP server of the jobs API of a transcoder server, listening on a host and port"""
+
+    def __init__(self, server_address: tuple, transcoder_server: TranscoderServer):
+        super().__init__(server_address, TranscoderRequestHandler)
+        self.transcoder_server = transcoder_server
+
+
+class ThreadingUnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """HTTP server of the jobs API of a transcoder server, listening on a UNIX domain socket"""
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, transcoder_server: TranscoderServer):
+        super().__init__(socket_path, TranscoderRequestHandler)
+        self.transcoder_server = transcoder_server
+
+
+class TranscoderRequestHandler(BaseHTTPRequestHandler):
+    """Jobs API: POST /jobs with a JSON object of TranscoderConfig fields queues a job, returning it when finished if
+    ?wait=true is given, GET /jobs and GET /jobs/<job_id> return jobs and GET /health the server stats"""
+
+    server_version = f'DatacastTranscoder/{__version__}'
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """Returns jobs or the server stats"""
+        transcoder_server: TranscoderServer = self.server.transcoder_server
+        path = urlparse(self.path).path.rstrip('/')
+        if path == '/health':
+            self.send_json(HTTPStatus.OK, transcoder_server.stats())
+        elif path == '/jobs':
+            self.send_json(HTTPStatus.OK, [x.to_dict() for x in transcoder_server.list_jobs()])
+        elif path.startswith('/jobs/'):
+            job = transcoder_server.get_job(path[len('/jobs/'):])
+            if job is None:
+                self.send_json(HTTPStatus.NOT_FOUND, {'error': 'Job not found'})
+            else:
+                self.send_json(HTTPStatus.OK, job.to_dict())
+        else:
+            self.send_json(HTTPStatus.NOT_FOUND, {'error': 'Not found'})
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        """Queues a job"""
+        transcoder_server: TranscoderServer = self.server.transcoder_server
+        url = urlparse(self.path)
+        if url.path.rstrip('/') != '/jobs':
+            self.send_json(HTTPStatus.NOT_FOUND, {'error': 'Not found'})
+            return
+
+        try:
+            body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            options = json.loads(body) if len(body) > 0 else {}
+            if not isinstance(options, dict):
+                raise ValueError('Job options must be a JSON object')
+            job = transcoder_server.submit(options)
+        except (ValueError, TypeError) as ex:
+            self.send_json(HTTPStatus.BAD_REQUEST, {'error': str(ex)})
+            return
+
+        if parse_qs(url.query).get('wait', ['false'])[0].lower() == 'true':
+            job.done.wait()
+            self.send_json(HTTPStatus.OK, job.to_dict())
+        else:
+            self.send_json(HTTPStatus.ACCEPTED, job.to_dict())
+
+    def send_json(self, status: HTTPStatus, body):
+        """Sends a JSON response"""
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def address_string(self):
+        # UNIX socket clients have no address
+        return self.client_address[0] if isinstance(self.client_address, tuple) else 'unix'
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        logging.debug('%s - %s', self.address_string(), format % args)
@@ -0,0 +1,75 @@
+#
+# Copyright 2023 Google LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+# pylint: disable=invalid-name
+
+"""
+CLI entry point for the market data transcoding server
+"""
+
+import argparse
+import logging
+import os
+
+from transcoder import __version__
+from transcoder.server import TranscoderServer
+
+
+def main():
+    """main entry point for the Datacast Transcoder server"""
+    arg_parser = argparse.ArgumentParser(description='Datacast Transcoder server process input arguments',
+                                         allow_abbrev=False)
+    listen_group = arg_parser.add_mutually_exclusive_group()
+    listen_group.add_argument('--socket', type=str, help='Path of the UNIX domain socket to listen on, instead of a '
+                                                         'TCP port')
+    listen_group.add_argument('--port', type=int, default=8080, help='TCP port to listen on')
+    arg_parser.add_argument('--host', type=str, default='127.0.0.1', help='Address to listen on for TCP connections')
+    arg_parser.add_argument('--max_workers', type=int, default=os.cpu_count(),
+                            help='Maximum number of jobs transcoded concurrently')
+    arg_parser.add_argument('--max_idle_parsers', type=int, default=4,
+                            help='Maximum number of idle parsers kept warm per schema file')
+    arg_parser.add_argument('--max_finished_jobs', type=int, default=1000,
+                            help='Number of finished jobs to keep the stats of')
+    arg_parser.add_argument('--log', choices=['notset', 'debug', 'info', 'warning', 'error', 'critical'],
+                            default='info',
+                            help='The default logging level')
+    arg_parser.add_argument('-v', '--version', action='version', version=f'Datacast Transcoder {__version__}')
+
+    args = arg_parser.parse_args()
+
+    logging.basicConfig(level=args.log.upper(), format='%(asctime)s %(threadName)s %(levelname)s %(message)s')
+
+    server = TranscoderServer(max_workers=args.max_workers, max_idle_parsers=args.max_idle_parsers,
+                              max_finished_jobs=args.max_finished_jobs)
+    socket_path = os.path.expanduser(args.socket) if args.socket is not None else None
+    http_server = server.create_http_server(args.host, args.port, socket_path)
+    logging.info('Listening on %s', socket_path if socket_path is not None else f'{args.host}:{args.port}')
+    try:
+        http_server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        http_server.server_close()
+        server.shutdown()
+        if socket_path is not None and os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+
+if __name__ == "__main__":
+    main()
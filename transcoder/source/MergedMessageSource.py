@@ -0,0 +1,127 @@
+#
+# Copyright 2023 Google LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+# pylint: disable=invalid-name
+
+import heapq
+import itertools
+from collections import deque
+
+from transcoder.source.Source import Source
+
+# Messages read ahead from each source at a time
+DEFAULT_MERGE_READ_AHEAD = 256
+
+
+class MergedMessageSource(Source):
+    """Merges the messages of several sources, such as the A and B feeds or the channels of a capture, into one
+    stream in timestamp order. Messages are ordered by the capture timestamps of their frames, or by the value
+    timestamp_reader reads from each raw message, such as a decoded timestamp field. Each source is expected to
+    be in timestamp order, and messages with equal timestamps are yielded in the order of the sources.
+
+    Sources are merged with a heap holding the next message of each, refilled from a buffer of up to read_ahead
+    messages per source, so memory is bounded by the number of sources rather than their size"""
+
+    @staticmethod
+    def source_type_identifier():
+        return 'merge'
+
+    def __init__(self, sources: [Source], timestamp_reader=None, read_ahead: int = DEFAULT_MERGE_READ_AHEAD):
+        super().__init__()
+        self.sources = sources
+        self.timestamp_reader = timestamp_reader
+        self.read_ahead = read_ahead
+
+    def open(self):
+        for source in self.sources:
+            source.open()
+
+    def close(self):
+        for source in self.sources:
+            source.close()
+
+    @property
+    def source_size(self):
+        sizes = [x.source_size for x in self.sources]
+        return sum(sizes) if None not in sizes else None
+
+    @property
+    def bytes_read(self):
+        counts = [x.bytes_read for x in self.sources]
+        return sum(counts) if None not in counts else None
+
+    @property
+    def message_count(self):
+        counts = [x.message_count for x in self.sources]
+        return sum(counts) if None not in counts else None
+
+    def _timestamped_messages(self, source: Source):
+        """Yields the (timestamp, message) of each message of a source. Messages without a timestamp, or whose
+        timestamp fails to decode, take the timestamp of the message before them, so they stay in their place in the
+        source and decode errors are reported when the message is transcoded"""
+        # Zero-copy sources may reuse the buffers of messages yielded earlier, so buffered messages are copied
+        copy = source.capabilities.supports_zero_copy is True
+        timestamp = None
+        if self.timestamp_reader is not None:
+            for message in source.get_message_iterator():
+                message = bytes(message) if copy else message
+                try:
+                    value = self.timestamp_reader(message)
+                except Exception:  # pylint: disable=broad-exception-caught
+                    value = None
+                timestamp = value if value is not None else timestamp
+                yield timestamp, message
+            return
+        for _, capture_timestamp, messages in source.get_frame_iterator():
+            if capture_timestamp is None:
+                raise MergedSourceError(f'{type(source).__name__} has no capture timestamps to merge by, merge by '
+                                        f'a timestamp field of the messages instead')
+            for message in messages:
+                yield capture_timestamp, bytes(message) if copy else message
+
+    def get_message_iterator(self):
+        # Heap entries are (timestamp key, source number, message), the source number breaking ties so messages are
+        # never compared. Messages before the first timestamp of their source sort ahead of every timestamp
+        iterators = [self._timestamped_messages(x) for x in self.sources]
+        buffers = [deque() for _ in self.sources]
+
+        def next_entry(number: int):
+            buffer = buffers[number]
+            if len(buffer) == 0:
+                buffer.extend(itertools.islice(iterators[number], self.read_ahead))
+                if len(buffer) == 0:
+                    return None
+            timestamp, message = buffer.popleft()
+            return (0, 0) if timestamp is None else (1, timestamp), number, message
+
+        heap = [x for x in map(next_entry, range(len(self.sources))) if x is not None]
+        heapq.heapify(heap)
+        while len(heap) > 0:
+            _, number, message = heap[0]
+            self.increment_count()
+            yield message
+            entry = next_entry(number)
+            if entry is not None:
+                heapq.heapreplace(heap, entry)
+            else:
+                heapq.heappop(heap)
+
+
+class MergedSourceError(Exception):
+    """Exception thrown when the messages of a merged source have no timestamps to be ordered by"""
@@ -17,9 +17,14 @@
 # limitations under the License.
 #
 
+from transcoder.PluginRegistry import PluginCapabilities
+
+
 class Source:
     """Class representing sources of market data"""
 
+    capabilities = PluginCapabilities()
+
     @staticmethod
     def source_type_identifier():
         """Returns identifier of source type"""
@@ -40,6 +45,48 @@ class Source:
         """Returns message iterator specific to source"""
         raise SourceFunctionNotDefinedError
 
+    @property
+    def source_size(self):
+        """Returns the size in bytes of the source, if known"""
+        return None
+
+    @property
+    def bytes_read(self):
+        """Returns the number of bytes read from the source so far, if known. Safe to call from other threads"""
+        return None
+
+    @property
+    def message_count(self):
+        """Returns the number of messages in the source, if known"""
+        return None
+
+    @property
+    def seekable(self) -> bool:
+        """Returns whether the opened source supports position and seek"""
+        return False
+
+    @property
+    def position(self):
+        """Returns the position following the last message yielded as a JSON serializable dict, for sources that can
+        seek back to it with seek, otherwise None"""
+        return None
+
+    def seek(self, position: dict):
+        """Moves an opened source to a position returned by position, before its message iterator is created.
+        Positions within a frame are returned with a skip_messages count of the messages of the frame to skip once
+        the frame is read again"""
+        raise SourceNotSeekableError(f'{type(self).__name__} does not support seeking')
+
+    def set_shard(self, shard_index: int, shard_count: int):
+        """Limits an unopened source to the zero based shard_index of shard_count byte ranges of it, each starting and
+        ending on a frame boundary, so shards can be transcoded independently"""
+        raise SourceNotShardableError(f'{type(self).__name__} does not support sharding')
+
+    def get_frame_iterator(self):
+        """Yields the (byte offset, capture timestamp, messages) of each frame of the source, for building a
+        MessageIndex. Frames are the units the source can seek to, a single message or a packet of them"""
+        raise SourceFunctionNotDefinedError
+
     def increment_count(self):
         """Increments count of messages"""
         self.record_count += 1
@@ -53,3 +100,11 @@ class Source:
 
 class SourceFunctionNotDefinedError(Exception):
     """Exception thrown by subclasses not overriding base class methods"""
+
+
+class SourceNotSeekableError(Exception):
+    """Exception thrown when seeking a source that cannot seek"""
+
+
+class SourceNotShardableError(Exception):
+    """Exception thrown when sharding a source that cannot be split into byte ranges"""
@@ -17,40 +17,77 @@
 # limitations under the License.
 #
 
+import glob
+import os
+
+from transcoder.PluginRegistry import PluginRegistry
 from transcoder.source import Source
 from transcoder.source.LineEncoding import LineEncoding
-from transcoder.source.file import PcapFileMessageSource, LengthDelimitedFileMessageSource, \
-    LineDelimitedFileMessageSource, CmeBinaryPacketFileMessageSource
+from transcoder.source.file.MessageIndex import INDEX_FILE_SUFFIX
+
+# Source identifier to the source class, imported only once the source is selected
+sources = PluginRegistry('market_data_transcoder.sources', {
+    'pcap': 'transcoder.source.file:PcapFileMessageSource',
+    'length_delimited': 'transcoder.source.file:LengthDelimitedFileMessageSource',
+    'line_delimited': 'transcoder.source.file:LineDelimitedFileMessageSource',
+    'cme_binary_packet': 'transcoder.source.file:CmeBinaryPacketFileMessageSource',
+    'fix_stream': 'transcoder.source.file:FixStreamFileMessageSource',
+    'synthetic': 'transcoder.source.synthetic:SyntheticMessageSource'
+})
 
 
 def all_source_identifiers():
     """List of all available source identifiers"""
-    return [
-        PcapFileMessageSource.source_type_identifier(),
-        LengthDelimitedFileMessageSource.source_type_identifier(),
-        LineDelimitedFileMessageSource.source_type_identifier(),
-        CmeBinaryPacketFileMessageSource.source_type_identifier()
-    ]
+    return sources.names()
+
+
+def get_source_class(source_file_format_type: str):
+    """Imports and returns the Source class registered for the supplied name"""
+    if source_file_format_type not in sources:
+        raise UnsupportedFileTypeError(f'Source {source_file_format_type} is not supported')
+    return sources.load(source_file_format_type)
+
+
+def is_multi_file_source(source_path: str) -> bool:
+    """Returns whether a source file argument is a directory or a glob pattern rather than a single file"""
+    return source_path is not None and (os.path.isdir(source_path) or glob.has_magic(source_path))
+
+
+def expand_source_paths(source_path: str) -> [str]:
+    """Returns the files of a directory, or the files matching a glob pattern, leaving out hidden files and sidecar
+    message indexes, in name order"""
+    pattern = os.path.join(source_path, '*') if os.path.isdir(source_path) else source_path
+    return sorted(x for x in glob.glob(pattern) if os.path.isfile(x) and not x.endswith(INDEX_FILE_SUFFIX))
+
+
+def multi_file_source_name(source_path: str) -> str:
+    """Returns the name of the directory of a directory or glob pattern source, or None if the pattern matches
+    files in more than one directory"""
+    directory = source_path if os.path.isdir(source_path) else os.path.dirname(source_path)
+    return os.path.basename(os.path.normpath(directory)) if directory and not glob.has_magic(directory) else None
 
 
-def get_message_source(source_loc: str,  # pylint: disable=too-many-arguments
+def get_message_source(source_loc: str,  # pylint: disable=too-many-arguments,too-many-locals
                        source_file_encoding: str, source_file_format_type: str,
                        endian: str, skip_bytes: int = 0, skip_lines: int = 0,
                         message_skip_bytes: int = 0, prefix_length: int = 2,
-                        base64: bool = False, base64_urlsafe: bool = False) -> Source:
+                        base64: bool = False, base64_urlsafe: bool = False,
+                        fix_separator: int = 1, factory: str = None, schema_file_path: str = None,
+                        synthetic_options: str = None) -> Source:
     """Returns a Source implementation instance based on the supplied source name"""
 
+    source_class = get_source_class(source_file_format_type)
     source: Source = None
 
-    if source_file_format_type == PcapFileMessageSource.source_type_identifier():
-        source = PcapFileMessageSource(source_loc, message_skip_bytes=message_skip_bytes)
-    elif source_file_format_type == LengthDelimitedFileMessageSource.source_type_identifier():
+    if source_file_format_type == 'pcap':
+        source = source_class(source_loc, message_skip_bytes=message_skip_bytes)
+    elif source_file_format_type == 'length_delimited':
 
-        source = LengthDelimitedFileMessageSource(source_loc, skip_bytes=skip_bytes,
-                                                  message_skip_bytes=message_skip_bytes,
-                                                  prefix_length=prefix_length)
+        source = source_class(source_loc, skip_bytes=skip_bytes,
+                              message_skip_bytes=message_skip_bytes,
+                              prefix_length=prefix_length)
 
-    elif source_file_format_type == LineDelimitedFileMessageSource.source_type_identifier():
+    elif source_file_format_type == 'line_delimited':
 
         if base64 is True:
             line_encoding = LineEncoding.BASE_64
@@ -59,17 +96,22 @@ def get_message_source(source_loc: str,  # pylint: disable=too-many-arguments
         else:
             line_encoding = LineEncoding.NONE
 
-        source = LineDelimitedFileMessageSource(source_loc,
-                                                encoding=source_file_encoding,
-                                                skip_lines=skip_lines,
-                                                line_encoding=line_encoding,
-                                                message_skip_bytes=message_skip_bytes)
-    elif source_file_format_type == CmeBinaryPacketFileMessageSource.source_type_identifier():
-        source = CmeBinaryPacketFileMessageSource(source_loc, endian, skip_bytes=skip_bytes,
-                                                  message_skip_bytes=message_skip_bytes,
-                                                  prefix_length=prefix_length)
-    else:
-        raise UnsupportedFileTypeError(f'Source {source_loc} is not supported')
+        source = source_class(source_loc,
+                              encoding=source_file_encoding,
+                              skip_lines=skip_lines,
+                              line_encoding=line_encoding,
+                              message_skip_bytes=message_skip_bytes)
+    elif source_file_format_type == 'cme_binary_packet':
+        source = source_class(source_loc, endian, skip_bytes=skip_bytes,
+                              message_skip_bytes=message_skip_bytes,
+                              prefix_length=prefix_length)
+    elif source_file_format_type == 'fix_stream':
+        source = source_class(source_loc, fix_separator=fix_separator, skip_bytes=skip_bytes)
+    elif source_file_format_type == 'synthetic':
+        source = source_class(factory, schema_file_path, synthetic_options=synthetic_options,
+                              fix_separator=fix_separator)
+    else:  # plugin sources are constructed from the source location only
+        source = source_class(source_loc)
     return source
 
 
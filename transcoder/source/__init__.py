@@ -19,4 +19,4 @@
 
 # pylint: disable=invalid-name
 
-from .SourceUtil import all_source_identifiers, get_message_source
+from .SourceUtil import all_source_identifiers, expand_source_paths, get_message_source, is_multi_file_source
@@ -19,6 +19,11 @@
 
 from transcoder.source.file import LengthDelimitedFileMessageSource
 
+# Length of the binary packet header of sequence number and sending time preceding the messages of a packet
+BINARY_PACKET_HEADER_LENGTH = 12
+# Length of the SBE message header of block length, template id, schema id and version following a message size
+SBE_MESSAGE_HEADER_LENGTH = 8
+
 
 class CmeBinaryPacketFileMessageSource(LengthDelimitedFileMessageSource):
     """CME binary package file message source implementation. Derives from length delimited source and overrides the
@@ -33,10 +38,67 @@ class CmeBinaryPacketFileMessageSource(LengthDelimitedFileMessageSource):
         super().__init__(file_path, skip_bytes=skip_bytes, endian=endian,
                          message_skip_bytes=message_skip_bytes,
                          prefix_length=prefix_length)
+        # Offset of the packet being read, and the message count before it, tracked without calling tell()
+        self.packet_offset = None
+        self.packet_record_count = 0
+        self.packet_header = None
+
+    @property
+    def frame_header_length(self) -> int:
+        return self.message_skip_bytes + self.prefix_length
+
+    @property
+    def max_frame_length(self) -> int:
+        return self.message_skip_bytes + self.prefix_length + (1 << 8 * self.prefix_length) - 1
+
+    def frame_length(self, data, position: int):
+        packet_start = position + self.message_skip_bytes + self.prefix_length
+        packet_length = int.from_bytes(data[packet_start - self.prefix_length:packet_start], self.endian)
+        packet_end = packet_start + packet_length
+        if packet_length < BINARY_PACKET_HEADER_LENGTH + self.prefix_length + SBE_MESSAGE_HEADER_LENGTH:
+            return None
+        if packet_end <= len(data):
+            # The sizes of the messages of the packet add up to the packet length
+            message_start = packet_start + BINARY_PACKET_HEADER_LENGTH
+            while message_start < packet_end:
+                message_size = int.from_bytes(data[message_start:message_start + self.prefix_length], self.endian)
+                if message_size < self.prefix_length + SBE_MESSAGE_HEADER_LENGTH:
+                    return None
+                message_start += message_size
+            if message_start != packet_end:
+                return None
+        return packet_end - position
+
+    @property
+    def position(self):
+        # Messages are only framed from the start of a packet, so the position is the packet and the messages of it
+        # already yielded
+        if self.packet_offset is None:
+            return None
+        return {'offset': self.packet_offset, 'skip_messages': self.record_count - self.packet_record_count}
+
+    def seek(self, position: dict):
+        self.seek_offset(position['offset'])
+
+    def get_frame_iterator(self):
+        # Each packet is a frame, captured at the sending time of its binary packet header
+        packet_offset, sending_time, messages = None, None, []
+        for message in self.get_message_iterator():
+            if self.packet_offset != packet_offset:
+                if len(messages) > 0:
+                    yield packet_offset, sending_time, messages
+                packet_offset, messages = self.packet_offset, []
+                sending_time = int.from_bytes(self.packet_header[4:12], 'little')
+            messages.append(message)
+        if len(messages) > 0:
+            yield packet_offset, sending_time, messages
 
     def get_message_iterator(self):
         # pylint: disable=duplicate-code
+        packet_offset = self.file_handle.tell() if self.file_handle.seekable() else None
         while True:
+            self.packet_offset = packet_offset
+            self.packet_record_count = self.record_count
             if self.message_skip_bytes > 0:
                 # Skip the channel id 2 bytes
                 skipped_bytes = self.file_handle.read(self.message_skip_bytes)
@@ -49,6 +111,8 @@ class CmeBinaryPacketFileMessageSource(LengthDelimitedFileMessageSource):
                 break
             message_length = int.from_bytes(parent_msg_bytes, self.endian)
             remaining_message_length = message_length
+            if packet_offset is not None:
+                packet_offset += self.message_skip_bytes + self.prefix_length + message_length
 
             # Skip binary packet header 12 bytes
             # Unable seek on a stream,
@@ -56,6 +120,7 @@ class CmeBinaryPacketFileMessageSource(LengthDelimitedFileMessageSource):
             packet_header_bytes = self.file_handle.read(12)
             if not packet_header_bytes:
                 break
+            self.packet_header = packet_header_bytes
 
             # Read message header message size 2 bytes
             msg_len_bytes = self.file_handle.read(self.prefix_length)
@@ -88,4 +153,6 @@ class CmeBinaryPacketFileMessageSource(LengthDelimitedFileMessageSource):
                 yield child_msg_bytes
                 remaining_message_length = remaining_message_length - child_message_length
 
-            self._log_percentage_read()
+            if self.log_percentage_read_enabled is True:
+
+                self._log_percentage_read()
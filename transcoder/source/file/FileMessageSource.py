@@ -17,13 +17,20 @@
 # limitations under the License.
 #
 
+import io
 import logging
 import os
 import sys
 from io import IOBase
 
 
-from transcoder.source.Source import Source, SourceFunctionNotDefinedError
+from transcoder.source.Source import Source, SourceFunctionNotDefinedError, SourceNotSeekableError, \
+    SourceNotShardableError
+from transcoder.source.file.FileShard import FileRangeReader, find_frame_boundary, split_point
+from transcoder.source.file.MessageIndex import MessageIndex, MessageIndexError
+
+# Number of messages read between logs of the percentage read, rather than calling tell() for every message
+PERCENTAGE_READ_LOG_INTERVAL = 10000
 
 
 class FileMessageSource(Source):
@@ -41,12 +48,33 @@ class FileMessageSource(Source):
         self.file_handle: IOBase = None
         self.file_size = 0
         self.log_percentage_read_enabled = logging.getLogger().isEnabledFor(logging.DEBUG)
+        self.percentage_read_countdown = PERCENTAGE_READ_LOG_INTERVAL
+        self.closed_bytes_read = None
+        # Header of the sidecar index of the source file, if one was built for it
+        self.index: MessageIndex = None
+        self.shard_index = None
+        self.shard_count = None
+        # Byte range of the shard, from the first frame at or after its split point to the first frame of the next
+        self.shard_start = None
+        self.shard_end = None
 
     def open(self):
-        if self.path is not None:
+        if hasattr(self.path, 'read'):  # an open binary file object, such as an in memory io.BytesIO buffer
+            self.file_handle = self.path if 'b' in self.file_open_mode \
+                else io.TextIOWrapper(self.path, encoding=self.file_encoding)
+            if self.path.seekable():
+                position = self.path.tell()
+                self.file_size = self.path.seek(0, os.SEEK_END)
+                self.path.seek(position)
+        elif self.path is not None:
             self.file_size = os.path.getsize(self.path)
-            self.file_handle = open(self.path, mode=self.file_open_mode,  # pylint: disable=consider-using-with
-                                    encoding=self.file_encoding)
+            self.index = self._read_index(header_only=True, required=False)
+            if self.shard_count is not None:
+                self.shard_start, self.shard_end = self.shard_range()
+                self.file_handle = io.BufferedReader(FileRangeReader(self.path, self.shard_end))
+            else:
+                self.file_handle = open(self.path, mode=self.file_open_mode,  # pylint: disable=consider-using-with
+                                        encoding=self.file_encoding)
         elif not sys.stdin.isatty():
             if sys.stdin.seekable():
                 sys.stdin.seek(0, os.SEEK_END)
@@ -57,16 +85,129 @@ class FileMessageSource(Source):
             self.file_handle = sys.stdin.buffer.raw
 
         self.prepare()
+        if self.shard_start is not None and self.shard_start > self.file_handle.tell():
+            self.file_handle.seek(self.shard_start)
 
     def prepare(self):
         """This is called after open. Prepare file for iteration, skips etc."""
 
+    @property
+    def frame_header_length(self) -> int:
+        """Returns the bytes of a frame read by frame_length, for sources that can be sharded, otherwise None"""
+        return None
+
+    @property
+    def data_offset(self) -> int:
+        """Returns the offset of the first frame, following any file header"""
+        return 0
+
+    @property
+    def max_frame_length(self) -> int:
+        """Returns the length of the longest frame frame_length accepts"""
+        return None
+
+    def frame_length(self, data, position: int) -> int:
+        """Returns the length of the frame at a position of data, or None if the frame header is not valid. Frames
+        extending beyond data are only checked as far as their header"""
+        raise SourceNotShardableError(f'{type(self).__name__} does not support sharding')
+
+    def set_shard(self, shard_index: int, shard_count: int):
+        if self.frame_header_length is None:
+            raise SourceNotShardableError(f'{type(self).__name__} does not support sharding')
+        if not isinstance(self.path, str):
+            raise SourceNotShardableError('Sharding requires a source file rather than a stream')
+        self.shard_index = shard_index
+        self.shard_count = shard_count
+
+    def shard_range(self) -> (int, int):
+        """Returns the byte range of the shard, each end aligned to the first frame at or after its split point. With
+        a sidecar index the frames are those of its entries, otherwise they are found by resynchronising on the framing
+        of the file"""
+        index = self._read_index(required=False)
+        with open(self.path, 'rb') as scan_file:
+            def boundary(shard_index: int) -> int:
+                if shard_index == 0:
+                    return self.data_offset
+                if shard_index == self.shard_count:
+                    return self.file_size
+                offset = max(split_point(self.file_size, shard_index, self.shard_count), self.data_offset)
+                if index is not None:
+                    return index.offset_at_or_after(offset)
+                return find_frame_boundary(scan_file, offset, self.data_offset, self.file_size,
+                                           max_frame_length=self.max_frame_length,
+                                           header_length=self.frame_header_length, frame_length=self.frame_length)
+
+            shard_range = boundary(self.shard_index), boundary(self.shard_index + 1)
+        logging.info('Shard %s of %s is bytes %s to %s of %s', self.shard_index, self.shard_count, *shard_range,
+                     self.file_size)
+        return shard_range
+
     def close(self):
+        self.closed_bytes_read = self.bytes_read
         self.file_handle.close()
 
     def get_message_iterator(self):
         raise SourceFunctionNotDefinedError
 
+    @property
+    def source_size(self):
+        if self.shard_end is not None:
+            return self.shard_end - self.shard_start
+        return self.file_size if self.file_size else None
+
+    @property
+    def bytes_read(self):
+        # The position of the binary stream, which is ahead of the messages yielded by up to a read buffer
+        if self.closed_bytes_read is not None:
+            return self.closed_bytes_read
+        stream = getattr(self.file_handle, 'buffer', self.file_handle)
+        try:
+            position = stream.tell() if stream is not None else None
+        except (OSError, ValueError):
+            return None
+        if position is not None and self.shard_start is not None:
+            return max(position - self.shard_start, 0)
+        return position
+
+    @property
+    def message_count(self):
+        # The index counts the messages of the whole file rather than those of a shard
+        return self.index.message_count if self.index is not None and self.shard_count is None else None
+
+    def _read_index(self, header_only: bool = False, required: bool = True):
+        index_path = MessageIndex.path_for(self.path) if isinstance(self.path, str) else None
+        if index_path is None or not os.path.exists(index_path):
+            if required is True:
+                raise MessageIndexError(f'No message index for {self.path}, build one with --build_index')
+            return None
+        try:
+            return MessageIndex.read(index_path, self.file_size, header_only=header_only)
+        except MessageIndexError as ex:
+            if required is True:
+                raise
+            logging.warning('Ignoring message index: %s', ex)
+            return None
+
+    def position_of_message(self, ordinal: int) -> dict:
+        """Returns the position of the message with the zero based ordinal, from the sidecar index"""
+        return self._read_index().position_of_message(ordinal)
+
+    def position_at_time(self, timestamp: int) -> dict:
+        """Returns the position of the last indexed frame captured at or before the timestamp, in nanoseconds since
+        the epoch, from the sidecar index"""
+        return self._read_index().position_at_time(timestamp)
+
+    def seek_offset(self, offset: int):
+        """Moves the file to a byte offset, for sources whose positions are the offset following a message"""
+        if not self.file_handle.seekable():
+            raise SourceNotSeekableError('Seeking requires a source file rather than a stream')
+        self.file_handle.seek(offset)
+
     def _log_percentage_read(self):
-        if self.file_size and self.log_percentage_read_enabled is True:
-            logging.debug('Percentage read: %f%%', round((self.file_handle.tell() / self.file_size) * 100, 6))
+        self.percentage_read_countdown -= 1
+        if self.percentage_read_countdown == 0 and self.message_count:
+            self.percentage_read_countdown = PERCENTAGE_READ_LOG_INTERVAL
+            logging.debug('Percentage read: %f%%', round((self.record_count / self.message_count) * 100, 6))
+        elif self.percentage_read_countdown == 0 and self.source_size:
+            self.percentage_read_countdown = PERCENTAGE_READ_LOG_INTERVAL
+            logging.debug('Percentage read: %f%%', round((self.bytes_read / self.source_size) * 100, 6))
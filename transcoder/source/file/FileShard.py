@@ -0,0 +1,141 @@
+#
+# Copyright 2023 Google LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+# pylint: disable=invalid-name
+
+import heapq
+import io
+
+# Bytes read at a time when resynchronising on the framing of a file
+SHARD_READ_SIZE = 1 << 16
+
+
+def shard_suffix(shard_index: int, shard_count: int) -> str:
+    """Returns the suffix appended to output names of a shard, such as -00002-of-00008"""
+    return f'-{shard_index:05d}-of-{shard_count:05d}'
+
+
+def split_point(size: int, shard_index: int, shard_count: int) -> int:
+    """Returns the byte offset a shard nominally starts at, before it is aligned to a frame"""
+    return size * shard_index // shard_count
+
+
+class FrameWalker:
+    """Follows frames of a binary file from any offset, reading the file as far as frames are followed.
+    frame_length returns the length of the frame at a position of the data read, or None if its header is invalid"""
+
+    def __init__(self, file, start: int, file_size: int, header_length: int, frame_length):
+        self.file = file
+        self.start = start
+        self.file_size = file_size
+        self.header_length = header_length
+        self.frame_length = frame_length
+        self.data = bytearray()
+
+    def next_frame(self, position: int) -> int:
+        """Returns the offset following the frame at a position, or None if no valid frame starts there"""
+        while True:
+            available = self.start + len(self.data)
+            if position + self.header_length <= available:
+                length = self.frame_length(self.data, position - self.start)
+                if length is None or position + length > self.file_size:
+                    return None
+                if position + length <= available:
+                    return position + length
+            elif available == self.file_size:
+                return None
+            self.file.seek(available)
+            self.data += self.file.read(SHARD_READ_SIZE)
+
+    def merge_chains(self, end: int) -> int:
+        """Follows the chains of frames from every offset from start to end, returning the first offset every chain
+        still valid passes through. Chains from offsets within frames merge into the chain of frame boundaries or
+        become invalid, so when a frame starts between start and end the offset returned is a frame boundary"""
+        positions = list(range(self.start, min(end, self.file_size)))
+        members = set(positions)
+        while len(positions) > 0:
+            position = heapq.heappop(positions)
+            members.discard(position)
+            if len(members) == 0:
+                return position
+            following = self.next_frame(position) if position < self.file_size else None
+            if following is not None and following not in members:
+                members.add(following)
+                heapq.heappush(positions, following)
+        return None
+
+
+def find_frame_boundary(file, offset: int, data_offset: int, file_size: int, *, max_frame_length: int,
+                        header_length: int, frame_length) -> int:
+    """Returns the offset of the first frame starting at or after a byte offset of a binary file, or the file size if
+    none does, by resynchronising on its framing. The chains of frames from each offset of a window at least as long
+    as the longest frame merge into the chain of frame boundaries, and the window is moved back from the offset until
+    they merge before it, or it reaches data_offset where the first frame starts"""
+    window = max_frame_length
+    while True:
+        start = max(offset - window, data_offset)
+        walker = FrameWalker(file, start, file_size, header_length, frame_length)
+        boundary = start if start == data_offset else walker.merge_chains(start + max_frame_length)
+        if boundary is not None and boundary <= offset:
+            break
+        window *= 2
+    while boundary is not None and boundary < offset:
+        boundary = walker.next_frame(boundary)
+    return boundary if boundary is not None else file_size
+
+
+class FileRangeReader(io.RawIOBase):
+    """Raw binary file that reads as ending at a byte offset, so a source reads no further than the end of its shard.
+    Wrapped in an io.BufferedReader"""
+
+    def __init__(self, path: str, end: int):
+        super().__init__()
+        self.file = io.FileIO(path)
+        self.name = path
+        self.end = end
+        self.offset = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def readinto(self, buffer):
+        remaining = self.end - self.offset
+        if remaining <= 0:
+            return 0
+        with memoryview(buffer) as view:
+            count = self.file.readinto(view[:remaining])
+        self.offset += count
+        return count
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        self.offset = self.file.seek(offset, whence)
+        return self.offset
+
+    def tell(self):
+        return self.offset
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+        super().close()
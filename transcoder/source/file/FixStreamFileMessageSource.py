@@ -0,0 +1,150 @@
+#
+# Copyright 2023 Google LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+import logging
+
+from transcoder.PluginRegistry import PluginCapabilities
+from transcoder.source.file.FileMessageSource import FileMessageSource
+
+BEGIN_STRING_PREFIX = b'8=FIX'
+BODY_LENGTH_PREFIX = b'9='
+CHECKSUM_PREFIX = b'10='
+CHECKSUM_DIGITS = 3
+MAX_BEGIN_STRING_FIELD_LENGTH = 16
+MAX_BODY_LENGTH_DIGITS = 9
+
+INCOMPLETE_FRAME = None
+INVALID_FRAME = -1
+
+
+class FixStreamFileMessageSource(FileMessageSource):
+    """Frames FIX messages from a stream of concatenated messages using the BeginString, BodyLength and CheckSum
+    fields, so messages need not be line or length delimited. Frames are yielded as memoryviews over the read
+    buffer, and data that does not frame is skipped until the next BeginString"""
+
+    capabilities = PluginCapabilities(supports_zero_copy=True)
+
+    @staticmethod
+    def source_type_identifier():
+        return 'fix_stream'
+
+    def __init__(self, file_path: str, fix_separator: int = 1, skip_bytes: int = 0,
+                 read_buffer_size: int = 1 << 22, max_body_length: int = 1 << 20):
+        super().__init__(file_path, file_open_mode='rb')
+        self.separator = chr(fix_separator).encode('UTF-8')
+        self.skip_bytes = skip_bytes
+        self.read_buffer_size = read_buffer_size
+        self.max_body_length = max_body_length
+        self.skipped_byte_count = 0
+
+    def prepare(self):
+        if self.skip_bytes > 0:
+            self.file_handle.read(self.skip_bytes)
+
+    def get_message_iterator(self):
+        buffer = b''
+        view = memoryview(buffer)
+        position = 0
+        end_of_file = False
+        while True:
+            start = buffer.find(BEGIN_STRING_PREFIX, position)
+            end = INCOMPLETE_FRAME if start == -1 else self.frame_end(buffer, start)
+
+            if end is INCOMPLETE_FRAME and end_of_file is True:
+                if start == -1:
+                    self._skip(buffer, position, len(buffer))
+                    break
+                end = INVALID_FRAME  # truncated, or a BeginString within skipped data
+
+            if end is INCOMPLETE_FRAME:
+                # Keep the partial frame, or a possibly split BeginString, for the next read
+                keep_from = start if start != -1 else max(position, len(buffer) - len(BEGIN_STRING_PREFIX) + 1)
+                self._skip(buffer, position, keep_from)
+                data = self.file_handle.read(self.read_buffer_size)
+                end_of_file = not data
+                buffer = buffer[keep_from:] + data
+                view = memoryview(buffer)
+                position = 0
+                if self.log_percentage_read_enabled is True:
+                    self._log_percentage_read()
+                continue
+
+            if end == INVALID_FRAME:
+                self._skip(buffer, position, start + 1)
+                position = start + 1
+                continue
+
+            self._skip(buffer, position, start)
+            yield view[start:end]
+            self.increment_count()
+            position = end
+
+        if self.skipped_byte_count > 0:
+            logging.warning('Skipped %d bytes that could not be framed as FIX messages', self.skipped_byte_count)
+
+    def frame_end(self, buffer: bytes, start: int):
+        """Returns the offset following the CheckSum field of the message starting at start, INCOMPLETE_FRAME if more
+        data is needed, or INVALID_FRAME if the BodyLength does not lead to a CheckSum field"""
+        separator = self.separator
+        buffer_length = len(buffer)
+
+        length_start = self.body_length_start(buffer, start)
+        if length_start in (INCOMPLETE_FRAME, INVALID_FRAME):
+            return length_start
+
+        length_end = buffer.find(separator, length_start, length_start + MAX_BODY_LENGTH_DIGITS + 1)
+        if length_end == -1:
+            return INCOMPLETE_FRAME if buffer_length <= length_start + MAX_BODY_LENGTH_DIGITS else INVALID_FRAME
+        body_length = buffer[length_start:length_end]
+        if not body_length.isdigit() or int(body_length) > self.max_body_length:
+            return INVALID_FRAME
+
+        # BodyLength counts the bytes from the field following it up to and including the separator before CheckSum
+        checksum_start = length_end + len(separator) + int(body_length)
+        checksum_end = checksum_start + len(CHECKSUM_PREFIX) + CHECKSUM_DIGITS
+        end = checksum_end + len(separator)
+        if buffer_length < end:
+            return INCOMPLETE_FRAME
+        if not buffer.startswith(CHECKSUM_PREFIX, checksum_start) \
+                or not buffer[checksum_end - CHECKSUM_DIGITS:checksum_end].isdigit() \
+                or not buffer.startswith(separator, checksum_end):
+            return INVALID_FRAME
+        return end
+
+    def body_length_start(self, buffer: bytes, start: int):
+        """Returns the offset of the BodyLength value following the BeginString field starting at start,
+        INCOMPLETE_FRAME if more data is needed, or INVALID_FRAME if the fields are not a BeginString and BodyLength"""
+        buffer_length = len(buffer)
+        begin_string_end = buffer.find(self.separator, start, start + MAX_BEGIN_STRING_FIELD_LENGTH)
+        if begin_string_end == -1:
+            return INCOMPLETE_FRAME if buffer_length < start + MAX_BEGIN_STRING_FIELD_LENGTH else INVALID_FRAME
+        if buffer.find(b'=', start + 2, begin_string_end) != -1:
+            return INVALID_FRAME
+
+        length_start = begin_string_end + len(self.separator) + len(BODY_LENGTH_PREFIX)
+        if buffer_length < length_start:
+            return INCOMPLETE_FRAME
+        if not buffer.startswith(BODY_LENGTH_PREFIX, length_start - len(BODY_LENGTH_PREFIX)):
+            return INVALID_FRAME
+        return length_start
+
+    def _skip(self, buffer: bytes, start: int, end: int):
+        # Whitespace between messages, such as line breaks in FIX logs, is expected and not counted
+        if end > start and buffer[start:end].strip():
+            self.skipped_byte_count += end - start
@@ -19,6 +19,10 @@
 
 from transcoder.source.file.FileMessageSource import FileMessageSource
 
+# Longest message length accepted when resynchronising on the length prefixes of a file to shard it. Messages are
+# expected to have been captured from network packets, so a longer length marks an offset within a message
+SHARD_MAX_MESSAGE_LENGTH = 1500
+
 
 class LengthDelimitedFileMessageSource(FileMessageSource):
     """Reads length delimited files and yields individual records for message consumption"""
@@ -40,6 +44,44 @@ class LengthDelimitedFileMessageSource(FileMessageSource):
         if self.skip_bytes > 0:
             self.file_handle.read(self.skip_bytes)
 
+    @property
+    def data_offset(self) -> int:
+        return self.skip_bytes
+
+    @property
+    def frame_header_length(self) -> int:
+        return self.prefix_length
+
+    @property
+    def max_frame_length(self) -> int:
+        return self.prefix_length + SHARD_MAX_MESSAGE_LENGTH + self.message_skip_bytes
+
+    def frame_length(self, data, position: int):
+        message_length = int.from_bytes(data[position:position + self.prefix_length], self.endian)
+        if message_length == 0 or message_length > SHARD_MAX_MESSAGE_LENGTH:
+            return None
+        return self.prefix_length + message_length + self.message_skip_bytes
+
+    @property
+    def seekable(self) -> bool:
+        return self.file_handle.seekable()
+
+    @property
+    def position(self):
+        return {'offset': self.file_handle.tell()} if self.seekable else None
+
+    def seek(self, position: dict):
+        self.seek_offset(position['offset'])
+
+    def get_frame_iterator(self):
+        # Offsets follow from the message lengths rather than calling tell() for every message. The skipped bytes
+        # are read both from the message and after it
+        offset = self.file_handle.tell()
+        frame_overhead = self.prefix_length + 2 * self.message_skip_bytes
+        for message in self.get_message_iterator():
+            yield offset, None, (message,)
+            offset += frame_overhead + len(message)
+
     def get_message_iterator(self):
         # pylint: disable=duplicate-code
         while True:
@@ -67,4 +109,6 @@ class LengthDelimitedFileMessageSource(FileMessageSource):
             else:
                 yield msg_bytes
 
-            self._log_percentage_read()
+            if self.log_percentage_read_enabled is True:
+
+                self._log_percentage_read()
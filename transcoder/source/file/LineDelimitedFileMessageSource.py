@@ -50,7 +50,8 @@ class LineDelimitedFileMessageSource(FileMessageSource):
         while line := self.file_handle.readline():
             self.increment_count()
             yield self.decode_message(line)
-            self._log_percentage_read()
+            if self.log_percentage_read_enabled is True:
+                self._log_percentage_read()
 
     def decode_message(self, record):
         """Performs line decoding and message skip bytes for line encoded cases"""
@@ -0,0 +1,147 @@
+#
+# Copyright 2023 Google LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+# pylint: disable=invalid-name
+
+import bisect
+import os
+import struct
+from array import array
+
+# Appended to the source file path to give the path of its index
+INDEX_FILE_SUFFIX = '.idx'
+# Messages between index entries
+DEFAULT_INDEX_INTERVAL = 1024
+
+INDEX_MAGIC = b'TXIDX1'
+# Magic, entry interval, message count, source size and entry count
+INDEX_HEADER = struct.Struct('<6s2xQQQQ')
+# Message ordinal, byte offset of the frame starting with the message, capture timestamp in nanoseconds since the
+# epoch and template id, -1 where the source has no timestamps or the template id is not known
+INDEX_ENTRY = struct.Struct('<QQqi')
+
+
+class MessageIndex:
+    """Sidecar index of the messages of a source file, holding an entry for the first message of a frame every
+    interval messages. Entries are held in columns, ordered by message ordinal, for binary search by ordinal or
+    capture timestamp. Seeking to an entry is exact, and a message between entries is reached by skipping at most
+    interval messages from the entry before it"""
+
+    def __init__(self, interval: int = DEFAULT_INDEX_INTERVAL, source_size: int = None, message_count: int = 0):
+        self.interval = interval
+        self.source_size = source_size
+        self.message_count = message_count
+        self.ordinals = array('Q')
+        self.offsets = array('Q')
+        self.timestamps = array('q')
+        self.template_ids = array('i')
+
+    @staticmethod
+    def path_for(source_path: str) -> str:
+        """Returns the path of the index of a source file"""
+        return source_path + INDEX_FILE_SUFFIX
+
+    def __len__(self):
+        return len(self.ordinals)
+
+    def append(self, ordinal: int, offset: int, timestamp: int = None, template_id: int = None):
+        """Appends an entry, in message ordinal order"""
+        self.ordinals.append(ordinal)
+        self.offsets.append(offset)
+        self.timestamps.append(timestamp if timestamp is not None else -1)
+        self.template_ids.append(template_id if template_id is not None else -1)
+
+    def entry(self, index: int) -> tuple:
+        """Returns the (ordinal, offset, timestamp, template id) of an entry"""
+        return self.ordinals[index], self.offsets[index], self.timestamps[index], self.template_ids[index]
+
+    def position_of_message(self, ordinal: int) -> dict:
+        """Returns the source position of the message with the zero based ordinal: the offset of the closest entry at
+        or before it, with the messages to skip from there"""
+        if ordinal < 0 or ordinal >= self.message_count:
+            raise MessageIndexError(f'Message {ordinal} is out of range, the source has {self.message_count} messages')
+        index = bisect.bisect_right(self.ordinals, ordinal) - 1
+        return {'offset': self.offsets[index], 'skip_messages': ordinal - self.ordinals[index]}
+
+    def position_at_time(self, timestamp: int) -> dict:
+        """Returns the source position of the last entry captured at or before the timestamp, in nanoseconds since the
+        epoch, or the first entry if all are captured after it. Capture timestamps are expected to not decrease"""
+        if len(self) == 0 or self.timestamps[0] < 0:
+            raise MessageIndexError('The index has no capture timestamps to seek by')
+        index = max(bisect.bisect_right(self.timestamps, timestamp) - 1, 0)
+        return {'offset': self.offsets[index], 'skip_messages': 0}
+
+    def offset_at_or_after(self, offset: int) -> int:
+        """Returns the offset of the first entry at or after a byte offset, or the source size if there is none"""
+        index = bisect.bisect_left(self.offsets, offset)
+        return self.offsets[index] if index < len(self) else self.source_size
+
+    def write(self, path: str):
+        """Writes the index, replacing any existing file atomically"""
+        temp_path = path + '.tmp'
+        with open(temp_path, 'wb') as index_file:
+            index_file.write(INDEX_HEADER.pack(INDEX_MAGIC, self.interval, self.message_count,
+                                               self.source_size or 0, len(self)))
+            pack = INDEX_ENTRY.pack
+            index_file.write(b''.join(pack(*self.entry(x)) for x in range(len(self))))
+        os.replace(temp_path, path)
+
+    @classmethod
+    def read(cls, path: str, source_size: int = None, header_only: bool = False) -> 'MessageIndex':
+        """Reads an index, raising MessageIndexError if it was built for a source of another size. With header_only
+        only the message count and interval are read"""
+        with open(path, 'rb') as index_file:
+            header = index_file.read(INDEX_HEADER.size)
+            if len(header) < INDEX_HEADER.size or header[:len(INDEX_MAGIC)] != INDEX_MAGIC:
+                raise MessageIndexError(f'{path} is not a message index')
+            _, interval, message_count, indexed_size, entry_count = INDEX_HEADER.unpack(header)
+            if source_size is not None and indexed_size != source_size:
+                raise MessageIndexError(f'{path} indexes a source of {indexed_size} bytes, not {source_size} bytes')
+            index = cls(interval, indexed_size, message_count)
+            if header_only is True:
+                return index
+            data = index_file.read(entry_count * INDEX_ENTRY.size)
+
+        if len(data) != entry_count * INDEX_ENTRY.size:
+            raise MessageIndexError(f'{path} is truncated')
+        for entry in INDEX_ENTRY.iter_unpack(data):
+            index.append(*entry)
+        return index
+
+
+def build_index(source, interval: int = DEFAULT_INDEX_INTERVAL, template_id_reader=None) -> MessageIndex:
+    """Frames every message of an unopened source, returning an index with an entry for the first message of the
+    first frame starting at or after every interval messages. template_id_reader returns the template id of a raw
+    message, such as MessageFactory.get_template_id_reader"""
+    index = MessageIndex(interval)
+    ordinal, next_ordinal = 0, 0
+    with source:
+        index.source_size = source.source_size
+        for offset, timestamp, messages in source.get_frame_iterator():
+            if ordinal >= next_ordinal and len(messages) > 0:
+                template_id = template_id_reader(messages[0]) if template_id_reader is not None else None
+                index.append(ordinal, offset, timestamp, template_id)
+                next_ordinal = ordinal + interval
+            ordinal += len(messages)
+    index.message_count = ordinal
+    return index
+
+
+class MessageIndexError(Exception):
+    """Exception thrown for a missing, stale or invalid message index, or a position it cannot resolve"""
@@ -18,11 +18,23 @@
 #
 
 import logging
+import struct
 
 import dpkt
 
+from transcoder.source.Source import SourceNotShardableError
 from transcoder.source.file.FileMessageSource import FileMessageSource
 
+# Length of the header at the start of a pcap file
+PCAP_FILE_HEADER_LENGTH = 24
+# Length of the header preceding each packet record of a pcap file
+PCAP_RECORD_HEADER_LENGTH = 16
+NANOSECONDS_PER_SECOND = 1_000_000_000
+# Magic numbers of pcap files with microsecond and nanosecond timestamps, by the divisor of their fractional seconds
+PCAP_MAGIC_DIVISORS = {0xa1b2c3d4: 1_000_000, 0xa1b23c4d: NANOSECONDS_PER_SECOND}
+# Seconds from the first packet that a packet record found when resynchronising to shard a capture can be captured at
+SHARD_MAX_CAPTURE_SPAN = 7 * 24 * 60 * 60
+
 
 class PcapFileMessageSource(FileMessageSource):
     """Reads pcap files and yields individual records for message consumption"""
@@ -36,22 +48,93 @@ class PcapFileMessageSource(FileMessageSource):
         self.message_skip_bytes = message_skip_bytes
         self.pcap_reader: dpkt.pcap.Reader = None
         self.length_threshold = length_threshold
+        # Packet record framing, read from the file header and first record when the capture is sharded
+        self.record_header: struct.Struct = None
+        self.snaplen = None
+        self.fraction_divisor = None
+        self.first_seconds = None
 
     def prepare(self):
         self.pcap_reader = dpkt.pcap.Reader(self.file_handle)
 
+    @property
+    def data_offset(self) -> int:
+        return PCAP_FILE_HEADER_LENGTH
+
+    @property
+    def frame_header_length(self) -> int:
+        return PCAP_RECORD_HEADER_LENGTH
+
+    @property
+    def max_frame_length(self) -> int:
+        return PCAP_RECORD_HEADER_LENGTH + self.snaplen
+
+    def frame_length(self, data, position: int):
+        seconds, fraction, captured_length, length = self.record_header.unpack_from(data, position)
+        if captured_length == 0 or captured_length > self.snaplen or captured_length > length \
+                or fraction >= self.fraction_divisor or abs(seconds - self.first_seconds) > SHARD_MAX_CAPTURE_SPAN:
+            return None
+        return PCAP_RECORD_HEADER_LENGTH + captured_length
+
+    def shard_range(self) -> (int, int):
+        with open(self.path, 'rb') as pcap_file:
+            header = pcap_file.read(PCAP_FILE_HEADER_LENGTH + PCAP_RECORD_HEADER_LENGTH)
+        for byte_order in '<>':
+            magic = struct.unpack_from(byte_order + 'I', header)[0] if len(header) >= 4 else None
+            if magic in PCAP_MAGIC_DIVISORS:
+                break
+        else:
+            raise SourceNotShardableError(f'{self.path} is not a pcap file')
+        self.fraction_divisor = PCAP_MAGIC_DIVISORS[magic]
+        self.snaplen = struct.unpack_from(byte_order + 'I', header, 16)[0]
+        self.record_header = struct.Struct(byte_order + 'IIII')
+        if len(header) == PCAP_FILE_HEADER_LENGTH + PCAP_RECORD_HEADER_LENGTH:
+            self.first_seconds = self.record_header.unpack_from(header, PCAP_FILE_HEADER_LENGTH)[0]
+        return super().shard_range()
+
+    @property
+    def seekable(self) -> bool:
+        return self.file_handle.seekable()
+
+    @property
+    def position(self):
+        # The reader reads each packet straight from the file, so the file offset follows the last packet yielded
+        return {'offset': self.file_handle.tell()} if self.seekable else None
+
+    def seek(self, position: dict):
+        self.seek_offset(position['offset'])
+
+    def get_frame_iterator(self):
+        # Offsets follow from the record lengths rather than calling tell() for every packet, and timestamps are
+        # rounded to the resolution of the capture
+        offset = self.file_handle.tell()
+        divisor = int(self.pcap_reader._divisor)  # pylint: disable=protected-access
+        scale = NANOSECONDS_PER_SECOND // divisor
+        for timestamp, packet in self.pcap_reader:
+            payload = self._get_payload(packet)
+            if payload is not None:
+                self.increment_count()
+                yield offset, round(timestamp * divisor) * scale, (payload,)
+            offset += PCAP_RECORD_HEADER_LENGTH + len(packet)
+
+    def _get_payload(self, packet):
+        # pylint: disable=no-member
+        ethernet = dpkt.ethernet.Ethernet(packet)
+        if not isinstance(ethernet.data, dpkt.ip.IP):
+            logging.debug('Packet type not supported %s\n', ethernet.data.__class__.__name__)
+            return None
+        proto = ethernet.ip.tcp if 'tcp' in ethernet.ip.__dict__.keys() else ethernet.ip.udp
+        pck_len = len(proto.data)
+        if pck_len > self.length_threshold:
+            return proto.data[self.message_skip_bytes:pck_len]
+        return None
+
     def get_message_iterator(self):
         # pylint: disable=unused-variable
-        # pylint: disable=no-member
         for timestamp, packet in self.pcap_reader:
-            ethernet = dpkt.ethernet.Ethernet(packet)
-            if not isinstance(ethernet.data, dpkt.ip.IP):
-                logging.debug('Packet type not supported %s\n', ethernet.data.__class__.__name__)
-            else:
-                proto = ethernet.ip.tcp if 'tcp' in ethernet.ip.__dict__.keys() else ethernet.ip.udp
-                pck_len = len(proto.data)
-                if pck_len > self.length_threshold:
-                    stripped = proto.data[self.message_skip_bytes:pck_len]
-                    yield stripped
-                    self.increment_count()
-            self._log_percentage_read()
+            stripped = self._get_payload(packet)
+            if stripped is not None:
+                yield stripped
+                self.increment_count()
+            if self.log_percentage_read_enabled is True:
+                self._log_percentage_read()
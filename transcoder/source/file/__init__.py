@@ -19,8 +19,23 @@
 
 # pylint: disable=invalid-name
 
+from typing import TYPE_CHECKING
+
+from transcoder.LazyImportUtil import lazy_exports
 from .FileMessageSource import FileMessageSource
-from .LengthDelimitedFileMessageSource import LengthDelimitedFileMessageSource
-from .LineDelimitedFileMessageSource import LineDelimitedFileMessageSource
-from .PcapFileMessageSource import PcapFileMessageSource
-from .CmeBinaryPacketFileMessageSource import CmeBinaryPacketFileMessageSource
+from .MessageIndex import MessageIndex
+
+if TYPE_CHECKING:
+    from .LengthDelimitedFileMessageSource import LengthDelimitedFileMessageSource
+    from .LineDelimitedFileMessageSource import LineDelimitedFileMessageSource
+    from .PcapFileMessageSource import PcapFileMessageSource
+    from .CmeBinaryPacketFileMessageSource import CmeBinaryPacketFileMessageSource
+    from .FixStreamFileMessageSource import FixStreamFileMessageSource
+
+__getattr__, __dir__ = lazy_exports(__name__, [
+    'LengthDelimitedFileMessageSource',
+    'LineDelimitedFileMessageSource',
+    'PcapFileMessageSource',
+    'CmeBinaryPacketFileMessageSource',
+    'FixStreamFileMessageSource'
+])
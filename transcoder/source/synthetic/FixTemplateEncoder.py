@@ -0,0 +1,167 @@
+#
+# Copyright 2023 Google LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+# pylint: disable=invalid-name
+
+import functools
+import random
+import re
+import string
+import time
+
+from third_party.pyfixmsg.reference import Component, FixSpec, FixTag, Group
+from transcoder.source.synthetic.MessageTemplate import FieldPatch, MessageTemplate
+
+# Width of the zero padded MsgSeqNum, so that the BodyLength of a template does not change as it is patched
+SEQUENCE_WIDTH = 9
+# Width of a UTCTIMESTAMP with milliseconds, YYYYMMDD-HH:MM:SS.sss
+TIMESTAMP_WIDTH = 21
+# Tags written from the message type rather than sampled
+HEADER_TAG_VALUES = {49: b'SENDER', 56: b'TARGET'}
+SKIPPED_TAGS = {8, 9, 10, 34, 35, 52}
+# Types of tags that are written with a length tag or group, and are left out of templates
+SKIPPED_TYPES = {'data', 'length', 'numingroup'}
+
+
+@functools.lru_cache(maxsize=4)
+def timestamp_text(millisecond: int) -> (bytes, int):
+    """Returns a UTCTIMESTAMP with milliseconds and the sum of its bytes, cached as consecutive messages mostly
+    share a millisecond"""
+    second, millisecond = divmod(millisecond, 1000)
+    text = time.strftime('%Y%m%d-%H:%M:%S', time.gmtime(second)).encode('ascii') + b'.%03d' % millisecond
+    return text, sum(text)
+
+
+class FixMessageTemplate(MessageTemplate):  # pylint: disable=too-few-public-methods
+    """A FIX message template, patched with a zero padded MsgSeqNum and fixed width timestamps so that the BodyLength
+    is unchanged, and the CheckSum updated for the patched bytes"""
+
+    __slots__ = ['unpatched_sum']
+
+    def __init__(self, name: str, buffer: bytes, patches: [FieldPatch], checksum_offset: int):
+        # The CheckSum digits are patched last, and the final segment is the separator following them
+        super().__init__(name, buffer, patches + [FieldPatch(None, checksum_offset, 3)])
+        self.unpatched_sum = sum(buffer[:checksum_offset - 3]) - sum(
+            sum(buffer[x.offset:x.offset + x.width]) for x in patches)
+
+    def render(self, sequence: int, timestamp: int) -> bytes:
+        checksum = self.unpatched_sum
+        timestamp_bytes, timestamp_sum = timestamp_text(timestamp // 1_000_000)
+        segments = self.segments
+        parts = []
+        for i, patch in enumerate(self.patches):
+            parts.append(segments[i])
+            if patch.is_timestamp is False:
+                text = b'%09d' % (sequence % 1_000_000_000)
+                sequence += 1
+                checksum += sum(text)
+            elif patch.is_timestamp:
+                text = timestamp_bytes
+                checksum += timestamp_sum
+            else:
+                text = b'%03d' % (checksum % 256)
+            parts.append(text)
+        parts.append(segments[-1])
+        return b''.join(parts)
+
+
+class FixTemplateEncoder:
+    """Encodes message templates with sampled field values from a FIX specification. Required fields and groups are
+    always written, optional ones with the given probability, and every field of a repeating group entry"""
+
+    def __init__(self, spec: FixSpec, group_sizes: (int, int) = (1, 4), seed: int = 1,  # pylint: disable=too-many-arguments
+                 fix_separator: int = 1, optional_probability: float = 0.5):
+        self.spec = spec
+        self.group_sizes = group_sizes
+        self.random = random.Random(seed)
+        self.separator = chr(fix_separator).encode('UTF-8')
+        self.optional_probability = optional_probability
+        self.begin_string = re.sub(r'^FIX(\d)', r'FIX.\1', spec.version).encode('ascii')
+
+    def message_types(self) -> dict:
+        """Returns the message types of the specification by name"""
+        return {x.name: x for key, x in self.spec.msg_types.items() if isinstance(key, str)}
+
+    def encode(self, message_type) -> FixMessageTemplate:
+        """Returns a template of the message type, with sampled field values and repeating group sizes"""
+        fields = [(35, message_type.msgtype.encode('ascii'), None), (49, HEADER_TAG_VALUES[49], None),
+                  (56, HEADER_TAG_VALUES[56], None), (34, b'0' * SEQUENCE_WIDTH, False),
+                  (52, b'0' * TIMESTAMP_WIDTH, True)]
+        self.encode_composition(message_type.composition, fields, False)
+
+        body = bytearray()
+        body_patches = []
+        for tag, value, is_timestamp in fields:
+            body += b'%d=' % tag
+            if is_timestamp is not None:
+                body_patches.append((is_timestamp, len(body), len(value)))
+            body += value + self.separator
+        prefix = b'8=' + self.begin_string + self.separator + b'9=%d' % len(body) + self.separator
+        buffer = prefix + bytes(body) + b'10=000' + self.separator
+        patches = [FieldPatch(is_timestamp, len(prefix) + offset, width)
+                   for is_timestamp, offset, width in body_patches]
+        return FixMessageTemplate(message_type.name, buffer, patches, len(prefix) + len(body) + 3)
+
+    def encode_composition(self, composition, fields: list, include_all: bool):
+        """Appends the (tag, value, is_timestamp) of the fields, components and groups of a composition"""
+        for element, required in composition:
+            included = include_all or required or self.random.random() < self.optional_probability
+            if isinstance(element, FixTag):
+                if included and element.tag not in SKIPPED_TAGS and (element.type or '').lower() not in SKIPPED_TYPES:
+                    fields.append(self.encode_tag(element))
+            elif isinstance(element, Component):
+                if included:
+                    self.encode_composition(element.composition, fields, include_all)
+            elif isinstance(element, Group) and included:
+                count = self.random.randint(*self.group_sizes)
+                fields.append((element.count_tag.tag, b'%d' % count, None))
+                for _ in range(count):
+                    self.encode_composition(element.composition, fields, True)
+
+    def encode_tag(self, tag: FixTag) -> tuple:
+        """Returns the (tag, value, is_timestamp) of a tag, with is_timestamp None for values that are not patched"""
+        tag_type = (tag.type or 'string').lower()
+        if tag._is_enum:  # pylint: disable=protected-access
+            return tag.tag, self.random.choice(tag._values)[0].encode('UTF-8'), None  # pylint: disable=protected-access
+        if tag_type == 'utctimestamp':
+            return tag.tag, b'0' * TIMESTAMP_WIDTH, True
+        if tag_type == 'seqnum':
+            return tag.tag, b'0' * SEQUENCE_WIDTH, False
+
+        if tag_type in ('int', 'dayofmonth'):
+            value = str(self.random.randint(1, 1000))
+        elif tag_type == 'qty':
+            value = str(self.random.randint(1, 100) * 100)
+        elif tag_type in ('price', 'float', 'amt', 'priceoffset', 'percentage'):
+            value = f'{self.random.uniform(1, 1000):.2f}'
+        elif tag_type == 'boolean':
+            value = self.random.choice('YN')
+        elif tag_type == 'char':
+            value = self.random.choice(string.ascii_uppercase)
+        elif tag_type == 'utctimeonly':
+            value = '09:30:00.000'
+        elif tag_type in ('utcdate', 'utcdateonly', 'localmktdate'):
+            value = '20230101'
+        elif tag_type == 'monthyear':
+            value = '202303'
+        elif tag_type == 'currency':
+            value = 'USD'
+        else:
+            value = re.sub(r'[^A-Z]', '', tag.name)[:3] + str(self.random.randint(1, 999))
+        return tag.tag, value.encode('UTF-8'), None
@@ -0,0 +1,78 @@
+#
+# Copyright 2023 Google LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+# pylint: disable=invalid-name
+
+# Nanoseconds in a day, timestamp fields narrower than 8 bytes hold the time since midnight
+NS_PER_DAY = 86_400_000_000_000
+
+
+class FieldPatch:  # pylint: disable=too-few-public-methods
+    """Position and encoding of a sequence number or timestamp field within a message template"""
+
+    __slots__ = ['is_timestamp', 'offset', 'width', 'byte_order', 'mask', 'modulus']
+
+    def __init__(self, is_timestamp: bool, offset: int, width: int, byte_order: str = 'big', signed: bool = False):
+        self.is_timestamp = is_timestamp
+        self.offset = offset
+        self.width = width
+        self.byte_order = byte_order
+        self.mask = (1 << (width * 8 - (1 if signed else 0))) - 1
+        self.modulus = NS_PER_DAY if is_timestamp and width < 8 else self.mask + 1
+
+    def value(self, sequence: int, timestamp: int) -> int:
+        """Returns the value of the field for the message sequence number and timestamp in nanoseconds since the
+        epoch, wrapped to fit the field"""
+        if self.is_timestamp is False:
+            return sequence & self.mask
+        return timestamp % self.modulus & self.mask
+
+
+class MessageTemplate:  # pylint: disable=too-few-public-methods
+    """A message encoded once, from which messages are generated by joining the unchanged segments of the encoded
+    buffer with freshly encoded sequence number and timestamp fields"""
+
+    __slots__ = ['name', 'buffer', 'patches', 'segments', 'sequence_count']
+
+    def __init__(self, name: str, buffer: bytes, patches: [FieldPatch]):
+        self.name = name
+        self.buffer = bytes(buffer)
+        self.patches = tuple(sorted(patches, key=lambda x: x.offset))
+        # segments[i] precedes patches[i], and the last segment follows the last patch
+        offsets = [0] + [y for x in self.patches for y in (x.offset, x.offset + x.width)] + [len(self.buffer)]
+        self.segments = tuple(self.buffer[offsets[i]:offsets[i + 1]] for i in range(0, len(offsets), 2))
+        # Each sequence number field of a message, including those of repeating group entries, takes the next number
+        self.sequence_count = sum(1 for x in self.patches if x.is_timestamp is False)
+
+    def render(self, sequence: int, timestamp: int) -> bytes:
+        """Returns a message with sequence numbers starting at sequence and the timestamp in nanoseconds since the
+        epoch"""
+        if not self.patches:
+            return self.buffer
+        parts = []
+        for patch, segment in zip(self.patches, self.segments):
+            if patch.is_timestamp is False:
+                value = sequence & patch.mask
+                sequence += 1
+            else:
+                value = timestamp % patch.modulus & patch.mask
+            parts.append(segment)
+            parts.append(value.to_bytes(patch.width, patch.byte_order))
+        parts.append(self.segments[-1])
+        return b''.join(parts)
@@ -0,0 +1,178 @@
+#
+# Copyright 2023 Google LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+# pylint: disable=invalid-name
+
+import random
+import re
+import string
+import struct
+
+from third_party.sbedecoder import SBESchema
+from third_party.sbedecoder.message import CompositeMessageField, EnumMessageField, SBERepeatingGroupContainer, \
+    SetMessageField, TypeMessageField
+from third_party.sbedecoder.typemap import TypeMap
+from transcoder.source.synthetic.MessageTemplate import FieldPatch, MessageTemplate
+
+# Header fields set from the message type, others are left zero
+TEMPLATE_ID_HEADER_FIELDS = ['template_id', 'message_type']
+BLOCK_LENGTH_HEADER_FIELDS = ['block_length']
+MESSAGE_LENGTH_HEADER_FIELDS = ['message_length', 'message_size', 'msg_size', 'length']
+
+
+def is_sequence_field(name: str, semantic_type: str = None) -> bool:
+    """Fields holding sequence numbers, by semantic type or by name"""
+    if semantic_type is not None:
+        return semantic_type.lower() == 'seqnum'
+    return 'seq' in name.lower()
+
+
+def is_timestamp_field(name: str, semantic_type: str = None) -> bool:
+    """Fields holding timestamps, by semantic type or by name"""
+    if semantic_type is not None:
+        return semantic_type.lower() in ('utctimestamp', 'timestamp')
+    name = name.lower()
+    return 'timestamp' in name or name == 'time' or name.endswith('_time')
+
+
+class SbeTemplateEncoder:
+    """Encodes message templates with sampled field values from a parsed SBE schema, for the ITCH, CME and MEMX
+    message layouts the schema describes"""
+
+    def __init__(self, schema: SBESchema, group_sizes: (int, int) = (1, 4), seed: int = 1):
+        self.schema = schema
+        self.group_sizes = group_sizes
+        self.random = random.Random(seed)
+        self.byte_order = schema.byte_order or 'big'
+        self.endian = '<' if self.byte_order == 'little' else '>'
+
+    def message_types(self) -> dict:
+        """Returns the message types of the schema by name"""
+        return {x.__name__: x for x in self.schema.message_map.values()}
+
+    def encode(self, message_type) -> MessageTemplate:
+        """Returns a template of the message type, with sampled field values and repeating group sizes"""
+        header_size = message_type.header_size
+        # The block length of ITCH schemas excludes the header fields, so the block is sized from the fields
+        block_end = max([header_size + message_type.schema_block_length] +
+                        [self.field_end(x) for x in message_type.fields])
+        buffer = bytearray(block_end)
+        patches = []
+        for field in message_type.fields:
+            if field.field_offset >= header_size:
+                self.encode_field(buffer, 0, field, patches)
+
+        for group in message_type.groups:
+            self.encode_group(buffer, group, patches)
+
+        for field in message_type.fields:
+            if field.field_offset < header_size:
+                self.encode_header_field(buffer, message_type, field)
+        return MessageTemplate(message_type.__name__, buffer, patches)
+
+    def encode_header_field(self, buffer: bytearray, message_type, field: TypeMessageField):
+        """Sets the template id, block length and message length of the header"""
+        value = None
+        if field.name in TEMPLATE_ID_HEADER_FIELDS:
+            value = message_type.message_id
+        elif field.name in BLOCK_LENGTH_HEADER_FIELDS:
+            value = message_type.schema_block_length
+        elif field.name in MESSAGE_LENGTH_HEADER_FIELDS:
+            value = len(buffer)
+        if value is not None:
+            if field.primitive_type == 'char':
+                value = bytes([value])
+            struct.pack_into(field.unpack_fmt, buffer, field.field_offset, value)
+
+    def encode_group(self, buffer: bytearray, group: SBERepeatingGroupContainer, patches: [FieldPatch]):
+        """Appends the dimension and entries of a repeating group, and of the groups nested in each entry"""
+        block_length = max((self.field_end(x) for x in group.fields), default=0)
+        count = self.random.randint(*self.group_sizes)
+        start = len(buffer)
+        buffer.extend(bytes(group.dimension_size))
+        struct.pack_into(group.block_length_field.unpack_fmt, buffer, start + group.block_length_field.field_offset,
+                         block_length)
+        struct.pack_into(group.num_in_group_field.unpack_fmt, buffer, start + group.num_in_group_field.field_offset,
+                         count)
+        for _ in range(count):
+            entry_start = len(buffer)
+            buffer.extend(bytes(block_length))
+            for field in group.fields:
+                self.encode_field(buffer, entry_start, field, patches)
+            for nested_group in group.groups:
+                self.encode_group(buffer, nested_group, patches)
+
+    @staticmethod
+    def field_end(field) -> int:
+        """Returns the offset following a field"""
+        if isinstance(field, CompositeMessageField):
+            return max((x.field_offset + x.field_length for x in field.parts if x.constant is None), default=0)
+        return field.field_offset + field.field_length
+
+    def encode_field(self, buffer: bytearray, base_offset: int, field,  # pylint: disable=too-many-arguments
+                     patches: [FieldPatch], semantic_type: str = None):
+        """Writes a sampled value of the field, recording a patch for sequence number and timestamp fields"""
+        semantic_type = semantic_type or getattr(field, 'semantic_type', None)
+        offset = base_offset + field.field_offset
+        if isinstance(field, CompositeMessageField):
+            for part in field.parts:
+                self.encode_field(buffer, base_offset, part, patches, semantic_type)
+        elif isinstance(field, EnumMessageField):
+            value = self.random.choice(field.enum_values)['text']
+            struct.pack_into(field.unpack_fmt, buffer, offset,
+                             value.encode('UTF-8') if field.primitive_type == 'char' else int(value))
+        elif isinstance(field, SetMessageField):
+            value = sum(1 << int(x['text']) for x in field.choices if self.random.random() < 0.5)
+            struct.pack_into(field.unpack_fmt, buffer, offset, value)
+        elif isinstance(field, TypeMessageField) and field.constant is None:
+            self.encode_type_field(buffer, offset, field, patches, semantic_type)
+
+    def encode_type_field(self, buffer: bytearray, offset: int,  # pylint: disable=too-many-arguments
+                          field: TypeMessageField, patches: [FieldPatch], semantic_type: str = None):
+        """Writes a sampled primitive, string or variable length integer value"""
+        primitive_type = field.primitive_type
+        if field.is_string_type:
+            text = re.sub(r'[^A-Z]', '', field.name.upper())[:3] + str(self.random.randint(0, 99))
+            buffer[offset:offset + field.field_length] = text.encode('UTF-8')[:field.field_length].ljust(
+                field.field_length, b' ')
+            return
+        if primitive_type == 'char':
+            buffer[offset] = ord(self.random.choice(string.ascii_uppercase))
+            return
+        if primitive_type in ('float', 'double'):
+            struct.pack_into(field.unpack_fmt, buffer, offset, round(self.random.uniform(1, 1000), 2))
+            return
+
+        _, primitive_size = TypeMap.primitive_type_map[primitive_type]
+        variable_length = primitive_size != field.field_length
+        signed = not primitive_type.startswith('uint')
+        if is_sequence_field(field.name, semantic_type) or is_timestamp_field(field.name, semantic_type):
+            patches.append(FieldPatch(is_timestamp_field(field.name, semantic_type), offset, field.field_length,
+                                      self.byte_order, signed))
+            return
+
+        if field.field_length == 1:
+            value = self.random.randint(-9, 9) if signed else self.random.randint(0, 9)
+        else:
+            value = self.random.randint(1, 10_000) * (100 if field.field_length >= 4 else 1)
+        if variable_length:
+            buffer[offset:offset + field.field_length] = value.to_bytes(field.field_length, self.byte_order,
+                                                                        signed=signed)
+        else:
+            struct.pack_into(field.unpack_fmt, buffer, offset, value)
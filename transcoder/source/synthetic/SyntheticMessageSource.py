@@ -0,0 +1,167 @@
+#
+# Copyright 2023 Google LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+# pylint: disable=invalid-name
+
+import itertools
+import random
+import time
+
+from transcoder.source.Source import Source
+
+# 2023-01-01 09:30:00 UTC, the timestamp of the first generated message
+START_TIMESTAMP = 1_672_565_400_000_000_000
+# Nanoseconds between messages when not paced to a rate
+UNPACED_TIMESTAMP_STEP = 1000
+# Templates drawn up front from the message mix, which the generator cycles through
+SCHEDULE_LENGTH = 4096
+# Messages generated between checks of the clock when paced to a rate
+PACING_INTERVAL = 256
+
+DEFAULT_OPTIONS = {'count': '1000000', 'rate': '0', 'mix': None, 'group_size': '1-4', 'variants': '16', 'seed': '1'}
+
+
+def parse_synthetic_options(options_string: str) -> dict:
+    """
+    Extracts the generator options from the CLI string, in the format:
+
+    count=<messages>:rate=<messages per second>:mix=<name>=<weight>|<name>=<weight>:group_size=<min>-<max>
+
+    For example:
+
+    --synthetic_options count=0:rate=50000:mix=add_order_no_attribution=5|trade=1
+
+    generates an add order for every five trades, at 50,000 messages per second, until stopped. A count of zero is
+    unbounded, a rate of zero is unpaced, and without a mix all message types of the schema are equally weighted.
+    variants is the number of templates with differently sampled field values per message type, and seed makes
+    the sampled values reproducible.
+    """
+    options = dict(DEFAULT_OPTIONS)
+    for param in (options_string or '').split(':'):
+        if param == '':
+            continue
+        keyval = param.split('=', 1)
+        if len(keyval) != 2 or keyval[0] not in DEFAULT_OPTIONS:
+            raise InvalidSyntheticOptionsError(f'Invalid synthetic option: "{param}"')
+        options[keyval[0]] = keyval[1]
+
+    try:
+        group_size = [int(x) for x in options['group_size'].split('-', 1)]
+        mix = None
+        if options['mix']:
+            mix = {}
+            for weighting in options['mix'].split('|'):
+                name, _, weight = weighting.partition('=')
+                mix[name] = float(weight) if weight else 1.0
+        return {'count': int(options['count']), 'rate': float(options['rate']), 'mix': mix,
+                'group_sizes': (group_size[0], group_size[-1]), 'variants': max(1, int(options['variants'])),
+                'seed': int(options['seed'])}
+    except ValueError as error:
+        raise InvalidSyntheticOptionsError(f'Invalid synthetic options: "{options_string}"') from error
+
+
+class SyntheticMessageSource(Source):
+    """Generates valid encoded messages from the message types of an SBE schema or FIX specification, for load
+    testing without captured data. Each message type is encoded once into a few template variants with sampled
+    field values, and messages are generated by copying a template and patching its monotonically increasing
+    sequence number and timestamp fields"""
+
+    @staticmethod
+    def source_type_identifier():
+        return 'synthetic'
+
+    def __init__(self, factory: str, schema_file_path: str, synthetic_options: str = None, fix_separator: int = 1):
+        super().__init__()
+        self.factory = factory
+        self.schema_file_path = schema_file_path
+        self.fix_separator = fix_separator
+        self.options = parse_synthetic_options(synthetic_options)
+        self.count = self.options['count']
+        self.rate = self.options['rate']
+        self.timestamp_step = int(1_000_000_000 / self.rate) if self.rate > 0 else UNPACED_TIMESTAMP_STEP
+        self.templates = {}
+        self.schedule = []
+
+    def create_encoder(self):
+        """Returns the template encoder for the schema of the factory"""
+        # pylint: disable=import-outside-toplevel
+        from transcoder.message.MessageUtil import FIX_PARSER, message_parsers
+        if message_parsers.object_path(self.factory) == FIX_PARSER:
+            from third_party.pyfixmsg.reference import FixSpec
+            from transcoder.source.synthetic import FixTemplateEncoder
+            return FixTemplateEncoder(FixSpec(self.schema_file_path), self.options['group_sizes'],
+                                      self.options['seed'], self.fix_separator)
+
+        from transcoder.message.factory.MessageFactory import get_message_factory
+        from transcoder.source.synthetic import SbeTemplateEncoder
+        return SbeTemplateEncoder(get_message_factory(self.factory, self.schema_file_path).schema,
+                                  self.options['group_sizes'], self.options['seed'])
+
+    def open(self):
+        encoder = self.create_encoder()
+        message_types = encoder.message_types()
+        mix = self.options['mix'] or {name: 1.0 for name in message_types}
+        unknown_names = [name for name in mix if name not in message_types]
+        if unknown_names:
+            raise InvalidSyntheticOptionsError(f'Message types not found in the schema: {", ".join(unknown_names)}')
+
+        names = [name for name, weight in mix.items() if weight > 0]
+        if not names:
+            raise InvalidSyntheticOptionsError('The synthetic message mix has no weighted message types')
+        self.templates = {name: [encoder.encode(message_types[name]) for _ in range(self.options['variants'])]
+                          for name in names}
+
+        schedule_random = random.Random(self.options['seed'])
+        self.schedule = [schedule_random.choice(self.templates[name])
+                         for name in schedule_random.choices(names, weights=[mix[x] for x in names],
+                                                             k=SCHEDULE_LENGTH)]
+        return self
+
+    def close(self):
+        self.templates = {}
+        self.schedule = []
+
+    def get_message_iterator(self):
+        sequence = 1
+        timestamp = START_TIMESTAMP
+        timestamp_step = self.timestamp_step
+        templates = itertools.cycle(self.schedule)
+        if self.count > 0:
+            templates = itertools.islice(templates, self.count)
+        paced = self.rate > 0
+        pacing_countdown = PACING_INTERVAL
+        start_time = time.monotonic()
+
+        for template in templates:
+            self.record_count += 1
+            yield template.render(sequence, timestamp)
+            sequence += template.sequence_count
+            timestamp += timestamp_step
+
+            if paced:
+                pacing_countdown -= 1
+                if pacing_countdown == 0:
+                    pacing_countdown = PACING_INTERVAL
+                    delay = start_time + self.record_count / self.rate - time.monotonic()
+                    if delay > 0:
+                        time.sleep(delay)
+
+
+class InvalidSyntheticOptionsError(Exception):
+    """Exception that is raised when the synthetic source options cannot be parsed or name unknown message types"""
@@ -0,0 +1,36 @@
+#
+# Copyright 2023 Google LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+# pylint: disable=invalid-name
+
+from typing import TYPE_CHECKING
+
+from transcoder.LazyImportUtil import lazy_exports
+from .MessageTemplate import MessageTemplate
+
+if TYPE_CHECKING:
+    from .SyntheticMessageSource import SyntheticMessageSource
+    from .SbeTemplateEncoder import SbeTemplateEncoder
+    from .FixTemplateEncoder import FixTemplateEncoder
+
+__getattr__, __dir__ = lazy_exports(__name__, [
+    'SyntheticMessageSource',
+    'SbeTemplateEncoder',
+    'FixTemplateEncoder'
+])
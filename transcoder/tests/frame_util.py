@@ -0,0 +1,120 @@
+#
+# Copyright 2023 Google LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+"""
+Builders of the ITCH messages, CME packets and network frames written to the source files of the tests, and of
+synthetic messages generated from schema templates
+"""
+
+import os
+import struct
+import tempfile
+import unittest
+
+import dpkt
+
+from transcoder.message.MessageUtil import get_message_parser
+from transcoder.source import get_message_source
+
+RESOURCES_PATH = os.path.join(os.path.dirname(__file__), 'resources')
+ITCH_SCHEMA_PATH = os.path.join(RESOURCES_PATH, 'itch_test_schema.xml')
+FIX_SPEC_PATH = os.path.join(RESOURCES_PATH, 'fix_test_spec.xml')
+
+
+def itch_header(message_type: bytes, stock_locate: int = 7, timestamp: int = 1) -> bytes:
+    """Returns the message type, stock_locate, tracking number and 48-bit timestamp every ITCH message starts with"""
+    return message_type + struct.pack('>HH', stock_locate, 0) + timestamp.to_bytes(6, 'big')
+
+
+def add_order(order_id: int, side: bytes, shares: int, price: int, *, timestamp: int = 1,
+              stock_locate: int = 7) -> bytes:
+    """Returns an ITCH add_order_no_attribution message for SPY"""
+    return itch_header(b'A', stock_locate, timestamp) + struct.pack('>QcI8sI', order_id, side, shares, b'SPY     ', price)
+
+
+def order_deleted(order_id: int, timestamp: int = None) -> bytes:
+    """Returns an ITCH order_deleted message, timestamped with the order id unless a timestamp is given"""
+    return itch_header(b'D', 7, order_id if timestamp is None else timestamp) + struct.pack('>Q', order_id)
+
+
+def system_event(timestamp: int = 1, event_code: bytes = b'O') -> bytes:
+    """Returns an ITCH system_event message, Start of Messages unless another event code is given"""
+    return itch_header(b'S', 0, timestamp) + event_code
+
+
+def time_message(second: int) -> bytes:
+    """Returns an ITCH time_message of the second"""
+    return b'T' + struct.pack('>I', second)
+
+
+def cme_message(template_id: int, block_length: int = 0) -> bytes:
+    """Returns a CME SBE message header and a zeroed root block"""
+    return struct.pack('<HHHH', block_length, template_id, 1, 9) + bytes(block_length)
+
+
+def cme_packet(messages: [bytes], sequence_number: int = 0, sending_time: int = 0) -> bytes:
+    """Returns a length prefixed CME binary packet of the messages, each prefixed with its size"""
+    body = b''.join(struct.pack('<H', len(x) + 2) + x for x in messages)
+    return struct.pack('<H', len(body) + 12) + struct.pack('<IQ', sequence_number, sending_time) + body
+
+
+def length_delimited(messages: [bytes]) -> bytes:
+    """Returns the messages each prefixed with its 2 byte big endian length"""
+    return b''.join(struct.pack('>H', len(x)) + x for x in messages)
+
+
+def udp_frame(payload: bytes) -> bytes:
+    """Returns an Ethernet frame of an IPv4 UDP datagram carrying the payload"""
+    udp = dpkt.udp.UDP(sport=1, dport=2, data=payload)
+    udp.ulen = len(udp)
+    ip = dpkt.ip.IP(src=b'\x0a\x00\x00\x01', dst=b'\x0a\x00\x00\x02', p=dpkt.ip.IP_PROTO_UDP, data=udp)
+    ip.len = len(ip)
+    return bytes(dpkt.ethernet.Ethernet(src=b'\x00' * 6, dst=b'\x00' * 6, type=dpkt.ethernet.ETH_TYPE_IP, data=ip))
+
+
+def synthetic_messages(factory: str, schema_file_path: str, synthetic_options: str) -> [bytes]:
+    """Returns every message of a synthetic source of the factory and schema, generated as the options say"""
+    source = get_message_source(None, None, 'synthetic', None, factory=factory, schema_file_path=schema_file_path,
+                                synthetic_options=synthetic_options)
+    with source:
+        return list(source.get_message_iterator())
+
+
+def schema_parser(factory: str, schema_file_path: str):
+    """Returns a parser of the factory with its schema processed"""
+    parser = get_message_parser(factory, schema_file_path)
+    parser.process_schema()
+    return parser
+
+
+class SourceFileTestCase(unittest.TestCase):
+    """Test case writing source files to a temporary directory removed after each test"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write_source(self, name: str, data: bytes) -> str:
+        """Writes a source file to the temporary directory, returning its path"""
+        path = os.path.join(self.temp_dir.name, name)
+        with open(path, 'wb') as source_file:
+            source_file.write(data)
+        return path
@@ -0,0 +1,150 @@
+#
+# Copyright 2023 Google LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+# pylint: disable=invalid-name
+
+import json
+import os
+import struct
+import tempfile
+import unittest
+
+from frame_util import add_order, length_delimited
+from transcoder.Transcoder import Transcoder
+from transcoder.TranscoderConfig import TranscoderConfig
+from transcoder.message.ParsedMessage import ParsedMessage
+from transcoder.message.handler import BarAggregationHandler
+
+SCHEMA_PATH = os.path.join(os.path.dirname(__file__), 'resources', 'itch_test_schema.xml')
+
+
+def trade(stock_locate: int, timestamp: int, shares: int, price: int) -> ParsedMessage:
+    """Returns a decoded ITCH trade message"""
+    return ParsedMessage(80, 'trade', None, dictionary={'stock_locate': stock_locate, 'timestamp': timestamp,
+                                                        'shares': shares, 'price': price})
+
+
+def trade_bytes(stock_locate: int, timestamp: int, shares: int, price: int) -> bytes:
+    """Returns an ITCH trade message for SPY"""
+    return b'P' + struct.pack('>HH', stock_locate, 0) + timestamp.to_bytes(6, 'big') + \
+        struct.pack('>QcI8sIQ', 1, b'B', shares, b'SPY     ', price, 1)
+
+
+def handle_all(handler, messages: [ParsedMessage]) -> [dict]:
+    """Handles the messages in order, returning the fields of the bars they manufactured"""
+    bars = []
+    for message in messages:
+        handler.handle(message)
+        bars.extend(x.dictionary for x in message.manufactured_messages or [])
+    return bars
+
+
+class TestBarAggregationHandler(unittest.TestCase):
+    """Tests trades and quotes are aggregated into bars per key and window"""
+
+    def test_trade_bars(self):
+        """Tests OHLCV and VWAP bars are emitted once the stream moves past a window"""
+        handler = BarAggregationHandler({'window': '10'})
+        bars = handle_all(handler, [trade(1, 11, 100, 10), trade(2, 12, 5, 50), trade(1, 13, 300, 12),
+                                    trade(1, 14, 100, 9), trade(1, 25, 10, 11)])
+        self.assertEqual(len(bars), 2)
+        self.assertEqual(bars[0], {'stock_locate': '1', 'bar_start': 10, 'bar_end': 20, 'open': 10, 'high': 12,
+                                   'low': 9, 'close': 9, 'volume': 500, 'vwap': 11.0, 'trade_count': 3,
+                                   'midpoint': None, 'midpoint_mean': None, 'quote_count': 0})
+        self.assertEqual((bars[1]['stock_locate'], bars[1]['vwap']), ('2', 50))
+
+        flushed = handler.flush()
+        self.assertEqual([(x.name, x.dictionary['bar_start'], x.dictionary['close']) for x in flushed],
+                         [('bar', 20, 11)])
+        self.assertEqual(handler.flush(), [])
+
+    def test_quote_midpoints(self):
+        """Tests midpoints from quote fields and grouped entries with mantissa and exponent prices"""
+        handler = BarAggregationHandler({'message_names': 'Quote|MDIncrementalRefreshTradeSummary48',
+                                         'group': 'no_md_entries', 'key_field': 'security_id',
+                                         'timestamp_field': 'transact_time', 'price_field': 'md_entry_px',
+                                         'size_field': 'md_entry_size', 'bid_field': 'bid_px',
+                                         'ask_field': 'offer_px'})
+        entries = [{'security_id': 5, 'md_entry_px': {'mantissa': 101_500_000_000, 'exponent': -9},
+                    'md_entry_size': 2}, {'security_id': 5, 'bid_px': 100.0, 'offer_px': 101.0}]
+        handler.handle(ParsedMessage(48, 'MDIncrementalRefreshTradeSummary48', None,
+                                     dictionary={'transact_time': 70_000_000_000, 'no_md_entries': entries}))
+        handler.handle(ParsedMessage(1, 'Quote', None, dictionary={
+            'transact_time': 80_000_000_000, 'no_md_entries': [{'security_id': 5, 'bid_px': 101, 'offer_px': 102}]}))
+        bar_fields = handler.flush()[0].dictionary
+        self.assertEqual((bar_fields['bar_start'], bar_fields['open'], bar_fields['volume']),
+                         (60_000_000_000, 101.5, 2))
+        self.assertEqual((bar_fields['midpoint'], bar_fields['midpoint_mean'], bar_fields['quote_count']),
+                         (101.5, 101.0, 2))
+
+    def test_bars_only_transcode(self):
+        """Tests source messages and their schemas are left out when raw output is disabled"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            source_path = os.path.join(temp_dir, 'itch.bin')
+            with open(source_path, 'wb') as source_file:
+                source_file.write(length_delimited([trade_bytes(7, 1, 100, 10), trade_bytes(7, 2, 300, 20),
+                                                    trade_bytes(7, 60_000_000_001, 10, 15)]))
+
+            config = TranscoderConfig('itch', SCHEMA_PATH, source_path, source_file_format_type='length_delimited',
+                                      quiet=True, output_type='jsonl', output_path=temp_dir,
+                                      error_output_path=temp_dir, lazy_create_resources=True,
+                                      message_handlers='BarAggregationHandler:raw_output=false')
+            transcoder = Transcoder.from_config(config)
+            transcoder.transcode()
+            transcoder.output_manager.wait_for_completion()
+
+            self.assertEqual((transcoder.transcoded_count, transcoder.manufactured_count), (0, 2))
+            self.assertEqual(sorted(x for x in os.listdir(temp_dir) if x.endswith('.jsonl')), ['itch-bar.jsonl'])
+            with open(os.path.join(temp_dir, 'itch-bar.jsonl'), encoding='utf-8') as bar_file:
+                bars = [json.loads(line) for line in bar_file]
+            self.assertEqual([(x['stock_locate'], x['vwap']) for x in bars], [(7, 17.5), (7, 15.0)])
+            with open(os.path.join(temp_dir, 'itch-bar.schema.json'), encoding='utf-8') as schema_file:
+                self.assertEqual(json.load(schema_file)['properties']['stock_locate']['type'], 'integer')
+
+    def test_book_snapshot_midpoints(self):
+        """Tests midpoints from the top of book of the snapshots of a book builder ahead of the handler, ignoring
+        one-sided books and levels below the top"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            source_path = os.path.join(temp_dir, 'itch.bin')
+            with open(source_path, 'wb') as source_file:
+                source_file.write(length_delimited([
+                    add_order(1, b'B', 100, 1000, timestamp=1), add_order(2, b'S', 100, 1010, timestamp=2),
+                    trade_bytes(7, 3, 100, 1005), add_order(3, b'B', 100, 1004, timestamp=4),
+                    add_order(4, b'B', 100, 990, timestamp=5),
+                    add_order(5, b'S', 100, 500, timestamp=6, stock_locate=8),
+                    add_order(6, b'S', 100, 1008, timestamp=60_000_000_001)]))
+
+            config = TranscoderConfig('itch', SCHEMA_PATH, source_path, source_file_format_type='length_delimited',
+                                      quiet=True, output_type='jsonl', output_path=temp_dir,
+                                      error_output_path=temp_dir, lazy_create_resources=True,
+                                      message_handlers='BookBuilderHandler,BarAggregationHandler:raw_output=false')
+            transcoder = Transcoder.from_config(config)
+            transcoder.transcode()
+            transcoder.output_manager.wait_for_completion()
+
+            self.assertEqual(sorted(x for x in os.listdir(temp_dir) if x.endswith('.jsonl')), ['itch-bar.jsonl'])
+            with open(os.path.join(temp_dir, 'itch-bar.jsonl'), encoding='utf-8') as bar_file:
+                bars = [json.loads(line) for line in bar_file]
+            self.assertEqual([(x['stock_locate'], x['bar_start'], x['midpoint'], x['midpoint_mean'],
+                               x['quote_count'], x['trade_count']) for x in bars],
+                             [(7, 0, 1007.0, 1006.0, 2, 1), (7, 60_000_000_000, 1006.0, 1006.0, 1, 0)])
+
+
+if __name__ == '__main__':
+    unittest.main()
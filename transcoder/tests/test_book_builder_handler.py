@@ -0,0 +1,182 @@
+#
+# Copyright 2023 Google LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+# pylint: disable=invalid-name
+
+import json
+import os
+import struct
+import tempfile
+import unittest
+
+from frame_util import add_order, itch_header, length_delimited, order_deleted
+from transcoder.Transcoder import Transcoder
+from transcoder.TranscoderConfig import TranscoderConfig
+from transcoder.message.MessageUtil import get_message_parser, parse_handler_config
+from transcoder.message.ParsedMessage import ParsedMessage
+from transcoder.message.handler import BookBuilderHandler
+
+SCHEMA_PATH = os.path.join(os.path.dirname(__file__), 'resources', 'itch_test_schema.xml')
+
+
+def order_executed(order_id: int, shares: int, timestamp: int = 1) -> bytes:
+    """Returns an ITCH order_executed message"""
+    return itch_header(b'E', 7, timestamp) + struct.pack('>QIQ', order_id, shares, 1)
+
+
+def order_cancelled(order_id: int, shares: int, timestamp: int = 1) -> bytes:
+    """Returns an ITCH order_cancelled message"""
+    return itch_header(b'X', 7, timestamp) + struct.pack('>QI', order_id, shares)
+
+
+def order_replaced(order_id: int, new_order_id: int, shares: int, price: int, timestamp: int = 1) -> bytes:
+    """Returns an ITCH order_replaced message"""
+    return itch_header(b'U', 7, timestamp) + struct.pack('>QQII', order_id, new_order_id, shares, price)
+
+
+def cme_message(name: str, entries: [dict]) -> ParsedMessage:
+    """Returns a parsed CME incremental refresh message of the book entries"""
+    return ParsedMessage(46, name, None, dictionary={'transact_time': 1000, 'no_md_entries': entries})
+
+
+def cme_level(action: str, entry_type: str, level: int, mantissa: int = 0, size: int = 0) -> dict:
+    """Returns a CME book entry of security_id 5 at the price level"""
+    return {'md_update_action': action, 'md_entry_type': entry_type, 'md_price_level': level, 'security_id': 5,
+            'md_entry_px': {'mantissa': mantissa, 'exponent': -9}, 'md_entry_size': size, 'number_of_orders': 1}
+
+
+class TestBookBuilderHandler(unittest.TestCase):
+    """Tests books built from ITCH and CME messages and the snapshots emitted from them"""
+
+    def setUp(self):
+        self.parser = get_message_parser('itch', SCHEMA_PATH)
+        self.parser.process_schema()
+
+    def handle_itch(self, handler, buffers: [bytes]) -> [dict]:
+        """Passes the parsed ITCH messages to the handler, returning the snapshots it manufactures"""
+        snapshots = []
+        for buffer in buffers:
+            message = self.parser.process_message(buffer)
+            handler.handle(message)
+            snapshots.extend(x.dictionary for x in message.manufactured_messages or [])
+        return snapshots
+
+    def test_itch_order_book(self):
+        """Tests adds, executions, cancels, deletes and replaces aggregate into price levels"""
+        handler = BookBuilderHandler({'depth': '2'})
+        snapshots = self.handle_itch(handler, [
+            add_order(1, b'B', 100, 1000), add_order(2, b'B', 50, 1000), add_order(3, b'B', 10, 990),
+            add_order(4, b'S', 70, 1010), order_executed(1, 40), order_cancelled(2, 50), order_deleted(3),
+            order_replaced(4, 5, 20, 1005)])
+        self.assertEqual(len(snapshots), 8)
+        self.assertEqual(snapshots[2]['bid_price_2'], 990)
+        self.assertEqual((snapshots[2]['bid_size_1'], snapshots[2]['bid_orders_1']), (150, 2))
+        last = snapshots[-1]
+        self.assertEqual((last['instrument_id'], last['symbol'], last['update_count']), (7, 'SPY', 8))
+        self.assertEqual((last['bid_price_1'], last['bid_size_1'], last['bid_orders_1']), (1000, 60, 1))
+        self.assertNotIn('bid_price_2', last)
+        self.assertEqual((last['ask_price_1'], last['ask_size_1']), (1005, 20))
+        self.assertEqual(list(handler.orders), [1, 5])
+
+    def test_changes_only_and_interval(self):
+        """Tests unchanged top of book is not re-emitted and pending snapshots are flushed"""
+        handler = BookBuilderHandler()
+        snapshots = self.handle_itch(handler, [add_order(1, b'B', 100, 1000), add_order(2, b'B', 10, 990)])
+        self.assertEqual(len(snapshots), 1)
+
+        handler = BookBuilderHandler(parse_handler_config('BookBuilderHandler:interval=2:changes_only=false'))
+        snapshots = self.handle_itch(handler, [add_order(1, b'B', 100, 1000), add_order(2, b'B', 10, 990),
+                                               add_order(3, b'S', 10, 1010, timestamp=9)])
+        self.assertEqual([x['update_count'] for x in snapshots], [2])
+        flushed = handler.flush()
+        self.assertEqual(flushed[0].name, 'book_snapshot')
+        self.assertEqual((flushed[0].dictionary['timestamp'], flushed[0].dictionary['ask_price_1']), (9, 1010))
+        self.assertEqual(handler.flush()[0].dictionary['update_count'], 3)
+
+    def test_cme_price_level_book(self):
+        """Tests level addressed inserts, changes and deletes of market by price messages"""
+        handler = BookBuilderHandler({'depth': '3', 'max_depth': '3'})
+        name = 'MDIncrementalRefreshBook46'
+        messages = [
+            cme_message(name, [cme_level('New', 'Bid', 1, 100_000_000_000, 5),
+                               cme_level('New', 'Bid', 1, 101_000_000_000, 3),
+                               cme_level('New', 'Offer', 1, 102_000_000_000, 4),
+                               cme_level('New', 'ImpliedBid', 1, 101_500_000_000, 9)]),
+            cme_message(name, [cme_level('New', 'Bid', 3, 99_000_000_000, 2),
+                               cme_level('New', 'Bid', 1, 101_500_000_000, 1)]),
+            cme_message(name, [cme_level('Change', 'Bid', 2, 101_000_000_000, 8),
+                               cme_level('Delete', 'Offer', 1)])]
+        for message in messages:
+            handler.handle(message)
+        book = handler.price_level_books[5]
+        self.assertEqual([x[:2] for x in book.bids], [(101.5, 1), (101.0, 8), (100.0, 5)])
+        self.assertEqual(book.asks, [])
+        self.assertEqual(len(messages[0].manufactured_messages), 1)
+        snapshot = messages[2].manufactured_messages[0].dictionary
+        self.assertEqual((snapshot['bid_price_2'], snapshot['bid_size_2']), (101.0, 8))
+        self.assertNotIn('ask_price_1', snapshot)
+
+        handler.handle(cme_message(name, [cme_level('DeleteFrom', 'Bid', 2)]))
+        self.assertEqual([x[0] for x in book.bids], [100.0])
+        handler.handle(cme_message(name, [{'md_entry_type': 'BookReset', 'security_id': 5}]))
+        self.assertEqual(book.snapshot(3), ((), ()))
+
+    def test_cme_order_book(self):
+        """Tests market by order entries are aggregated by price"""
+        handler = BookBuilderHandler()
+        name = 'MDIncrementalRefreshOrderBook47'
+        entries = [{'order_id': i, 'md_update_action': 'New', 'md_entry_type': 'Offer', 'security_id': 5,
+                    'md_entry_px': {'mantissa': 25_000_000_000, 'exponent': -9}, 'md_display_qty': 10}
+                   for i in range(3)]
+        handler.handle(cme_message(name, entries))
+        handler.handle(cme_message(name, [{'order_id': 1, 'md_update_action': 'Delete'},
+                                          dict(entries[2], md_update_action='Change', md_display_qty=4)]))
+        self.assertEqual(handler.order_books[5].snapshot(1), ((), ((25.0, 14, 2),)))
+
+
+class TestBookBuilderTranscode(unittest.TestCase):
+    """Tests snapshots are written as their own message type"""
+
+    def test_transcode_book_snapshots(self):
+        """Tests the snapshot schema is created and snapshots written alongside source messages"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            source_path = os.path.join(temp_dir, 'itch.bin')
+            with open(source_path, 'wb') as source_file:
+                source_file.write(length_delimited([add_order(1, b'B', 100, 1000), add_order(2, b'S', 10, 1010),
+                                                    order_deleted(1)]))
+
+            config = TranscoderConfig('itch', SCHEMA_PATH, source_path, source_file_format_type='length_delimited',
+                                      quiet=True, output_type='jsonl', output_path=temp_dir,
+                                      error_output_path=temp_dir, message_handlers='BookBuilderHandler:depth=2',
+                                      lazy_create_resources=True)
+            transcoder = Transcoder.from_config(config)
+            transcoder.transcode()
+            transcoder.output_manager.wait_for_completion()
+
+            self.assertEqual(transcoder.manufactured_count, 3)
+            with open(os.path.join(temp_dir, 'itch-book_snapshot.jsonl'), encoding='utf-8') as snapshot_file:
+                snapshots = [json.loads(line) for line in snapshot_file]
+            self.assertEqual(snapshots[1]['ask_price_1'], 1010)
+            self.assertEqual(snapshots[2], {'instrument_id': 7, 'symbol': 'SPY', 'timestamp': 1, 'update_count': 3,
+                                            'ask_price_1': 1010, 'ask_size_1': 10, 'ask_orders_1': 1})
+            self.assertTrue(os.path.exists(os.path.join(temp_dir, 'itch-add_order_no_attribution.jsonl')))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,145 @@
+#
+# Copyright 2023 Google LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+# pylint: disable=invalid-name
+
+import json
+import os
+import tempfile
+import unittest
+
+from frame_util import cme_packet, length_delimited, order_deleted
+from transcoder.Transcoder import Transcoder
+from transcoder.TranscoderConfig import TranscoderConfig
+from transcoder.source import get_message_source
+
+SCHEMA_PATH = os.path.join(os.path.dirname(__file__), 'resources', 'itch_test_schema.xml')
+
+
+def create_transcoder(source_path: str, output_path: str, checkpoint_path: str, resume: bool) -> Transcoder:
+    """Returns a transcoder checkpointing the output of a SequencerHandler every 3 messages"""
+    config = TranscoderConfig('itch', SCHEMA_PATH, source_path, source_file_format_type='length_delimited',
+                              quiet=True, output_type='jsonl', output_path=output_path,
+                              error_output_path=output_path, message_handlers='SequencerHandler',
+                              lazy_create_resources=True, checkpoint_path=checkpoint_path, checkpoint_interval=0,
+                              resume=resume)
+    transcoder = Transcoder.from_config(config)
+    transcoder.checkpointer.check_interval = 3
+    return transcoder
+
+
+def fail_after(transcoder: Transcoder, count: int, fail):
+    """Calls fail from the output once count records are written"""
+    write_record = transcoder.output_manager._write_record  # pylint: disable=protected-access
+
+    def _write_record(record_type_name, record):
+        write_record(record_type_name, record)
+        if record['sequence_number'] == count:
+            fail()
+    transcoder.output_manager._write_record = _write_record  # pylint: disable=protected-access
+
+
+class TestCheckpointResume(unittest.TestCase):
+    """Tests an interrupted transcode resumes from its last checkpoint without duplicating output"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.source_path = os.path.join(self.temp_dir.name, 'itch.bin')
+        with open(self.source_path, 'wb') as source_file:
+            source_file.write(length_delimited([order_deleted(x) for x in range(1, 21)]))
+        self.checkpoint_path = os.path.join(self.temp_dir.name, 'itch.checkpoint')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def read_output(self) -> [tuple]:
+        """Returns the order reference and sequence numbers of the records written"""
+        with open(os.path.join(self.temp_dir.name, 'itch-order_deleted.jsonl'), encoding='utf-8') as output_file:
+            return [(x['order_reference_number'], x['sequence_number']) for x in map(json.loads, output_file)]
+
+    def resume(self) -> Transcoder:
+        """Returns a transcoder that has resumed from the checkpoint and run to the end of the source"""
+        transcoder = create_transcoder(self.source_path, self.temp_dir.name, self.checkpoint_path, True)
+        transcoder.transcode()
+        transcoder.output_manager.wait_for_completion()
+        return transcoder
+
+    def test_resume_after_crash(self):
+        """Tests records written after the last checkpoint are discarded and written once on resume"""
+        transcoder = create_transcoder(self.source_path, self.temp_dir.name, self.checkpoint_path, False)
+
+        def crash():
+            raise OSError('crash')
+        fail_after(transcoder, 11, crash)
+        with self.assertRaises(OSError):
+            transcoder.transcode()
+        for writer in transcoder.output_manager.writers.values():
+            writer.close()
+        self.assertEqual(len(self.read_output()), 11)
+        with open(self.checkpoint_path, encoding='utf-8') as checkpoint_file:
+            checkpoint = json.load(checkpoint_file)
+        self.assertEqual((checkpoint['position'], checkpoint['source_record_count']), ({'offset': 189}, 9))
+        self.assertEqual(checkpoint['handlers'], [{'name': 'SequencerHandler', 'state': {'sequence_number': 9}}])
+
+        transcoder = self.resume()
+        self.assertEqual(self.read_output(), [(x, x) for x in range(1, 21)])
+        self.assertEqual((transcoder.source.record_count, transcoder.transcoded_count), (20, 20))
+        self.assertEqual(transcoder.message_parser.record_type_count['order_deleted'], 20)
+
+        transcoder = self.resume()
+        self.assertEqual(transcoder.transcoded_count, 0)
+        self.assertEqual(len(self.read_output()), 20)
+
+    def test_resume_after_interrupt(self):
+        """Tests the first interrupt stops at the next checkpoint boundary"""
+        transcoder = create_transcoder(self.source_path, self.temp_dir.name, self.checkpoint_path, False)
+        fail_after(transcoder, 4, lambda: transcoder.trap(None, None))
+        with self.assertRaises(SystemExit):
+            transcoder.transcode()
+        self.assertEqual(self.read_output(), [(x, x) for x in range(1, 7)])
+
+        self.resume()
+        self.assertEqual(self.read_output(), [(x, x) for x in range(1, 21)])
+
+
+class TestSourcePosition(unittest.TestCase):
+    """Tests sources seek to the positions they report"""
+
+    def test_cme_binary_packet_position(self):
+        """Tests positions within a packet skip the messages of it already yielded"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            source_path = os.path.join(temp_dir, 'cme.bin')
+            with open(source_path, 'wb') as source_file:
+                source_file.write(cme_packet([b'a', b'bb', b'ccc']) + cme_packet([b'dd', b'e']))
+
+            source = get_message_source(source_path, None, 'cme_binary_packet', 'little')
+            with source:
+                iterator = source.get_message_iterator()
+                self.assertEqual([next(iterator) for _ in range(4)], [b'a', b'bb', b'ccc', b'dd'])
+                position = source.position
+            self.assertEqual(position, {'offset': 26, 'skip_messages': 1})
+
+            source = get_message_source(source_path, None, 'cme_binary_packet', 'little')
+            with source:
+                source.seek(position)
+                self.assertEqual(list(source.get_message_iterator()), [b'dd', b'e'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,139 @@
+#
+# Copyright 2023 Google LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+# pylint: disable=invalid-name
+
+import os
+import sys
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from frame_util import order_deleted
+from transcoder.Transcoder import Transcoder
+from transcoder.TranscoderConfig import TranscoderConfig
+from transcoder.message.ParsedMessage import ParsedMessage
+from transcoder.message.handler import ConflationHandler
+from transcoder.output.memory import MemoryOutputManager
+
+SCHEMA_PATH = os.path.join(os.path.dirname(__file__), 'resources', 'itch_test_schema.xml')
+
+
+def message(name: str, timestamp: int, **fields) -> ParsedMessage:
+    """Returns a decoded message of the name and fields"""
+    return ParsedMessage(name, name, None, dictionary=dict(fields, timestamp=timestamp))
+
+
+class TestConflationHandler(unittest.TestCase):
+    """Tests messages are conflated per message type and key and output once per interval"""
+
+    def test_message_clock(self):
+        """Tests the latest message per key is flushed when message timestamps cross an interval"""
+        handler = ConflationHandler({'interval': '10'})
+        messages = [message('trade', 1, stock_locate=1, price=10), message('trade', 2, stock_locate=2, price=20),
+                    message('trade', 3, stock_locate=1, price=11), message('stock_directory', 4, stock_locate=1),
+                    message('system_event', 5), message('trade', 12, stock_locate=1, price=12)]
+        for x in messages:
+            handler.handle(x)
+
+        self.assertEqual([x.ignored for x in messages], [True, True, True, True, False, True])
+        flushed = [(x.name, x.dictionary.get('price', None)) for x in messages[-1].manufactured_messages]
+        self.assertEqual(flushed, [('trade', 11), ('trade', 20), ('stock_directory', None)])
+        self.assertEqual(handler.conflated_count, 1)
+        self.assertEqual([x.dictionary['price'] for x in handler.flush()], [12])
+        self.assertEqual(handler.flush(), [])
+
+    def test_message_names(self):
+        """Tests only the configured message types are conflated"""
+        handler = ConflationHandler({'key_field': 'security_id', 'message_names': 'Quote|Trade'})
+        quote, news = message('Quote', 1, security_id=5), message('News', 1, security_id=5)
+        handler.handle(quote)
+        handler.handle(news)
+        self.assertEqual((quote.ignored, news.ignored), (True, False))
+
+    def test_wall_clock(self):
+        """Tests intervals are measured on the system clock for live sources"""
+        handler = ConflationHandler({'clock': 'wall', 'interval': '0.5'})
+        handler_module = sys.modules[ConflationHandler.__module__]
+        messages = [message('trade', 0, stock_locate=1, price=x) for x in range(3)]
+        with mock.patch.object(handler_module.time, 'monotonic', side_effect=[100.1, 100.2, 100.6]):
+            for x in messages:
+                handler.handle(x)
+        self.assertIsNone(messages[1].manufactured_messages)
+        self.assertEqual([x.dictionary['price'] for x in messages[2].manufactured_messages], [1])
+
+    def test_quiet_source(self):
+        """Tests conflated messages are output on the wall clock while a live source is quiet"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            config = TranscoderConfig('itch', SCHEMA_PATH, os.path.join(temp_dir, 'live.bin'),
+                                      source_file_format_type='length_delimited', quiet=True,
+                                      error_output_path=temp_dir,
+                                      message_handlers='ConflationHandler:clock=wall:interval=0.05')
+            output = MemoryOutputManager()
+            transcoder = Transcoder.from_config(config, output_manager=output)
+            quiet_records = []
+
+            def live_messages():
+                yield order_deleted(1)
+                yield order_deleted(2)
+                deadline = time.monotonic() + 5
+                while len(output.records) == 0 and time.monotonic() < deadline:
+                    time.sleep(0.01)
+                quiet_records.extend(output.take_records())
+                yield order_deleted(3)
+
+            with mock.patch.object(transcoder.source, 'get_message_iterator', live_messages), \
+                    mock.patch.object(transcoder.source, 'open'), mock.patch.object(transcoder.source, 'close'):
+                transcoder.transcode()
+            self.assertEqual([x[1]['order_reference_number'] for x in quiet_records], [2])
+            self.assertEqual([x[1]['order_reference_number'] for x in output.take_records()], [3])
+            self.assertGreater(transcoder.flush_timer.flush_count, 0)
+            self.assertIs(transcoder.lock, transcoder.flush_timer.lock)
+            self.assertNotIn('transcode_message', vars(transcoder))
+
+    def test_timer_error(self):
+        """Tests an error of the timer thread stops the timer and is raised on the transcoder thread"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            config = TranscoderConfig('itch', SCHEMA_PATH, os.path.join(temp_dir, 'live.bin'),
+                                      source_file_format_type='length_delimited', quiet=True,
+                                      error_output_path=temp_dir,
+                                      message_handlers='ConflationHandler:clock=wall:interval=0.05')
+            transcoder = Transcoder.from_config(config, output_manager=MemoryOutputManager())
+            timer_lock = transcoder.flush_timer.lock
+
+            def live_messages():
+                yield order_deleted(1)
+                deadline = time.monotonic() + 5
+                while timer_lock.exception is None and time.monotonic() < deadline:
+                    time.sleep(0.01)
+                yield order_deleted(2)
+
+            handler = transcoder.all_handlers[0]
+            with mock.patch.object(transcoder.source, 'get_message_iterator', live_messages), \
+                    mock.patch.object(transcoder.source, 'open'), mock.patch.object(transcoder.source, 'close'), \
+                    mock.patch.object(handler, 'timed_flush', side_effect=ValueError('flush failed')):
+                with self.assertRaisesRegex(ValueError, 'flush failed'):
+                    transcoder.transcode()
+            self.assertIsNone(transcoder.flush_timer.thread)
+            self.assertFalse(timer_lock.lock.locked())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+#
+# Copyright 2023 Google LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+# pylint: disable=invalid-name
+
+import json
+import os
+import tempfile
+import unittest
+
+from frame_util import FIX_SPEC_PATH, ITCH_SCHEMA_PATH, schema_parser, synthetic_messages
+from transcoder.DecodeProfiler import DecodeProfiler
+from transcoder.Transcoder import Transcoder
+from transcoder.TranscoderConfig import TranscoderConfig
+from transcoder.message.ParsedMessage import ParsedMessage
+
+
+def profile(factory: str, schema_file_path: str, synthetic_options: str):
+    """Returns a parser of the factory and schema, a decode profiler that sampled every message it parsed, and the
+    parsed synthetic messages"""
+    parser = schema_parser(factory, schema_file_path)
+    profiler = DecodeProfiler(sample_interval=1)
+    profiler.instrument(parser)
+    messages = [parser.process_message(x) for x in synthetic_messages(factory, schema_file_path, synthetic_options)]
+    profiler.uninstrument()
+    return parser, profiler, messages
+
+
+class TestDecodeProfiler(unittest.TestCase):
+    """Tests decode time and allocations are attributed to templates and field types"""
+
+    def test_sbe_field_types(self):
+        """Tests SBE fields are attributed to their decode path, and precompiled layouts as a whole"""
+        parser, profiler, messages = profile('itch', ITCH_SCHEMA_PATH, 'count=40:mix=stock_directory=1|trade=1')
+        self.assertNotIn('_parse_message', vars(parser))
+        self.assertIsNotNone(messages[0].dictionary)
+        report = profiler.report()
+        self.assertEqual({x['template'] for x in report['templates']}, {'stock_directory', 'trade'})
+        self.assertEqual(sum(x['calls'] for x in report['templates']), 40)
+        self.assertEqual([x['field_type'] for x in report['field_types']], ['compiled_layout'])
+
+        message_type = parser.factory.schema.message_map[ord('R')]
+        sbe_message = message_type()
+        sbe_message.wrap(synthetic_messages('itch', ITCH_SCHEMA_PATH, 'count=1:mix=stock_directory=1')[0], 0)
+        parser.profile_decode(ParsedMessage(82, 'stock_directory', sbe_message), None, profiler)
+        field_types = profiler.field_types['stock_directory']
+        for field_type in ['TypeMessageField(variable_length_int)', 'TypeMessageField(string)',
+                           'TypeMessageField(char)', 'SetMessageField']:
+            self.assertGreater(field_types[field_type].calls, 0)
+
+    def test_fix_field_types(self):
+        """Tests FIX tokenizing and value conversions are attributed by tag type, with allocations"""
+        _, profiler, _ = profile('fix', FIX_SPEC_PATH, 'count=30:mix=MarketDataIncrementalRefresh=1')
+        report = profiler.report()
+        template = report['templates'][0]
+        self.assertEqual((template['template'], template['calls'], template['sampled_messages']),
+                         ('MarketDataIncrementalRefresh', 30, 30))
+        field_types = {x['field_type']: x for x in template['field_types']}
+        self.assertIn('tokenize', field_types)
+        self.assertIn('PRICE', field_types)
+        self.assertIn('CHAR(enum)', field_types)
+        self.assertGreater(field_types['tokenize']['mean_allocated_bytes'], 0)
+        estimates = [x['estimated_total_ns'] for x in template['field_types']]
+        self.assertEqual(estimates, sorted(estimates, reverse=True))
+
+    def test_transcode_report(self):
+        """Tests the report is written at the end of a transcode"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            report_path = os.path.join(temp_dir, 'decode.json')
+            config = TranscoderConfig('fix', FIX_SPEC_PATH, source_file_format_type='synthetic',
+                                      source_file_endian=None, quiet=True, error_output_path=temp_dir,
+                                      lazy_create_resources=True, synthetic_options='count=200',
+                                      profile_decode_path=report_path)
+            transcoder = Transcoder.from_config(config)
+            transcoder.transcode()
+            with open(report_path, encoding='utf-8') as report_file:
+                report = json.load(report_file)
+            self.assertEqual(sum(x['calls'] for x in report['templates']), 200)
+            self.assertEqual(report['field_types'][0]['field_type'], 'tokenize')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+#
+# Copyright 2023 Google LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+# pylint: disable=invalid-name
+
+import os
+import unittest
+
+from transcoder.message.MessageUtil import get_message_parser
+
+SPEC_PATH = os.path.join(os.path.dirname(__file__), 'resources', 'fix_test_spec.xml')
+
+HEADER = '8=FIX.4.4|9=100|35={}|49=SENDER|56=TARGET|34=1|52=20230101-12:00:00.000|'
+
+
+def fix_message(msg_type: str, body: str) -> bytes:
+    """Returns a FIX message of the type with a fixed header and the body, with | replaced by SOH"""
+    return (HEADER.format(msg_type) + body).replace('|', '\x01').encode('UTF-8')
+
+
+class TestFixCodec(unittest.TestCase):
+    """Tests tokenizing and repeating group handling of the string FIX codec"""
+
+    def setUp(self):
+        self.codec = get_message_parser('fix', SPEC_PATH).codec
+
+    def test_parse_tag_values(self):
+        """Tests tags are converted to int and values decoded"""
+        msg = self.codec.parse(fix_message('8', '37=O1|17=E1|150=F|39=2|55=SPY|54=1|151=0|14=100|10=000|'))
+        self.assertEqual(msg[35], '8')
+        self.assertEqual(msg[55], 'SPY')
+        self.assertEqual(msg[10], '000')
+
+    def test_parse_str_with_custom_separator(self):
+        """Tests unicode input split on a non-default separator"""
+        msg = self.codec.parse('8=FIX.4.4;35=0;112=ping;10=000;', separator=';')
+        self.assertEqual(dict(msg), {8: 'FIX.4.4', 35: '0', 112: 'ping', 10: '000'})
+
+    def test_word_tokens_join_previous_value(self):
+        """Tests a separator followed by a word and a separator stays part of the value"""
+        msg = self.codec.parse(b'8=FIX.4.4\x0135=0\x01112=ping\x01pong\x0110=000\x01')
+        self.assertEqual(msg[112], 'ping\x01pong')
+
+    def test_invalid_and_unterminated_tokens_dropped(self):
+        """Tests tokens without a delimiter and the unterminated trailing pair are dropped"""
+        msg = self.codec.parse(b'8=FIX.4.4\x0135=0\x01not a tag\x01112=ping\x0110=000')
+        self.assertEqual(dict(msg), {8: 'FIX.4.4', 35: '0', 112: 'ping'})
+
+    def test_short_message(self):
+        """Tests messages with fewer than four pairs are parsed"""
+        self.assertEqual(dict(self.codec.parse(b'8=FIX.4.4\x0135=0\x01')), {8: 'FIX.4.4', 35: '0'})
+
+    def test_repeating_groups(self):
+        """Tests repeating groups, nested groups and the tags following a group"""
+        msg = self.codec.parse(fix_message('X', '262=R1|268=2|279=0|269=0|270=10.5|453=2|448=A|452=1|448=B|452=3|'
+                                                '271=5|279=1|269=1|270=11|271=7|10=000|'))
+        entries = msg[268]
+        self.assertEqual(len(entries), 2)
+        self.assertEqual(entries[0][270], '10.5')
+        self.assertEqual([party[448] for party in entries[0][453]], ['A', 'B'])
+        self.assertEqual(entries[0][271], '5')
+        self.assertEqual(entries[1][271], '7')
+        self.assertEqual(msg[10], '000')
+
+    def test_empty_repeating_group(self):
+        """Tests a zero count creates an empty repeating group"""
+        msg = self.codec.parse(fix_message('X', '268=0|10=000|'))
+        self.assertEqual(len(msg[268]), 0)
+
+    def test_message_encoding(self):
+        """Tests encoded data tags are decoded with the encoding in tag 347"""
+        body = HEADER.format('8').replace('52=', '347=latin-1|52=').replace('|', '\x01').encode('UTF-8')
+        body += '355=caf\xe9\x01'.encode('latin-1')
+        msg = self.codec.parse(body)
+        self.assertEqual(msg[347], 'latin-1')
+        self.assertEqual(msg[355], 'caf\xe9')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,186 @@
+#
+# Copyright 2023 Google LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+# pylint: disable=invalid-name
+
+import os
+import tempfile
+import unittest
+
+from transcoder.message.MessageUtil import get_message_parser
+from transcoder.message.handler import SequencerHandler
+
+SPEC_PATH = os.path.join(os.path.dirname(__file__), 'resources', 'fix_test_spec.xml')
+
+HEADER = '8=FIX.4.4|9=100|35={}|49=SENDER|56=TARGET|34=1|52=20230101-12:00:00.000|'
+
+
+def fix_message(msg_type: str, body: str) -> bytes:
+    """Returns a FIX message of the type with a fixed header and the body, with | replaced by SOH"""
+    return (HEADER.format(msg_type) + body).replace('|', '\x01').encode('UTF-8')
+
+
+class TestFixParser(unittest.TestCase):
+    """Tests conversion of FIX messages to dictionaries"""
+
+    def setUp(self):
+        self.parser = get_message_parser('fix', SPEC_PATH)
+        self.parser.process_schema()
+
+    def parse(self, raw_msg):
+        """Parses the message, asserting it is parsed without an exception"""
+        message = self.parser.process_message(raw_msg)
+        self.assertIsNone(message.exception)
+        return message
+
+    def test_execution_report(self):
+        """Tests values are cast to their spec types and enums to descriptions"""
+        message = self.parse(fix_message('8', '37=O1|17=E1|150=F|39=2|55=SPY|54=1|38=100|44=412.5|151=0|14=100|'
+                                              '10=000|'))
+        self.assertEqual(message.name, 'ExecutionReport')
+        dictionary = message.dictionary
+        self.assertEqual(dictionary['MsgSeqNum'], 1)
+        self.assertEqual(dictionary['Price'], 412.5)
+        self.assertEqual(dictionary['OrdStatus'], 'FILLED')
+        self.assertEqual(dictionary['Side'], 'BUY')
+        self.assertEqual(dictionary['Symbol'], 'SPY')
+
+    def test_tags_outside_schema_skipped(self):
+        """Tests tags the message schema does not emit are left out of the dictionary"""
+        message = self.parse(fix_message('0', '112=ping|1=ACCOUNT|10=000|'))
+        self.assertEqual(message.dictionary['TestReqID'], 'ping')
+        self.assertNotIn('Account', message.dictionary)
+        self.assertNotIn('CheckSum', message.dictionary)
+
+    def test_nested_repeating_groups(self):
+        """Tests repeating groups and nested groups are placed within their parent record"""
+        message = self.parse(fix_message('X', '268=2|279=0|269=0|270=10.5|453=1|448=A|452=1|271=5|'
+                                              '279=2|269=1|270=11|10=000|'))
+        entries = message.dictionary['NoMDEntries']
+        self.assertEqual(len(entries), 2)
+        self.assertEqual(entries[0]['MDEntrySize'], 5.0)
+        self.assertEqual(entries[0]['NoPartyIDs'], [{'PartyID': 'A', 'PartyRole': 1}])
+        self.assertEqual(entries[1]['MDUpdateAction'], 'DELETE')
+
+    def test_unknown_tag(self):
+        """Tests tags missing from the spec are reported as message errors"""
+        message = self.parser.process_message(fix_message('0', '112=ping|9999=x|10=000|'))
+        self.assertIsInstance(message.exception, KeyError)
+
+
+class TestFixMsgTypePeek(unittest.TestCase):
+    """Tests message types are identified from the raw message before tokenizing"""
+
+    def test_peek_msg_type(self):
+        """Tests MsgType is found within the leading fields of bytes and str messages"""
+        parser = get_message_parser('fix', SPEC_PATH)
+        self.assertEqual(parser.peek_msg_type(fix_message('8', '')), '8')
+        self.assertEqual(parser.peek_msg_type(fix_message('X', '').decode('UTF-8')), 'X')
+        self.assertEqual(parser.peek_msg_type(b'\n8=FIX.4.4\x019=5\x0135=0\x01'), '0')
+        self.assertEqual(parser.peek_msg_type(' \r\n8=FIX.4.4|9=5|35=A|'.replace('|', '\x01')), 'A')
+        self.assertIsNone(parser.peek_msg_type(b' \n'))
+        self.assertIsNone(parser.peek_msg_type(b'8=FIX.4.4\x019=5\x0149=A\x0156=B\x0135=0\x01'))
+
+    def test_excluded_message_not_tokenized(self):
+        """Tests excluded message types are rejected with the raw message untouched"""
+        parser = get_message_parser('fix', SPEC_PATH, message_type_exclusions='Heartbeat')
+        raw_msg = fix_message('0', '112=ping|10=000|')
+        message = parser.process_message(raw_msg)
+        self.assertTrue(message.ignored)
+        self.assertIs(message.raw_message, raw_msg)
+
+    def test_stats_only(self):
+        """Tests message types are counted without tokenizing the message"""
+        parser = get_message_parser('fix', SPEC_PATH, stats_only=True)
+        for msg_type in ['0', '0', '8']:
+            message = parser.process_message(fix_message(msg_type, '10=000|'))
+            self.assertTrue(message.ignored)
+            self.assertIsNone(message.dictionary)
+        self.assertEqual(parser.record_type_count, {'Heartbeat': 2, 'ExecutionReport': 1})
+
+    def test_msg_type_outside_leading_fields(self):
+        """Tests messages with a late MsgType fall back to tokenizing"""
+        parser = get_message_parser('fix', SPEC_PATH)
+        parser.process_schema()
+        message = parser.process_message(b'8=FIX.4.4\x019=5\x0149=A\x0156=B\x0135=0\x01112=ping\x01')
+        self.assertEqual(message.name, 'Heartbeat')
+        self.assertEqual(message.dictionary['TestReqID'], 'ping')
+
+
+class TestFixSpecCache(unittest.TestCase):
+    """Tests the parsed FIX spec and schemas are reused across parser instances"""
+
+    def setUp(self):
+        self.cache_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+
+    def tearDown(self):
+        self.cache_dir.cleanup()
+
+    def create_parser(self, fix_header_tags=None):
+        """Returns a parser caching its spec and schemas in the temporary cache directory"""
+        return get_message_parser('fix', SPEC_PATH, fix_header_tags=fix_header_tags,
+                                  schema_cache_dir=self.cache_dir.name)
+
+    def test_cache_round_trip(self):
+        """Tests a second parser loads the spec and schemas written by the first"""
+        parser = self.create_parser()
+        self.assertIsNone(parser.cached_schemas)
+        schemas = parser.process_schema()
+
+        cached_parser = self.create_parser()
+        self.assertIsNotNone(cached_parser.cached_schemas)
+        cached_schemas = cached_parser.process_schema()
+        self.assertEqual([x.name for x in cached_schemas], [x.name for x in schemas])
+        self.assertEqual([len(x.fields) for x in cached_schemas], [len(x.fields) for x in schemas])
+
+        message = cached_parser.process_message(fix_message('0', '112=ping|10=000|'))
+        self.assertEqual(message.dictionary['TestReqID'], 'ping')
+
+    def test_cached_schemas_not_mutated(self):
+        """Tests fields handlers append to the schemas returned do not reach the cached schemas"""
+        self.create_parser().process_schema()
+        parser = self.create_parser()
+        handler = SequencerHandler({})
+        field_counts = []
+        for _ in range(2):
+            schemas = parser.process_schema()
+            field_counts.append([len(x.fields) for x in schemas])
+            for schema in schemas:
+                handler.append_manufactured_fields(schema)
+        self.assertEqual(field_counts[0], field_counts[1])
+        self.assertEqual(len(parser.cached_schemas[0].fields), field_counts[0][0])
+
+    def test_cache_keyed_by_header_tags(self):
+        """Tests schemas built with different FIX header tags are cached separately"""
+        self.create_parser().process_schema()
+        parser = self.create_parser(fix_header_tags='1')
+        self.assertIsNone(parser.cached_schemas)
+        self.assertEqual(parser.process_schema()[0].fields[0].name, 'Account')
+
+    def test_corrupt_cache_ignored(self):
+        """Tests an unreadable cache entry falls back to parsing the spec"""
+        parser = self.create_parser()
+        parser.process_schema()
+        with open(parser.spec_cache.cache_file_path, 'wb') as cache_file:
+            cache_file.write(b'not a pickle')
+        self.assertIsNone(self.create_parser().cached_schemas)
+
+
+if __name__ == '__main__':
+    unittest.main()
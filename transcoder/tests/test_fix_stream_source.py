@@ -0,0 +1,96 @@
+#
+# Copyright 2023 Google LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+# pylint: disable=invalid-name
+
+import os
+import tempfile
+import unittest
+
+from transcoder.message.MessageUtil import get_message_parser
+from transcoder.source import get_message_source
+
+SPEC_PATH = os.path.join(os.path.dirname(__file__), 'resources', 'fix_test_spec.xml')
+
+
+def fix_message(msg_type: str, body: str, body_length_delta: int = 0) -> bytes:
+    """Returns a FIX message with its BodyLength, offset by body_length_delta, and | replaced by SOH"""
+    body = f'35={msg_type}|49=SENDER|56=TARGET|34=1|52=20230101-12:00:00.000|{body}'.replace('|', '\x01')
+    header = f'8=FIX.4.4\x019={len(body) + body_length_delta}\x01'
+    return (header + body + '10=000\x01').encode('UTF-8')
+
+
+class TestFixStreamSource(unittest.TestCase):
+    """Tests framing of concatenated FIX messages"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def read_frames(self, data: bytes, read_buffer_size: int = None):
+        """Writes the data to a stream file, returning the source and the frames read from it"""
+        path = os.path.join(self.temp_dir.name, 'stream.fix')
+        with open(path, 'wb') as stream_file:
+            stream_file.write(data)
+        source = get_message_source(path, None, 'fix_stream', None)
+        if read_buffer_size is not None:
+            source.read_buffer_size = read_buffer_size
+        with source:
+            frames = list(source.get_message_iterator())
+        return source, frames
+
+    def test_concatenated_messages(self):
+        """Tests messages are framed without delimiters and yielded as memoryviews"""
+        messages = [fix_message('0', '112=ping|'), fix_message('8', '55=SPY|10=not the checksum|'),
+                    fix_message('0', '112=pong|')]
+        source, frames = self.read_frames(b''.join(messages))
+        self.assertTrue(all(isinstance(frame, memoryview) for frame in frames))
+        self.assertEqual([bytes(frame) for frame in frames], messages)
+        self.assertEqual(source.record_count, 3)
+        self.assertEqual(source.skipped_byte_count, 0)
+
+    def test_frames_split_across_reads(self):
+        """Tests messages spanning read buffer boundaries, with line breaks between messages"""
+        messages = [fix_message('0', f'112=ping{i}|') for i in range(20)]
+        source, frames = self.read_frames(b'\r\n'.join(messages), read_buffer_size=7)
+        self.assertEqual([bytes(frame) for frame in frames], messages)
+        self.assertEqual(source.skipped_byte_count, 0)
+
+    def test_resync_after_invalid_data(self):
+        """Tests garbage, an incorrect BodyLength and a truncated message are skipped"""
+        first, last = fix_message('0', '112=first|'), fix_message('0', '112=last|')
+        data = b'garbage8=FIX' + first + fix_message('0', '112=bad|', body_length_delta=3) + last + last[:30]
+        source, frames = self.read_frames(data, read_buffer_size=16)
+        self.assertEqual([bytes(frame) for frame in frames], [first, last])
+        self.assertGreater(source.skipped_byte_count, 0)
+
+    def test_parse_frames(self):
+        """Tests the FIX parser accepts memoryview frames passed to it directly, which it copies"""
+        parser = get_message_parser('fix', SPEC_PATH)
+        parser.process_schema()
+        _, frames = self.read_frames(fix_message('0', '112=ping|') + fix_message('8', '55=SPY|'))
+        messages = [parser.process_message(frame) for frame in frames]
+        self.assertEqual([message.name for message in messages], ['Heartbeat', 'ExecutionReport'])
+        self.assertEqual(messages[0].dictionary['TestReqID'], 'ping')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+#
+# Copyright 2023 Google LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+# pylint: disable=invalid-name
+
+import os
+import struct
+import unittest
+
+from transcoder.message.MessageUtil import get_message_parser
+from transcoder.message.factory.ITCHMessage import ITCHMessage
+from transcoder.message.factory.exception import TemplateSchemaNotDefinedError
+
+SCHEMA_PATH = os.path.join(os.path.dirname(__file__), 'resources', 'itch_test_schema.xml')
+
+
+def timestamp_bytes(value: int) -> bytes:
+    """Returns an ITCH 48-bit big endian timestamp"""
+    return value.to_bytes(6, 'big')
+
+
+class TestITCHMessageFactory(unittest.TestCase):
+    """Verifies the precompiled ITCH layouts decode identically to the generic SBE field traversal"""
+
+    def setUp(self):
+        self.parser = get_message_parser('itch', SCHEMA_PATH)
+        self.factory = self.parser.factory
+
+    def assert_decodes_as_generic(self, buffer: bytes):
+        """Asserts the precompiled layout decodes the buffer as the generic field traversal does"""
+        message, size = self.factory.build(buffer, 0)
+        self.assertIsInstance(message, ITCHMessage)
+        self.assertEqual(size, len(buffer))
+
+        generic_message = message.message_type()
+        generic_message.wrap(buffer, 0)
+        expected = self.parser.process_field(generic_message.fields, generic_message.groups)
+        actual = self.factory.decode(message)
+        self.assertEqual(actual, expected)
+        return actual
+
+    def test_add_order(self):
+        """Tests enum descriptions, 48-bit timestamps and padded strings"""
+        buffer = b'A' + struct.pack('>HH', 7, 0) + timestamp_bytes(123456789012) + \
+            struct.pack('>QcI8sI', 99, b'B', 100, b'SPY     ', 1234500)
+        decoded = self.assert_decodes_as_generic(buffer)
+        self.assertEqual(decoded['buy_sell_indicator'], 'Buy')
+        self.assertEqual(decoded['timestamp'], 123456789012)
+        self.assertEqual(decoded['stock'], 'SPY')
+
+    def test_enum_fallback_to_name(self):
+        """Tests enum values without a description fall back to the enumerant name"""
+        buffer = b'P' + struct.pack('>HH', 1, 2) + timestamp_bytes(1) + \
+            struct.pack('>QcI8sIQ', 5, b'S', 10, b'QQQ\x00\x00\x00\x00\x00', 4200, 77)
+        decoded = self.assert_decodes_as_generic(buffer)
+        self.assertEqual(decoded['buy_sell_indicator'], 'sell')
+
+    def test_null_values(self):
+        """Tests null chars, empty strings, sets and primitive null values"""
+        buffer = b'R' + struct.pack('>HH', 0xFFFF, 0) + timestamp_bytes(0) + \
+            struct.pack('>8scB', bytes(8), b'\x00', 0)
+        decoded = self.assert_decodes_as_generic(buffer)
+        self.assertIsNone(decoded['stock_locate'])
+        self.assertIsNone(decoded['stock'])
+        self.assertIsNone(decoded['market_category'])
+        self.assertIsNone(decoded['flags'])
+
+    def test_set_choices(self):
+        """Tests set choices are joined in bit order"""
+        buffer = b'R' + struct.pack('>HH', 3, 0) + timestamp_bytes(42) + struct.pack('>8scB', b'AAPL    ', b'Q', 3)
+        decoded = self.assert_decodes_as_generic(buffer)
+        self.assertEqual(decoded['flags'], 'first, second')
+
+    def test_all_templates(self):
+        """Tests every template in the schema decodes from an arbitrary buffer"""
+        for template_id in self.factory.schema.message_map:
+            buffer = bytes([template_id]) + b'\x01' * 60
+            self.assert_decodes_as_generic(buffer)
+
+    def test_unknown_template(self):
+        """Tests an unknown message type raises the template error"""
+        with self.assertRaises(TemplateSchemaNotDefinedError):
+            self.factory.build(b'Z' + bytes(20), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+#
+# Copyright 2023 Google LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+# pylint: disable=invalid-name
+
+import subprocess
+import sys
+import unittest
+
+from transcoder.message.MessageUtil import message_parsers
+from transcoder.message.factory import all_supported_factory_types
+from transcoder.output.OutputUtil import UnsupportedOutputTypeError, all_output_identifiers, \
+    get_output_manager_class
+from transcoder.source.SourceUtil import UnsupportedFileTypeError, all_source_identifiers, get_source_class
+
+LAZY_IMPORT_SCRIPT = '''
+import sys
+import transcoder.main
+from transcoder.message.MessageUtil import message_parsers
+from transcoder.output.OutputUtil import get_output_manager_class
+from transcoder.source.SourceUtil import get_source_class
+message_parsers.load('itch')
+get_source_class('length_delimited')
+get_output_manager_class('jsonl')
+print(','.join(x for x in ['google.cloud.bigquery', 'google.cloud.pubsub_v1', 'numpy', 'avro', 'fastavro', 'yaml',
+                           'dpkt', 'transcoder.message.handler.BookBuilderHandler', 'http.server',
+                           'transcoder.TranscoderMetrics', 'transcoder.Checkpointer', 'transcoder.DecodeProfiler',
+                           'transcoder.StageProfiler', 'transcoder.source.MergedMessageSource',
+                           'transcoder.HandlerFlushTimer'] if x in sys.modules))
+'''
+
+PACKAGE_EXPORTS_SCRIPT = '''
+from transcoder.source.file.FileMessageSource import FileMessageSource
+from transcoder.source.file.FixStreamFileMessageSource import FixStreamFileMessageSource
+from transcoder.source import file
+from transcoder.source.SourceUtil import get_source_class
+print(file.FileMessageSource is FileMessageSource, isinstance(file.LineDelimitedFileMessageSource, type),
+      get_source_class('fix_stream') is FixStreamFileMessageSource,
+      file.FixStreamFileMessageSource is FixStreamFileMessageSource)
+'''
+
+
+class TestLazyImports(unittest.TestCase):
+    """Tests implementations are registered by identifier and imported only when selected"""
+
+    def test_unselected_dependencies_not_imported(self):
+        """Tests a file to file run does not import cloud, avro, pcap, handler, profiling, metrics or checkpoint
+        dependencies"""
+        result = subprocess.run([sys.executable, '-c', LAZY_IMPORT_SCRIPT], capture_output=True, check=True,
+                                text=True)
+        self.assertEqual(result.stdout.strip(), '')
+
+    def test_registered_identifiers(self):
+        """Tests each registered identifier resolves to the class reporting that identifier"""
+        for identifier in all_output_identifiers():
+            self.assertEqual(get_output_manager_class(identifier).output_type_identifier(), identifier)
+        for identifier in all_source_identifiers():
+            self.assertEqual(get_source_class(identifier).source_type_identifier(), identifier)
+        self.assertEqual(all_supported_factory_types(), ['cme', 'itch', 'memx', 'fix'])
+        for factory in message_parsers.names():
+            self.assertIn(factory, message_parsers.load(factory).supported_factory_types())
+        with self.assertRaises(UnsupportedOutputTypeError):
+            get_output_manager_class('parquet')
+        with self.assertRaises(UnsupportedFileTypeError):
+            get_source_class('parquet')
+
+    def test_package_exports_classes(self):
+        """Tests package exports resolve to classes, eagerly exported base classes also after their submodules are
+        imported directly, and registered classes also after their lazily exported submodules are"""
+        result = subprocess.run([sys.executable, '-c', PACKAGE_EXPORTS_SCRIPT], capture_output=True, check=True,
+                                text=True)
+        self.assertEqual(result.stdout.split(), ['True', 'True', 'True', 'True'])
+        from transcoder.source import file  # pylint: disable=import-outside-toplevel
+        self.assertIn('PcapFileMessageSource', dir(file))
+        with self.assertRaises(AttributeError):
+            getattr(file, 'MissingMessageSource')
+
+
+if __name__ == '__main__':
+    unittest.main()
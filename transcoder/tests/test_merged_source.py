@@ -0,0 +1,128 @@
+#
+# Copyright 2023 Google LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+# pylint: disable=invalid-name
+
+import functools
+import json
+import os
+import struct
+import tempfile
+import unittest
+
+import dpkt
+
+from frame_util import itch_header, length_delimited, order_deleted, udp_frame
+from transcoder.TranscoderConfig import TranscoderConfig
+from transcoder.Transcoder import Transcoder
+from transcoder.message.MessageUtil import get_message_parser
+from transcoder.source import get_message_source
+from transcoder.source.MergedMessageSource import MergedMessageSource, MergedSourceError
+
+SCHEMA_PATH = os.path.join(os.path.dirname(__file__), 'resources', 'itch_test_schema.xml')
+
+
+class TestMergedMessageSource(unittest.TestCase):
+    """Tests merging the messages of several sources into one stream in timestamp order"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.source_dir = os.path.join(self.temp_dir.name, 'channels')
+        os.makedirs(self.source_dir)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write_itch(self, name: str, messages: [bytes]) -> str:
+        """Writes a length delimited ITCH source file of the messages to the source directory, returning its path"""
+        path = os.path.join(self.source_dir, name)
+        with open(path, 'wb') as source_file:
+            source_file.write(length_delimited(messages))
+        return path
+
+    def merged_transcode(self, **config) -> (Transcoder, [dict]):
+        """Transcodes the source directory merged by the timestamp field, returning the transcoder and the
+        order_deleted records"""
+        config = TranscoderConfig('itch', SCHEMA_PATH, self.source_dir, source_file_format_type='length_delimited',
+                                  quiet=True, output_type='jsonl', output_path=self.temp_dir.name,
+                                  error_output_path=self.temp_dir.name, merge_sources=True,
+                                  merge_timestamp_field='timestamp', **config)
+        transcoder = Transcoder.from_config(config)
+        transcoder.transcode()
+        transcoder.output_manager.wait_for_completion()
+        with open(os.path.join(self.temp_dir.name, 'channels-order_deleted.jsonl'), encoding='utf-8') as output_file:
+            return transcoder, [json.loads(x) for x in output_file]
+
+    def test_capture_timestamps(self):
+        """Tests pcap messages are merged by capture timestamp, in source order for equal timestamps"""
+        captures = [[(x, 1_672_565_400 + x / 1000) for x in range(0, 300, 3)],
+                    [(x, 1_672_565_400 + x / 1000) for x in range(1, 300, 3)],
+                    [(1000, 1_672_565_400)] + [(x, 1_672_565_400 + x / 1000) for x in range(2, 300, 3)]]
+        sources = []
+        for i, packets in enumerate(captures):
+            path = os.path.join(self.source_dir, f'{i}.pcap')
+            with open(path, 'wb') as pcap_file:
+                writer = dpkt.pcap.Writer(pcap_file)
+                for order_id, timestamp in packets:
+                    writer.writepkt(udp_frame(order_deleted(order_id, 0)), ts=timestamp)
+            sources.append(get_message_source(path, None, 'pcap', None))
+
+        source = MergedMessageSource(sources, read_ahead=4)
+        with source:
+            order_ids = [struct.unpack_from('>Q', x, 11)[0] for x in source.get_message_iterator()]
+        self.assertEqual(order_ids, [0, 1000] + list(range(1, 300)))
+        self.assertEqual(source.record_count, 301)
+
+        with self.assertRaises(MergedSourceError):
+            source = MergedMessageSource([get_message_source(self.write_itch('a.bin', [order_deleted(1, 1)]), None,
+                                                             'length_delimited', 'big')])
+            with source:
+                list(source.get_message_iterator())
+
+    def test_timestamp_field(self):
+        """Tests messages are merged by a decoded timestamp field"""
+        paths = [self.write_itch('a.bin', [order_deleted(x, 10 * x) for x in range(0, 100, 2)]),
+                 self.write_itch('b.bin', [order_deleted(x, 10 * x) for x in range(1, 100, 2)])]
+        parser = get_message_parser('itch', SCHEMA_PATH)
+        source = MergedMessageSource([get_message_source(x, None, 'length_delimited', 'big') for x in paths],
+                                     functools.partial(parser.read_field, field_name='timestamp'), read_ahead=7)
+        with source:
+            order_ids = [struct.unpack_from('>Q', x, 11)[0] for x in source.get_message_iterator()]
+        self.assertEqual(order_ids, list(range(100)))
+        self.assertEqual(source.source_size, 100 * 21)
+
+    def test_merged_transcode(self):
+        """Tests a directory of source files is transcoded as one stream, named for the directory"""
+        self.write_itch('a.bin', [order_deleted(x, 10 * x) for x in range(0, 60, 3)])
+        self.write_itch('b.bin', [order_deleted(x, 10 * x) for x in range(1, 60, 3)])
+        self.write_itch('c.bin', [order_deleted(x, 10 * x) for x in range(2, 60, 3)])
+        _, records = self.merged_transcode()
+        self.assertEqual([x['order_reference_number'] for x in records], list(range(60)))
+
+    def test_undecodable_timestamp(self):
+        """Tests a message whose timestamp fails to decode keeps its place, and is reported by the transcoder"""
+        self.write_itch('a.bin', [order_deleted(0, 0), itch_header(b'!'), order_deleted(2, 20)])
+        self.write_itch('b.bin', [order_deleted(1, 10), order_deleted(3, 30)])
+        transcoder, records = self.merged_transcode(continue_on_error=True)
+        self.assertEqual([x['order_reference_number'] for x in records], [0, 1, 2, 3])
+        self.assertEqual((transcoder.source.record_count, transcoder.message_parser.error_summary_count),
+                         (5, {'UNKNOWN': 1}))
+
+if __name__ == '__main__':
+    unittest.main()
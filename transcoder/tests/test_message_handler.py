@@ -0,0 +1,229 @@
+#
+# Copyright 2023 Google LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+# pylint: disable=invalid-name
+
+import os
+import tempfile
+import unittest
+
+from frame_util import length_delimited, system_event, time_message
+from transcoder.PluginRegistry import PluginCapabilities
+from transcoder.Transcoder import Transcoder
+from transcoder.TranscoderConfig import TranscoderConfig
+from transcoder.message.ErrorWriter import TranscodeStep
+from transcoder.message.ParsedMessage import ParsedMessage
+from transcoder.message.handler import SequencerHandler, TimestampPullForwardHandler
+from transcoder.message.handler.MessageHandler import MessageHandler
+from transcoder.output.memory import MemoryOutputManager
+
+SPEC_PATH = os.path.join(os.path.dirname(__file__), 'resources', 'fix_test_spec.xml')
+ITCH_SCHEMA_PATH = os.path.join(os.path.dirname(__file__), 'resources', 'itch_test_schema.xml')
+
+
+class ExecutionReportHandler(MessageHandler):
+    """Records the messages passed to a handler supporting a single message type"""
+
+    def __init__(self, config=None):
+        super().__init__(config)
+        self.handled = []
+
+    @property
+    def supports_all_message_types(self):
+        return False
+
+    @property
+    def supported_message_types(self):
+        return ['8']
+
+    def handle(self, message: ParsedMessage):
+        self.handled.append(message.dictionary['id'])
+
+
+class CountHandler(MessageHandler):
+    """Manufactures a count message for each message handled, failing on time messages of the given second"""
+
+    capabilities = PluginCapabilities(supports_batching=True)
+
+    def __init__(self, fail_second: int, restorable: bool = True):
+        super().__init__()
+        self.fail_second = fail_second
+        self.restorable = restorable
+        self.count = 0
+
+    def checkpoint_state(self):
+        return {'count': self.count} if self.restorable is True else None
+
+    def restore_state(self, state):
+        self.count = state['count']
+
+    def handle(self, message: ParsedMessage):
+        if message.dictionary.get('second') == self.fail_second:
+            raise ValueError('handler failure')
+        self.count += 1
+        message.manufactured_messages = (message.manufactured_messages or []) + \
+            [ParsedMessage('count', 'count', None, dictionary={'count': self.count})]
+
+
+def create_transcoder(message_handlers: str, error_output_path: str) -> Transcoder:
+    """Returns a transcoder of FIX messages passed to it, with the handlers given by their spec"""
+    return Transcoder.from_config(TranscoderConfig('fix', SPEC_PATH, source_file_format_type='line_delimited',
+                                                   source_file_endian=None, quiet=True,
+                                                   error_output_path=error_output_path,
+                                                   message_handlers=message_handlers, lazy_create_resources=True,
+                                                   continue_on_error=True))
+
+
+def create_messages(types: [str]) -> [ParsedMessage]:
+    """Returns parsed messages of the types, with their index as id and second"""
+    return [ParsedMessage(msg_type, 'time_message' if msg_type == 'T' else msg_type, None,
+                          dictionary={'id': i, 'second': i}) for i, msg_type in enumerate(types)]
+
+
+class TestHandlerDispatch(unittest.TestCase):
+    """Tests handler chains are resolved per message type and applied to single messages and batches"""
+
+    def setUp(self):
+        self.error_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.transcoder = create_transcoder('SequencerHandler,TimestampPullForwardHandler', self.error_dir.name)
+        self.type_handler = ExecutionReportHandler()
+        self.transcoder.all_handlers.insert(1, self.type_handler)
+        self.transcoder.message_handlers['8'] = [self.type_handler]
+        self.transcoder.build_handler_chains()
+
+    def tearDown(self):
+        self.error_dir.cleanup()
+
+    def test_handler_chains(self):
+        """Tests handlers for all message types precede type specific handlers in each chain"""
+        default_chain = tuple(self.transcoder.all_message_type_handlers)
+        self.assertEqual([type(x) for x in default_chain], [SequencerHandler, TimestampPullForwardHandler])
+        self.assertEqual(self.transcoder.default_handler_chain, default_chain)
+        self.assertEqual(self.transcoder.handler_chains['8'], default_chain + (self.type_handler,))
+
+    def test_batch_matches_single_message_dispatch(self):
+        """Tests executing handlers over a batch gives the same results as one message at a time"""
+        types = ['0', 'T', '8', '0', '8', 'T', '0']
+        messages, batch = create_messages(types), create_messages(types)
+        messages[3].ignored = batch[3].ignored = True
+        for message in messages:
+            self.transcoder.execute_handlers(message)
+        single_results = [message.dictionary for message in messages]
+        single_handled = self.type_handler.handled
+
+        transcoder = create_transcoder('SequencerHandler,TimestampPullForwardHandler', self.error_dir.name)
+        type_handler = ExecutionReportHandler()
+        transcoder.all_handlers.append(type_handler)
+        transcoder.message_handlers['8'] = [type_handler]
+        transcoder.build_handler_chains()
+        transcoder.execute_handlers_batch(batch)
+
+        self.assertEqual([message.dictionary for message in batch], single_results)
+        self.assertEqual(type_handler.handled, single_handled)
+        self.assertEqual(single_results[6], {'id': 6, 'second': 6, 'sequence_number': 6, 'timestamp_seconds': 5})
+
+    def test_failed_handler_step(self):
+        """Tests the failing handler is recorded as the error step"""
+        message = ParsedMessage('8', '8', None, dictionary={})
+        with self.assertRaises(KeyError):
+            self.transcoder.execute_handlers(message)
+        self.assertEqual(self.transcoder.error_writer.step, TranscodeStep.EXECUTE_HANDLER)
+        self.assertEqual(self.transcoder.error_writer.note, 'ExecutionReportHandler')
+
+
+class TestBatchHandlers(unittest.TestCase):
+    """Tests batch processing of the sequencer and timestamp handlers keeps state across batches"""
+
+    def test_sequencer_batches(self):
+        """Tests sequence numbers continue across batches and skip ignored messages"""
+        handler = SequencerHandler({'field_name': 'seq'})
+        first, second = create_messages(['0', '0', '0']), create_messages(['0', '0'])
+        first[1].ignored = True
+        handler.handle_batch(first)
+        handler.handle_batch(second)
+        self.assertEqual([x.dictionary.get('seq') for x in first + second], [1, None, 2, 3, 4])
+
+    def test_timestamp_pull_forward_batches(self):
+        """Tests the last time message is carried forward into the following batch"""
+        handler = TimestampPullForwardHandler()
+        handler.handle_batch(create_messages(['0', 'T', '0']))
+        batch = create_messages(['0'])
+        handler.handle_batch(batch)
+        self.assertEqual(batch[0].dictionary['timestamp_seconds'], 1)
+
+
+
+class TestBatchTranscoding(unittest.TestCase):
+    """Tests source messages transcoded in batches are written as they are message by message"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.source_path = os.path.join(self.temp_dir.name, 'itch.bin')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def create_transcoder(self, messages: [bytes], continue_on_error: bool, message_handlers: str = None):
+        """Returns a transcoder of the ITCH messages written to a length delimited source file, writing to memory"""
+        with open(self.source_path, 'wb') as source_file:
+            source_file.write(length_delimited(messages))
+        config = TranscoderConfig('itch', ITCH_SCHEMA_PATH, self.source_path, source_file_format_type='length_delimited',
+                                  quiet=True, error_output_path=self.temp_dir.name, message_handlers=message_handlers,
+                                  continue_on_error=continue_on_error)
+        return Transcoder.from_config(config, output_manager=MemoryOutputManager())
+
+    def test_decode_error(self):
+        """Tests the messages parsed ahead of a message that fails to decode are written before the error is raised"""
+        messages = [system_event(1), system_event(2), b'Z' + bytes(10), system_event(3)]
+        for batch_handlers in [True, False]:
+            transcoder = self.create_transcoder(messages, False, 'SequencerHandler')
+            self.assertTrue(transcoder.batch_handlers)
+            transcoder.batch_handlers = batch_handlers
+            with self.assertRaises(Exception):
+                transcoder.transcode()
+            self.assertEqual([x[1]['sequence_number'] for x in transcoder.output_manager.records], [1, 2])
+
+    def test_handler_error(self):
+        """Tests a batch a handler fails on is handled again message by message from the handler state ahead of it,
+        without the messages the handler manufactured in the failed batch"""
+        records = []
+        for batch_handlers in [True, False]:
+            transcoder = self.create_transcoder([time_message(1), time_message(2), time_message(3)], True)
+            transcoder.add_handler(CountHandler(fail_second=2))
+            transcoder.build_handler_chains()
+            transcoder.select_pipeline()
+            self.assertTrue(transcoder.batch_handlers)
+            transcoder.batch_handlers = batch_handlers
+            transcoder.transcode()
+            records.append(transcoder.output_manager.records)
+        self.assertEqual(records[0], records[1])
+        self.assertEqual(records[0], [('time_message', {'second': 1}), ('count', {'count': 1}),
+                                      ('time_message', {'second': 3}), ('count', {'count': 2})])
+
+    def test_handler_without_state(self):
+        """Tests handlers are not batched if they can not restore their state ahead of a failed batch"""
+        transcoder = self.create_transcoder([time_message(1)], True)
+        transcoder.add_handler(CountHandler(fail_second=None, restorable=False))
+        transcoder.build_handler_chains()
+        transcoder.select_pipeline()
+        self.assertFalse(transcoder.batch_handlers)
+
+
+if __name__ == '__main__':
+    unittest.main()
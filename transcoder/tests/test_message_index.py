@@ -0,0 +1,103 @@
+#
+# Copyright 2023 Google LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+# pylint: disable=invalid-name
+
+import json
+import os
+import unittest
+
+import dpkt
+
+from frame_util import SourceFileTestCase, cme_message, cme_packet, length_delimited, order_deleted, udp_frame
+from transcoder.Transcoder import Transcoder
+from transcoder.TranscoderConfig import TranscoderConfig
+from transcoder.message.factory.MessageFactory import get_template_id_reader
+from transcoder.source import get_message_source
+from transcoder.source.file.MessageIndex import MessageIndex, MessageIndexError, build_index
+
+SCHEMA_PATH = os.path.join(os.path.dirname(__file__), 'resources', 'itch_test_schema.xml')
+
+
+class TestMessageIndex(SourceFileTestCase):
+    """Tests building sidecar indexes and seeking sources with them"""
+
+    def test_length_delimited_index(self):
+        """Tests entries every interval messages, and transcoding from a message between entries"""
+        path = self.write_source('itch.bin', length_delimited([order_deleted(x) for x in range(10)]))
+        index = build_index(get_message_source(path, None, 'length_delimited', 'big'), 4,
+                            get_template_id_reader('itch'))
+        self.assertEqual([index.entry(x) for x in range(len(index))],
+                         [(0, 0, -1, 68), (4, 84, -1, 68), (8, 168, -1, 68)])
+        index.write(MessageIndex.path_for(path))
+
+        index = MessageIndex.read(MessageIndex.path_for(path), os.path.getsize(path))
+        self.assertEqual((index.message_count, len(index)), (10, 3))
+        self.assertEqual(index.position_of_message(6), {'offset': 84, 'skip_messages': 2})
+        with self.assertRaises(MessageIndexError):
+            index.position_of_message(10)
+        with self.assertRaises(MessageIndexError):
+            MessageIndex.read(MessageIndex.path_for(path), 1)
+
+        config = TranscoderConfig('itch', SCHEMA_PATH, path, source_file_format_type='length_delimited', quiet=True,
+                                  output_type='jsonl', output_path=self.temp_dir.name,
+                                  error_output_path=self.temp_dir.name, lazy_create_resources=True, start_message=6)
+        transcoder = Transcoder.from_config(config)
+        transcoder.transcode()
+        transcoder.output_manager.wait_for_completion()
+        self.assertEqual((transcoder.source.message_count, transcoder.source.record_count), (10, 4))
+        with open(os.path.join(self.temp_dir.name, 'itch-order_deleted.jsonl'), encoding='utf-8') as output_file:
+            self.assertEqual([json.loads(x)['order_reference_number'] for x in output_file], [6, 7, 8, 9])
+
+    def test_cme_binary_packet_index(self):
+        """Tests entries are made at packet boundaries with the packet sending time"""
+        path = self.write_source('cme.bin', cme_packet([cme_message(46), cme_message(47)], 1, 100) +
+                                 cme_packet([cme_message(48)], 1, 200) +
+                                 cme_packet([cme_message(49), cme_message(50), cme_message(51)], 1, 300))
+        index = build_index(get_message_source(path, None, 'cme_binary_packet', 'little'), 2,
+                            get_template_id_reader('cme'))
+        self.assertEqual(index.message_count, 6)
+        self.assertEqual([index.entry(x) for x in range(len(index))], [(0, 0, 100, 46), (2, 34, 200, 48)])
+        self.assertEqual(index.position_of_message(5), {'offset': 34, 'skip_messages': 3})
+        self.assertEqual(index.position_at_time(250), {'offset': 34, 'skip_messages': 0})
+        self.assertEqual(index.position_at_time(50), {'offset': 0, 'skip_messages': 0})
+
+    def test_pcap_index(self):
+        """Tests capture timestamps of pcap packets and seeking by time past packets without payloads"""
+        path = os.path.join(self.temp_dir.name, 'capture.pcap')
+        with open(path, 'wb') as pcap_file:
+            writer = dpkt.pcap.Writer(pcap_file)
+            for second, payload in enumerate([b'first', None, b'second', b'third']):
+                frame = udp_frame(payload) if payload is not None else bytes(dpkt.ethernet.Ethernet(type=0x0806))
+                writer.writepkt(frame, ts=1_672_565_400 + second + 0.25)
+        index = build_index(get_message_source(path, None, 'pcap', None), 1)
+        self.assertEqual(index.message_count, 3)
+        self.assertEqual([index.timestamps[x] for x in range(len(index))],
+                         [1_672_565_400_250_000_000, 1_672_565_402_250_000_000, 1_672_565_403_250_000_000])
+        index.write(MessageIndex.path_for(path))
+
+        source = get_message_source(path, None, 'pcap', None)
+        with source:
+            self.assertEqual(source.message_count, 3)
+            source.seek(source.position_at_time(1_672_565_402_500_000_000))
+            self.assertEqual(list(source.get_message_iterator()), [b'second', b'third'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,148 @@
+#
+# Copyright 2023 Google LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+# pylint: disable=invalid-name
+
+import json
+import os
+import tempfile
+import unittest
+
+import fastavro
+
+from frame_util import length_delimited, order_deleted
+from transcoder.MultiFileTranscoder import MultiFileTranscodeError, MultiFileTranscoder
+from transcoder.TranscoderConfig import TranscoderConfig
+from transcoder.message.MessageUtil import get_message_parser
+from transcoder.source import expand_source_paths, is_multi_file_source
+
+SCHEMA_PATH = os.path.join(os.path.dirname(__file__), 'resources', 'itch_test_schema.xml')
+FIX_SPEC_PATH = os.path.join(os.path.dirname(__file__), 'resources', 'fix_test_spec.xml')
+
+
+class TestMultiFileTranscoder(unittest.TestCase):
+    """Tests transcoding the files of a directory or glob pattern in a pool of worker processes"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.source_dir = os.path.join(self.temp_dir.name, 'day1')
+        self.output_dir = os.path.join(self.temp_dir.name, 'out')
+        os.makedirs(self.source_dir)
+        # Files of 30, 10 and 20 messages, numbered on from each other in name order
+        self.paths = [self.write_source(name, range(first, first + count))
+                      for name, first, count in [('a.bin', 0, 30), ('b.bin', 30, 10), ('c.bin', 40, 20)]]
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write_source(self, name: str, order_ids) -> str:
+        """Writes a source file of order_deleted messages of the order ids, returning its path"""
+        path = os.path.join(self.source_dir, name)
+        with open(path, 'wb') as source_file:
+            source_file.write(length_delimited([order_deleted(x) for x in order_ids]))
+        return path
+
+    def config(self, source_file_path: str, output_type: str = 'jsonl', message_handlers: str = None) \
+            -> TranscoderConfig:
+        """Returns the config of a transcode of the ITCH source files to the output directory"""
+        return TranscoderConfig('itch', SCHEMA_PATH, source_file_path, source_file_format_type='length_delimited',
+                                quiet=True, output_type=output_type, output_path=self.output_dir,
+                                error_output_path=self.output_dir, message_handlers=message_handlers)
+
+    def test_source_paths(self):
+        """Tests directories and glob patterns expand to their files in name order, leaving out message indexes"""
+        self.write_source('a.bin.idx', [])
+        self.assertTrue(is_multi_file_source(self.source_dir))
+        self.assertTrue(is_multi_file_source(os.path.join(self.source_dir, '*.bin')))
+        self.assertFalse(is_multi_file_source(self.paths[0]))
+        self.assertEqual(expand_source_paths(self.source_dir), self.paths)
+        self.assertEqual(expand_source_paths(os.path.join(self.source_dir, '[bc].bin')), self.paths[1:])
+
+        transcoder = MultiFileTranscoder.from_source(self.config(self.source_dir))
+        self.assertEqual(transcoder.source_paths, [self.paths[0], self.paths[2], self.paths[1]])
+        self.assertEqual(transcoder.merged_prefix, 'day1')
+
+        other_dir = os.path.join(self.temp_dir.name, 'day2')
+        os.makedirs(other_dir)
+        with self.assertRaises(MultiFileTranscodeError):
+            MultiFileTranscoder(self.config(self.source_dir), self.paths + [os.path.join(other_dir, 'a.bin')])
+        with self.assertRaises(MultiFileTranscodeError):
+            MultiFileTranscoder(self.config(self.source_dir, 'diag'), self.paths, merge_outputs=True)
+
+    def test_per_file_outputs(self):
+        """Tests each file is transcoded to outputs prefixed with its name"""
+        results = MultiFileTranscoder.from_source(self.config(os.path.join(self.source_dir, '*.bin')),
+                                                  workers=2).transcode()
+        self.assertEqual({path: result['source_record_count'] for path, result in results.items()},
+                         dict(zip(self.paths, [30, 10, 20])))
+        for name, count in [('a', 30), ('b', 10), ('c', 20)]:
+            with open(os.path.join(self.output_dir, f'{name}-order_deleted.jsonl'), encoding='utf-8') as output_file:
+                self.assertEqual(len(output_file.readlines()), count)
+
+    def test_shared_parser_schemas(self):
+        """Tests a worker transcoding several files reuses the parser its cached FIX schemas were loaded into"""
+        fix_dir = os.path.join(self.temp_dir.name, 'fix')
+        os.makedirs(fix_dir)
+        for name in ['a', 'b']:
+            with open(os.path.join(fix_dir, f'{name}.fix'), 'w', encoding='utf-8') as source_file:
+                for sequence_number in range(1, 4):
+                    source_file.write(f'8=FIX.4.4|9=100|35=0|49=SENDER|56=TARGET|34={sequence_number}|'
+                                      f'52=20230101-12:00:00.000|112=ping|10=000|\n')
+        cache_dir = os.path.join(self.temp_dir.name, 'cache')
+        get_message_parser('fix', FIX_SPEC_PATH, schema_cache_dir=cache_dir).process_schema()
+        config = TranscoderConfig('fix', FIX_SPEC_PATH, fix_dir, source_file_format_type='line_delimited', quiet=True,
+                                  output_type='jsonl', output_path=self.output_dir, error_output_path=self.output_dir,
+                                  message_handlers='SequencerHandler', fix_separator=ord('|'),
+                                  schema_cache_dir=cache_dir)
+        results = MultiFileTranscoder.from_source(config, workers=1).transcode()
+        self.assertEqual([x['transcoded_count'] for x in results.values()], [3, 3])
+        with open(os.path.join(self.output_dir, 'b-Heartbeat.jsonl'), encoding='utf-8') as output_file:
+            self.assertEqual([json.loads(x)['sequence_number'] for x in output_file], [1, 2, 3])
+
+    def test_merged_outputs(self):
+        """Tests file outputs are merged in file name order into outputs prefixed with the directory name"""
+        for output_type, schema_extension in [('jsonl', 'schema.json'), ('avro', 'avsc')]:
+            MultiFileTranscoder.from_source(self.config(self.source_dir, output_type), workers=2,
+                                            merge_outputs=True).transcode()
+            output_path = os.path.join(self.output_dir, f'day1-order_deleted.{output_type}')
+            if output_type == 'jsonl':
+                with open(output_path, encoding='utf-8') as output_file:
+                    records = [json.loads(x) for x in output_file]
+            else:
+                with open(output_path, 'rb') as output_file:
+                    records = list(fastavro.reader(output_file))
+            self.assertEqual([x['order_reference_number'] for x in records], list(range(60)))
+            self.assertTrue(os.path.exists(os.path.join(self.output_dir, f'day1-order_deleted.{schema_extension}')))
+            self.assertFalse(any(x.startswith(('a-', 'b-', 'c-')) for x in os.listdir(self.output_dir)))
+
+    def test_merged_sequence_numbers(self):
+        """Tests sequenced records of merged outputs carry the file they were numbered in"""
+        MultiFileTranscoder.from_source(self.config(self.source_dir, message_handlers='SequencerHandler'), workers=2,
+                                        merge_outputs=True).transcode()
+        with open(os.path.join(self.output_dir, 'day1-order_deleted.jsonl'), encoding='utf-8') as output_file:
+            records = [json.loads(x) for x in output_file]
+        self.assertEqual([(x['source_file'], x['sequence_number']) for x in records],
+                         [('a', x) for x in range(1, 31)] + [('b', x) for x in range(1, 11)] +
+                         [('c', x) for x in range(1, 21)])
+        with open(os.path.join(self.output_dir, 'day1-order_deleted.schema.json'), encoding='utf-8') as schema_file:
+            self.assertIn('source_file', json.load(schema_file)['properties'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,179 @@
+#
+# Copyright 2023 Google LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+# pylint: disable=invalid-name
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+from frame_util import length_delimited, system_event, time_message
+from transcoder.PluginRegistry import PluginCapabilities, PluginRegistry
+from transcoder.Transcoder import Transcoder
+from transcoder.TranscoderConfig import TranscoderConfig
+from transcoder.message.MessageUtil import message_handlers, message_parsers
+from transcoder.message.exception import MessageHandlerNotDefinedError
+from transcoder.message.handler.MessageHandler import MessageHandler
+from transcoder.output.OutputUtil import output_managers
+from transcoder.source.SourceUtil import sources
+
+SCHEMA_PATH = os.path.join(os.path.dirname(__file__), 'resources', 'itch_test_schema.xml')
+SPEC_PATH = os.path.join(os.path.dirname(__file__), 'resources', 'fix_test_spec.xml')
+
+
+def create_transcoder(source_path: str, output_path: str, message_handlers_spec: str, factory: str = 'itch',
+                      source_type: str = 'length_delimited', **config) -> Transcoder:
+    """Returns a transcoder writing jsonl files of the source to the output path, with any other config given"""
+    schema_path = SPEC_PATH if factory == 'fix' else SCHEMA_PATH
+    config = TranscoderConfig(factory, schema_path, source_path, source_file_format_type=source_type, quiet=True,
+                              output_type=config.pop('output_type', 'jsonl'), output_path=output_path,
+                              error_output_path=output_path, message_handlers=message_handlers_spec,
+                              lazy_create_resources=True, **config)
+    return Transcoder.from_config(config)
+
+
+class TestPluginRegistry(unittest.TestCase):
+    """Tests implementations resolve from built ins, entry points and runtime registrations"""
+
+    def test_entry_points(self):
+        """Tests entry points add implementations, discovered only for identifiers that are not built in"""
+        registry = PluginRegistry('market_data_transcoder.outputs', {'jsonl': 'transcoder.output.json:JsonOutputManager',
+                                                                     'diag': 'transcoder.output.diag:DiagnosticOutputManager'})
+        entry_points = [('parquet', 'transcoder.message.ParsedMessage:ParsedMessage'),
+                        ('jsonl', 'transcoder.output.length_delimited:LengthDelimitedOutputManager')]
+        with mock.patch('transcoder.PluginRegistry.get_entry_points', return_value=entry_points) as get_entry_points:
+            self.assertIn('jsonl', registry)
+            self.assertEqual(registry.load('jsonl').output_type_identifier(), 'jsonl')
+            self.assertEqual(registry.builtin_names(), ['jsonl', 'diag'])
+            get_entry_points.assert_not_called()
+            self.assertEqual(registry.names(), ['jsonl', 'diag', 'parquet'])
+            self.assertEqual(registry.load('jsonl').output_type_identifier(), 'jsonl')
+            get_entry_points.assert_called_once_with('market_data_transcoder.outputs')
+        self.assertIn('parquet', registry)
+        self.assertNotIn('orc', registry)
+        self.assertEqual(registry.capabilities('parquet'), PluginCapabilities())
+
+        registry.register('jsonl', 'transcoder.output.length_delimited:LengthDelimitedOutputManager')
+        with mock.patch('transcoder.PluginRegistry.get_entry_points', return_value=entry_points):
+            self.assertEqual(registry.load('jsonl').output_type_identifier(), 'length_delimited')
+
+    def test_builtin_capabilities(self):
+        """Tests capabilities are described without constructing implementations"""
+        self.assertEqual(sources.capabilities('fix_stream'), PluginCapabilities(supports_zero_copy=True))
+        self.assertFalse(sources.capabilities('length_delimited').supports_zero_copy)
+        self.assertTrue(output_managers.capabilities('length_delimited').supports_zero_copy)
+        self.assertTrue(message_handlers.capabilities('SequencerHandler').supports_batching)
+        self.assertFalse(message_handlers.capabilities('BookBuilderHandler').supports_batching)
+        self.assertFalse(message_parsers.capabilities('fix').supports_zero_copy)
+        self.assertEqual(repr(PluginCapabilities(supports_batching=True)),
+                         'PluginCapabilities(supports_batching=True, supports_zero_copy=False)')
+
+
+class TestPipelineSelection(unittest.TestCase):
+    """Tests the transcoder picks its processing path from the capabilities of the configured implementations"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.source_path = os.path.join(self.temp_dir.name, 'itch.bin')
+        with open(self.source_path, 'wb') as source_file:
+            source_file.write(length_delimited([system_event(1), time_message(5), system_event(2), time_message(6),
+                                                system_event(3)]))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def read_output(self, name: str) -> [dict]:
+        """Returns the records of the jsonl output file of the message type"""
+        with open(os.path.join(self.temp_dir.name, f'itch-{name}.jsonl'), encoding='utf-8') as output_file:
+            return [json.loads(line) for line in output_file]
+
+    def test_batched_handlers(self):
+        """Tests handlers that all support batching are executed per batch with the same results"""
+        transcoder = create_transcoder(self.source_path, self.temp_dir.name,
+                                       'SequencerHandler,TimestampPullForwardHandler')
+        self.assertTrue(transcoder.batch_handlers)
+        self.assertFalse(transcoder.copy_source_buffers)
+        with mock.patch.object(transcoder, 'transcode_message') as transcode_message:
+            transcoder.transcode()
+            transcoder.output_manager.wait_for_completion()
+        transcode_message.assert_not_called()
+        self.assertEqual(transcoder.transcoded_count, 5)
+        self.assertEqual([(x['sequence_number'], x['timestamp_seconds']) for x in self.read_output('system_event')],
+                         [(1, None), (3, 5), (5, 6)])
+
+    def test_batch_with_bad_messages(self):
+        """Tests messages that fail to decode or to be handled are reported alone on the batch path"""
+        with open(self.source_path, 'ab') as source_file:
+            source_file.write(length_delimited([b'S\x00\x00', system_event(4)]))
+        outputs, error_counts = [], []
+        for batch_handlers in [True, False]:
+            transcoder = create_transcoder(self.source_path, self.temp_dir.name, 'SequencerHandler,'
+                                           'TimestampPullForwardHandler')
+            transcoder.batch_handlers = batch_handlers
+            handlers_module = sys.modules[type(transcoder.all_handlers[1]).__module__]
+            # The handler fails on one well formed message, by its timestamp
+            original_handle = handlers_module.TimestampPullForwardHandler.handle
+
+            def handle(handler, message, original_handle=original_handle):
+                if message.dictionary.get('timestamp') == 2:
+                    raise ValueError('handler failure')
+                original_handle(handler, message)
+
+            with mock.patch.object(handlers_module.TimestampPullForwardHandler, 'handle', handle), \
+                    mock.patch.object(handlers_module.TimestampPullForwardHandler, 'handle_batch',
+                                      MessageHandler.handle_batch), \
+                    mock.patch.object(transcoder, 'handle_exception') as handle_exception:
+                transcoder.transcode()
+                transcoder.output_manager.wait_for_completion()
+            outputs.append(self.read_output('system_event'))
+            error_counts.append(handle_exception.call_count)
+        self.assertEqual(outputs[0], outputs[1])
+        self.assertEqual([x['timestamp'] for x in outputs[0]], [1, 3, 4])
+        self.assertEqual(error_counts, [2, 2])
+
+    def test_message_by_message_handlers(self):
+        """Tests a handler without batch support keeps the message by message path"""
+        transcoder = create_transcoder(self.source_path, self.temp_dir.name, 'SequencerHandler,FilterHandler')
+        self.assertFalse(transcoder.batch_handlers)
+
+    def test_zero_copy_source(self):
+        """Tests memoryview frames are copied only for parsers, or frame only outputs, that do not accept them"""
+        self.assertTrue(create_transcoder(None, None, None, 'fix', 'fix_stream').copy_source_buffers)
+        self.assertFalse(create_transcoder(None, None, None, 'fix', 'fix_stream', frame_only=True,
+                                           output_type='length_delimited').copy_source_buffers)
+        self.assertTrue(create_transcoder(None, None, None, 'fix', 'fix_stream', frame_only=True).copy_source_buffers)
+
+    def test_registered_handler(self):
+        """Tests handlers registered at runtime are available to --message_handlers"""
+        message_handlers.register('PluginSequencerHandler', 'transcoder.message.handler:SequencerHandler')
+        try:
+            transcoder = create_transcoder(self.source_path, self.temp_dir.name, 'PluginSequencerHandler')
+            self.assertEqual(type(transcoder.all_handlers[0]).__name__, 'SequencerHandler')
+        finally:
+            del message_handlers.registered_plugins['PluginSequencerHandler']
+            message_handlers.register('SequencerHandler', 'transcoder.message.handler:SequencerHandler')
+        with self.assertRaises(MessageHandlerNotDefinedError):
+            create_transcoder(self.source_path, self.temp_dir.name, 'MissingHandler')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+#
+# Copyright 2023 Google LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+# pylint: disable=invalid-name
+
+import json
+import os
+import struct
+import unittest
+
+import dpkt
+
+from frame_util import (SourceFileTestCase, add_order, cme_message, cme_packet, length_delimited, order_deleted,
+                        udp_frame)
+from transcoder.Transcoder import Transcoder
+from transcoder.TranscoderConfig import TranscoderConfig
+from transcoder.source import get_message_source
+from transcoder.source.Source import SourceNotShardableError
+from transcoder.source.file.MessageIndex import MessageIndex, build_index
+
+SCHEMA_PATH = os.path.join(os.path.dirname(__file__), 'resources', 'itch_test_schema.xml')
+
+
+def read_shards(path: str, source_file_format_type: str, endian: str, shard_count: int, **kwargs) -> [[bytes]]:
+    """Returns the messages read by each shard of a source"""
+    shards = []
+    for shard_index in range(shard_count):
+        source = get_message_source(path, None, source_file_format_type, endian, **kwargs)
+        source.set_shard(shard_index, shard_count)
+        with source:
+            shards.append([bytes(x) for x in source.get_message_iterator()])
+    return shards
+
+
+class TestShard(SourceFileTestCase):
+    """Tests splitting source files into byte ranges aligned to frames"""
+
+    def test_length_delimited_shards(self):
+        """Tests every message is read by exactly one shard, resynchronising on length prefixes or from the index"""
+        messages = [add_order(x, b'B', 100, 1000 + x, timestamp=x) if x % 3 == 0 else order_deleted(x)
+                    for x in range(3000)]
+        path = self.write_source('itch.bin', b'HEADER' + length_delimited(messages))
+        shards = read_shards(path, 'length_delimited', 'big', 7, skip_bytes=6)
+        self.assertTrue(all(len(x) > 0 for x in shards))
+        self.assertEqual(sum(shards, []), messages)
+
+        build_index(get_message_source(path, None, 'length_delimited', 'big', skip_bytes=6), 100) \
+            .write(MessageIndex.path_for(path))
+        shards = read_shards(path, 'length_delimited', 'big', 7, skip_bytes=6)
+        self.assertEqual([len(x) for x in shards], [500, 400, 400, 500, 400, 400, 400])
+        self.assertEqual(sum(shards, []), messages)
+
+    def test_cme_binary_packet_shards(self):
+        """Tests shards start on packets whose message sizes add up to the packet length"""
+        packets = [cme_packet([cme_message(46 + x % 5, 4 * ((46 + x % 5) % 3))] * (1 + x % 4), x, 100 * x)
+                   for x in range(2000)]
+        path = self.write_source('cme.bin', b''.join(struct.pack('<H', 0) + x for x in packets))
+        shards = read_shards(path, 'cme_binary_packet', 'little', 5, message_skip_bytes=2)
+        self.assertTrue(all(len(x) > 0 for x in shards))
+        self.assertEqual(sum(shards, []), sum(read_shards(path, 'cme_binary_packet', 'little', 1,
+                                                          message_skip_bytes=2), []))
+        self.assertEqual(len(sum(shards, [])), sum(1 + x % 4 for x in range(2000)))
+
+    def test_pcap_shards(self):
+        """Tests shards start on packet records, and sources that can not be sharded"""
+        path = os.path.join(self.temp_dir.name, 'capture.pcap')
+        payloads = [order_deleted(x) * (1 + x % 3) for x in range(1000)]
+        with open(path, 'wb') as pcap_file:
+            writer = dpkt.pcap.Writer(pcap_file)
+            for i, payload in enumerate(payloads):
+                writer.writepkt(udp_frame(payload), ts=1_672_565_400 + i / 1000)
+        shards = read_shards(path, 'pcap', None, 4)
+        self.assertTrue(all(len(x) > 0 for x in shards))
+        self.assertEqual(sum(shards, []), payloads)
+
+        with self.assertRaises(SourceNotShardableError):
+            get_message_source(path, None, 'line_delimited', None).set_shard(0, 2)
+
+    def test_shard_output(self):
+        """Tests shard output files are named for the shard and sequenced messages carry the shard index"""
+        path = self.write_source('itch.bin', length_delimited([order_deleted(x) for x in range(100)]))
+        order_ids = []
+        for shard_index in range(2):
+            config = TranscoderConfig('itch', SCHEMA_PATH, path, source_file_format_type='length_delimited',
+                                      quiet=True, output_type='jsonl', output_path=self.temp_dir.name,
+                                      error_output_path=self.temp_dir.name, message_handlers='SequencerHandler',
+                                      lazy_create_resources=True, shard_index=shard_index, shard_count=2)
+            transcoder = Transcoder.from_config(config)
+            transcoder.transcode()
+            transcoder.output_manager.wait_for_completion()
+            output_path = os.path.join(self.temp_dir.name, f'itch-{shard_index:05d}-of-00002-order_deleted.jsonl')
+            with open(output_path, encoding='utf-8') as output_file:
+                records = [json.loads(x) for x in output_file]
+            self.assertEqual({x['shard_index'] for x in records}, {shard_index})
+            self.assertEqual([x['sequence_number'] for x in records], list(range(1, len(records) + 1)))
+            order_ids.extend(x['order_reference_number'] for x in records)
+        self.assertEqual(order_ids, list(range(100)))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+#
+# Copyright 2023 Google LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+# pylint: disable=invalid-name
+
+import json
+import os
+import pstats
+import tempfile
+import unittest
+
+from frame_util import length_delimited, system_event, time_message
+from transcoder.StageProfiler import StageStats
+from transcoder.Transcoder import Transcoder
+from transcoder.TranscoderConfig import TranscoderConfig
+
+SCHEMA_PATH = os.path.join(os.path.dirname(__file__), 'resources', 'itch_test_schema.xml')
+
+
+class TestStageProfiler(unittest.TestCase):
+    """Tests the per stage and message type profile of a transcoding run"""
+
+    def test_stage_stats(self):
+        """Tests cumulative times cover every call and percentiles the sampled ones"""
+        stats = StageStats()
+        for elapsed in range(1, 101):
+            stats.add(elapsed)
+        self.assertEqual(stats.to_dict(), {'calls': 100, 'total_ns': 5050, 'mean_ns': 50, 'sampled_calls': 7,
+                                           'p50_ns': 49, 'p99_ns': 97, 'max_ns': 97})
+
+    def test_profile_report(self):
+        """Tests framing, parsing, handlers and writes are reported by message type, with a pstats dump"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            source_path = os.path.join(temp_dir, 'itch.bin')
+            with open(source_path, 'wb') as source_file:
+                source_file.write(length_delimited([time_message(x) for x in range(3)] + [system_event(0)]))
+
+            report_path, pstats_path = os.path.join(temp_dir, 'profile.json'), os.path.join(temp_dir, 'profile.pstats')
+            transcoder = Transcoder.from_config(TranscoderConfig(
+                factory='itch', schema_file_path=SCHEMA_PATH, source_file_path=source_path,
+                source_file_format_type='length_delimited', quiet=True, output_type='jsonl', output_path=temp_dir,
+                error_output_path=temp_dir, message_handlers='SequencerHandler', profile_path=report_path,
+                profile_pstats_path=pstats_path))
+            self.assertFalse(transcoder.batch_handlers)
+            transcoder.transcode()
+            transcoder.output_manager.wait_for_completion()
+
+            with open(report_path, encoding='utf-8') as report_file:
+                stages = json.load(report_file)['stages']
+            self.assertEqual(set(stages), {'framing', 'process_message', 'parse_message', 'handler:SequencerHandler',
+                                           'write_record'})
+            self.assertEqual(stages['framing']['by_message_type']['*']['calls'], 4)
+            for stage in ['parse_message', 'handler:SequencerHandler', 'write_record']:
+                self.assertEqual({k: v['calls'] for k, v in stages[stage]['by_message_type'].items()},
+                                 {'time_message': 3, 'system_event': 1})
+            self.assertAlmostEqual(sum(x['share'] for x in stages.values()), 1, places=3)
+            self.assertGreater(pstats.Stats(pstats_path).total_calls, 0)
+            self.assertNotIn('_parse_message', vars(transcoder.message_parser))
+
+
+if __name__ == '__main__':
+    unittest.main()
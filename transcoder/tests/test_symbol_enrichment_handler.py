@@ -0,0 +1,104 @@
+#
+# Copyright 2023 Google LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+# pylint: disable=invalid-name
+
+import json
+import os
+import struct
+import tempfile
+import unittest
+
+from frame_util import add_order, itch_header, length_delimited
+from transcoder.Transcoder import Transcoder
+from transcoder.TranscoderConfig import TranscoderConfig
+from transcoder.message.ParsedMessage import ParsedMessage
+from transcoder.message.handler import SymbolEnrichmentHandler
+
+SCHEMA_PATH = os.path.join(os.path.dirname(__file__), 'resources', 'itch_test_schema.xml')
+
+
+def stock_directory(stock_locate: int, stock: bytes) -> bytes:
+    """Returns an ITCH stock_directory message naming the stock of the stock locate"""
+    return itch_header(b'R', stock_locate) + struct.pack('>8scB', stock.ljust(8), b'Q', 0)
+
+
+def cme_message(name: str, entries: [dict], **fields) -> ParsedMessage:
+    """Returns a decoded CME message of the name, with the entries as its no_md_entries group"""
+    return ParsedMessage(46, name, None, dictionary=dict(fields, no_md_entries=entries))
+
+
+class TestSymbolEnrichmentHandler(unittest.TestCase):
+    """Tests symbols learned from directory messages and secdef files are appended to messages"""
+
+    def test_transcode_itch_symbols(self):
+        """Tests the symbol field is added to schemas and filled in from stock_directory messages"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            source_path = os.path.join(temp_dir, 'itch.bin')
+            with open(source_path, 'wb') as source_file:
+                source_file.write(length_delimited([add_order(1, b'B', 100, 1000, stock_locate=3),
+                                                    stock_directory(3, b'AAPL'),
+                                                    add_order(1, b'B', 100, 1000, stock_locate=3),
+                                                    add_order(1, b'B', 100, 1000, stock_locate=4)]))
+
+            config = TranscoderConfig('itch', SCHEMA_PATH, source_path, source_file_format_type='length_delimited',
+                                      quiet=True, output_type='jsonl', output_path=temp_dir,
+                                      error_output_path=temp_dir, message_handlers='SymbolEnrichmentHandler',
+                                      lazy_create_resources=True)
+            transcoder = Transcoder.from_config(config)
+            transcoder.transcode()
+            transcoder.output_manager.wait_for_completion()
+
+            with open(os.path.join(temp_dir, 'itch-add_order_no_attribution.jsonl'), encoding='utf-8') as add_file:
+                self.assertEqual([json.loads(line)['symbol'] for line in add_file], [None, 'AAPL', None])
+            with open(os.path.join(temp_dir, 'itch-stock_directory.jsonl'), encoding='utf-8') as directory_file:
+                self.assertEqual(json.loads(directory_file.readline())['symbol'], 'AAPL')
+            with open(os.path.join(temp_dir, 'itch-stock_directory.schema.json'), encoding='utf-8') as schema_file:
+                self.assertEqual(json.load(schema_file)['properties']['symbol']['type'], 'string')
+            handler = transcoder.all_handlers[0]
+            self.assertEqual(handler.enrichment_plans['time_message'], (False, ()))
+
+    def test_cme_definitions_and_groups(self):
+        """Tests security ids beyond the lookup array and symbols within repeating group entries"""
+        handler = SymbolEnrichmentHandler({'key_field': 'security_id'})
+        definition = ParsedMessage(54, 'MDInstrumentDefinitionFuture54', None,
+                                   dictionary={'security_id': 1_000_042, 'symbol': 'ESZ3'})
+        handler.handle(definition)
+        self.assertEqual(definition.dictionary, {'security_id': 1_000_042, 'symbol': 'ESZ3'})
+
+        message = cme_message('MDIncrementalRefreshBook46', [{'security_id': 1_000_042}, {'security_id': 7}],
+                              transact_time=1)
+        handler.handle(message)
+        self.assertEqual([x['symbol'] for x in message.dictionary['no_md_entries']], ['ESZ3', None])
+        self.assertNotIn('symbol', message.dictionary)
+        self.assertEqual(handler.overflow_symbols, {1_000_042: 'ESZ3'})
+
+    def test_secdef_file(self):
+        """Tests symbols are pre-seeded from the SecurityID and Symbol tags of a secdef file"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            secdef_path = os.path.join(temp_dir, 'secdef.dat')
+            with open(secdef_path, 'w', encoding='utf-8') as secdef_file:
+                secdef_file.write('35=d\x0148=42\x0155=NQZ3\x01\n35=d\x0148=2000000\x0155=CLF4\x01\n35=d\x0155=X\x01\n')
+            handler = SymbolEnrichmentHandler({'key_field': 'security_id', 'secdef_file': secdef_path})
+        self.assertEqual((handler.get_symbol(42), handler.get_symbol(2_000_000)), ('NQZ3', 'CLF4'))
+        self.assertIsNone(handler.get_symbol(None))
+
+
+if __name__ == '__main__':
+    unittest.main()
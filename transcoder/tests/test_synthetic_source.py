@@ -0,0 +1,97 @@
+#
+# Copyright 2023 Google LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+# pylint: disable=invalid-name
+
+import os
+import tempfile
+import time
+import unittest
+
+from frame_util import FIX_SPEC_PATH, ITCH_SCHEMA_PATH, schema_parser, synthetic_messages
+from transcoder.Transcoder import Transcoder
+from transcoder.TranscoderConfig import TranscoderConfig
+from transcoder.source.synthetic.SyntheticMessageSource import InvalidSyntheticOptionsError, START_TIMESTAMP
+
+
+def parse_all(factory: str, schema_file_path: str, messages: [bytes]) -> list:
+    """Returns the messages parsed with a parser of the factory and schema"""
+    parser = schema_parser(factory, schema_file_path)
+    return [parser.process_message(x) for x in messages]
+
+
+class TestSyntheticMessageSource(unittest.TestCase):
+    """Tests messages generated from schema templates decode, follow the mix and advance monotonically"""
+
+    def test_itch_messages(self):
+        """Tests generated ITCH messages decode with increasing timestamps in the configured mix"""
+        messages = parse_all('itch', ITCH_SCHEMA_PATH, synthetic_messages(
+            'itch', ITCH_SCHEMA_PATH, 'count=2000:mix=add_order_no_attribution=3|order_deleted=1'))
+        counts = {x.name: sum(1 for y in messages if y.name == x.name) for x in messages}
+        self.assertEqual(set(counts), {'add_order_no_attribution', 'order_deleted'})
+        self.assertGreater(counts['add_order_no_attribution'], counts['order_deleted'] * 2)
+
+        timestamps = [x.dictionary['timestamp'] for x in messages]
+        self.assertEqual(timestamps[0], START_TIMESTAMP % 86_400_000_000_000)
+        self.assertTrue(all(b - a == 1000 for a, b in zip(timestamps, timestamps[1:])))
+
+    def test_fix_messages(self):
+        """Tests generated FIX messages decode with valid checksums, group sizes and sequence numbers"""
+        raw_messages = synthetic_messages('fix', FIX_SPEC_PATH, 'count=500:group_size=2-3:rate=0')
+        for raw in raw_messages:
+            checksum_index = raw.rindex(b'\x0110=') + 1
+            self.assertEqual(int(raw[checksum_index + 3:checksum_index + 6]), sum(raw[:checksum_index]) % 256)
+
+        messages = parse_all('fix', FIX_SPEC_PATH, raw_messages)
+        self.assertEqual([x.dictionary['MsgSeqNum'] for x in messages], list(range(1, 501)))
+        refreshes = [x for x in messages if x.name == 'MarketDataIncrementalRefresh']
+        self.assertTrue(refreshes)
+        self.assertTrue(all(2 <= len(x.dictionary['NoMDEntries']) <= 3 for x in refreshes))
+        self.assertEqual(messages[0].dictionary['SendingTime'], '20230101-09:30:00.000')
+
+    def test_rate(self):
+        """Tests generation is paced to the configured rate"""
+        start_time = time.monotonic()
+        messages = synthetic_messages('itch', ITCH_SCHEMA_PATH, 'count=1024:rate=4096')
+        self.assertEqual(len(messages), 1024)
+        self.assertGreaterEqual(time.monotonic() - start_time, 0.18)
+
+    def test_invalid_options(self):
+        """Tests unknown options and message types are rejected"""
+        with self.assertRaises(InvalidSyntheticOptionsError):
+            synthetic_messages('itch', ITCH_SCHEMA_PATH, 'count=10:speed=fast')
+        with self.assertRaises(InvalidSyntheticOptionsError):
+            synthetic_messages('itch', ITCH_SCHEMA_PATH, 'mix=no_such_message=1')
+
+    def test_transcode(self):
+        """Tests a synthetic source transcodes without errors into outputs prefixed as synthetic"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            config = TranscoderConfig('itch', ITCH_SCHEMA_PATH, source_file_format_type='synthetic', quiet=True,
+                                      output_type='jsonl', output_path=temp_dir, error_output_path=temp_dir,
+                                      lazy_create_resources=True, synthetic_options='count=300:mix=trade=1')
+            transcoder = Transcoder.from_config(config)
+            transcoder.transcode()
+            transcoder.output_manager.wait_for_completion()
+            self.assertEqual((transcoder.source.record_count, transcoder.transcoded_count), (300, 300))
+            with open(os.path.join(temp_dir, 'synthetic-trade.jsonl'), encoding='utf-8') as trade_file:
+                self.assertEqual(sum(1 for _ in trade_file), 300)
+
+
+if __name__ == '__main__':
+    unittest.main()
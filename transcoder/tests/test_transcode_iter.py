@@ -0,0 +1,95 @@
+#
+# Copyright 2023 Google LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+# pylint: disable=invalid-name
+
+import dataclasses
+import inspect
+import io
+import os
+import unittest
+from unittest import mock
+
+from frame_util import length_delimited, system_event, time_message
+from transcoder import TranscoderConfig, transcode_iter
+from transcoder.Transcoder import Transcoder
+from transcoder.message.MessageUtil import get_message_parser
+from transcoder.message.handler import SequencerHandler
+from transcoder.source import get_message_source
+
+ITCH_SCHEMA_PATH = os.path.join(os.path.dirname(__file__), 'resources', 'itch_test_schema.xml')
+FIX_SPEC_PATH = os.path.join(os.path.dirname(__file__), 'resources', 'fix_test_spec.xml')
+
+MESSAGES = [system_event(), time_message(5), system_event(event_code=b'C')]
+
+
+class TestTranscodeIter(unittest.TestCase):
+    """Tests in process transcoding of in memory sources"""
+
+    def test_buffer_sources(self):
+        """Tests bytes, memoryviews and iterables of messages yield the same records"""
+        expected = [('system_event', 'Start of Messages'), ('time_message', 5), ('system_event', 'End of Messages')]
+        for source in [length_delimited(MESSAGES), memoryview(bytearray(length_delimited(MESSAGES))), MESSAGES]:
+            records = list(transcode_iter(source, 'itch', schema_file_path=ITCH_SCHEMA_PATH))
+            self.assertEqual([(name, record.get('event_code', record.get('second'))) for name, record in records],
+                             expected)
+
+    def test_handlers_and_batches(self):
+        """Tests handler specs and instances, batches and sampling"""
+        parser = get_message_parser('itch', ITCH_SCHEMA_PATH)
+        records = list(transcode_iter(length_delimited(MESSAGES), parser, handlers='SequencerHandler'))
+        self.assertEqual([x[1]['sequence_number'] for x in records], [1, 2, 3])
+
+        sequencer = SequencerHandler({'field_name': 'seq'})
+        batches = list(transcode_iter(length_delimited(MESSAGES * 2), parser, handlers=[sequencer], batch_size=4))
+        self.assertEqual([[x[1]['seq'] for x in batch] for batch in batches], [[1, 2, 3, 4], [5, 6]])
+
+        config = TranscoderConfig(schema_file_path=ITCH_SCHEMA_PATH, sampling_count=2)
+        self.assertEqual(len(list(transcode_iter(MESSAGES, 'itch', config=config))), 2)
+
+    def test_line_delimited_fix(self):
+        """Tests sources framed by a message source and sources passed as instances"""
+        messages = ['8=FIX.4.4\x019=5\x0135=0\x0110=000\x01', '8=FIX.4.4\x019=5\x0135=8\x0110=000\x01']
+        buffer = '\n'.join(messages).encode('utf-8')
+        records = transcode_iter(buffer, 'fix', schema_file_path=FIX_SPEC_PATH,
+                                 source_file_format_type='line_delimited')
+        self.assertEqual([name for name, _ in records], ['Heartbeat', 'ExecutionReport'])
+
+        source = get_message_source(io.BytesIO(buffer), None, 'fix_stream', None)
+        self.assertEqual(len(list(transcode_iter(source, 'fix', schema_file_path=FIX_SPEC_PATH))), 2)
+
+    def test_closed_early(self):
+        """Tests a source is closed when the records are closed before the source is exhausted"""
+        source = get_message_source(io.BytesIO(length_delimited(MESSAGES)), None, 'length_delimited', 'big')
+        with mock.patch.object(source, 'close', wraps=source.close) as close:
+            records = transcode_iter(source, 'itch', schema_file_path=ITCH_SCHEMA_PATH)
+            self.assertEqual(next(records)[0], 'system_event')
+            close.assert_not_called()
+            records.close()
+            close.assert_called_once_with()
+
+    def test_config_fields(self):
+        """Tests the config fields match the transcoder parameters"""
+        parameters = list(inspect.signature(Transcoder).parameters)
+        self.assertEqual([x.name for x in dataclasses.fields(TranscoderConfig)],
+                         [x for x in parameters if x not in ('message_parser', 'output_manager')])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+#
+# Copyright 2023 Google LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+# pylint: disable=invalid-name
+
+import json
+import os
+import tempfile
+import unittest
+import urllib.request
+
+from frame_util import length_delimited, system_event, time_message
+from transcoder.Transcoder import Transcoder
+from transcoder.TranscoderConfig import TranscoderConfig
+from transcoder.TranscoderMetrics import LATENCY_BUCKETS_NS, LatencyHistogram, TranscoderMetrics
+from transcoder.output.OutputManager import OutputManager
+
+SCHEMA_PATH = os.path.join(os.path.dirname(__file__), 'resources', 'itch_test_schema.xml')
+
+
+class TestTranscoderMetrics(unittest.TestCase):
+    """Tests the live metrics of a transcoding run"""
+
+    def test_latency_histogram(self):
+        """Tests latencies are counted in fixed buckets and percentiles reported as bucket bounds"""
+        histogram = LatencyHistogram()
+        self.assertIsNone(histogram.percentile_ns(50))
+        for elapsed in [500, 1000, 1500, 3000, 4000, 7000, 20_000, 10 ** 11]:
+            histogram.observe(elapsed)
+        self.assertEqual(histogram.cumulative_counts()[:5], [2, 3, 5, 6, 7])
+        self.assertEqual(histogram.cumulative_counts()[-1], 8)
+        self.assertEqual((histogram.percentile_ns(50), histogram.percentile_ns(75)), (5000, 10_000))
+        self.assertIsNone(histogram.percentile_ns(100))
+        self.assertEqual(len(LATENCY_BUCKETS_NS), 22)
+
+    def test_metered_transcode(self):
+        """Tests counts and bytes by type, sampled latencies, the stats file and the /metrics endpoint"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            source_path = os.path.join(temp_dir, 'itch.bin')
+            with open(source_path, 'wb') as source_file:
+                source_file.write(length_delimited([time_message(x) for x in range(3)] + [system_event(0)]))
+
+            stats_path = os.path.join(temp_dir, 'stats.json')
+            transcoder = Transcoder.from_config(TranscoderConfig(
+                factory='itch', schema_file_path=SCHEMA_PATH, source_file_path=source_path,
+                source_file_format_type='length_delimited', quiet=True, output_type='jsonl', output_path=temp_dir,
+                error_output_path=temp_dir, metrics_port=0, metrics_file_path=stats_path, metrics_interval=60))
+            transcoder.metrics.stop = lambda: None  # keep serving to scrape the endpoint after the run
+            transcoder.transcode()
+            metrics: TranscoderMetrics = transcoder.metrics
+            try:
+                port = metrics.http_server.server_port
+                with urllib.request.urlopen(f'http://127.0.0.1:{port}/metrics') as response:
+                    text = response.read().decode('utf-8')
+            finally:
+                TranscoderMetrics.stop(metrics)
+
+            self.assertIn('transcoder_messages_total{message_type="time_message"} 3', text)
+            self.assertIn('transcoder_message_bytes_total{message_type="system_event"} 12', text)
+            self.assertIn('transcoder_decode_latency_seconds_count 1', text)
+            self.assertIn(f'transcoder_source_read_bytes {3 * 7 + 14}', text)
+
+            with open(stats_path, encoding='utf-8') as stats_file:
+                stats = json.load(stats_file)
+            self.assertEqual({k: v for k, v in stats['messages_by_type'].items() if v},
+                             {'time_message': 3, 'system_event': 1})
+            self.assertEqual(stats['bytes_by_type'], {'time_message': 15, 'system_event': 12})
+            self.assertEqual(stats['transcoded_count'], 4)
+            self.assertEqual(stats['output_latency_ns']['sampled'], 1)
+            self.assertEqual((stats['output_in_flight'], stats['read_progress']), (0, 1.0))
+            self.assertFalse(os.path.exists(f'{stats_path}.tmp'))
+
+    def test_in_flight_count(self):
+        """Tests outputs without asynchronous writes have nothing in flight"""
+        self.assertEqual(OutputManager.in_flight_count(None), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
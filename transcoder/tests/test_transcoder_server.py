@@ -0,0 +1,209 @@
+#
+# Copyright 2023 Google LLC
+#
+# Licensed to the Apache Software Foundation (ASF) under one or more
+# contributor license agreements.  See the NOTICE file distributed with
+# this work for additional information regarding copyright ownership.
+# The ASF licenses this file to You under the Apache License, Version 2.0
+# (the "License"); you may not use this file except in compliance with
+# the License.  You may obtain a copy of the License at
+#
+#    http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+
+# pylint: disable=invalid-name
+
+import http.client
+import json
+import os
+import socket
+import struct
+import sys
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from transcoder.TranscoderConfig import TranscoderConfig
+from transcoder.message.DatacastSchema import DatacastSchema
+from transcoder.message.MessageUtil import get_message_parser
+from transcoder.output.google_cloud import PubSubOutputManager
+from transcoder.output.google_cloud.ResourceCache import resource_cache
+from transcoder.server import ParserPool, TranscoderServer
+
+SCHEMA_PATH = os.path.join(os.path.dirname(__file__), 'resources', 'itch_test_schema.xml')
+FIX_SPEC_PATH = os.path.join(os.path.dirname(__file__), 'resources', 'fix_test_spec.xml')
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTP connection over a UNIX domain socket"""
+
+    def __init__(self, socket_path: str):
+        super().__init__('localhost')
+        self.socket_path = socket_path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(self.socket_path)
+
+
+class TestParserPool(unittest.TestCase):
+    """Tests parsers are reused between jobs but never shared by concurrent ones"""
+
+    def test_checkout(self):
+        """Tests a returned parser is checked out again with its counts reset"""
+        pool = ParserPool()
+        config = TranscoderConfig(factory='itch', schema_file_path=SCHEMA_PATH)
+        with pool.checkout(config) as (first, reused):
+            self.assertFalse(reused)
+            first.increment_summary_count('time_message')
+            with pool.checkout(config) as (concurrent, _):
+                self.assertIsNot(concurrent, first)
+        with pool.checkout(config) as (parser, reused):
+            self.assertTrue(reused)
+            self.assertEqual(parser.record_count, 0)
+        self.assertEqual((pool.created_count, pool.reused_count, pool.idle_count()), (2, 1, 2))
+
+
+class TestTranscoderServer(unittest.TestCase):
+    """Tests jobs submitted to the server over a UNIX socket"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.source_path = os.path.join(self.temp_dir.name, 'itch.bin')
+        with open(self.source_path, 'wb') as source_file:
+            for second in range(3):
+                source_file.write(struct.pack('>HcI', 5, b'T', second))
+
+        self.server = TranscoderServer(max_workers=2)
+        self.socket_path = os.path.join(self.temp_dir.name, 'txcode.sock')
+        self.http_server = self.server.create_http_server(socket_path=self.socket_path)
+        threading.Thread(target=self.http_server.serve_forever, daemon=True).start()
+
+    def tearDown(self):
+        self.http_server.shutdown()
+        self.http_server.server_close()
+        self.server.shutdown()
+        self.temp_dir.cleanup()
+
+    def request(self, method: str, path: str, body: dict = None):
+        """Sends a request to the jobs API over the UNIX socket, returning the response status and JSON body"""
+        connection = UnixHTTPConnection(self.socket_path)
+        connection.request(method, path, body=json.dumps(body) if body is not None else None)
+        response = connection.getresponse()
+        result = response.status, json.loads(response.read())
+        connection.close()
+        return result
+
+    def test_jobs(self):
+        """Tests jobs run with per job stats, the second on a warm parser"""
+        options = {'factory': 'itch', 'schema_file_path': SCHEMA_PATH, 'source_file_path': self.source_path,
+                   'source_file_format_type': 'length_delimited', 'output_type': 'jsonl',
+                   'output_path': self.temp_dir.name, 'error_output_path': self.temp_dir.name}
+        status, first = self.request('POST', '/jobs?wait=true', options)
+        self.assertEqual((status, first['state'], first['warm_parser']), (200, 'succeeded', False))
+        self.assertEqual(first['summary']['transcoded_count'], 3)
+        self.assertEqual(first['summary']['record_type_count']['time_message'], 3)
+
+        status, second = self.request('POST', '/jobs', options)
+        self.assertEqual(status, 202)
+        self.server.get_job(second['job_id']).done.wait()
+        status, second = self.request('GET', f'/jobs/{second["job_id"]}')
+        self.assertEqual((second['state'], second['warm_parser']), ('succeeded', True))
+        self.assertEqual(second['summary']['record_type_count']['time_message'], 3)
+
+        with open(os.path.join(self.temp_dir.name, 'itch-time_message.jsonl'), encoding='utf-8') as output_file:
+            self.assertEqual(len(output_file.readlines()), 3)
+        self.assertEqual(self.request('GET', '/health')[1]['jobs']['succeeded'], 2)
+
+    def test_warm_parser_schemas(self):
+        """Tests fields appended by handlers of a job do not reach the cached schemas of the warm parser"""
+        source_path = os.path.join(self.temp_dir.name, 'session.fix')
+        with open(source_path, 'w', encoding='utf-8') as source_file:
+            for sequence_number in range(1, 3):
+                source_file.write(f'8=FIX.4.4|9=100|35=0|49=SENDER|56=TARGET|34={sequence_number}|'
+                                  f'52=20230101-12:00:00.000|112=ping|10=000|\n')
+        options = {'factory': 'fix', 'schema_file_path': FIX_SPEC_PATH, 'source_file_path': source_path,
+                   'source_file_format_type': 'line_delimited', 'fix_separator': ord('|'), 'output_type': 'jsonl',
+                   'output_path': self.temp_dir.name, 'error_output_path': self.temp_dir.name,
+                   'schema_cache_dir': os.path.join(self.temp_dir.name, 'cache'),
+                   'message_handlers': 'SequencerHandler'}
+        # The pooled parser loads its schemas from a spec cache written beforehand
+        get_message_parser('fix', FIX_SPEC_PATH, schema_cache_dir=options['schema_cache_dir']).process_schema()
+        for warm_parser in [False, True]:
+            status, job = self.request('POST', '/jobs?wait=true', options)
+            self.assertEqual((status, job['state'], job['warm_parser']), (200, 'succeeded', warm_parser),
+                             job.get('error'))
+            self.assertEqual(job['summary']['transcoded_count'], 2)
+
+    def test_invalid_jobs(self):
+        """Tests unknown options are rejected and failed jobs report their error"""
+        status, body = self.request('POST', '/jobs', {'source_file': self.source_path})
+        self.assertEqual((status, body['error']), (400, 'Unknown transcoder options: source_file'))
+
+        status, job = self.request('POST', '/jobs?wait=true', {
+            'factory': 'itch', 'schema_file_path': SCHEMA_PATH, 'source_file_format_type': 'length_delimited',
+            'source_file_path': os.path.join(self.temp_dir.name, 'missing.bin'), 'output_type': 'jsonl',
+            'output_path': self.temp_dir.name})
+        self.assertEqual(job['state'], 'failed')
+        self.assertTrue(job['error'].startswith('FileNotFoundError'))
+        self.assertEqual(self.request('GET', '/jobs/100')[0], 404)
+
+
+class TestResourceCache(unittest.TestCase):
+    """Tests Google Cloud clients and resource listings are shared by the output managers of a process"""
+
+    def tearDown(self):
+        resource_cache.clear()
+
+    def test_pubsub_listings(self):
+        """Tests topics and schemas are listed once per project"""
+        output_module = sys.modules[PubSubOutputManager.__module__]
+        with mock.patch.object(output_module.pubsub_v1, 'PublisherClient') as publisher, \
+                mock.patch.object(output_module, 'SchemaServiceClient') as schema_client:
+            publisher.return_value.list_topics.return_value = []
+            schema_client.return_value.list_schemas.return_value = []
+            first = PubSubOutputManager('project', 'binary')
+            second = PubSubOutputManager('project', 'json')
+            PubSubOutputManager('other-project', 'binary')
+        self.assertIs(first.publisher, second.publisher)
+        self.assertEqual(publisher.return_value.list_topics.call_count, 2)
+        self.assertEqual(schema_client.return_value.list_schemas.call_count, 2)
+
+    def test_stale_listings(self):
+        """Tests listings are listed again once expired, or once a create finds a resource created elsewhere"""
+        output_module = sys.modules[PubSubOutputManager.__module__]
+        with mock.patch.object(output_module.pubsub_v1, 'PublisherClient') as publisher, \
+                mock.patch.object(output_module, 'SchemaServiceClient') as schema_client, \
+                mock.patch.object(resource_cache, 'ttl', 0):
+            publisher.return_value.list_topics.return_value = []
+            schema_client.return_value.list_schemas.return_value = []
+            PubSubOutputManager('project', 'binary')
+            PubSubOutputManager('project', 'binary')
+        self.assertEqual(publisher.return_value.list_topics.call_count, 2)
+
+        resource_cache.clear()
+        with mock.patch.object(output_module.pubsub_v1, 'PublisherClient') as publisher, \
+                mock.patch.object(output_module, 'SchemaServiceClient') as schema_client:
+            publisher.return_value.list_topics.return_value = []
+            publisher.return_value.topic_path.return_value = 'projects/project/topics/trade'
+            publisher.return_value.create_topic.side_effect = output_module.AlreadyExists('topic')
+            schema_client.return_value.list_schemas.return_value = []
+            schema_client.return_value.schema_path.return_value = 'projects/project/schemas/trade'
+            schema_client.return_value.create_schema.side_effect = output_module.AlreadyExists('schema')
+            output_manager = PubSubOutputManager('project', 'binary')
+            PubSubOutputManager('project', 'binary')
+            self.assertEqual(publisher.return_value.list_topics.call_count, 1)
+            output_manager.add_schema(DatacastSchema('trade', 'trade', []))
+            PubSubOutputManager('project', 'binary')
+        self.assertEqual(publisher.return_value.list_topics.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()